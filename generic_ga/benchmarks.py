@@ -0,0 +1,187 @@
+# Genetic algorithms examples - operator benchmarks.
+# MIT License.
+
+# Times GA operators over a grid of problem sizes, stores the results as JSON
+# baselines and checks new results against a baseline.
+#
+# A benchmark case is a function taking the problem size and returning the
+# zero-argument callable to time, so that the setup cost (building the
+# population, the distance table, ...) is never measured:
+#
+#     def crossover_case( word_length ):
+#         words = ( random_word( word_length ), random_word( word_length ) )
+#         return lambda: ga.crossover( words )
+#
+# A case raises SkipBenchmark when a size makes no sense for it (e.g. a full
+# distance matrix that would not fit in memory). Sizes are run in increasing
+# order and an operator's larger sizes are skipped, rather than run for hours,
+# once a single call is predicted to take more than time_budget seconds. The
+# prediction extrapolates the growth measured on the two previous sizes (e.g.
+# an O(n^2) crossover at 10x the size is predicted to be 100x slower).
+#
+# Each example has its own runner, e.g.:
+#     python benchmarks_word_search_ga.py --save-baseline baseline.json
+#     python benchmarks_word_search_ga.py --check baseline.json --tolerance 1.5
+
+
+import argparse
+import json
+import platform
+import sys
+import time
+import numpy as np
+
+
+class SkipBenchmark( Exception ):
+    pass
+
+
+def time_callable( function, min_time = 0.1, repeats = 3 ):
+
+    # seconds per call: each of the repeats runs the callable enough times to
+    # last about min_time, and the fastest repeat wins (least noisy).
+    start_time = time.perf_counter()
+    function()
+    first_call_time = time.perf_counter() - start_time
+
+    number = max( 1, int( min_time / max( first_call_time, 1e-9 ) ) )
+    if number == 1 and first_call_time >= min_time:
+        # slow operator, one call already says enough.
+        return first_call_time
+
+    best_time = first_call_time
+    for _ in range( repeats ):
+        start_time = time.perf_counter()
+        for _ in range( number ):
+            function()
+        best_time = min( best_time, ( time.perf_counter() - start_time ) / number )
+    return best_time
+
+
+def get_predicted_time( timings, size ):
+
+    # extrapolate the time of a call at the given size from the last two
+    # measured ( size, seconds ) pairs, assuming at least linear growth.
+    ( size_0, seconds_0 ), ( size_1, seconds_1 ) = \
+        ( [ ( 1, 0.0 ) ] + timings )[ -2: ]
+    exponent = 1.0
+    if seconds_0 > 0.0 and size_1 > size_0:
+        exponent = max(
+            1.0, np.log( seconds_1 / seconds_0 ) / np.log( size_1 / size_0 )
+        )
+    return seconds_1 * ( size / float( size_1 ) ) ** exponent
+
+
+def run_benchmarks( cases, sizes, time_budget = 2.0, min_time = 0.1,
+                    repeats = 3, operators = None, log = None ):
+
+    # returns { operator: { str( size ): seconds per call or None } }.
+    results = {}
+    for operator, case in cases.items():
+        if operators and operator not in operators:
+            continue
+        results[ operator ] = {}
+        timings = []
+        for size in sorted( sizes ):
+            results[ operator ][ str( size ) ] = None
+            if timings and get_predicted_time( timings, size ) > time_budget:
+                continue
+            try:
+                seconds = time_callable( case( size ), min_time, repeats )
+            except SkipBenchmark:
+                continue
+            results[ operator ][ str( size ) ] = seconds
+            timings.append( ( size, seconds ) )
+            if log is not None:
+                log.write( '%-36s %8s  %.6e s\n' % ( operator, size, seconds ) )
+    return results
+
+
+def get_metadata():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+        'date': time.strftime( '%Y-%m-%dT%H:%M:%S' ),
+    }
+
+
+def save_baseline( results, path ):
+    with open( path, 'w' ) as f:
+        json.dump( { 'metadata': get_metadata(), 'results': results }, f,
+                   indent=1, sort_keys=True )
+
+
+def load_baseline( path ):
+    with open( path ) as f:
+        return json.load( f )[ 'results' ]
+
+
+def get_regressions( results, baseline, tolerance = 1.5, min_seconds = 1e-6 ):
+
+    # operators/sizes that are more than tolerance times slower than in the
+    # baseline. Timings below min_seconds are too noisy to be compared.
+    regressions = []
+    for operator, timings in sorted( results.items() ):
+        for size, seconds in timings.items():
+            baseline_seconds = baseline.get( operator, {} ).get( size )
+            if seconds is None or baseline_seconds is None:
+                continue
+            if max( seconds, baseline_seconds ) < min_seconds:
+                continue
+            ratio = seconds / baseline_seconds
+            if ratio > tolerance:
+                regressions.append( {
+                    'operator': operator,
+                    'size': int( size ),
+                    'baseline': baseline_seconds,
+                    'current': seconds,
+                    'ratio': round( ratio, 3 ),
+                } )
+    return regressions
+
+
+def get_argument_parser( description, default_sizes ):
+    parser = argparse.ArgumentParser( description=description )
+    parser.add_argument( '--sizes', type=int, nargs='+', default=default_sizes )
+    parser.add_argument( '--operators', nargs='+', default=None,
+                         help='only time these operators.' )
+    parser.add_argument( '--time-budget', type=float, default=2.0,
+                         help='skip sizes predicted to take longer per call.' )
+    parser.add_argument( '--min-time', type=float, default=0.1 )
+    parser.add_argument( '--repeats', type=int, default=3 )
+    parser.add_argument( '--output', help='write the results as JSON.' )
+    parser.add_argument( '--save-baseline', help='write a baseline JSON file.' )
+    parser.add_argument( '--check', help='baseline JSON file to compare with.' )
+    parser.add_argument( '--tolerance', type=float, default=1.5,
+                         help='max allowed slowdown ratio vs the baseline.' )
+    return parser
+
+
+def main( cases, default_sizes, description, argv = None ):
+
+    # returns the process exit code: 1 when a regression was found.
+    args = get_argument_parser( description, default_sizes ).parse_args( argv )
+
+    results = run_benchmarks(
+        cases, args.sizes, args.time_budget, args.min_time, args.repeats,
+        args.operators, log=sys.stderr
+    )
+    if args.output:
+        with open( args.output, 'w' ) as f:
+            json.dump( results, f, indent=1, sort_keys=True )
+    if args.save_baseline:
+        save_baseline( results, args.save_baseline )
+
+    if args.check:
+        regressions = get_regressions(
+            results, load_baseline( args.check ), args.tolerance
+        )
+        for regression in regressions:
+            sys.stderr.write(
+                'REGRESSION %(operator)s size=%(size)s: %(baseline).3e s -> '
+                '%(current).3e s (x%(ratio)s)\n' % regression
+            )
+        return 1 if regressions else 0
+    return 0
@@ -0,0 +1,191 @@
+# Genetic algorithms examples - checkpoints.
+# MIT License.
+
+# Periodic snapshots of the complete state of a GA run, so that a killed run
+# (e.g. on a recycled preemptible node) resumes from its last checkpoint and
+# continues exactly as the uninterrupted run would have:
+#
+#   checkpointer = Checkpointer( 'run.npz', every = 100, interval = 600 )
+#   while ...:
+#       ...
+#       checkpointer.maybe_save( t, lambda: (
+#           { 'routes': routes, 'lengths': lengths },
+#           { 'generation': t, 'rng': get_rng_state() }
+#       ) )
+#   checkpointer.close()
+#
+#   arrays, metadata = load_checkpoint( 'run.npz' )
+#   set_rng_state( metadata[ 'rng' ] )
+#
+# A checkpoint is an uncompressed .npz file: the named arrays plus a JSON
+# metadata entry. It is written by a background thread to a temporary file of
+# the same directory, fsynced, then renamed over the previous checkpoint, so
+# that a crash at any point leaves either the previous or the new checkpoint,
+# never a torn one. The GA loop only pays for copying the state: while a
+# checkpoint is being written, newer snapshots replace each other and only the
+# latest one is written next.
+#
+# RNG state: get_rng_state() returns the (JSON) state of numpy's global
+# generator, of python's random module and, optionally, of a numpy Generator.
+
+
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import numpy as np
+
+
+METADATA_KEY = '__metadata__'
+
+
+def save_checkpoint( path, arrays, metadata = None ):
+    # atomic: the temporary file replaces the previous checkpoint once it is
+    # safely on disk.
+    directory = os.path.dirname( os.path.abspath( path ) )
+    handle, temporary_path = tempfile.mkstemp(
+        dir = directory, prefix = os.path.basename( path ) + '.', suffix = '.tmp'
+    )
+    try:
+        with os.fdopen( handle, 'wb' ) as f:
+            np.savez( f, **dict(
+                arrays, **{ METADATA_KEY: np.array( json.dumps( metadata or {} ) ) }
+            ) )
+            f.flush()
+            os.fsync( f.fileno() )
+        os.replace( temporary_path, path )
+    except BaseException:
+        if os.path.exists( temporary_path ):
+            os.remove( temporary_path )
+        raise
+    fsync_directory( directory )
+
+
+def fsync_directory( directory ):
+    # make the rename itself durable; not supported on every platform.
+    try:
+        handle = os.open( directory, os.O_RDONLY )
+    except OSError:
+        return
+    try:
+        os.fsync( handle )
+    except OSError:
+        pass
+    finally:
+        os.close( handle )
+
+
+def load_checkpoint( path ):
+    # ( arrays, metadata ).
+    with np.load( path, allow_pickle=False ) as data:
+        arrays = { name: data[ name ] for name in data.files if name != METADATA_KEY }
+        metadata = json.loads( str( data[ METADATA_KEY ] ) )
+    return arrays, metadata
+
+
+def get_rng_state( rng = None ):
+    numpy_state = np.random.get_state( legacy=False )
+    numpy_state[ 'state' ][ 'key' ] = numpy_state[ 'state' ][ 'key' ].tolist()
+    version, internal_state, gauss_next = random.getstate()
+    state = {
+        'numpy': numpy_state,
+        'random': [ version, list( internal_state ), gauss_next ],
+    }
+    if rng is not None:
+        state[ 'generator' ] = rng.bit_generator.state
+    return state
+
+
+def set_rng_state( state, rng = None ):
+    numpy_state = dict( state[ 'numpy' ] )
+    numpy_state[ 'state' ] = dict(
+        numpy_state[ 'state' ],
+        key = np.array( numpy_state[ 'state' ][ 'key' ], dtype=np.uint32 )
+    )
+    np.random.set_state( numpy_state )
+    version, internal_state, gauss_next = state[ 'random' ]
+    random.setstate( ( version, tuple( internal_state ), gauss_next ) )
+    if rng is not None:
+        rng.bit_generator.state = state[ 'generator' ]
+
+
+class Checkpointer( object ):
+
+    # saves a checkpoint every `every` generations and / or every `interval`
+    # seconds, whichever comes first.
+
+    def __init__( self, path, every = None, interval = None ):
+        self.path = path
+        self.every = every
+        self.interval = interval
+        self.last_time = time.monotonic()
+        self.generation = None  # of the last snapshot.
+        self.number_of_checkpoints = 0  # written.
+
+        self.error = None
+        self.pending = None
+        self.closed = False
+        self.condition = threading.Condition()
+        self.thread = threading.Thread( target = self._write_loop, daemon = True )
+        self.thread.start()
+
+    def is_due( self, generation ):
+        if self.every and generation % self.every == 0:
+            return True
+        return self.interval is not None and \
+            time.monotonic() - self.last_time >= self.interval
+
+    def maybe_save( self, generation, get_state, force = False ):
+        # get_state() returns ( arrays, metadata ) and is only called when a
+        # checkpoint is due; force saves any generation not saved yet, e.g.
+        # the last one.
+        if generation == self.generation or \
+                not ( force or self.is_due( generation ) ):
+            return False
+        self.save( *get_state() )
+        self.generation = generation
+        return True
+
+    def save( self, arrays, metadata = None ):
+        if self.error is not None:
+            raise self.error
+        # copied, the GA goes on modifying its state.
+        snapshot = (
+            { name: np.array( array ) for name, array in arrays.items() },
+            json.loads( json.dumps( metadata or {} ) )
+        )
+        with self.condition:
+            self.pending = snapshot
+            self.condition.notify()
+        self.last_time = time.monotonic()
+
+    def _write_loop( self ):
+        try:
+            while True:
+                with self.condition:
+                    while self.pending is None and not self.closed:
+                        self.condition.wait()
+                    if self.pending is None:
+                        break
+                    snapshot, self.pending = self.pending, None
+                save_checkpoint( self.path, *snapshot )
+                self.number_of_checkpoints += 1
+        except Exception as e:
+            self.error = e
+
+    def close( self ):
+        # write the pending snapshot.
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, *exc_info ):
+        self.close()
@@ -0,0 +1,568 @@
+# Genetic algorithms examples - generic GA engine.
+# MIT License.
+
+# One generation loop for any problem. A problem only provides its batch
+# operators on ( population_size, genome_length ) numpy arrays, see Problem;
+# selection, elitism, the population buffers, the run control and the
+# hooks are the engine's:
+#
+#   engine = Engine( WordSearchProblem( 'supercalifragilisticexpialidocious' ),
+#                    population_size = 1000, number_of_elites = 2,
+#                    selection_strategy = get_selection_strategy( 'tournament' ),
+#                    rng = 1 )
+#   best_fitness, best_word = engine.run( target_fitness = 1.0 )
+#
+# Adapters: word_search/word_search_problem.py and
+# symmetric_travelling_salesman/symmetric_travelling_salesman_problem.py.
+#
+# Every generation:
+#   1. parents: the two fittest individuals (as the examples) or, with a
+#      selection_strategy (see selection_strategies.py), a pair per child.
+#   2. population_size - number_of_elites children are bred into the back
+#      buffer: crossover() then mutate(), in place, then evaluate().
+#   3. elitism: the number_of_elites fittest individuals are copied, with
+#      their fitness, after the children.
+#   4. the back and front buffers are swapped: no population is allocated
+#      after the first generation.
+#   5. the run controller (see run_controller.py) is updated, then the
+#      hooks are called.
+#
+# Hooks are called with the engine on 'generation' (every generation, e.g.
+# to record or checkpoint the run), 'improvement' (new best-so-far
+# individual) and 'reseed' (partial restart by the controller):
+#
+#   engine.add_hook( 'generation', lambda engine: checkpointer.maybe_save(
+#       engine.generation, engine.get_state ) )
+#
+# Delta scoring: a problem with delta_scoring gives every individual a
+# scoring state (e.g. a word's match bitmap, a route's edge lengths), from
+# which the children's fitnesses are derived by crossover_with_state() and
+# mutate_with_state() instead of evaluate(). When all the children share
+# their two parents, as with the two fittest, the parents and their states
+# are given once rather than one row per child. The engine carries the
+# states through elitism, reseeds and set_state().
+#
+# duplicate_filter: a fitness_cache.py DuplicateFilter, the children
+# duplicating a parent or an earlier child are bred again or dropped, the
+# dropped ones leaving their places to the next fittest individuals.
+# memetic: the children ('offspring') or the elites ('elites') are improved
+# by the problem's improve(), e.g. a local search.
+#
+# SteadyStateEngine: every step breeds a few children only, each replacing
+# the population's worst member unless it is worse. The members are indexed
+# by fitness (see population_index.py), so with tournament parents a step
+# costs O(number_of_children log N) besides the operators, and the survivors
+# are never evaluated again. A selection strategy draws from the whole
+# population's weights instead, i.e. O(N) per step.
+# A step counts as a generation for the hooks, the controller and run().
+
+
+from collections import defaultdict
+import numpy as np
+from population_index import PopulationIndex
+from instrumentation import get_phase
+
+
+EVENTS = ( 'generation', 'improvement', 'reseed' )
+MEMETIC_MODES = ( 'offspring', 'elites' )
+
+
+def take_rows( scoring_state, ids ):
+    # the scoring state of the individuals ids.
+    return tuple( array[ ids ] for array in scoring_state )
+
+
+def put_rows( scoring_state, ids, rows ):
+    for array, array_rows in zip( scoring_state, rows ):
+        array[ ids ] = array_rows
+
+
+class Problem( object ):
+
+    # fitnesses are maximized, or minimized (e.g. route lengths) if minimize.
+    minimize = False
+    # see get_scoring_state().
+    delta_scoring = False
+
+    def get_initial_population( self, population_size, rng ):
+        # ( population_size, genome_length ) array.
+        raise NotImplementedError()
+
+    def evaluate( self, population ):
+        # fitness of every row.
+        raise NotImplementedError()
+
+    def crossover( self, parents_1, parents_2, rng, out ):
+        # one child per row of the parents arrays, written into out.
+        raise NotImplementedError()
+
+    def mutate( self, population, number_of_mutations, rng ):
+        # in place.
+        raise NotImplementedError()
+
+    def get_scoring_state( self, population ):
+        # delta scoring: a tuple of arrays, one row per individual, scored
+        # from scratch.
+        raise NotImplementedError()
+
+    def get_state_fitnesses( self, scoring_state ):
+        raise NotImplementedError()
+
+    def crossover_with_state( self, parents_1, parents_2, states_1, states_2, rng, out ):
+        # crossover(), returning the children's scoring state. The parents
+        # and their states are one row per child, or a single individual
+        # shared by all the children.
+        raise NotImplementedError()
+
+    def mutate_with_state( self, population, scoring_state, number_of_mutations, rng ):
+        # mutate(), updating the scoring state; both in place.
+        raise NotImplementedError()
+
+    def improve( self, population, fitnesses ):
+        # memetic engines: the individuals are improved in place (e.g. by a
+        # local search), returns their fitnesses.
+        raise NotImplementedError()
+
+    def encode( self, individual ):
+        return np.asarray( individual )
+
+    def decode( self, genome ):
+        return genome
+
+    def get_selection_weights( self, fitnesses ):
+        # non-negative, higher is fitter, as the mating pools' sampling
+        # weights.
+        if self.minimize:
+            return 1.0 / np.maximum( fitnesses, 1e-12 )
+        return np.where( fitnesses > 0.0, fitnesses, 0.00001 )
+
+
+class Engine( object ):
+
+    def __init__( self, problem, population_size = 10, number_of_elites = 1,
+                  selection_strategy = None, number_of_mutations = 1, rng = None,
+                  instrumentation = None, controller = None,
+                  duplicate_filter = None, memetic = None ):
+        # rng: a numpy Generator or a seed.
+        # controller: a run_controller.py RunController with the problem's
+        # minimize, it then sets the number of mutations.
+        assert( 0 <= number_of_elites < population_size )
+        if memetic is not None and memetic not in MEMETIC_MODES:
+            raise ValueError( 'unknown memetic mode: %s' % memetic )
+        self.problem = problem
+        self.population_size = population_size
+        self.number_of_elites = number_of_elites
+        self.number_of_children = population_size - number_of_elites
+        self.selection_strategy = selection_strategy
+        self.number_of_mutations = number_of_mutations
+        self.rng = np.random.default_rng( rng )
+        self.hooks = defaultdict( list )
+        self.instrumentation = instrumentation
+        self.controller = controller
+        self.duplicate_filter = duplicate_filter
+        self.memetic = memetic
+
+        self.generation = 0
+        self.population = None
+        self.fitnesses = None
+        self.scoring_state = None
+        self.best_fitness = None
+        self.best_individual = None
+
+    def add_hook( self, event, callback ):
+        if event not in EVENTS:
+            raise ValueError( 'unknown event: %s' % event )
+        self.hooks[ event ].append( callback )
+
+    def _call_hooks( self, event ):
+        for callback in self.hooks[ event ]:
+            callback( self )
+
+    def _get_phase( self, name ):
+        return get_phase( self.instrumentation, name )
+
+    def initialize( self, population = None ):
+        if population is None:
+            population = self.problem.get_initial_population(
+                self.population_size, self.rng
+            )
+        self.population = np.array( population )
+        assert( len( self.population ) == self.population_size )
+        self.fitnesses, self.scoring_state = self._score( self.population )
+        self._allocate_buffers()
+        self.generation = 0
+        self.best_fitness = None
+        self._update_best()
+        if self.controller is not None:
+            self.controller.update( self.best_fitness, self.best_individual )
+
+    def _allocate_buffers( self ):
+        genome_shape = self.population.shape[ 1: ]
+        self.back_population = np.empty_like( self.population )
+        self.back_fitnesses = np.empty_like( self.fitnesses )
+        self.parents_1 = np.empty( ( self.number_of_children, ) + genome_shape,
+                                   dtype=self.population.dtype )
+        self.parents_2 = np.empty_like( self.parents_1 )
+        self.back_scoring_state = None
+        if self.scoring_state is not None:
+            self.back_scoring_state = tuple( np.empty_like( array ) for array in self.scoring_state )
+
+    def _score( self, population ):
+        # ( fitnesses, scoring state or None ), from scratch.
+        if self.problem.delta_scoring:
+            scoring_state = self.problem.get_scoring_state( population )
+            return np.asarray( self.problem.get_state_fitnesses( scoring_state ), dtype=float ), \
+                scoring_state
+        return np.asarray( self.problem.evaluate( population ), dtype=float ), None
+
+    def is_better( self, fitness, other_fitness ):
+        if other_fitness is None:
+            return True
+        if self.problem.minimize:
+            return fitness < other_fitness
+        return fitness > other_fitness
+
+    def _get_keys( self ):
+        # lower is fitter.
+        return self.fitnesses if self.problem.minimize else -self.fitnesses
+
+    def get_fittest_ids( self, k ):
+        # the k fittest, fittest first.
+        keys = self._get_keys()
+        if k < len( keys ):
+            candidates = np.argpartition( keys, k - 1 )[ :k ]
+        else:
+            candidates = np.arange( len( keys ) )
+        return candidates[ np.argsort( keys[ candidates ], kind='stable' ) ]
+
+    def get_best_id( self ):
+        return self.get_fittest_ids( 1 )[0]
+
+    def _update_best( self ):
+        best_id = self.get_best_id()
+        if self.is_better( self.fitnesses[ best_id ], self.best_fitness ):
+            self.best_fitness = float( self.fitnesses[ best_id ] )
+            self.best_individual = self.population[ best_id ].copy()
+            self._call_hooks( 'improvement' )
+
+    def get_best( self ):
+        # ( best-so-far fitness, decoded individual ).
+        return self.best_fitness, self.problem.decode( self.best_individual )
+
+    def select_parent_ids( self ):
+        if self.selection_strategy is None:
+            # the two fittest, ties broken at random as in the examples.
+            order = self.rng.permutation( self.population_size )
+            two_fittest_ids = order[ np.argpartition( self._get_keys()[ order ], 1 )[ :2 ] ]
+            return np.full( self.number_of_children, two_fittest_ids[0] ), \
+                np.full( self.number_of_children, two_fittest_ids[1] )
+        return self.selection_strategy.select_pairs(
+            self.problem.get_selection_weights( self.fitnesses ),
+            self.number_of_children, self.rng
+        )
+
+    def _breed( self, children ):
+        # breeds len( children ) children into the children buffer and
+        # scores them. The duplicates dropped by a 'reject' duplicate_filter
+        # leave the last rows unused; returns ( number of children, their
+        # fitnesses, their scoring state or None ).
+        delta_scoring = self.problem.delta_scoring
+        with self._get_phase( 'selection' ):
+            ids_1, ids_2 = self.select_parent_ids()
+            if delta_scoring and ( ids_1 == ids_1[0] ).all() and ( ids_2 == ids_2[0] ).all():
+                # shared parents, e.g. the two fittest.
+                parent_ids_1, parent_ids_2 = ids_1[0], ids_2[0]
+                parents_1 = self.population[ parent_ids_1 ]
+                parents_2 = self.population[ parent_ids_2 ]
+            else:
+                parent_ids_1, parent_ids_2 = ids_1, ids_2
+                parents_1 = np.take( self.population, ids_1, axis=0, out=self.parents_1 )
+                parents_2 = np.take( self.population, ids_2, axis=0, out=self.parents_2 )
+        number_of_mutations = self.number_of_mutations if self.controller is None \
+            else self.controller.number_of_mutations
+        scoring_state = None
+        if delta_scoring:
+            with self._get_phase( 'crossover' ):
+                scoring_state = self.problem.crossover_with_state(
+                    parents_1, parents_2, take_rows( self.scoring_state, parent_ids_1 ),
+                    take_rows( self.scoring_state, parent_ids_2 ), self.rng, children
+                )
+            with self._get_phase( 'mutation' ):
+                self.problem.mutate_with_state(
+                    children, scoring_state, number_of_mutations, self.rng
+                )
+        else:
+            with self._get_phase( 'crossover' ):
+                self.problem.crossover( parents_1, parents_2, self.rng, children )
+            with self._get_phase( 'mutation' ):
+                self.problem.mutate( children, number_of_mutations, self.rng )
+
+        number_of_children = len( children )
+        if self.duplicate_filter is not None:
+            number_of_children, scoring_state = self._drop_duplicates(
+                children, scoring_state, ids_1, ids_2, number_of_mutations
+            )
+            children = children[ :number_of_children ]
+        with self._get_phase( 'evaluation' ):
+            if delta_scoring:
+                fitnesses = np.asarray(
+                    self.problem.get_state_fitnesses( scoring_state ), dtype=float
+                )
+            else:
+                fitnesses = np.asarray( self.problem.evaluate( children ), dtype=float )
+        if self.memetic == 'offspring':
+            fitnesses, scoring_state = self._improve( children, fitnesses )
+        return number_of_children, fitnesses, scoring_state
+
+    def _drop_duplicates( self, children, scoring_state, ids_1, ids_2, number_of_mutations ):
+        # the duplicate_filter's unique children, moved to the first rows of
+        # children; the resampled ones are bred one at a time from this
+        # step's parent pairs. Returns ( number of children, their scoring
+        # state or None ).
+        bred_states = {}
+
+        def breed():
+            k = self.rng.integers( len( ids_1 ) )
+            parent_1 = self.population[ ids_1[ k:k + 1 ] ]
+            parent_2 = self.population[ ids_2[ k:k + 1 ] ]
+            child = np.empty_like( parent_1 )
+            child_state = None
+            if scoring_state is not None:
+                child_state = self.problem.crossover_with_state(
+                    parent_1, parent_2, take_rows( self.scoring_state, ids_1[ k:k + 1 ] ),
+                    take_rows( self.scoring_state, ids_2[ k:k + 1 ] ), self.rng, child
+                )
+                self.problem.mutate_with_state( child, child_state, number_of_mutations, self.rng )
+            else:
+                self.problem.crossover( parent_1, parent_2, self.rng, child )
+                self.problem.mutate( child, number_of_mutations, self.rng )
+            # the filter returns this very object.
+            row = child[0]
+            bred_states[ id( row ) ] = child_state
+            return row
+
+        rows = list( children )
+        positions = { id( row ): i for i, row in enumerate( rows ) }
+        unique_children = self.duplicate_filter.get_unique_children(
+            rows, breed, self.population[ np.union1d( ids_1, ids_2 ) ], self.instrumentation
+        )
+        new_scoring_state = None
+        if scoring_state is not None:
+            new_scoring_state = tuple( np.concatenate( arrays ) for arrays in zip( *[
+                take_rows( scoring_state, [ positions[ id( child ) ] ] )
+                if id( child ) in positions else bred_states[ id( child ) ]
+                for child in unique_children
+            ] ) )
+        # copied first, the unique children are views of the buffer.
+        children[ :len( unique_children ) ] = np.array( unique_children )
+        return len( unique_children ), new_scoring_state
+
+    def _improve( self, population, fitnesses ):
+        # memetic: the individuals are improved in place, with delta scoring
+        # their states (and fitnesses) are then scored from scratch.
+        with self._get_phase( 'local_search' ):
+            fitnesses = np.asarray( self.problem.improve( population, fitnesses ), dtype=float )
+        if not self.problem.delta_scoring:
+            return fitnesses, None
+        return self._score( population )
+
+    def step( self ):
+        if self.population is None:
+            self.initialize()
+        number_of_children, fitnesses, scoring_state = self._breed(
+            self.back_population[ :self.number_of_children ]
+        )
+        children = slice( 0, number_of_children )
+        self.back_fitnesses[ children ] = fitnesses
+        if scoring_state is not None:
+            put_rows( self.back_scoring_state, children, scoring_state )
+
+        # elitism, without re-evaluation; the children dropped as duplicates
+        # leave their places to the next fittest individuals.
+        number_of_survivors = self.population_size - number_of_children
+        if number_of_survivors:
+            survivor_ids = self.get_fittest_ids( number_of_survivors )
+            survivors = slice( number_of_children, None )
+            self.back_population[ survivors ] = self.population[ survivor_ids ]
+            self.back_fitnesses[ survivors ] = self.fitnesses[ survivor_ids ]
+            if self.scoring_state is not None:
+                put_rows( self.back_scoring_state, survivors,
+                          take_rows( self.scoring_state, survivor_ids ) )
+            if self.memetic == 'elites':
+                fitnesses, scoring_state = self._improve(
+                    self.back_population[ survivors ], self.back_fitnesses[ survivors ]
+                )
+                self.back_fitnesses[ survivors ] = fitnesses
+                if scoring_state is not None:
+                    put_rows( self.back_scoring_state, survivors, scoring_state )
+
+        self.population, self.back_population = self.back_population, self.population
+        self.fitnesses, self.back_fitnesses = self.back_fitnesses, self.fitnesses
+        self.scoring_state, self.back_scoring_state = self.back_scoring_state, self.scoring_state
+        self._end_step( number_of_children )
+
+    def _end_step( self, number_of_evaluations ):
+        self.generation += 1
+        self._update_best()
+
+        if self.controller is not None:
+            best_id = self.get_best_id()
+            if self.controller.update( self.fitnesses[ best_id ],
+                                       self.population[ best_id ] ) == 'reseed':
+                self.reseed( self.controller.reseed_proportion )
+                self._call_hooks( 'reseed' )
+
+        if self.instrumentation is not None:
+            self.instrumentation.count(
+                'delta_evaluations' if self.problem.delta_scoring else 'evaluations',
+                number_of_evaluations
+            )
+            if self.controller is not None:
+                self.instrumentation.gauge( 'number_of_mutations', self.controller.number_of_mutations )
+            self.instrumentation.gauge( 'best_fitness', self.best_fitness )
+            self.instrumentation.end_generation()
+        self._call_hooks( 'generation' )
+
+    def reseed( self, proportion ):
+        # partial restart: the least fit proportion of the population, but
+        # never the fittest individual, is replaced with random individuals.
+        number_of_new_individuals = min(
+            self.population_size - 1, int( round( proportion * self.population_size ) )
+        )
+        if number_of_new_individuals <= 0:
+            return
+        self._replace_worst( self.problem.get_initial_population(
+            number_of_new_individuals, self.rng
+        ) )
+
+    def immigrate( self, individuals ):
+        # migration, e.g. from other islands: the individuals replace the
+        # least fit members, and are scored from scratch.
+        individuals = np.asarray( individuals, dtype=self.population.dtype )
+        if len( individuals ) == 0:
+            return
+        assert( len( individuals ) < self.population_size )
+        self._replace_worst( individuals )
+        self._update_best()
+
+    def _replace_worst( self, individuals ):
+        worst_ids = self.get_fittest_ids( self.population_size )[ -len( individuals ): ]
+        self.population[ worst_ids ] = individuals
+        fitnesses, scoring_state = self._score( individuals )
+        self.fitnesses[ worst_ids ] = fitnesses
+        if scoring_state is not None:
+            put_rows( self.scoring_state, worst_ids, scoring_state )
+
+    def is_converged( self, target_fitness ):
+        return target_fitness is not None and self.best_fitness is not None and \
+            not self.is_better( target_fitness, self.best_fitness )
+
+    def run( self, max_generations = None, target_fitness = None ):
+        # until max_generations, the target fitness or the controller's stop;
+        # returns get_best().
+        assert( max_generations is not None or target_fitness is not None or
+                self.controller is not None )
+        if self.population is None:
+            self.initialize()
+        while ( max_generations is None or self.generation < max_generations ) and \
+                not self.is_converged( target_fitness ) and \
+                ( self.controller is None or not self.controller.should_stop() ):
+            self.step()
+        return self.get_best()
+
+    def get_state( self ):
+        # ( arrays, metadata ), e.g. for checkpoint.py.
+        return {
+            'population': self.population,
+            'fitnesses': self.fitnesses,
+            'best_individual': self.best_individual,
+        }, {
+            'generation': self.generation,
+            'best_fitness': self.best_fitness,
+            'rng': self.rng.bit_generator.state,
+            'controller': self.controller.get_state()
+                          if self.controller is not None else None,
+        }
+
+    def set_state( self, arrays, metadata ):
+        self.population = np.array( arrays[ 'population' ] )
+        self.fitnesses = np.array( arrays[ 'fitnesses' ], dtype=float )
+        self.best_individual = np.array( arrays[ 'best_individual' ] )
+        # the scoring states are not saved, they follow from the population.
+        self.scoring_state = self._score( self.population )[1]
+        self._allocate_buffers()
+        self.generation = metadata[ 'generation' ]
+        self.best_fitness = metadata[ 'best_fitness' ]
+        self.rng.bit_generator.state = metadata[ 'rng' ]
+        if self.controller is not None and metadata.get( 'controller' ):
+            self.controller.set_state( metadata[ 'controller' ] )
+
+
+class SteadyStateEngine( Engine ):
+
+    def __init__( self, problem, population_size = 10, number_of_children = 2,
+                  selection_strategy = None, tournament_size = 2,
+                  number_of_mutations = 1, rng = None, instrumentation = None,
+                  controller = None, duplicate_filter = None, memetic = None ):
+        # parents: the fitter of tournament_size random members, O(1) per
+        # parent, or drawn by selection_strategy from the whole population's
+        # selection weights, which costs O(N) per step.
+        assert( 0 < number_of_children < population_size )
+        if memetic == 'elites':
+            raise ValueError( 'a steady-state engine has no elites, only memetic offspring' )
+        Engine.__init__( self, problem, population_size, 0, selection_strategy,
+                         number_of_mutations, rng, instrumentation, controller,
+                         duplicate_filter, memetic )
+        self.number_of_children = number_of_children
+        self.tournament_size = tournament_size
+        self.index = None
+
+    def _allocate_buffers( self ):
+        genome_shape = self.population.shape[ 1: ]
+        self.children = np.empty( ( self.number_of_children, ) + genome_shape,
+                                  dtype=self.population.dtype )
+        self.parents_1 = np.empty_like( self.children )
+        self.parents_2 = np.empty_like( self.children )
+        self.index = PopulationIndex( self._get_keys() )
+
+    def get_best_id( self ):
+        return self.index.get_best_id()
+
+    def select_parent_ids( self ):
+        if self.selection_strategy is not None:
+            return Engine.select_parent_ids( self )
+        # one tournament per parent.
+        candidates = self.rng.integers(
+            self.population_size, size=( 2, self.number_of_children, self.tournament_size )
+        )
+        # only the candidates' fitnesses are gathered, O(1) per parent.
+        fitnesses = self.fitnesses[ candidates ]
+        fittest = fitnesses.argmin( axis=2 ) if self.problem.minimize \
+            else fitnesses.argmax( axis=2 )
+        winners = np.take_along_axis( candidates, fittest[ ..., None ], axis=2 )
+        return winners[ 0, :, 0 ], winners[ 1, :, 0 ]
+
+    def step( self ):
+        if self.population is None:
+            self.initialize()
+
+        number_of_children, children_fitnesses, scoring_state = self._breed( self.children )
+
+        # replacement of the worst members, in place.
+        for i in range( number_of_children ):
+            fitness = children_fitnesses[ i ]
+            worst_id = self.index.get_worst_id()
+            if self.is_better( self.fitnesses[ worst_id ], fitness ):
+                continue
+            self.population[ worst_id ] = self.children[ i ]
+            self.fitnesses[ worst_id ] = fitness
+            if scoring_state is not None:
+                put_rows( self.scoring_state, worst_id, take_rows( scoring_state, i ) )
+            # lower is fitter, as _get_keys().
+            self.index.update( worst_id, fitness if self.problem.minimize else -fitness )
+        self._end_step( number_of_children )
+
+    def _replace_worst( self, individuals ):
+        # reseeds and immigrants.
+        Engine._replace_worst( self, individuals )
+        self.index = PopulationIndex( self._get_keys() )
@@ -0,0 +1,175 @@
+# Genetic algorithms examples - fitness cache and duplicate children.
+# MIT License.
+
+# Every reproduction() breeds its children from the same two parents, so many
+# children are copies of each other or of a parent. Two tools so that an
+# expensive fitness function is never paid twice for the same individual:
+#
+# CachedEvaluator wraps any evaluator (see fitness_evaluators.py) with a
+# bounded LRU cache of the scores, keyed by a canonical key of the individual:
+#
+#   evaluator = CachedEvaluator( SerialEvaluator( get_route_length,
+#                                                 { 'dist_matrix': dist_matrix } ),
+#                                max_entries = 100000, key_function = get_route_key )
+#   scores = evaluator.evaluate( population )  # only new individuals are scored.
+#
+# DuplicateFilter rejects (or breeds again) the children that duplicate a
+# parent or an earlier child, before anything is evaluated:
+#
+#   duplicate_filter = DuplicateFilter( 'resample', key_function = get_route_key )
+#   population, lengths = ga.reproduction_with_lengths(
+#       mating_pool, 10, dist_matrix, duplicate_filter = duplicate_filter
+#   )
+#
+# Keys: key_function( individual ) returns a hashable key, equal for the
+# individuals that always have equal fitness scores, e.g. a TSP route and its
+# rotations and reversal (symmetric_travelling_salesman_ga.get_route_key()).
+# The default key is the individual itself (e.g. a str word) or, for numpy
+# rows, their bytes.
+
+
+from collections import OrderedDict
+import numpy as np
+
+
+DUPLICATE_POLICIES = ( 'reject', 'resample' )
+
+
+def get_default_key( individual ):
+    if isinstance( individual, np.ndarray ):
+        return individual.tobytes()
+    return individual
+
+
+class FitnessCache( object ):
+
+    # scores by key; once max_entries are stored, the least recently used
+    # entry is evicted for every new one.
+
+    def __init__( self, max_entries = 65536 ):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__( self ):
+        return len( self.entries )
+
+    def __contains__( self, key ):
+        return key in self.entries
+
+    def get( self, key, default = None ):
+        if key not in self.entries:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self.entries.move_to_end( key )
+        return self.entries[ key ]
+
+    def put( self, key, score ):
+        self.entries[ key ] = score
+        self.entries.move_to_end( key )
+        while len( self.entries ) > self.max_entries:
+            self.entries.popitem( last = False )
+
+
+class CachedEvaluator( object ):
+
+    def __init__( self, evaluator, max_entries = 65536, key_function = None,
+                  cache = None ):
+        self.evaluator = evaluator
+        self.key_function = key_function or get_default_key
+        # the cache can be shared, e.g. by the evaluators of several runs.
+        self.cache = cache if cache is not None else FitnessCache( max_entries )
+
+    def evaluate( self, population ):
+        keys = [ self.key_function( individual ) for individual in population ]
+        scores = [ None ] * len( keys )
+
+        # the positions of every new key; a key repeated within the
+        # population is only scored once.
+        new_positions = OrderedDict()
+        for i, key in enumerate( keys ):
+            if key in new_positions:
+                new_positions[ key ].append( i )
+                self.cache.hits += 1
+                continue
+            score = self.cache.get( key )
+            if score is None:
+                new_positions[ key ] = [ i ]
+            else:
+                scores[ i ] = score
+
+        if new_positions:
+            firsts = [ positions[0] for positions in new_positions.values() ]
+            if isinstance( population, np.ndarray ):
+                new_individuals = population[ firsts ]
+            else:
+                new_individuals = [ population[ i ] for i in firsts ]
+            new_scores = self.evaluator.evaluate( new_individuals )
+            for ( key, positions ), score in zip( new_positions.items(), new_scores ):
+                self.cache.put( key, score )
+                for i in positions:
+                    scores[ i ] = score
+        return scores
+
+    def close( self ):
+        self.evaluator.close()
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, *exc_info ):
+        self.close()
+
+
+class DuplicateFilter( object ):
+
+    # passed to reproduction( ..., duplicate_filter = ... ), which calls
+    # get_unique_children() on its children before they are evaluated.
+    # policy:
+    #   'reject'    the duplicates are dropped, but at least min_children
+    #               children are kept so that the next generation can mate.
+    #   'resample'  every duplicate is replaced with a new breed() child, up
+    #               to max_attempts times, after which the duplicate is kept.
+
+    def __init__( self, policy = 'resample', key_function = None,
+                  max_attempts = 10, min_children = 2 ):
+        if policy not in DUPLICATE_POLICIES:
+            raise ValueError( 'unknown duplicate policy: %s' % policy )
+        self.policy = policy
+        self.key_function = key_function or get_default_key
+        self.max_attempts = max_attempts
+        self.min_children = min_children
+        self.number_of_duplicates = 0
+
+    def get_unique_children( self, children, breed = None, parents = (),
+                             instrumentation = None ):
+        # children duplicating a parent or an earlier child are dropped or
+        # replaced, see policy.
+        seen = set( self.key_function( parent ) for parent in parents )
+        unique_children = []
+        rejected_children = []
+        number_of_duplicates = 0
+        for child in children:
+            key = self.key_function( child )
+            if key in seen:
+                number_of_duplicates += 1
+                if self.policy == 'reject':
+                    rejected_children.append( child )
+                    continue
+                for _ in range( self.max_attempts ):
+                    child = breed()
+                    key = self.key_function( child )
+                    if key not in seen:
+                        break
+            seen.add( key )
+            unique_children.append( child )
+
+        missing = min( self.min_children, len( children ) ) - len( unique_children )
+        unique_children.extend( rejected_children[ :max( missing, 0 ) ] )
+
+        self.number_of_duplicates += number_of_duplicates
+        if instrumentation is not None:
+            instrumentation.count( 'duplicate_children', number_of_duplicates )
+        return unique_children
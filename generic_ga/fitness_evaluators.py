@@ -0,0 +1,250 @@
+# Genetic algorithms examples - pluggable fitness evaluators.
+# MIT License.
+
+# selection() in both examples can delegate the scoring of a population to one
+# of these evaluators. All of them expose the same interface:
+#
+#     scores = evaluator.evaluate( population )   # list of floats.
+#     evaluator.close()                           # or use it as a context.
+#
+# The fitness function is called once per individual as
+#     fitness_function( individual, **constants )
+# after the optional to_array( population ) conversion, e.g. a list of str
+# words is encoded first with word_search_batched_ga.encode_population().
+# e.g.: word_search_ga.get_fitness_score( word, ref = encoded_ref ) or
+#       symmetric_travelling_salesman_ga.get_route_length( route,
+#                                                dist_matrix = dist_matrix ).
+#
+# Backends:
+#   'serial'   plain loop, no overhead.
+#   'vectorized'  one call for the whole population, the fitness function
+#              returns all the scores, e.g.
+#              word_search_batched_ga.get_fitness_scores( population,
+#                                                  encoded_ref = encoded_ref ).
+#   'thread'   thread pool; useful when the fitness function releases the GIL.
+#   'process'  process pool. The population and the constant arrays (e.g. the
+#              encoded reference word or the distance table) live in
+#              multiprocessing.shared_memory blocks that the workers map
+#              zero-copy, so only ( name, start, stop ) is sent per task.
+#              NB: the fitness function must be importable (module level).
+
+
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+
+
+BACKENDS = ( 'serial', 'vectorized', 'thread', 'process' )
+
+
+def get_chunks( number_of_individuals, number_of_chunks ):
+    # contiguous ( start, stop ) ranges covering the whole population.
+    bounds = np.linspace( 0, number_of_individuals, number_of_chunks + 1 )
+    bounds = bounds.astype( int )
+    return [
+        ( int( start ), int( stop ) )
+        for start, stop in zip( bounds[ :-1 ], bounds[ 1: ] ) if stop > start
+    ]
+
+
+class SerialEvaluator( object ):
+
+    def __init__( self, fitness_function, constants = None, to_array = None ):
+        self.fitness_function = fitness_function
+        self.constants = dict( constants or {} )
+        self.to_array = to_array
+
+    def evaluate( self, population ):
+        if self.to_array is not None:
+            population = self.to_array( population )
+        return [
+            float( self.fitness_function( individual, **self.constants ) )
+            for individual in population
+        ]
+
+    def close( self ):
+        pass
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, *exc_info ):
+        self.close()
+
+
+class VectorizedEvaluator( SerialEvaluator ):
+
+    def evaluate( self, population ):
+        if self.to_array is not None:
+            population = self.to_array( population )
+        return [
+            float( score )
+            for score in self.fitness_function( population, **self.constants )
+        ]
+
+
+class ThreadPoolEvaluator( SerialEvaluator ):
+
+    def __init__( self, fitness_function, constants = None,
+                  number_of_threads = None, chunks_per_worker = 4,
+                  to_array = None ):
+        SerialEvaluator.__init__( self, fitness_function, constants, to_array )
+        self.number_of_threads = number_of_threads or os.cpu_count()
+        self.chunks_per_worker = chunks_per_worker
+        self._executor = ThreadPoolExecutor( self.number_of_threads )
+
+    def _evaluate_chunk( self, population, start, stop ):
+        return [
+            float( self.fitness_function( individual, **self.constants ) )
+            for individual in population[ start:stop ]
+        ]
+
+    def evaluate( self, population ):
+        if self.to_array is not None:
+            population = self.to_array( population )
+        chunks = get_chunks(
+            len( population ), self.number_of_threads * self.chunks_per_worker
+        )
+        futures = [
+            self._executor.submit( self._evaluate_chunk, population, start, stop )
+            for start, stop in chunks
+        ]
+        return [ score for future in futures for score in future.result() ]
+
+    def close( self ):
+        self._executor.shutdown()
+
+
+### process backend.
+
+# per worker process state, set by _init_process_worker().
+_worker_state = {}
+
+
+def _attach_array( spec ):
+    # map an array that lives in a shared memory block without copying it.
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory( name = name )
+    return shm, np.ndarray( shape, dtype = np.dtype( dtype ), buffer = shm.buf )
+
+
+def _init_process_worker( fitness_function, constant_specs ):
+    _worker_state[ 'fitness_function' ] = fitness_function
+    _worker_state[ 'shms' ] = []
+    _worker_state[ 'constants' ] = {}
+    for key, spec in constant_specs.items():
+        shm, array = _attach_array( spec )
+        _worker_state[ 'shms' ].append( shm )
+        _worker_state[ 'constants' ][ key ] = array
+    _worker_state[ 'population' ] = None
+
+
+def _evaluate_shared_rows( population_spec, start, stop ):
+    # the population buffer is re-attached only when the coordinator has
+    # replaced it (i.e. when the population grew).
+    name, shape, dtype = population_spec
+    shm = _worker_state[ 'population' ]
+    if shm is None or shm.name != name:
+        if shm is not None:
+            shm.close()
+        shm = shared_memory.SharedMemory( name = name )
+        _worker_state[ 'population' ] = shm
+    population = np.ndarray( shape, dtype = np.dtype( dtype ), buffer = shm.buf )
+
+    fitness_function = _worker_state[ 'fitness_function' ]
+    constants = _worker_state[ 'constants' ]
+    return [
+        float( fitness_function( population[ i ], **constants ) )
+        for i in range( start, stop )
+    ]
+
+
+def _get_shared_copy( array ):
+    shm = shared_memory.SharedMemory( create = True, size = max( array.nbytes, 1 ) )
+    np.ndarray( array.shape, dtype = array.dtype, buffer = shm.buf )[...] = array
+    return shm, ( shm.name, array.shape, array.dtype.str )
+
+
+class ProcessPoolEvaluator( object ):
+
+    def __init__( self, fitness_function, constants = None,
+                  number_of_processes = None, chunks_per_worker = 4,
+                  to_array = np.asarray ):
+        # to_array must turn a population into a 2D numeric array, e.g. a list
+        # of routes is fine as is while a list of str needs encoding first.
+        self.number_of_processes = number_of_processes or os.cpu_count()
+        self.chunks_per_worker = chunks_per_worker
+        self.to_array = to_array
+
+        self._constant_shms = []
+        constant_specs = {}
+        for key, value in ( constants or {} ).items():
+            shm, spec = _get_shared_copy( np.ascontiguousarray( value ) )
+            self._constant_shms.append( shm )
+            constant_specs[ key ] = spec
+
+        self._population_shm = None
+        self._executor = ProcessPoolExecutor(
+            max_workers = self.number_of_processes,
+            initializer = _init_process_worker,
+            initargs = ( fitness_function, constant_specs )
+        )
+
+    def _get_population_buffer( self, nbytes ):
+        # grow-only buffer, reused from one generation to the next.
+        if self._population_shm is None or self._population_shm.size < nbytes:
+            if self._population_shm is not None:
+                self._population_shm.close()
+                self._population_shm.unlink()
+            self._population_shm = shared_memory.SharedMemory(
+                create = True, size = max( nbytes, 1 )
+            )
+        return self._population_shm
+
+    def evaluate( self, population ):
+        array = np.ascontiguousarray( self.to_array( population ) )
+        shm = self._get_population_buffer( array.nbytes )
+        np.ndarray( array.shape, dtype = array.dtype, buffer = shm.buf )[...] = array
+        population_spec = ( shm.name, array.shape, array.dtype.str )
+
+        chunks = get_chunks(
+            len( array ), self.number_of_processes * self.chunks_per_worker
+        )
+        futures = [
+            self._executor.submit(
+                _evaluate_shared_rows, population_spec, start, stop
+            )
+            for start, stop in chunks
+        ]
+        return [ score for future in futures for score in future.result() ]
+
+    def close( self ):
+        self._executor.shutdown()
+        for shm in self._constant_shms:
+            shm.close()
+            shm.unlink()
+        self._constant_shms = []
+        if self._population_shm is not None:
+            self._population_shm.close()
+            self._population_shm.unlink()
+            self._population_shm = None
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, *exc_info ):
+        self.close()
+
+
+def get_evaluator( backend, fitness_function, constants = None, **kwargs ):
+
+    if backend == 'serial':
+        return SerialEvaluator( fitness_function, constants, **kwargs )
+    if backend == 'vectorized':
+        return VectorizedEvaluator( fitness_function, constants, **kwargs )
+    if backend == 'thread':
+        return ThreadPoolEvaluator( fitness_function, constants, **kwargs )
+    if backend == 'process':
+        return ProcessPoolEvaluator( fitness_function, constants, **kwargs )
+    raise ValueError( 'unknown evaluator backend: %s' % backend )
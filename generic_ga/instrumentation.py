@@ -0,0 +1,196 @@
+# Genetic algorithms examples - per-generation instrumentation.
+# MIT License.
+
+# Wall-clock timers per phase, counters, gauges and hooks around the GA
+# phases, plus exporters that write one metrics record per sampled generation.
+#
+#   instrumentation = Instrumentation(
+#       exporters = [ JsonLinesExporter( 'metrics.jsonl' ) ],
+#       sample_every = 10,            # only every 10th generation is measured.
+#       operator_sample_every = 100,  # time 1 crossover/mutation call in 100.
+#   )
+#   while ...:
+#       with instrumentation.phase( 'selection' ):
+#           ...
+#       population = ga.reproduction( mating_pool, 10, instrumentation )
+#       instrumentation.end_generation()
+#
+# The GA modules only rely on phase(), count() and gauge(), and accept
+# instrumentation = None (the default) at no cost: they open their phases with
+# get_phase( instrumentation, name ).
+#
+# e.g. of an exported record:
+#   {"generation": 20, "time": 1.52, "phases": {"selection": 0.0012, ...},
+#    "calls": {"crossover": 10, ...}, "counters": {"evaluations": 10, ...},
+#    "gauges": {"dist_memo_size": 435}}
+#
+# Hooks are called with the phase name on 'before_phase' / 'after_phase' and
+# with the record on 'generation'. Like the timers, they only run during the
+# sampled generations.
+
+
+import json
+import time
+from collections import defaultdict
+
+
+EVENTS = ( 'before_phase', 'after_phase', 'generation' )
+
+# phases called once per child; they can be sub-sampled on top of the
+# per-generation sampling since timing them is not free.
+OPERATOR_PHASES = ( 'crossover', 'mutation' )
+
+
+class _NullPhase( object ):
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, *exc_info ):
+        return False
+
+
+NULL_PHASE = _NullPhase()
+
+
+def get_phase( instrumentation, name ):
+    # instrumentation is optional: None times nothing.
+    if instrumentation is None:
+        return NULL_PHASE
+    return instrumentation.phase( name )
+
+
+class _Phase( object ):
+
+    def __init__( self, instrumentation, name ):
+        self.instrumentation = instrumentation
+        self.name = name
+
+    def __enter__( self ):
+        for callback in self.instrumentation.hooks[ 'before_phase' ]:
+            callback( self.name )
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__( self, *exc_info ):
+        elapsed_time = time.perf_counter() - self.start_time
+        instrumentation = self.instrumentation
+        instrumentation.phase_times[ self.name ] += elapsed_time
+        instrumentation.timed_calls[ self.name ] += 1
+        for callback in instrumentation.hooks[ 'after_phase' ]:
+            callback( self.name )
+        return False
+
+
+class Instrumentation( object ):
+
+    def __init__( self, exporters = None, sample_every = 1,
+                  operator_sample_every = 1 ):
+        self.exporters = list( exporters or [] )
+        self.sample_every = max( 1, sample_every )
+        self.operator_sample_every = max( 1, operator_sample_every )
+        self.hooks = defaultdict( list )
+        self.generation = 0
+        self.start_time = time.perf_counter()
+        self._reset()
+
+    def _reset( self ):
+        self.active = ( self.generation % self.sample_every == 0 )
+        self.phase_times = defaultdict( float )
+        self.timed_calls = defaultdict( int )
+        self.calls = defaultdict( int )
+        self.counters = defaultdict( int )
+        self.gauges = {}
+
+    def add_hook( self, event, callback ):
+        if event not in EVENTS:
+            raise ValueError( 'unknown event: %s' % event )
+        self.hooks[ event ].append( callback )
+
+    def phase( self, name ):
+        if not self.active:
+            return NULL_PHASE
+        self.calls[ name ] += 1
+        if name in OPERATOR_PHASES and \
+                ( self.calls[ name ] - 1 ) % self.operator_sample_every:
+            return NULL_PHASE
+        return _Phase( self, name )
+
+    def count( self, name, value = 1 ):
+        if self.active:
+            self.counters[ name ] += value
+
+    def gauge( self, name, value ):
+        if self.active:
+            self.gauges[ name ] = value
+
+    def get_record( self ):
+        # sub-sampled phases are extrapolated to all their calls.
+        phases = {}
+        for name, seconds in self.phase_times.items():
+            phases[ name ] = seconds * self.calls[ name ] / float(
+                max( 1, self.timed_calls[ name ] )
+            )
+        return {
+            'generation': self.generation,
+            'time': round( time.perf_counter() - self.start_time, 6 ),
+            'phases': phases,
+            'calls': dict( self.calls ),
+            'counters': dict( self.counters ),
+            'gauges': dict( self.gauges ),
+        }
+
+    def end_generation( self ):
+        # returns the generation's record, or None if it was not sampled.
+        record = None
+        if self.active:
+            record = self.get_record()
+            for exporter in self.exporters:
+                exporter.write( record )
+            for callback in self.hooks[ 'generation' ]:
+                callback( record )
+        self.generation += 1
+        self._reset()
+        return record
+
+    def close( self ):
+        for exporter in self.exporters:
+            exporter.close()
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, *exc_info ):
+        self.close()
+
+
+class MemoryExporter( object ):
+
+    def __init__( self ):
+        self.records = []
+
+    def write( self, record ):
+        self.records.append( record )
+
+    def close( self ):
+        pass
+
+
+class JsonLinesExporter( object ):
+
+    # one JSON object per line, flushed every flush_every records.
+
+    def __init__( self, path, flush_every = 100 ):
+        self.file = open( path, 'w' )
+        self.flush_every = flush_every
+        self.number_of_records = 0
+
+    def write( self, record ):
+        self.file.write( json.dumps( record, sort_keys=True ) + '\n' )
+        self.number_of_records += 1
+        if self.number_of_records % self.flush_every == 0:
+            self.file.flush()
+
+    def close( self ):
+        if not self.file.closed:
+            self.file.close()
@@ -0,0 +1,156 @@
+# Genetic algorithms examples - mating pool.
+# MIT License.
+
+# Array-backed mating pool shared by both examples: parallel arrays of
+# fitnesses and of individual ids (indices in self.individuals). Unlike the
+# historical dict pools keyed by fitness, individuals with colliding
+# fitnesses are never merged or lost, the best-k queries are O(N) partial
+# sorts instead of repeated max() / min() + pop(), and nothing is copied or
+# rescaled per generation.
+#
+#   e.g.:  individuals     = [ 'vfwpcyze', 'svvdlsof', 'ebjvywaz' ]
+#          fitnesses       = [ 0.0, 0.125, 0.125 ]
+#          individual_ids  = [ 0, 1, 2 ]
+#
+# Fitnesses are maximized (e.g. word scores), or minimized if minimize (e.g.
+# route lengths). With a precision, the fitnesses are compared and keyed at
+# that many decimals, as the dict pool rounding its keys.
+#
+# Parents: the two fittest individuals, or a pair per child drawn by a
+# selection strategy (see selection_strategies.py) from the sampling
+# weights, see get_parent_pairs().
+
+
+import logging
+import numpy as np
+
+
+logger = logging.getLogger( __name__ )
+
+
+class MatingPool( object ):
+
+    minimize = False
+    precision = None
+
+    def __init__( self, individuals, fitnesses ):
+        self.individuals = list( individuals )
+        self.fitnesses = np.asarray( fitnesses, dtype=float )
+        self.individual_ids = np.arange( len( self.individuals ) )
+        assert( len( self.individuals ) == len( self.fitnesses ) )
+
+    @classmethod
+    def from_dict( cls, mating_pool ):
+        individuals, fitnesses = [], []
+        for fitness, individuals_with_that_fitness in mating_pool.items():
+            individuals.extend( individuals_with_that_fitness )
+            fitnesses.extend( [ fitness ] * len( individuals_with_that_fitness ) )
+        return cls( individuals, fitnesses )
+
+    @classmethod
+    def as_mating_pool( cls, mating_pool ):
+        # accept both the array-backed pool and the historical dict pool.
+        if isinstance( mating_pool, MatingPool ):
+            return mating_pool
+        return cls.from_dict( mating_pool )
+
+    def get_rounded( self, fitnesses ):
+        if self.precision is None:
+            return fitnesses
+        return np.round( fitnesses, self.precision )
+
+    def to_dict( self ):
+        mating_pool = {}
+        for fitness, individual_id in zip(
+                self.get_rounded( self.fitnesses ).tolist(), self.individual_ids ):
+            if fitness not in mating_pool:
+                mating_pool[ fitness ] = []
+            mating_pool[ fitness ].append( self.individuals[ individual_id ] )
+        return mating_pool
+
+    def __len__( self ):
+        return len( self.individual_ids )
+
+    def get_individuals( self, ids ):
+        # the individuals at positions ids of the parallel arrays.
+        return [ self.individuals[ i ] for i in self.individual_ids[ ids ] ]
+
+    def extend( self, individuals, fitnesses ):
+        self.individual_ids = np.concatenate( [
+            self.individual_ids,
+            np.arange( len( self.individuals ), len( self.individuals ) + len( individuals ) )
+        ] )
+        self.individuals.extend( individuals )
+        self.fitnesses = np.concatenate( [ self.fitnesses, fitnesses ] )
+
+    def get_keys( self ):
+        # lower is fitter.
+        return self.fitnesses if self.minimize else -self.fitnesses
+
+    def get_top_k_ids( self, k ):
+        # positions (in the parallel arrays) of the k fittest individuals,
+        # fittest first. argpartition keeps this O(N) + O(k log k).
+        keys = self.get_keys()
+        k = min( k, len( self ) )
+        if k < len( self ):
+            candidates = np.argpartition( keys, k - 1 )[ :k ]
+        else:
+            candidates = np.arange( len( self ) )
+        return candidates[ np.argsort( keys[ candidates ], kind='stable' ) ]
+
+    def get_top_k( self, k ):
+        top_k_ids = self.get_top_k_ids( k )
+        return self.get_individuals( top_k_ids ), self.fitnesses[ top_k_ids ]
+
+    def get_best_fitness( self ):
+        best_fitness = self.fitnesses.min() if self.minimize else self.fitnesses.max()
+        return float( self.get_rounded( best_fitness ) )
+
+    def get_elites( self ):
+        # all the individuals sharing the best (rounded) fitness, i.e. the
+        # same individuals the dict pool keeps under its best key.
+        ids = np.flatnonzero( self.get_rounded( self.fitnesses ) == self.get_best_fitness() )
+        return self.get_individuals( ids ), self.fitnesses[ ids ]
+
+    def get_sampling_weights( self ):
+        # fitness-proportional weights summing to 1.0: a 0.0 score is
+        # replaced with a very low non-zero value, shorter lengths weigh more.
+        if self.minimize:
+            weights = 1.0 / np.maximum( self.fitnesses, 1e-12 )
+        else:
+            weights = np.where( self.fitnesses == 0.0, 0.00001, self.fitnesses )
+        return weights / weights.sum()
+
+    def get_two_fittest_individuals( self ):
+        # ties are broken at random by shuffling the candidates before the
+        # partial sort.
+        order = np.random.permutation( len( self ) )
+        top_2_ids = order[ np.argpartition( self.get_keys()[ order ], 1 )[ :2 ] ]
+        return self.get_individuals( top_2_ids )
+
+    def select_parent_pairs( self, number_of_pairs, selection_strategy ):
+        # one [ individual_1, individual_2 ] pair per child, drawn by
+        # selection_strategy from the sampling weights.
+        ids_1, ids_2 = selection_strategy.select_pairs(
+            self.get_sampling_weights(), number_of_pairs
+        )
+        return [ list( parent_pair ) for parent_pair in
+                 zip( self.get_individuals( ids_1 ), self.get_individuals( ids_2 ) ) ]
+
+
+def get_parent_pairs( mating_pool, number_of_pairs, selection_strategy = None ):
+
+    # ( parent pairs, all the parents, a function drawing one more pair ).
+    # Every child is bred from the two fittest individuals or, with a
+    # selection_strategy (tournament, rank, ... see selection_strategies.py),
+    # from its own pair of parents.
+    if selection_strategy is None:
+        two_fittest_individuals = mating_pool.get_two_fittest_individuals()
+        logger.debug( 'two fittest individuals: %s', two_fittest_individuals )
+        return [ two_fittest_individuals ] * number_of_pairs, \
+            two_fittest_individuals, lambda: two_fittest_individuals
+
+    parent_pairs = mating_pool.select_parent_pairs( number_of_pairs, selection_strategy )
+    parents = [ individual for parent_pair in parent_pairs for individual in parent_pair ]
+    return parent_pairs, parents, \
+        lambda: mating_pool.select_parent_pairs( 1, selection_strategy )[0]
@@ -0,0 +1,292 @@
+# Genetic algorithms examples - multi-run statistics.
+# MIT License.
+
+# One run of a GA says little: its outcome is one draw of a random variable.
+# This harness launches number_of_runs independent seeded runs of one or more
+# configurations in a process pool and reports the distributions of the
+# generations and wall time to target, and of the best fitness over time:
+#
+#   results = run_trials( headless.run_trial, {
+#       'baseline': [ '--population-size', '10' ],
+#       'tournament': [ '--population-size', '10', '--selection', 'tournament' ],
+#   }, number_of_runs = 30, seed = 1 )
+#   summary = get_summary( results[ 'baseline' ] )
+#   comparison = compare( results[ 'baseline' ], results[ 'tournament' ] )
+#
+# A trial function runs one GA and is called in a worker process as
+# trial_function( configuration, seed ); it returns the run's JSON summary
+# with its 'curve', the ( seconds, generation, best fitness ) points recorded
+# by a CurveRecorder every time the best fitness changed. See run_trial() in
+# the headless runners.
+#
+# Seeds: the seed of every run is drawn from its own numpy SeedSequence child
+# of seed, so the runs' streams are independent, and run i gets the same seed
+# in every configuration (common random numbers: a comparison is not blurred
+# by the luck of the draw).
+#
+# Target: either given (target and minimize) and looked up in the curves, or
+# the runs' own stopping criterion (e.g. --target-fitness) and 'converged'
+# flag. Runs that never reach the target count as infinitely slow: they are
+# in the percentiles (as None when infinite) and keep the ECDF below 1.
+#
+# Comparison: two-sided Mann-Whitney U test (normal approximation with ties
+# correction) and Vargha-Delaney A, the probability that a run of the first
+# configuration reaches the target faster than one of the second (0.5: no
+# difference, above 0.56 / 0.64 / 0.71: small / medium / large effect).
+#
+# Each example has its own runner, e.g.:
+#     python multi_run_word_search_example.py --runs 30 \
+#         --configuration baseline "--population-size 10" \
+#         --configuration tournament "--population-size 10 --selection tournament"
+
+
+import argparse
+import json
+import math
+import os, sys
+import shlex
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+
+PERCENTILES = ( 5, 25, 50, 75, 95 )
+
+
+class CurveRecorder( object ):
+
+    # best fitness over time, as a generic_ga/run_history.py recorder: only
+    # the changes of the best fitness are kept.
+
+    def __init__( self ):
+        self.start_time = time.perf_counter()
+        self.curve = []
+
+    def record( self, generation, best_fitness, best_individual = None, fitnesses = None ):
+        best_fitness = float( best_fitness )
+        if not self.curve or self.curve[ -1 ][2] != best_fitness:
+            self.curve.append(
+                ( time.perf_counter() - self.start_time, int( generation ), best_fitness )
+            )
+
+    def get_state( self ):
+        # nothing to resume, the curve is kept in memory.
+        return None
+
+    def close( self ):
+        pass
+
+
+def get_seeds( number_of_runs, seed = None ):
+    # one independent 32 bits seed per run, the same for a given seed.
+    return [
+        int( child.generate_state( 1 )[0] )
+        for child in np.random.SeedSequence( seed ).spawn( number_of_runs )
+    ]
+
+
+def run_trials( trial_function, configurations, number_of_runs, seed = None,
+                number_of_processes = None ):
+    # { name: [ result of every run, in seeds order ] }, the runs of all the
+    # configurations in one process pool. NB: the wall times are only
+    # comparable with at most one worker per physical core.
+    seeds = get_seeds( number_of_runs, seed )
+    with ProcessPoolExecutor( max_workers = number_of_processes or os.cpu_count() ) as executor:
+        futures = {
+            name: [ executor.submit( trial_function, configuration, run_seed )
+                    for run_seed in seeds ]
+            for name, configuration in configurations.items()
+        }
+        return {
+            name: [ future.result() for future in name_futures ]
+            for name, name_futures in futures.items()
+        }
+
+
+def get_best_so_far( curve, minimize = False ):
+    # the curve's ( seconds, best-so-far fitness ) arrays.
+    if not curve:
+        return np.zeros( 0 ), np.zeros( 0 )
+    seconds, _, fitnesses = np.array( curve, dtype=float ).T
+    accumulate = np.minimum.accumulate if minimize else np.maximum.accumulate
+    return seconds, accumulate( fitnesses )
+
+
+def get_time_to_target( result, target = None, minimize = False ):
+    # ( generations, seconds ) to target, inf if the run never reached it.
+    if target is None:
+        if result[ 'converged' ]:
+            return float( result[ 'generations' ] ), float( result[ 'elapsed_time' ] )
+        return math.inf, math.inf
+    for seconds, generation, fitness in result[ 'curve' ]:
+        if ( fitness <= target ) if minimize else ( fitness >= target ):
+            return float( generation ), float( seconds )
+    return math.inf, math.inf
+
+
+def get_percentiles( values ):
+    # { percentile: value }, None for infinite values (runs off target).
+    values = np.asarray( values, dtype=float )
+    return {
+        str( p ): None if math.isinf( v ) else round( float( v ), 6 )
+        for p, v in zip( PERCENTILES, np.percentile( values, PERCENTILES,
+                                                     method='inverted_cdf' ) )
+    }
+
+
+def get_ecdf( values ):
+    # [ [ value, proportion of runs <= value ], ... ] of the finite values.
+    values = np.sort( np.asarray( values, dtype=float ) )
+    finite = values[ np.isfinite( values ) ]
+    return [ [ round( float( v ), 6 ), round( ( i + 1 ) / float( len( values ) ), 6 ) ]
+             for i, v in enumerate( finite ) ]
+
+
+def get_fitness_over_time( results, minimize = False, number_of_points = 20 ):
+    # percentiles of the best-so-far fitness on a common time grid; None for
+    # the runs without any record yet.
+    curves = [ get_best_so_far( result[ 'curve' ], minimize ) for result in results ]
+    end_time = max( [ seconds[ -1 ] for seconds, _ in curves if len( seconds ) ] or [ 0.0 ] )
+    grid = np.linspace( 0.0, end_time, number_of_points )
+    table = np.full( ( len( curves ), number_of_points ), np.nan )
+    for i, ( seconds, fitnesses ) in enumerate( curves ):
+        ids = np.searchsorted( seconds, grid, side='right' ) - 1
+        table[ i, ids >= 0 ] = fitnesses[ ids[ ids >= 0 ] ]
+    points = []
+    for j, seconds in enumerate( grid ):
+        column = table[ :, j ][ ~np.isnan( table[ :, j ] ) ]
+        point = { 'seconds': round( float( seconds ), 6 ), 'runs': len( column ) }
+        if len( column ):
+            point.update( get_percentiles( column ) )
+        points.append( point )
+    return points
+
+
+def get_summary( results, target = None, minimize = False ):
+    generations, seconds = np.array(
+        [ get_time_to_target( result, target, minimize ) for result in results ]
+    ).reshape( -1, 2 ).T
+    best_fitnesses = [ result[ 'best_fitness' ] for result in results ]
+    return {
+        'runs': len( results ),
+        'converged': int( np.isfinite( seconds ).sum() ),
+        'generations_to_target': get_percentiles( generations ),
+        'seconds_to_target': get_percentiles( seconds ),
+        'best_fitness': get_percentiles( best_fitnesses ),
+        'seconds_to_target_ecdf': get_ecdf( seconds ),
+        'best_fitness_over_time': get_fitness_over_time( results, minimize ),
+    }
+
+
+def get_mann_whitney_u( values_1, values_2 ):
+    # ( U of values_1, two-sided p-value ), normal approximation with ties
+    # correction; inf values are fine (ranked last, tied).
+    values_1 = np.asarray( values_1, dtype=float )
+    values_2 = np.asarray( values_2, dtype=float )
+    n_1, n_2 = len( values_1 ), len( values_2 )
+    values = np.concatenate( [ values_1, values_2 ] )
+    # average ranks of the ties.
+    _, inverse, counts = np.unique( values, return_inverse=True, return_counts=True )
+    upper_ranks = np.cumsum( counts )
+    ranks = ( upper_ranks - ( counts - 1 ) / 2.0 )[ inverse ]
+    u = ranks[ :n_1 ].sum() - n_1 * ( n_1 + 1 ) / 2.0
+
+    n = n_1 + n_2
+    variance = n_1 * n_2 / 12.0 * ( ( n + 1 ) - ( counts ** 3 - counts ).sum() / ( n * ( n - 1 ) ) )
+    if variance <= 0.0:
+        return float( u ), 1.0
+    z = ( abs( u - n_1 * n_2 / 2.0 ) - 0.5 ) / math.sqrt( variance )
+    return float( u ), min( 1.0, math.erfc( max( z, 0.0 ) / math.sqrt( 2.0 ) ) )
+
+
+def compare( results_1, results_2, target = None, minimize = False ):
+    # is the first configuration faster to target, and fitter at the end?
+    _, seconds_1 = np.array(
+        [ get_time_to_target( result, target, minimize ) for result in results_1 ]
+    ).reshape( -1, 2 ).T
+    _, seconds_2 = np.array(
+        [ get_time_to_target( result, target, minimize ) for result in results_2 ]
+    ).reshape( -1, 2 ).T
+    fitnesses_1 = [ result[ 'best_fitness' ] for result in results_1 ]
+    fitnesses_2 = [ result[ 'best_fitness' ] for result in results_2 ]
+
+    comparison = {}
+    # higher is better for both, runs off target are the worst.
+    for name, values_1, values_2 in (
+            ( 'seconds_to_target', -seconds_1, -seconds_2 ),
+            ( 'best_fitness',
+              -np.asarray( fitnesses_1 ) if minimize else fitnesses_1,
+              -np.asarray( fitnesses_2 ) if minimize else fitnesses_2 ) ):
+        u, p_value = get_mann_whitney_u( values_1, values_2 )
+        comparison[ name ] = {
+            'u': u,
+            'p_value': round( p_value, 6 ),
+            # probability that the first configuration is better.
+            'a': round( u / float( len( values_1 ) * len( values_2 ) ), 6 ),
+        }
+    return comparison
+
+
+def get_argument_parser( description ):
+    parser = argparse.ArgumentParser( description=description )
+    parser.add_argument( '--runs', type=int, default=30,
+                         help='independent runs per configuration.' )
+    parser.add_argument( '--seed', type=int, default=None,
+                         help='seed of the runs\' seeds (default: fresh entropy).' )
+    parser.add_argument( '--processes', type=int, default=None,
+                         help='worker processes (default: one per CPU).' )
+    parser.add_argument( '--configuration', nargs=2, action='append',
+                         metavar=( 'NAME', 'OPTIONS' ), default=None,
+                         help='a named set of the runner\'s options, e.g. '
+                         '"--population-size 100"; two of them are compared.' )
+    parser.add_argument( '--target', type=float, default=None,
+                         help='fitness to reach (default: the runs\' own target).' )
+    parser.add_argument( '--minimize', action='store_true',
+                         help='lower fitnesses are better (e.g. route lengths).' )
+    parser.add_argument( '--output', help='JSON report path (default: stdout).' )
+    parser.add_argument( '--runs-output', help='JSON lines of every run\'s summary.' )
+    return parser
+
+
+def main( trial_function, description, argv = None, minimize = False ):
+    # minimize: the problem's default for --minimize.
+    parser = get_argument_parser( description )
+    parser.set_defaults( minimize = minimize )
+    args = parser.parse_args( argv )
+    configurations = dict(
+        ( name, shlex.split( options ) )
+        for name, options in ( args.configuration or [ ( 'default', '' ) ] )
+    )
+    if len( configurations ) != len( args.configuration or [ None ] ):
+        parser.error( 'the configuration names must be unique' )
+
+    results = run_trials(
+        trial_function, configurations, args.runs, args.seed, args.processes
+    )
+    report = {
+        'seed': args.seed,
+        'configurations': dict(
+            ( name, dict( options = ' '.join( configurations[ name ] ),
+                          **get_summary( name_results, args.target, args.minimize ) ) )
+            for name, name_results in results.items()
+        ),
+    }
+    if len( results ) == 2:
+        name_1, name_2 = list( results )
+        report[ 'comparison' ] = dict(
+            configurations = [ name_1, name_2 ],
+            **compare( results[ name_1 ], results[ name_2 ], args.target, args.minimize )
+        )
+
+    if args.runs_output:
+        with open( args.runs_output, 'w' ) as f:
+            for name, name_results in results.items():
+                for result in name_results:
+                    f.write( json.dumps( dict( configuration = name, **result ) ) + '\n' )
+    if args.output:
+        with open( args.output, 'w' ) as f:
+            json.dump( report, f, indent=1 )
+    else:
+        json.dump( report, sys.stdout, indent=1 )
+        sys.stdout.write( '\n' )
+    return report
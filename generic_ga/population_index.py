@@ -0,0 +1,63 @@
+# Genetic algorithms examples - population index.
+# MIT License.
+
+# Best and worst members of a population whose fitnesses change one member at
+# a time (e.g. a steady-state GA replacing its worst member with a child), in
+# O(log N) per change instead of an O(N) scan or a full re-sort:
+#
+#   index = PopulationIndex( keys )       # lower key is fitter
+#   worst_id = index.get_worst_id()
+#   index.update( worst_id, child_key )   # the member at worst_id replaced
+#   best_id = index.get_best_id()
+#
+# Two binary heaps (a min-heap for the best, a max-heap for the worst) of
+# ( key, id, version ) entries. An update pushes new entries and leaves the
+# member's old ones in the heaps, stale: they are dropped when they reach the
+# top (lazy deletion), and the heaps are rebuilt once they hold more than
+# max_stale_ratio times the population. Ties are broken by the lower id, in
+# both heaps, so a rebuilt index (e.g. after a resume) answers the same.
+
+
+import heapq
+
+
+class PopulationIndex( object ):
+
+    def __init__( self, keys, max_stale_ratio = 4 ):
+        self.max_stale_ratio = max_stale_ratio
+        self._build( keys )
+
+    def _build( self, keys ):
+        self.keys = [ float( key ) for key in keys ]
+        self.versions = [ 0 ] * len( self.keys )
+        self._best_heap = [ ( key, i, 0 ) for i, key in enumerate( self.keys ) ]
+        self._worst_heap = [ ( -key, i, 0 ) for i, key in enumerate( self.keys ) ]
+        heapq.heapify( self._best_heap )
+        heapq.heapify( self._worst_heap )
+
+    def __len__( self ):
+        return len( self.keys )
+
+    def _get_top_id( self, heap ):
+        while True:
+            _, i, version = heap[0]
+            if version == self.versions[ i ]:
+                return i
+            heapq.heappop( heap )
+
+    def get_best_id( self ):
+        return self._get_top_id( self._best_heap )
+
+    def get_worst_id( self ):
+        return self._get_top_id( self._worst_heap )
+
+    def update( self, i, key ):
+        key = float( key )
+        version = self.versions[ i ] + 1
+        self.versions[ i ] = version
+        self.keys[ i ] = key
+        heapq.heappush( self._best_heap, ( key, i, version ) )
+        heapq.heappush( self._worst_heap, ( -key, i, version ) )
+        if max( len( self._best_heap ), len( self._worst_heap ) ) > \
+                self.max_stale_ratio * len( self.keys ):
+            self._build( self.keys )
@@ -0,0 +1,147 @@
+# Genetic algorithms examples - run controller.
+# MIT License.
+
+# Decides, generation after generation, how many mutations every child gets,
+# when to reseed the population and when to stop, and keeps the best-so-far
+# individual so that a run can be cut at any time:
+#
+#   controller = RunController( minimize = True, window = 50, max_mutations = 8,
+#                               restart_after = 500, time_budget = 30.0 )
+#   while not controller.should_stop():
+#       population, lengths = ga.reproduction_with_lengths(
+#           ..., number_of_mutations = controller.number_of_mutations
+#       )
+#       ...
+#       if controller.update( best_length, best_route ) == 'reseed':
+#           mating_pool = ga.get_reseeded_mating_pool(
+#               mating_pool, controller.reseed_proportion, dist_matrix
+#           )
+#   controller.best_fitness, controller.best_individual
+#
+# Stagnation: the best fitness did not improve by more than tolerance over the
+# last window generations.
+# Adaptive mutation: number_of_mutations is multiplied by mutation_factor (up
+# to max_mutations) for every window generations of stagnation and divided by
+# it (down to min_mutations) at every improvement. max_mutations =
+# min_mutations turns the adaptation off.
+# Restarts: after restart_after generations of stagnation, update() returns
+# 'reseed': the caller replaces the worst reseed_proportion of its population
+# with random individuals (the fittest is always kept).
+# Stop: should_stop() once time_budget seconds have elapsed, or after patience
+# generations of stagnation. The deadline is checked between generations.
+
+
+import math
+import time
+
+
+class RunController( object ):
+
+    def __init__( self, minimize = False, window = 50, tolerance = 0.0,
+                  min_mutations = 1, max_mutations = 1, mutation_factor = 2.0,
+                  restart_after = None, reseed_proportion = 0.5,
+                  patience = None, time_budget = None ):
+        assert( 1 <= min_mutations <= max_mutations )
+        assert( 0.0 < reseed_proportion <= 1.0 )
+        # both are moduli of the stagnant generations.
+        if window < 1:
+            raise ValueError( 'the stagnation window must be at least 1: %s' % window )
+        if restart_after is not None and restart_after < 1:
+            raise ValueError( 'restart_after must be at least 1: %s' % restart_after )
+        self.minimize = minimize
+        self.window = window
+        self.tolerance = tolerance
+        self.min_mutations = min_mutations
+        self.max_mutations = max_mutations
+        self.mutation_factor = mutation_factor
+        self.restart_after = restart_after
+        self.reseed_proportion = reseed_proportion
+        self.patience = patience
+        self.time_budget = time_budget
+
+        self.number_of_mutations = min_mutations
+        self.best_fitness = None
+        self.best_individual = None
+        # the best fitness when the current plateau started.
+        self.reference_fitness = None
+        self.stagnant_generations = 0
+        self.number_of_restarts = 0
+        self.start()
+
+    def start( self, elapsed_time = 0.0 ):
+        # starts the clock, elapsed_time seconds ago (e.g. a resumed run's).
+        self.start_time = time.perf_counter() - elapsed_time
+
+    def get_elapsed_time( self ):
+        return time.perf_counter() - self.start_time
+
+    def get_remaining_time( self ):
+        if self.time_budget is None:
+            return None
+        return max( 0.0, self.time_budget - self.get_elapsed_time() )
+
+    def is_better( self, fitness, other_fitness, tolerance = 0.0 ):
+        if other_fitness is None:
+            return True
+        if self.minimize:
+            return fitness < other_fitness - tolerance
+        return fitness > other_fitness + tolerance
+
+    def is_stagnating( self ):
+        return self.stagnant_generations >= self.window
+
+    def is_out_of_time( self ):
+        return self.time_budget is not None and \
+            self.get_elapsed_time() >= self.time_budget
+
+    def should_stop( self ):
+        return self.is_out_of_time() or \
+            ( self.patience is not None and self.stagnant_generations >= self.patience )
+
+    def update( self, best_fitness, best_individual = None ):
+        # once per generation, with the generation's best; returns 'reseed'
+        # when the population should be partially reseeded, else None.
+        if self.is_better( best_fitness, self.best_fitness ):
+            self.best_fitness = best_fitness
+            # copied, the caller may go on modifying it.
+            self.best_individual = best_individual.copy() \
+                if hasattr( best_individual, 'copy' ) else best_individual
+
+        if self.is_better( self.best_fitness, self.reference_fitness, self.tolerance ):
+            self.reference_fitness = self.best_fitness
+            self.stagnant_generations = 0
+            self.number_of_mutations = max(
+                self.min_mutations, int( self.number_of_mutations / self.mutation_factor )
+            )
+            return None
+
+        self.stagnant_generations += 1
+        if self.stagnant_generations % self.window == 0:
+            self.number_of_mutations = min(
+                self.max_mutations,
+                int( math.ceil( self.number_of_mutations * self.mutation_factor ) )
+            )
+        if self.restart_after is not None and \
+                self.stagnant_generations % self.restart_after == 0:
+            self.number_of_restarts += 1
+            self.number_of_mutations = self.min_mutations
+            return 'reseed'
+        return None
+
+    def get_state( self ):
+        # JSON state, e.g. for a generic_ga/checkpoint.py checkpoint.
+        best_individual = self.best_individual
+        if hasattr( best_individual, 'tolist' ):
+            best_individual = best_individual.tolist()
+        return {
+            'number_of_mutations': self.number_of_mutations,
+            'best_fitness': self.best_fitness,
+            'best_individual': best_individual,
+            'reference_fitness': self.reference_fitness,
+            'stagnant_generations': self.stagnant_generations,
+            'number_of_restarts': self.number_of_restarts,
+        }
+
+    def set_state( self, state ):
+        for name, value in state.items():
+            setattr( self, name, value )
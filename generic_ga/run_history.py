@@ -0,0 +1,341 @@
+# Genetic algorithms examples - streaming run history.
+# MIT License.
+
+# Records, for every generation, the best fitness, the best individual and
+# the population's fitness statistics in an append-only binary file, written
+# by a background thread so that the GA loop only pays for a queue put.
+#
+#   recorder = RunHistoryRecorder( 'run.gahist', individual_length = 30,
+#                                  dtype = '<i4', metadata = { 'seed': 1 } )
+#   while ...:
+#       recorder.record( t, best_fitness, best_route, lengths )
+#   recorder.close()
+#
+# Resuming a checkpointed run: get_state(), saved in the checkpoint, flushes
+# the pending records and returns the last recorded generation and the file
+# size; the resumed run's recorder is given that state and cuts the file back
+# to it, dropping the generations recorded after the checkpoint, then appends.
+#
+#   state = recorder.get_state()      # into the checkpoint's metadata.
+#   recorder = RunHistoryRecorder( 'run.gahist', 30, resume_state = state )
+#
+#   history = RunHistory( 'run.gahist' )
+#   for record, route in history.replay( 1000, 2000 ):
+#       ...
+#   history.plot( 1000, 2000 )
+#
+# or from the command line (JSON lines, or a picture with --plot):
+#   python run_history.py run.gahist --start 1000 --stop 2000 [--plot run.png]
+#
+# File layout (little endian):
+#   header   b'GAHIST01', uint32 JSON size, JSON { 'individual_length',
+#            'dtype', 'chunk_size', 'metadata' }
+#   chunks   b'CHNK', uint32 number of records, uint32 number of changes,
+#            then the RECORD_DTYPE records, the changed positions (uint32)
+#            and the changed values (header dtype).
+#
+# The best individuals are delta-encoded: a record only stores the positions
+# that changed since the previous generation (e.g. 2 positions after a swap
+# mutation). The first record of every chunk stores the full individual, so
+# any chunk can be decoded on its own and the reader, which memory-maps the
+# file, only touches the chunks overlapping the requested generation range.
+# A chunk cut short by a crash is ignored.
+
+
+import argparse
+import json
+import os
+import queue
+import struct
+import sys
+import threading
+import numpy as np
+
+
+MAGIC = b'GAHIST01'
+CHUNK_MAGIC = b'CHNK'
+CHUNK_HEADER = struct.Struct( '<4sII' )
+# queued by get_state().
+FLUSH = object()
+
+RECORD_DTYPE = np.dtype( [
+    ( 'generation', '<i8' ),
+    ( 'best', '<f8' ),
+    ( 'mean', '<f8' ),
+    ( 'std', '<f8' ),
+    ( 'min', '<f8' ),
+    ( 'max', '<f8' ),
+    ( 'number_of_changes', '<u4' ),
+] )
+
+
+class RunHistoryRecorder( object ):
+
+    def __init__( self, path, individual_length, dtype = '<i4',
+                  chunk_size = 1024, metadata = None, max_pending = 4096,
+                  resume_state = None ):
+        # resume_state: the get_state() of the interrupted run's recorder,
+        # the history is then continued instead of started again.
+        self.individual_length = individual_length
+        self.dtype = np.dtype( dtype )
+        self.chunk_size = chunk_size
+        if resume_state is not None and os.path.exists( path ):
+            if os.path.getsize( path ) < resume_state[ 'offset' ]:
+                raise ValueError( 'run history shorter than its checkpoint: %s' % path )
+            # read-write, not 'wb': the generations up to the checkpoint stay.
+            self.file = open( path, 'r+b' )
+            self.file.truncate( resume_state[ 'offset' ] )
+            self.file.seek( resume_state[ 'offset' ] )
+            self.last_generation = resume_state[ 'generation' ]
+        else:
+            self.file = open( path, 'wb' )
+            header = json.dumps( {
+                'individual_length': individual_length,
+                'dtype': self.dtype.str,
+                'chunk_size': chunk_size,
+                'metadata': metadata or {},
+            }, sort_keys=True ).encode( 'utf-8' )
+            self.file.write( MAGIC + struct.pack( '<I', len( header ) ) + header )
+            self.file.flush()
+            self.last_generation = None
+        # of the records written so far, see get_state().
+        self.offset = self.file.tell()
+
+        self.error = None
+        # bounded so that a stalled disk slows the GA down instead of
+        # filling the memory; records are never dropped.
+        self.queue = queue.Queue( max_pending )
+        self.thread = threading.Thread( target = self._write_loop, daemon = True )
+        self.thread.start()
+
+    def record( self, generation, best_fitness, best_individual, fitnesses ):
+        if self.error is not None:
+            raise self.error
+        self.queue.put( (
+            generation,
+            best_fitness,
+            np.array( best_individual, dtype=self.dtype ),
+            np.array( fitnesses, dtype=float ),
+        ) )
+
+    def get_state( self ):
+        # { 'generation', 'offset' }: the last recorded generation and the
+        # size of the file once the pending records are written (the partial
+        # chunk included). Blocks until they are.
+        if self.error is not None:
+            raise self.error
+        flushed = threading.Event()
+        self.queue.put( ( FLUSH, flushed ) )
+        while not flushed.wait( 0.1 ) and self.thread.is_alive():
+            pass
+        if self.error is not None:
+            raise self.error
+        return { 'generation': self.last_generation, 'offset': self.offset }
+
+    def _write_loop( self ):
+        records = []
+        positions = []
+        values = []
+        previous_individual = None
+        try:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    break
+                if item[0] is FLUSH:
+                    if records:
+                        self._write_chunk( records, positions, values )
+                        records, positions, values = [], [], []
+                    item[1].set()
+                    continue
+                generation, best_fitness, individual, fitnesses = item
+                assert( len( individual ) == self.individual_length )
+
+                if previous_individual is None or not records:
+                    # key frame, first record of a chunk.
+                    changed = np.arange( len( individual ) )
+                else:
+                    changed = np.flatnonzero( individual != previous_individual )
+                positions.append( changed )
+                values.append( individual[ changed ] )
+                previous_individual = individual
+                self.last_generation = generation
+                records.append( (
+                    generation, best_fitness, fitnesses.mean(), fitnesses.std(),
+                    fitnesses.min(), fitnesses.max(), len( changed )
+                ) )
+
+                if len( records ) == self.chunk_size:
+                    self._write_chunk( records, positions, values )
+                    records, positions, values = [], [], []
+            if records:
+                self._write_chunk( records, positions, values )
+        except Exception as e:
+            self.error = e
+        finally:
+            self.file.close()
+
+    def _write_chunk( self, records, positions, values ):
+        records = np.array( records, dtype=RECORD_DTYPE )
+        positions = np.concatenate( positions ).astype( '<u4' )
+        values = np.concatenate( values ).astype( self.dtype )
+        self.file.write(
+            CHUNK_HEADER.pack( CHUNK_MAGIC, len( records ), len( positions ) ) +
+            records.tobytes() + positions.tobytes() + values.tobytes()
+        )
+        self.file.flush()
+        self.offset = self.file.tell()
+
+    def close( self ):
+        # write the pending records and the last (partial) chunk.
+        if self.thread.is_alive():
+            self.queue.put( None )
+            self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, *exc_info ):
+        self.close()
+
+
+class RunHistory( object ):
+
+    def __init__( self, path ):
+        self.buffer = np.memmap( path, dtype=np.uint8, mode='r' )
+        if bytes( self.buffer[ :len( MAGIC ) ] ) != MAGIC:
+            raise ValueError( 'not a run history file: %s' % path )
+        header_size, = struct.unpack_from( '<I', self.buffer, len( MAGIC ) )
+        offset = len( MAGIC ) + 4
+        header = json.loads( bytes( self.buffer[ offset:offset + header_size ] ) )
+        self.individual_length = header[ 'individual_length' ]
+        self.dtype = np.dtype( header[ 'dtype' ] )
+        self.chunk_size = header[ 'chunk_size' ]
+        self.metadata = header[ 'metadata' ]
+        self.chunks = self._get_chunks( offset + header_size )
+
+    def _get_chunks( self, offset ):
+        # only the chunk headers and generation bounds are read, the payloads
+        # stay on disk until they are replayed.
+        chunks = []
+        while offset + CHUNK_HEADER.size <= len( self.buffer ):
+            magic, number_of_records, number_of_changes = \
+                CHUNK_HEADER.unpack_from( self.buffer, offset )
+            records_offset = offset + CHUNK_HEADER.size
+            positions_offset = records_offset + number_of_records * RECORD_DTYPE.itemsize
+            values_offset = positions_offset + 4 * number_of_changes
+            end = values_offset + number_of_changes * self.dtype.itemsize
+            if magic != CHUNK_MAGIC or end > len( self.buffer ):
+                break
+            records = np.frombuffer(
+                self.buffer, RECORD_DTYPE, number_of_records, records_offset
+            )
+            chunks.append( {
+                'records': records,
+                'positions': np.frombuffer(
+                    self.buffer, '<u4', number_of_changes, positions_offset
+                ),
+                'values': np.frombuffer(
+                    self.buffer, self.dtype, number_of_changes, values_offset
+                ),
+                'first_generation': int( records[ 0 ][ 'generation' ] ),
+                'last_generation': int( records[ -1 ][ 'generation' ] ),
+            } )
+            offset = end
+        return chunks
+
+    def __len__( self ):
+        return sum( len( chunk[ 'records' ] ) for chunk in self.chunks )
+
+    def _get_overlapping_chunks( self, start, stop ):
+        for chunk in self.chunks:
+            if ( start is None or chunk[ 'last_generation' ] >= start ) and \
+                    ( stop is None or chunk[ 'first_generation' ] < stop ):
+                yield chunk
+
+    @staticmethod
+    def _get_mask( records, start, stop ):
+        mask = np.ones( len( records ), dtype=bool )
+        if start is not None:
+            mask &= records[ 'generation' ] >= start
+        if stop is not None:
+            mask &= records[ 'generation' ] < stop
+        return mask
+
+    def get_records( self, start = None, stop = None ):
+        # records of the generations in [ start, stop ), as a structured array.
+        records = [
+            chunk[ 'records' ][ self._get_mask( chunk[ 'records' ], start, stop ) ]
+            for chunk in self._get_overlapping_chunks( start, stop )
+        ]
+        if not records:
+            return np.empty( 0, dtype=RECORD_DTYPE )
+        return np.concatenate( records )
+
+    def replay( self, start = None, stop = None ):
+        # yields ( record, best individual ) for the generations in
+        # [ start, stop ), decoding each chunk from its key frame.
+        for chunk in self._get_overlapping_chunks( start, stop ):
+            records = chunk[ 'records' ]
+            mask = self._get_mask( records, start, stop )
+            change_offsets = np.concatenate( [
+                [ 0 ], np.cumsum( records[ 'number_of_changes' ], dtype=np.int64 )
+            ] )
+            individual = np.zeros( self.individual_length, dtype=self.dtype )
+            for i in range( len( records ) ):
+                if stop is not None and records[ i ][ 'generation' ] >= stop:
+                    return
+                changes = slice( change_offsets[ i ], change_offsets[ i + 1 ] )
+                individual[ chunk[ 'positions' ][ changes ] ] = chunk[ 'values' ][ changes ]
+                if mask[ i ]:
+                    yield records[ i ], individual.copy()
+
+    def get_best_individual( self, generation ):
+        for record, individual in self.replay( generation, generation + 1 ):
+            return individual
+        raise KeyError( generation )
+
+    def plot( self, start = None, stop = None, ax = None ):
+        # NB: matplotlib is only imported when plotting.
+        import matplotlib.pyplot as plt
+
+        records = self.get_records( start, stop )
+        if ax is None:
+            ax = plt.gca()
+        ax.fill_between(
+            records[ 'generation' ], records[ 'min' ], records[ 'max' ],
+            alpha=.2, label='min - max'
+        )
+        ax.plot( records[ 'generation' ], records[ 'mean' ], lw=.5, label='mean' )
+        ax.plot( records[ 'generation' ], records[ 'best' ], lw=.5, label='best' )
+        ax.set_xlabel( 'time (steps)' )
+        ax.legend()
+        return ax
+
+
+def main( argv = None ):
+    parser = argparse.ArgumentParser( description='replay or plot a run history.' )
+    parser.add_argument( 'path' )
+    parser.add_argument( '--start', type=int, default=None )
+    parser.add_argument( '--stop', type=int, default=None )
+    parser.add_argument( '--plot', help='save a fitness plot to this path.' )
+    args = parser.parse_args( argv )
+
+    history = RunHistory( args.path )
+    if args.plot:
+        import matplotlib
+        matplotlib.use( 'Agg' )
+        ax = history.plot( args.start, args.stop )
+        ax.figure.savefig( args.plot, dpi=150 )
+        return
+
+    for record, individual in history.replay( args.start, args.stop ):
+        line = dict( zip( RECORD_DTYPE.names, record.tolist() ) )
+        line[ 'best_individual' ] = individual.tolist()
+        sys.stdout.write( json.dumps( line ) + '\n' )
+
+
+if __name__ == '__main__':
+    main()
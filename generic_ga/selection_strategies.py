@@ -0,0 +1,169 @@
+# Genetic algorithms examples - parent selection strategies.
+# MIT License.
+
+# By default reproduction() breeds the whole next generation from the two
+# fittest individuals. With a selection strategy every child gets its own
+# pair of parents, drawn from the whole population:
+#
+#   selection_strategy = get_selection_strategy( 'tournament', tournament_size = 3 )
+#   population = ga.reproduction( mating_pool, 1000,
+#                                 selection_strategy = selection_strategy )
+#
+# A strategy only sees a fitnesses array (higher is fitter, non-negative, e.g.
+# the mating pool's get_sampling_weights()) and returns population indices,
+# with vectorized sampling:
+#
+#   'tournament'  the fittest of tournament_size random individuals; O(m * k).
+#   'rank'        linear ranking: the selection probability only depends on
+#                 the rank, from ( 2 - pressure ) / N for the worst to
+#                 pressure / N for the fittest; O(N log N + m log N).
+#   'roulette'    fitness-proportional, cumulative-weight sampling with
+#                 replacement: one binary search of the cumulative weights
+#                 per parent; O(N + m log N).
+#   'sus'         stochastic universal sampling: fitness-proportional, with
+#                 m evenly spaced pointers on the roulette wheel so that an
+#                 individual is picked floor or ceil of its expected number
+#                 of times; O(N + m log N).
+#   'truncation'  uniform among the fittest proportion of the population;
+#                 O(N + m).
+#
+# rng: a numpy Generator, or None for numpy's global generator (as the GA
+# modules draw from).
+
+
+import numpy as np
+
+
+class SelectionStrategy( object ):
+
+    name = None
+
+    def select( self, fitnesses, number_of_parents, rng = None ):
+        raise NotImplementedError()
+
+    def select_pairs( self, fitnesses, number_of_pairs, rng = None ):
+        # ( ids_1, ids_2 ), the parents of every child.
+        ids = self.select(
+            np.asarray( fitnesses, dtype=float ), 2 * number_of_pairs, get_rng( rng )
+        )
+        return ids[ 0::2 ], ids[ 1::2 ]
+
+
+def get_rng( rng ):
+    # np.random itself offers the random() and permutation() used below.
+    return np.random if rng is None else rng
+
+
+def get_random_ids( number_of_ids, shape, rng ):
+    return np.minimum(
+        ( rng.random( shape ) * number_of_ids ).astype( int ), number_of_ids - 1
+    )
+
+
+class TournamentSelection( SelectionStrategy ):
+
+    name = 'tournament'
+
+    def __init__( self, tournament_size = 2 ):
+        self.tournament_size = tournament_size
+
+    def select( self, fitnesses, number_of_parents, rng = None ):
+        rng = get_rng( rng )
+        contestants = get_random_ids(
+            len( fitnesses ), ( number_of_parents, self.tournament_size ), rng
+        )
+        winners = fitnesses[ contestants ].argmax( axis=1 )
+        return contestants[ np.arange( number_of_parents ), winners ]
+
+
+class RankSelection( SelectionStrategy ):
+
+    name = 'rank'
+
+    def __init__( self, pressure = 1.5 ):
+        assert( 1.0 <= pressure <= 2.0 )
+        self.pressure = pressure
+
+    def select( self, fitnesses, number_of_parents, rng = None ):
+        rng = get_rng( rng )
+        n = len( fitnesses )
+        order = np.argsort( fitnesses, kind='stable' )  # worst first.
+        if n == 1:
+            return np.zeros( number_of_parents, dtype=int )
+        ranks = np.arange( n )
+        probabilities = ( 2.0 - self.pressure ) / n + \
+            2.0 * ranks * ( self.pressure - 1.0 ) / ( n * ( n - 1 ) )
+        cumulative_probabilities = np.cumsum( probabilities )
+        positions = np.searchsorted(
+            cumulative_probabilities,
+            rng.random( number_of_parents ) * cumulative_probabilities[ -1 ],
+            side='right'
+        )
+        return order[ np.minimum( positions, n - 1 ) ]
+
+
+def get_cumulative_weights( fitnesses ):
+    # as the mating pools' sampling weights: no zero weight.
+    return np.cumsum( np.where( fitnesses > 0.0, fitnesses, 0.00001 ) )
+
+
+class RouletteWheelSelection( SelectionStrategy ):
+
+    name = 'roulette'
+
+    def select( self, fitnesses, number_of_parents, rng = None ):
+        rng = get_rng( rng )
+        cumulative_weights = get_cumulative_weights( fitnesses )
+        ids = np.searchsorted(
+            cumulative_weights,
+            rng.random( number_of_parents ) * cumulative_weights[ -1 ],
+            side='right'
+        )
+        return np.minimum( ids, len( fitnesses ) - 1 )
+
+
+class StochasticUniversalSampling( SelectionStrategy ):
+
+    name = 'sus'
+
+    def select( self, fitnesses, number_of_parents, rng = None ):
+        rng = get_rng( rng )
+        cumulative_weights = get_cumulative_weights( fitnesses )
+        step = cumulative_weights[ -1 ] / number_of_parents
+        pointers = step * ( rng.random() + np.arange( number_of_parents ) )
+        ids = np.searchsorted( cumulative_weights, pointers, side='right' )
+        ids = np.minimum( ids, len( fitnesses ) - 1 )
+        # the pointers pick the ids in population order, shuffle them so that
+        # the pairs are random.
+        return ids[ rng.permutation( number_of_parents ) ]
+
+
+class TruncationSelection( SelectionStrategy ):
+
+    name = 'truncation'
+
+    def __init__( self, proportion = 0.2 ):
+        assert( 0.0 < proportion <= 1.0 )
+        self.proportion = proportion
+
+    def select( self, fitnesses, number_of_parents, rng = None ):
+        rng = get_rng( rng )
+        n = len( fitnesses )
+        k = min( n, max( 2, int( np.ceil( self.proportion * n ) ) ) )
+        fittest = np.argpartition( -fitnesses, k - 1 )[ :k ] if k < n else np.arange( n )
+        return fittest[ get_random_ids( k, number_of_parents, rng ) ]
+
+
+SELECTION_STRATEGIES = {
+    'tournament': TournamentSelection,
+    'rank': RankSelection,
+    'roulette': RouletteWheelSelection,
+    'sus': StochasticUniversalSampling,
+    'truncation': TruncationSelection,
+}
+
+
+def get_selection_strategy( name, **kwargs ):
+    if name not in SELECTION_STRATEGIES:
+        raise ValueError( 'unknown selection strategy: %s' % name )
+    return SELECTION_STRATEGIES[ name ]( **kwargs )
@@ -0,0 +1,306 @@
+# Genetic algorithms examples - hyperparameter sweep.
+# MIT License.
+
+# Tunes a GA's command line options (population size, mutations, crossover
+# fraction, elites, selection, ...) over a grid or a random search space, in a
+# process pool, with successive halving: every configuration gets a small
+# budget, the best 1 / eta of them get eta times more, and so on up to
+# max_budget, so that the poor configurations are pruned early.
+#
+#   space = {
+#       'population-size': [ 10, 100, 1000 ],
+#       'mutations': [ 1, 2, 4 ],
+#       'crossover-fraction': { 'min': 0.2, 'max': 0.8 },
+#   }
+#   with TrialCache( 'sweep.jsonl' ) as cache:
+#       rungs = successive_halving(
+#           headless.run_trial, get_random_configurations( space, 27, rng ),
+#           budgets = get_budgets( 100, 2700, eta = 3 ), cache = cache
+#       )
+#
+# Space: a list is a set of values; a { 'min', 'max', 'log', 'integer' }
+# range can only be sampled (random search). True is a flag option, False and
+# None leave the option out.
+# Trials: trial_function( options, seed ) as generic_ga/multi_run.py's (see
+# run_trial() in the headless runners), with the configuration's options, the
+# fixed options and budget_option (e.g. '--generations' or '--time-budget')
+# set to the rung's budget. Every configuration is run with the same
+# runs_per_trial seeds (see multi_run.get_seeds()).
+# Score of a configuration: the median of its runs' best fitness (lower is
+# better if minimize), ties broken by the median elapsed time (faster wins,
+# e.g. for runs stopping on target).
+# Cache: every completed trial is appended, as one JSON line, to the cache
+# file; a sweep run again with the same cache only runs the missing trials, so
+# an interrupted sweep resumes where it stopped.
+#
+# Each example has its own runner, e.g.:
+#     python sweep_word_search_example.py --cache sweep.jsonl \
+#         --space '{"population-size": [10, 100, 1000], "mutations": [1, 2, 4]}' \
+#         --options "--word supercalifragilisticexpialidocious" \
+#         --min-budget 30 --max-budget 810
+
+
+import argparse
+import itertools
+import json
+import math
+import os, sys
+import shlex
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from multi_run import get_seeds
+
+
+def get_grid_configurations( space ):
+    # every combination of the space's values, in the space's order.
+    names = list( space )
+    for name in names:
+        if not isinstance( space[ name ], list ):
+            raise ValueError( 'a grid needs lists of values: %s' % name )
+    return [ dict( zip( names, values ) )
+             for values in itertools.product( *[ space[ name ] for name in names ] ) ]
+
+
+def get_random_value( domain, rng ):
+    if isinstance( domain, list ):
+        return domain[ rng.integers( len( domain ) ) ]
+    low, high = domain[ 'min' ], domain[ 'max' ]
+    if domain.get( 'log' ):
+        value = math.exp( rng.uniform( math.log( low ), math.log( high ) ) )
+    else:
+        value = rng.uniform( low, high )
+    if domain.get( 'integer' ):
+        return int( min( high, max( low, round( value ) ) ) )
+    return round( value, 6 )
+
+
+def get_random_configurations( space, number_of_samples, rng = None ):
+    # number_of_samples distinct configurations (fewer if the space is small).
+    rng = np.random.default_rng( rng )
+    configurations = []
+    keys = set()
+    for _ in range( 100 * number_of_samples ):
+        if len( configurations ) == number_of_samples:
+            break
+        configuration = dict( ( name, get_random_value( domain, rng ) )
+                              for name, domain in space.items() )
+        key = get_key( configuration )
+        if key not in keys:
+            keys.add( key )
+            configurations.append( configuration )
+    return configurations
+
+
+def get_options( configuration ):
+    # the command line options of a configuration.
+    options = []
+    for name, value in configuration.items():
+        if value is True:
+            options.append( '--' + name )
+        elif value is not False and value is not None:
+            options.extend( [ '--' + name, str( value ) ] )
+    return options
+
+
+def get_trial_options( configuration, fixed_options, budget_option, budget ):
+    return list( fixed_options ) + get_options( configuration ) + \
+        [ budget_option, str( budget ) ]
+
+
+def get_key( value ):
+    return json.dumps( value, sort_keys=True )
+
+
+def get_budgets( min_budget, max_budget, eta = 3 ):
+    # min_budget * eta ** r up to max_budget, max_budget last.
+    assert( 0 < min_budget <= max_budget and eta > 1 )
+    budgets = [ min_budget ]
+    while budgets[ -1 ] * eta < max_budget * ( 1.0 - 1e-9 ):
+        budgets.append( budgets[ -1 ] * eta )
+    if budgets[ -1 ] < max_budget:
+        budgets.append( max_budget )
+    return budgets
+
+
+class TrialCache( object ):
+
+    # completed trials, appended to a JSON lines file: { 'key', 'result' }.
+
+    def __init__( self, path = None ):
+        self.path = path
+        self.results = {}
+        if path is not None and os.path.exists( path ):
+            with open( path ) as f:
+                for line in f:
+                    try:
+                        entry = json.loads( line )
+                    except ValueError:
+                        continue  # a line cut short by a crash.
+                    self.results[ entry[ 'key' ] ] = entry[ 'result' ]
+        self._file = open( path, 'a' ) if path is not None else None
+
+    def __contains__( self, key ):
+        return key in self.results
+
+    def get( self, key ):
+        return self.results[ key ]
+
+    def put( self, key, result ):
+        self.results[ key ] = result
+        if self._file is not None:
+            self._file.write( json.dumps( { 'key': key, 'result': result } ) + '\n' )
+            self._file.flush()
+            os.fsync( self._file.fileno() )
+
+    def close( self ):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, *exc_info ):
+        self.close()
+
+
+def _run_trial( trial_function, options, seed ):
+    result = trial_function( options, seed )
+    # only the summary is kept, e.g. not multi_run's curves.
+    return dict( ( name, value ) for name, value in result.items()
+                 if name in ( 'best_fitness', 'elapsed_time', 'generations', 'converged' ) )
+
+
+def get_score( results, minimize = False ):
+    # higher is better: ( median best fitness, -median elapsed time ).
+    fitness = float( np.median( [ result[ 'best_fitness' ] for result in results ] ) )
+    elapsed_time = float( np.median( [ result[ 'elapsed_time' ] for result in results ] ) )
+    return ( -fitness if minimize else fitness, -elapsed_time )
+
+
+def successive_halving( trial_function, configurations, budgets,
+                        budget_option = '--generations', fixed_options = (),
+                        eta = 3, runs_per_trial = 1, seed = None, minimize = False,
+                        cache = None, number_of_processes = None, log = None ):
+
+    # [ rung, ... ], a rung being { 'budget', 'configurations': [ { 'configuration',
+    # 'fitness', 'elapsed_time', 'results' }, ... ] } sorted best first; the
+    # best 1 / eta configurations of a rung go on to the next one.
+    cache = cache if cache is not None else TrialCache()
+    seeds = get_seeds( runs_per_trial, seed )
+    rungs = []
+    survivors = list( configurations )
+    with ProcessPoolExecutor( max_workers = number_of_processes or os.cpu_count() ) as executor:
+        for budget in budgets:
+            trials = {}
+            for configuration in survivors:
+                options = get_trial_options( configuration, fixed_options,
+                                             budget_option, budget )
+                for trial_seed in seeds:
+                    key = get_key( { 'options': options, 'seed': trial_seed } )
+                    trials[ key ] = ( options, trial_seed )
+
+            futures = {
+                executor.submit( _run_trial, trial_function, options, trial_seed ): key
+                for key, ( options, trial_seed ) in trials.items() if key not in cache
+            }
+            for future in as_completed( futures ):
+                cache.put( futures[ future ], future.result() )
+
+            ranking = []
+            for configuration in survivors:
+                options = get_trial_options( configuration, fixed_options,
+                                             budget_option, budget )
+                results = [ cache.get( get_key( { 'options': options, 'seed': trial_seed } ) )
+                            for trial_seed in seeds ]
+                score = get_score( results, minimize )
+                ranking.append( ( score, configuration, results ) )
+            # stable: equal scores keep the configurations' order.
+            ranking.sort( key=lambda item: item[0], reverse=True )
+
+            rungs.append( {
+                'budget': budget,
+                'configurations': [ {
+                    'configuration': configuration,
+                    'fitness': -score[0] if minimize else score[0],
+                    'elapsed_time': round( -score[1], 6 ),
+                    'results': results,
+                } for score, configuration, results in ranking ],
+            } )
+            if log is not None:
+                log.write( 'budget %s: %d configurations, best %s\n'
+                           % ( budget, len( ranking ), get_key( ranking[0][1] ) ) )
+            survivors = [ configuration for _, configuration, _ in
+                          ranking[ :max( 1, len( ranking ) // eta ) ] ]
+            if len( ranking ) == 1:
+                break
+    return rungs
+
+
+def get_argument_parser( description ):
+    parser = argparse.ArgumentParser( description=description )
+    parser.add_argument( '--space', required=True,
+                         help='JSON search space, or the path of a JSON file.' )
+    parser.add_argument( '--samples', type=int, default=None, metavar='N',
+                         help='random search of N configurations (default: the grid).' )
+    parser.add_argument( '--options', default='',
+                         help='options of every run, e.g. "--number-of-cities 100".' )
+    parser.add_argument( '--budget-option', default='--generations',
+                         help='the runner\'s option set to the budget, e.g. --time-budget.' )
+    parser.add_argument( '--min-budget', type=float, required=True )
+    parser.add_argument( '--max-budget', type=float, required=True )
+    parser.add_argument( '--eta', type=int, default=3,
+                         help='keep the best 1 / eta configurations at every rung.' )
+    parser.add_argument( '--runs-per-trial', type=int, default=3,
+                         help='seeds per configuration and budget.' )
+    parser.add_argument( '--seed', type=int, default=None )
+    parser.add_argument( '--processes', type=int, default=None,
+                         help='worker processes (default: one per CPU).' )
+    parser.add_argument( '--cache', help='JSON lines file of the completed trials; '
+                         'run the same sweep again to resume it.' )
+    parser.add_argument( '--minimize', action='store_true',
+                         help='lower fitnesses are better (e.g. route lengths).' )
+    parser.add_argument( '--output', help='JSON report path (default: stdout).' )
+    return parser
+
+
+def main( trial_function, description, argv = None, minimize = False ):
+    # minimize: the problem's default for --minimize.
+    parser = get_argument_parser( description )
+    parser.set_defaults( minimize = minimize )
+    args = parser.parse_args( argv )
+    if os.path.exists( args.space ):
+        with open( args.space ) as f:
+            space = json.load( f )
+    else:
+        space = json.loads( args.space )
+
+    if args.samples is None:
+        configurations = get_grid_configurations( space )
+    else:
+        configurations = get_random_configurations( space, args.samples, args.seed )
+    # integer budgets stay integers on the command line, e.g. --generations.
+    budgets = [ int( budget ) if float( budget ).is_integer() else budget
+                for budget in get_budgets( args.min_budget, args.max_budget, args.eta ) ]
+
+    with TrialCache( args.cache ) as cache:
+        rungs = successive_halving(
+            trial_function, configurations, budgets, args.budget_option,
+            shlex.split( args.options ), args.eta, args.runs_per_trial, args.seed,
+            args.minimize, cache, args.processes, log=sys.stderr
+        )
+    report = {
+        'seed': args.seed,
+        'options': args.options,
+        'budget_option': args.budget_option,
+        'number_of_configurations': len( configurations ),
+        'best': rungs[ -1 ][ 'configurations' ][0],
+        'rungs': rungs,
+    }
+    if args.output:
+        with open( args.output, 'w' ) as f:
+            json.dump( report, f, indent=1 )
+    else:
+        json.dump( report, sys.stdout, indent=1 )
+        sys.stdout.write( '\n' )
+    return report
@@ -0,0 +1,88 @@
+# Genetic algorithms examples - tests.
+# MIT License.
+
+
+import json
+import os
+import tempfile
+import unittest
+from benchmarks import SkipBenchmark, time_callable, get_predicted_time, \
+    run_benchmarks, save_baseline, load_baseline, get_regressions, main
+
+
+def sum_case( size ):
+    numbers = list( range( size ) )
+    return lambda: sum( numbers )
+
+
+def skipped_case( size ):
+    if size > 10:
+        raise SkipBenchmark()
+    return lambda: None
+
+
+class TestBenchmarks( unittest.TestCase ):
+
+    def test_time_callable( self ):
+        calls = []
+        seconds = time_callable( lambda: calls.append( 1 ), min_time=0.001, repeats=2 )
+        self.assertTrue( seconds > 0.0 )
+        self.assertTrue( len( calls ) > 2 )
+
+
+    def test_get_predicted_time( self ):
+        # quadratic growth measured on the last two sizes.
+        self.assertAlmostEqual(
+            get_predicted_time( [ ( 10, 1.0 ), ( 100, 100.0 ) ], 1000 ), 10000.0
+        )
+        # a single timing is extrapolated linearly.
+        self.assertAlmostEqual( get_predicted_time( [ ( 10, 1.0 ) ], 100 ), 10.0 )
+
+
+    def test_run_benchmarks( self ):
+        results = run_benchmarks(
+            { 'sum': sum_case, 'skipped': skipped_case },
+            [ 100, 10 ],
+            min_time = 0.001,
+            repeats = 1
+        )
+        self.assertEqual( sorted( results[ 'sum' ].keys() ), [ '10', '100' ] )
+        self.assertTrue( results[ 'skipped' ][ '10' ] is not None )
+        self.assertEqual( results[ 'skipped' ][ '100' ], None )
+
+        # over budget: the larger sizes are not even run.
+        results = run_benchmarks(
+            { 'sum': sum_case }, [ 10, 10**9 ], time_budget = 1e-3,
+            min_time = 0.001, repeats = 1
+        )
+        self.assertEqual( results[ 'sum' ][ str( 10**9 ) ], None )
+
+
+    def test_get_regressions( self ):
+        baseline = { 'crossover': { '10': 1e-3, '100': 1e-2, '1000': None } }
+        results = { 'crossover': { '10': 1.2e-3, '100': 3e-2, '1000': 1.0 } }
+        regressions = get_regressions( results, baseline, tolerance = 1.5 )
+        self.assertEqual( len( regressions ), 1 )
+        self.assertEqual( regressions[0][ 'size' ], 100 )
+        self.assertEqual( regressions[0][ 'ratio' ], 3.0 )
+
+
+    def test_baseline_round_trip_and_check( self ):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join( directory, 'baseline.json' )
+            save_baseline( { 'sum': { '10': 1e-9 } }, path )
+            self.assertEqual( load_baseline( path ), { 'sum': { '10': 1e-9 } } )
+            with open( path ) as f:
+                self.assertTrue( 'python' in json.load( f )[ 'metadata' ] )
+
+            # anything is a regression against an impossibly fast baseline.
+            save_baseline( { 'sum': { '100000': 1e-12 } }, path )
+            exit_code = main(
+                { 'sum': sum_case }, [ 100000 ], 'test',
+                [ '--check', path, '--min-time', '0.001', '--repeats', '1' ]
+            )
+            self.assertEqual( exit_code, 1 )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+# Genetic algorithms examples - tests.
+# MIT License.
+
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from checkpoint import save_checkpoint, load_checkpoint, get_rng_state, \
+    set_rng_state, Checkpointer
+
+
+class TestCheckpoint( unittest.TestCase ):
+
+    def setUp( self ):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join( self.directory, 'run.npz' )
+
+    def tearDown( self ):
+        shutil.rmtree( self.directory )
+
+
+    def test_save_and_load( self ):
+        routes = np.arange( 12, dtype='<i4' ).reshape( 3, 4 )
+        save_checkpoint( self.path, { 'routes': routes, 'lengths': np.ones( 3 ) },
+                         { 'generation': 7, 'seed': None } )
+        # the previous checkpoint is replaced, no temporary file left behind.
+        save_checkpoint( self.path, { 'routes': routes[ ::-1 ] }, { 'generation': 8 } )
+        self.assertEqual( os.listdir( self.directory ), [ 'run.npz' ] )
+
+        arrays, metadata = load_checkpoint( self.path )
+        self.assertEqual( metadata, { 'generation': 8 } )
+        self.assertEqual( list( arrays ), [ 'routes' ] )
+        self.assertEqual( arrays[ 'routes' ].tolist(), routes[ ::-1 ].tolist() )
+        self.assertEqual( arrays[ 'routes' ].dtype, np.dtype( '<i4' ) )
+
+
+    def test_failed_save_keeps_the_previous_checkpoint( self ):
+        save_checkpoint( self.path, { 'lengths': np.ones( 3 ) }, { 'generation': 1 } )
+        with self.assertRaises( TypeError ):
+            save_checkpoint( self.path, { 'lengths': np.ones( 3 ) }, { 'rng': object() } )
+        self.assertEqual( os.listdir( self.directory ), [ 'run.npz' ] )
+        self.assertEqual( load_checkpoint( self.path )[1], { 'generation': 1 } )
+
+
+    def test_rng_state( self ):
+        np.random.seed( 1 )
+        random.seed( 1 )
+        rng = np.random.default_rng( 1 )
+        np.random.standard_normal()  # a cached gaussian is part of the state.
+        state = get_rng_state( rng )
+        expected = ( np.random.random( 5 ).tolist(), random.random(), rng.random( 5 ).tolist() )
+
+        # through the JSON metadata of a checkpoint.
+        save_checkpoint( self.path, {}, { 'rng': state } )
+        np.random.seed( 2 )
+        random.seed( 2 )
+        rng = np.random.default_rng( 2 )
+        set_rng_state( load_checkpoint( self.path )[1][ 'rng' ], rng )
+        self.assertEqual(
+            ( np.random.random( 5 ).tolist(), random.random(), rng.random( 5 ).tolist() ),
+            expected
+        )
+
+
+    def test_checkpointer( self ):
+        with Checkpointer( self.path, every = 10 ) as checkpointer:
+            for t in range( 1, 26 ):
+                checkpointer.maybe_save( t, lambda: (
+                    { 'population': np.full( 4, t ) }, { 'generation': t }
+                ) )
+            self.assertEqual( checkpointer.generation, 20 )
+            # the last generation, once.
+            self.assertTrue( checkpointer.maybe_save( 25, lambda: (
+                { 'population': np.full( 4, 25 ) }, { 'generation': 25 }
+            ), force = True ) )
+            self.assertFalse( checkpointer.maybe_save( 25, None, force = True ) )
+        arrays, metadata = load_checkpoint( self.path )
+        self.assertEqual( metadata[ 'generation' ], 25 )
+        self.assertEqual( arrays[ 'population' ].tolist(), [ 25 ] * 4 )
+        self.assertTrue( 1 <= checkpointer.number_of_checkpoints <= 3 )
+
+        # every interval seconds.
+        with Checkpointer( self.path, interval = 0.0 ) as checkpointer:
+            self.assertTrue( checkpointer.is_due( 1 ) )
+        with Checkpointer( self.path ) as checkpointer:
+            self.assertFalse( checkpointer.is_due( 1 ) )
+
+
+    def test_checkpointer_error( self ):
+        checkpointer = Checkpointer( os.path.join( self.directory, 'missing', 'run.npz' ) )
+        checkpointer.save( { 'lengths': np.ones( 3 ) } )
+        with self.assertRaises( OSError ):
+            checkpointer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
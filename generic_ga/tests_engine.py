@@ -0,0 +1,247 @@
+# Genetic algorithms examples - tests.
+# MIT License.
+
+
+import unittest
+import numpy as np
+from engine import Engine, SteadyStateEngine, Problem
+from selection_strategies import get_selection_strategy, SELECTION_STRATEGIES
+from run_controller import RunController
+from instrumentation import Instrumentation
+from fitness_cache import DuplicateFilter
+from benchmarks import time_callable
+
+
+class OneMaxProblem( Problem ):
+
+    # bit strings, the fitness is the number of ones (or of zeros).
+
+    def __init__( self, genome_length = 32, minimize = False ):
+        self.genome_length = genome_length
+        self.minimize = minimize
+        self.number_of_evaluations = 0
+
+    def get_initial_population( self, population_size, rng ):
+        return rng.integers( 0, 2, size=( population_size, self.genome_length ), dtype=np.uint8 )
+
+    def evaluate( self, population ):
+        self.number_of_evaluations += len( population )
+        return population.sum( axis=1 ).astype( float )
+
+    def crossover( self, parents_1, parents_2, rng, out ):
+        mask = rng.random( parents_1.shape ) < 0.5
+        np.copyto( out, parents_2 )
+        np.copyto( out, parents_1, where=mask )
+        return out
+
+    def mutate( self, population, number_of_mutations, rng ):
+        rows = np.arange( len( population ) )
+        for _ in range( number_of_mutations ):
+            positions = rng.integers( 0, self.genome_length, size=len( population ) )
+            population[ rows, positions ] ^= 1
+        return population
+
+    def decode( self, genome ):
+        return ''.join( str( bit ) for bit in genome )
+
+
+class TestEngine( unittest.TestCase ):
+
+    def test_run( self ):
+        problem = OneMaxProblem()
+        engine = Engine( problem, population_size = 20, number_of_elites = 2, rng = 1 )
+        best_fitness, best_individual = engine.run( target_fitness = 32.0 )
+        self.assertEqual( ( best_fitness, best_individual ), ( 32.0, '1' * 32 ) )
+        # children only, the elites are never evaluated again.
+        self.assertEqual( problem.number_of_evaluations, 20 + 18 * engine.generation )
+
+        engine = Engine( OneMaxProblem( minimize = True ), population_size = 20, rng = 1 )
+        self.assertEqual( engine.run( target_fitness = 0.0 ), ( 0.0, '0' * 32 ) )
+        engine = Engine( OneMaxProblem(), population_size = 20, rng = 1 )
+        engine.run( max_generations = 5 )
+        self.assertEqual( engine.generation, 5 )
+
+
+    def test_double_buffering( self ):
+        engine = Engine( OneMaxProblem(), population_size = 10, number_of_elites = 3, rng = 2 )
+        engine.initialize()
+        buffers = { id( engine.population ), id( engine.back_population ) }
+        best_fitnesses = []
+        for _ in range( 10 ):
+            elites = engine.population[ engine.get_fittest_ids( 3 ) ].copy()
+            engine.step()
+            # the elites are the last rows of the new population.
+            self.assertEqual( engine.population[ 7: ].tolist(), elites.tolist() )
+            self.assertEqual( engine.fitnesses.tolist(),
+                              engine.population.sum( axis=1 ).tolist() )
+            best_fitnesses.append( engine.fitnesses.max() )
+        self.assertEqual( { id( engine.population ), id( engine.back_population ) }, buffers )
+        # elitism: the best fitness never decreases.
+        self.assertEqual( best_fitnesses, sorted( best_fitnesses ) )
+
+
+    def test_selection_strategies( self ):
+        for name in SELECTION_STRATEGIES:
+            engine = Engine( OneMaxProblem(), population_size = 50,
+                             selection_strategy = get_selection_strategy( name ), rng = 3 )
+            best_fitness, _ = engine.run( max_generations = 30 )
+            self.assertGreater( best_fitness, 24.0, name )
+
+
+    def test_hooks( self ):
+        engine = Engine( OneMaxProblem(), population_size = 10, rng = 4,
+                         instrumentation = Instrumentation() )
+        generations = []
+        improvements = []
+        engine.add_hook( 'generation', lambda engine: generations.append( engine.generation ) )
+        engine.add_hook( 'improvement', lambda engine: improvements.append( engine.best_fitness ) )
+        engine.run( max_generations = 5 )
+        self.assertEqual( generations, [ 1, 2, 3, 4, 5 ] )
+        self.assertEqual( improvements, sorted( improvements ) )
+        self.assertEqual( improvements[ -1 ], engine.best_fitness )
+        self.assertEqual( engine.instrumentation.generation, 5 )
+        with self.assertRaises( ValueError ):
+            engine.add_hook( 'mutation', print )
+
+
+    def test_controller( self ):
+        controller = RunController( window = 2, max_mutations = 8, restart_after = 3,
+                                    patience = 12 )
+        # one bit: stagnates at once.
+        engine = Engine( OneMaxProblem( 1 ), population_size = 6, rng = 5,
+                         controller = controller )
+        reseeds = []
+        engine.add_hook( 'reseed', lambda engine: reseeds.append( engine.generation ) )
+        self.assertEqual( engine.run(), ( 1.0, '1' ) )
+        self.assertEqual( reseeds, [ 3, 6, 9, 12 ] )
+        self.assertEqual( controller.number_of_restarts, 4 )
+        self.assertTrue( controller.should_stop() )
+
+
+    def test_duplicate_filter( self ):
+        # 3 bits, 8 distinct genomes: most children duplicate a parent.
+        for policy in ( 'reject', 'resample' ):
+            problem = OneMaxProblem( 3 )
+            duplicate_filter = DuplicateFilter( policy )
+            engine = Engine( problem, population_size = 12, number_of_elites = 1, rng = 7,
+                             duplicate_filter = duplicate_filter )
+            for _ in range( 10 ):
+                engine.step()
+                self.assertEqual( len( engine.population ), 12 )
+                self.assertEqual( engine.fitnesses.tolist(),
+                                  engine.population.sum( axis=1 ).tolist() )
+            self.assertGreater( duplicate_filter.number_of_duplicates, 0 )
+            if policy == 'reject':
+                # the rejected children's places go to the next fittest
+                # individuals, which are not evaluated again.
+                self.assertLess( problem.number_of_evaluations, 12 + 11 * 10 )
+
+
+    def test_immigrate( self ):
+        for engine_class in ( Engine, SteadyStateEngine ):
+            engine = engine_class( OneMaxProblem( 16 ), population_size = 10, rng = 8 )
+            engine.initialize()
+            before = sorted( engine.fitnesses.tolist() )
+            engine.immigrate( np.ones( ( 3, 16 ), dtype=np.uint8 ) )
+            # the 3 least fit members are replaced, the immigrants scored.
+            self.assertEqual( sorted( engine.fitnesses.tolist() ), sorted( before[ 3: ] + [ 16.0 ] * 3 ) )
+            self.assertEqual( engine.fitnesses.tolist(), engine.population.sum( axis=1 ).tolist() )
+            self.assertEqual( engine.get_best(), ( 16.0, '1' * 16 ) )
+            self.assertEqual( engine.fitnesses[ engine.get_best_id() ], 16.0 )
+
+
+    def test_state( self ):
+        engine = Engine( OneMaxProblem(), population_size = 10, rng = 6 )
+        engine.run( max_generations = 5 )
+        arrays, metadata = engine.get_state()
+        arrays = { name: array.copy() for name, array in arrays.items() }
+        engine.run( max_generations = 10 )
+
+        resumed = Engine( OneMaxProblem(), population_size = 10 )
+        resumed.set_state( arrays, metadata )
+        resumed.run( max_generations = 10 )
+        self.assertEqual( resumed.population.tolist(), engine.population.tolist() )
+        self.assertEqual( resumed.get_best(), engine.get_best() )
+
+
+class TestSteadyStateEngine( unittest.TestCase ):
+
+    def test_run( self ):
+        problem = OneMaxProblem( 64 )
+        engine = SteadyStateEngine( problem, population_size = 100, number_of_children = 2,
+                                    number_of_mutations = 1, rng = 1 )
+        best_fitnesses = []
+        engine.add_hook( 'generation', lambda engine: best_fitnesses.append(
+            engine.fitnesses.max() ) )
+        self.assertEqual( engine.run( target_fitness = 64.0 ), ( 64.0, '1' * 64 ) )
+        # only the children are evaluated, the survivors never again.
+        self.assertEqual( problem.number_of_evaluations, 100 + 2 * engine.generation )
+        self.assertEqual( engine.fitnesses.tolist(), engine.population.sum( axis=1 ).tolist() )
+        # the best member is never replaced by a worse child.
+        self.assertEqual( best_fitnesses, sorted( best_fitnesses ) )
+
+        engine = SteadyStateEngine( OneMaxProblem( minimize = True ), population_size = 50,
+                                    rng = 1 )
+        self.assertEqual( engine.run( target_fitness = 0.0 ), ( 0.0, '0' * 32 ) )
+
+
+    def test_replacement( self ):
+        engine = SteadyStateEngine( OneMaxProblem(), population_size = 20,
+                                    number_of_children = 4, rng = 2 )
+        engine.initialize()
+        for _ in range( 50 ):
+            before = sorted( engine.fitnesses.tolist() )
+            engine.step()
+            after = sorted( engine.fitnesses.tolist() )
+            # the k-th worst fitness never decreases.
+            self.assertTrue( all( a >= b for a, b in zip( after, before ) ) )
+            self.assertEqual( engine.fitnesses[ engine.get_best_id() ], engine.fitnesses.max() )
+
+
+    def test_selection_strategies( self ):
+        for name in SELECTION_STRATEGIES:
+            engine = SteadyStateEngine( OneMaxProblem(), population_size = 50,
+                                        number_of_children = 10,
+                                        selection_strategy = get_selection_strategy( name ),
+                                        rng = 3 )
+            best_fitness, _ = engine.run( max_generations = 100 )
+            self.assertGreater( best_fitness, 24.0, name )
+
+
+    def test_controller_and_state( self ):
+        controller = RunController( window = 2, restart_after = 3, patience = 9 )
+        engine = SteadyStateEngine( OneMaxProblem( 1 ), population_size = 6, rng = 5,
+                                    controller = controller )
+        reseeds = []
+        engine.add_hook( 'reseed', lambda engine: reseeds.append( engine.generation ) )
+        engine.run()
+        self.assertEqual( reseeds, [ 3, 6, 9 ] )
+
+        engine = SteadyStateEngine( OneMaxProblem(), population_size = 30, rng = 6 )
+        engine.run( max_generations = 20 )
+        arrays, metadata = engine.get_state()
+        arrays = { name: array.copy() for name, array in arrays.items() }
+        engine.run( max_generations = 200 )
+        resumed = SteadyStateEngine( OneMaxProblem(), population_size = 30 )
+        resumed.set_state( arrays, metadata )
+        resumed.run( max_generations = 200 )
+        self.assertEqual( resumed.population.tolist(), engine.population.tolist() )
+        self.assertEqual( resumed.get_best(), engine.get_best() )
+
+
+    def test_step_cost( self ):
+        # tournament parents: a step costs O(log N), it does not grow with
+        # the population as an O(N) scan would (about 1000 times from 1k to
+        # 1M members).
+        step_times = []
+        for population_size in ( 1000, 1000000 ):
+            for minimize in ( False, True ):
+                engine = SteadyStateEngine( OneMaxProblem( 8, minimize ),
+                                            population_size = population_size, rng = 7 )
+                engine.initialize()
+                step_times.append( time_callable( engine.step, min_time = 0.05 ) )
+        self.assertLess( max( step_times[2:] ), 4.0 * max( step_times[:2] ) )
+
+
+if __name__ == '__main__':
+    unittest.main()
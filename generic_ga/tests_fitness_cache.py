@@ -0,0 +1,92 @@
+# Genetic algorithms examples - tests.
+# MIT License.
+
+
+import unittest
+import numpy as np
+from fitness_cache import FitnessCache, CachedEvaluator, DuplicateFilter
+from fitness_evaluators import SerialEvaluator
+
+
+class CountingEvaluator( SerialEvaluator ):
+
+    def __init__( self ):
+        SerialEvaluator.__init__( self, len )
+        self.evaluated = []
+
+    def evaluate( self, population ):
+        self.evaluated.extend( population )
+        return SerialEvaluator.evaluate( self, population )
+
+
+class TestFitnessCache( unittest.TestCase ):
+
+    def test_fitness_cache( self ):
+        cache = FitnessCache( max_entries = 2 )
+        cache.put( 'a', 1.0 )
+        cache.put( 'b', 2.0 )
+        self.assertEqual( cache.get( 'a' ), 1.0 )  # 'b' is now the oldest.
+        cache.put( 'c', 3.0 )
+        self.assertEqual( len( cache ), 2 )
+        self.assertFalse( 'b' in cache )
+        self.assertIsNone( cache.get( 'b' ) )
+        self.assertEqual( ( cache.hits, cache.misses ), ( 1, 1 ) )
+
+
+    def test_cached_evaluator( self ):
+        inner = CountingEvaluator()
+        with CachedEvaluator( inner, max_entries = 10 ) as evaluator:
+            self.assertEqual( evaluator.evaluate( [ 'ab', 'abc', 'ab' ] ), [ 2, 3, 2 ] )
+            self.assertEqual( evaluator.evaluate( [ 'abc', 'abcd' ] ), [ 3, 4 ] )
+            # every individual was scored once.
+            self.assertEqual( inner.evaluated, [ 'ab', 'abc', 'abcd' ] )
+            self.assertEqual( ( evaluator.cache.hits, evaluator.cache.misses ), ( 2, 3 ) )
+
+
+    def test_cached_evaluator_key_function( self ):
+        inner = CountingEvaluator()
+        evaluator = CachedEvaluator( inner, key_function = lambda word: ''.join( sorted( word ) ) )
+        self.assertEqual( evaluator.evaluate( [ 'abc', 'cab', 'bca' ] ), [ 3, 3, 3 ] )
+        self.assertEqual( inner.evaluated, [ 'abc' ] )
+
+        # numpy populations are keyed by their rows' bytes.
+        inner = CountingEvaluator()
+        population = np.array( [ [ 1, 2 ], [ 3, 4 ], [ 1, 2 ] ] )
+        CachedEvaluator( inner ).evaluate( population )
+        self.assertEqual( np.array( inner.evaluated ).tolist(), [ [ 1, 2 ], [ 3, 4 ] ] )
+
+
+    def test_duplicate_filter( self ):
+        children = [ 'a', 'b', 'a', 'p', 'c' ]
+        duplicate_filter = DuplicateFilter( 'reject' )
+        self.assertEqual(
+            duplicate_filter.get_unique_children( children, parents = [ 'p' ] ),
+            [ 'a', 'b', 'c' ]
+        )
+        # at least min_children children are kept.
+        self.assertEqual(
+            duplicate_filter.get_unique_children( [ 'p', 'p', 'p' ], parents = [ 'p' ] ),
+            [ 'p', 'p' ]
+        )
+        self.assertEqual( duplicate_filter.number_of_duplicates, 5 )
+
+        new_children = iter( [ 'a', 'd', 'e' ] )
+        self.assertEqual(
+            DuplicateFilter( 'resample' ).get_unique_children(
+                children, lambda: next( new_children ), parents = [ 'p' ]
+            ),
+            [ 'a', 'b', 'd', 'e', 'c' ]
+        )
+        # resampling gives up after max_attempts.
+        self.assertEqual(
+            DuplicateFilter( 'resample', max_attempts = 3 ).get_unique_children(
+                [ 'a', 'a' ], lambda: 'a'
+            ),
+            [ 'a', 'a' ]
+        )
+        with self.assertRaises( ValueError ):
+            DuplicateFilter( 'keep' )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+# Genetic algorithms examples - tests.
+# MIT License.
+
+
+import unittest
+import numpy as np
+from fitness_evaluators import get_chunks, get_evaluator, SerialEvaluator, \
+    ThreadPoolEvaluator, ProcessPoolEvaluator, VectorizedEvaluator
+
+
+def weighted_sum( individual, weights ):
+    # module level so that the process backend's workers can import it.
+    return float( np.dot( individual, weights ) )
+
+
+class TestFitnessEvaluators( unittest.TestCase ):
+
+    def setUp( self ):
+        rng = np.random.default_rng( 0 )
+        self.population = rng.integers( 0, 100, size=( 103, 7 ) )
+        self.weights = rng.random( 7 )
+        self.expected_scores = [
+            weighted_sum( individual, self.weights ) for individual in self.population
+        ]
+
+
+    def test_get_chunks( self ):
+        self.assertEqual( get_chunks( 10, 3 ), [ (0, 3), (3, 6), (6, 10) ] )
+        self.assertEqual( get_chunks( 2, 4 ), [ (0, 1), (1, 2) ] )
+        self.assertEqual( get_chunks( 0, 4 ), [] )
+
+
+    def test_serial_evaluator( self ):
+        with SerialEvaluator( weighted_sum, { 'weights': self.weights } ) as evaluator:
+            self.assertEqual(
+                evaluator.evaluate( self.population ), self.expected_scores
+            )
+
+
+    def test_vectorized_evaluator( self ):
+        with get_evaluator(
+                'vectorized', np.dot, { 'b': self.weights } ) as evaluator:
+            self.assertTrue( isinstance( evaluator, VectorizedEvaluator ) )
+            self.assertTrue( np.allclose(
+                evaluator.evaluate( self.population ), self.expected_scores
+            ) )
+
+
+    def test_thread_pool_evaluator( self ):
+        with ThreadPoolEvaluator(
+                weighted_sum, { 'weights': self.weights }, 3 ) as evaluator:
+            self.assertEqual(
+                evaluator.evaluate( self.population ), self.expected_scores
+            )
+
+
+    def test_process_pool_evaluator( self ):
+        with ProcessPoolEvaluator(
+                weighted_sum, { 'weights': self.weights }, 2 ) as evaluator:
+            self.assertEqual(
+                evaluator.evaluate( self.population ), self.expected_scores
+            )
+            # smaller and then bigger populations reuse or replace the buffer.
+            self.assertEqual(
+                evaluator.evaluate( self.population[ :5 ] ),
+                self.expected_scores[ :5 ]
+            )
+            bigger_population = np.vstack( [ self.population ] * 3 )
+            self.assertEqual(
+                evaluator.evaluate( bigger_population ), self.expected_scores * 3
+            )
+
+
+    def test_get_evaluator( self ):
+        evaluator = get_evaluator( 'serial', weighted_sum, { 'weights': self.weights } )
+        self.assertTrue( isinstance( evaluator, SerialEvaluator ) )
+        with self.assertRaises( ValueError ) as ctx:
+            get_evaluator( 'gpu', weighted_sum )
+
+
+if __name__ == '__main__':
+    unittest.main()
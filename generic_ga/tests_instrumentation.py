@@ -0,0 +1,92 @@
+# Genetic algorithms examples - tests.
+# MIT License.
+
+
+import json
+import os
+import tempfile
+import unittest
+from instrumentation import Instrumentation, MemoryExporter, \
+    JsonLinesExporter, NULL_PHASE, get_phase
+
+
+class TestInstrumentation( unittest.TestCase ):
+
+    def test_phases_counters_and_gauges( self ):
+        exporter = MemoryExporter()
+        instrumentation = Instrumentation( exporters = [ exporter ] )
+        with instrumentation.phase( 'selection' ):
+            instrumentation.count( 'evaluations', 10 )
+        instrumentation.count( 'evaluations', 5 )
+        instrumentation.gauge( 'dist_memo_size', 42 )
+        record = instrumentation.end_generation()
+
+        self.assertEqual( exporter.records, [ record ] )
+        self.assertEqual( record[ 'generation' ], 0 )
+        self.assertEqual( record[ 'counters' ], { 'evaluations': 15 } )
+        self.assertEqual( record[ 'gauges' ], { 'dist_memo_size': 42 } )
+        self.assertEqual( record[ 'calls' ], { 'selection': 1 } )
+        self.assertTrue( record[ 'phases' ][ 'selection' ] >= 0.0 )
+
+        # everything is reset for the next generation.
+        self.assertEqual( instrumentation.end_generation()[ 'counters' ], {} )
+
+
+    def test_sample_every( self ):
+        exporter = MemoryExporter()
+        instrumentation = Instrumentation( exporters = [ exporter ], sample_every = 3 )
+        for _ in range( 7 ):
+            self.assertEqual(
+                instrumentation.phase( 'selection' ) is NULL_PHASE,
+                not instrumentation.active
+            )
+            instrumentation.count( 'evaluations' )
+            instrumentation.end_generation()
+        self.assertEqual(
+            [ record[ 'generation' ] for record in exporter.records ], [ 0, 3, 6 ]
+        )
+        self.assertIs( get_phase( None, 'selection' ), NULL_PHASE )
+
+
+    def test_operator_sample_every( self ):
+        instrumentation = Instrumentation( operator_sample_every = 4 )
+        timed = 0
+        for _ in range( 10 ):
+            phase = instrumentation.phase( 'crossover' )
+            with phase:
+                pass
+            timed += phase is not NULL_PHASE
+        self.assertEqual( timed, 3 )
+        record = instrumentation.end_generation()
+        self.assertEqual( record[ 'calls' ][ 'crossover' ], 10 )
+
+
+    def test_hooks( self ):
+        events = []
+        instrumentation = Instrumentation()
+        instrumentation.add_hook( 'before_phase', lambda name: events.append( ( 'before', name ) ) )
+        instrumentation.add_hook( 'after_phase', lambda name: events.append( ( 'after', name ) ) )
+        instrumentation.add_hook( 'generation', lambda record: events.append( record[ 'generation' ] ) )
+        with instrumentation.phase( 'mutation' ):
+            pass
+        instrumentation.end_generation()
+        self.assertEqual( events, [ ( 'before', 'mutation' ), ( 'after', 'mutation' ), 0 ] )
+        with self.assertRaises( ValueError ) as ctx:
+            instrumentation.add_hook( 'before_crossover', print )
+
+
+    def test_json_lines_exporter( self ):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join( directory, 'metrics.jsonl' )
+            with Instrumentation( exporters = [ JsonLinesExporter( path ) ] ) as instrumentation:
+                for _ in range( 3 ):
+                    instrumentation.count( 'evaluations', 10 )
+                    instrumentation.end_generation()
+            with open( path ) as f:
+                records = [ json.loads( line ) for line in f ]
+        self.assertEqual( [ record[ 'generation' ] for record in records ], [ 0, 1, 2 ] )
+        self.assertEqual( records[ -1 ][ 'counters' ], { 'evaluations': 10 } )
+
+
+if __name__ == '__main__':
+    unittest.main()
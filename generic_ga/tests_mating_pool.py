@@ -0,0 +1,75 @@
+# Genetic algorithms examples - tests.
+# MIT License.
+
+
+import unittest
+import numpy as np
+from mating_pool import get_parent_pairs, MatingPool
+from selection_strategies import get_selection_strategy
+
+
+class LengthsMatingPool( MatingPool ):
+
+    minimize = True
+    precision = 2
+
+
+class TestMatingPool( unittest.TestCase ):
+
+    def test_maximize( self ):
+        mating_pool = MatingPool( [ 'a', 'b', 'c', 'd' ], [ 0.0, 0.5, 0.25, 0.5 ] )
+        self.assertEqual( mating_pool.get_best_fitness(), 0.5 )
+        self.assertEqual( mating_pool.get_top_k( 3 )[0], [ 'b', 'd', 'c' ] )
+        self.assertEqual( mating_pool.get_elites()[0], [ 'b', 'd' ] )
+        self.assertEqual( sorted( mating_pool.get_two_fittest_individuals() ), [ 'b', 'd' ] )
+        self.assertEqual( mating_pool.to_dict(), { 0.0: [ 'a' ], 0.5: [ 'b', 'd' ], 0.25: [ 'c' ] } )
+        self.assertIs( MatingPool.as_mating_pool( mating_pool ), mating_pool )
+
+
+    def test_minimize_and_precision( self ):
+        mating_pool = LengthsMatingPool( [ 'a', 'b', 'c' ], [ 3.001, 1.004, 1.003 ] )
+        # compared at 2 decimals.
+        self.assertEqual( mating_pool.get_best_fitness(), 1.0 )
+        self.assertEqual( mating_pool.get_elites()[0], [ 'b', 'c' ] )
+        self.assertEqual( mating_pool.get_top_k( 1 )[0], [ 'c' ] )
+        self.assertEqual( mating_pool.to_dict(), { 3.0: [ 'a' ], 1.0: [ 'b', 'c' ] } )
+        # shorter is heavier.
+        weights = mating_pool.get_sampling_weights()
+        self.assertAlmostEqual( weights.sum(), 1.0 )
+        self.assertTrue( weights[0] < weights[1] )
+        pool = LengthsMatingPool.as_mating_pool( { 2.0: [ 'x', 'y' ] } )
+        self.assertIsInstance( pool, LengthsMatingPool )
+        self.assertEqual( pool.fitnesses.tolist(), [ 2.0, 2.0 ] )
+
+
+    def test_extend_and_select_parent_pairs( self ):
+        mating_pool = MatingPool( [ 'a', 'b' ], [ 0.1, 0.2 ] )
+        mating_pool.extend( [ 'c' ], [ 0.9 ] )
+        self.assertEqual( len( mating_pool ), 3 )
+        self.assertEqual( mating_pool.get_top_k( 1 )[0], [ 'c' ] )
+        np.random.seed( 0 )
+        parent_pairs = mating_pool.select_parent_pairs(
+            1000, get_selection_strategy( 'roulette' )
+        )
+        parents = [ parent for parent_pair in parent_pairs for parent in parent_pair ]
+        # fitness-proportional: 'c' is drawn 0.9 / 1.2 of the time.
+        self.assertAlmostEqual( parents.count( 'c' ) / 2000.0, 0.75, delta=0.05 )
+
+
+    def test_get_parent_pairs( self ):
+        mating_pool = MatingPool( [ 'a', 'b', 'c' ], [ 0.1, 0.2, 0.9 ] )
+        parent_pairs, parents, get_parent_pair = get_parent_pairs( mating_pool, 3 )
+        self.assertEqual( sorted( parents ), [ 'b', 'c' ] )
+        self.assertEqual( parent_pairs, [ parents ] * 3 )
+        self.assertEqual( get_parent_pair(), parents )
+
+        parent_pairs, parents, get_parent_pair = get_parent_pairs(
+            mating_pool, 4, get_selection_strategy( 'tournament' )
+        )
+        self.assertEqual( len( parent_pairs ), 4 )
+        self.assertEqual( parents, [ parent for pair in parent_pairs for parent in pair ] )
+        self.assertEqual( len( get_parent_pair() ), 2 )
+
+
+if __name__ == '__main__':
+    unittest.main()
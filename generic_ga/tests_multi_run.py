@@ -0,0 +1,112 @@
+# Genetic algorithms examples - tests.
+# MIT License.
+
+
+import math
+import unittest
+import numpy as np
+from multi_run import CurveRecorder, get_seeds, run_trials, get_time_to_target, \
+    get_percentiles, get_ecdf, get_fitness_over_time, get_summary, \
+    get_mann_whitney_u, compare
+
+
+def run_random_walk( configuration, seed ):
+    # a toy trial: the best of seed-drawn steps, slower for a larger step_size.
+    rng = np.random.default_rng( seed )
+    fitness = 0.0
+    curve = []
+    for generation in range( 1, 101 ):
+        fitness = max( fitness, rng.random() * configuration[ 'step_size' ] * generation )
+        curve.append( ( generation * 0.01, generation, fitness ) )
+    return { 'seed': seed, 'curve': curve, 'best_fitness': fitness,
+             'converged': fitness >= 10.0, 'generations': 100, 'elapsed_time': 1.0 }
+
+
+class TestMultiRun( unittest.TestCase ):
+
+    def test_get_seeds( self ):
+        seeds = get_seeds( 50, seed = 1 )
+        self.assertEqual( seeds, get_seeds( 50, seed = 1 ) )
+        self.assertEqual( len( set( seeds ) ), 50 )
+        self.assertNotEqual( seeds, get_seeds( 50, seed = 2 ) )
+        # more runs, the first seeds unchanged.
+        self.assertEqual( get_seeds( 60, seed = 1 )[ :50 ], seeds )
+
+
+    def test_curve_recorder( self ):
+        recorder = CurveRecorder()
+        for generation, best_fitness in enumerate( [ 0.1, 0.1, 0.3, 0.2, 0.2 ] ):
+            recorder.record( generation, best_fitness, None, None )
+        self.assertEqual( [ point[ 1: ] for point in recorder.curve ],
+                          [ ( 0, 0.1 ), ( 2, 0.3 ), ( 3, 0.2 ) ] )
+        seconds = [ point[0] for point in recorder.curve ]
+        self.assertEqual( seconds, sorted( seconds ) )
+
+
+    def test_time_to_target( self ):
+        result = { 'curve': [ ( 0.5, 1, 10.0 ), ( 1.5, 4, 8.0 ), ( 2.5, 9, 6.0 ) ],
+                   'converged': False, 'generations': 9, 'elapsed_time': 3.0 }
+        self.assertEqual( get_time_to_target( result, 8.0, minimize = True ), ( 4.0, 1.5 ) )
+        self.assertEqual( get_time_to_target( result, 5.0, minimize = True ),
+                          ( math.inf, math.inf ) )
+        self.assertEqual( get_time_to_target( result, 10.0 ), ( 1.0, 0.5 ) )
+        self.assertEqual( get_time_to_target( result ), ( math.inf, math.inf ) )
+        result[ 'converged' ] = True
+        self.assertEqual( get_time_to_target( result ), ( 9.0, 3.0 ) )
+
+
+    def test_percentiles_and_ecdf( self ):
+        values = [ 3.0, 1.0, math.inf, 2.0 ]
+        percentiles = get_percentiles( values )
+        self.assertEqual( ( percentiles[ '5' ], percentiles[ '50' ], percentiles[ '95' ] ),
+                          ( 1.0, 2.0, None ) )
+        # the run off target keeps the ECDF below 1.
+        self.assertEqual( get_ecdf( values ), [ [ 1.0, 0.25 ], [ 2.0, 0.5 ], [ 3.0, 0.75 ] ] )
+
+
+    def test_fitness_over_time( self ):
+        results = [ { 'curve': [ ( 1.0, 1, 5.0 ), ( 2.0, 2, 4.0 ) ] },
+                    { 'curve': [ ( 0.0, 0, 9.0 ), ( 4.0, 5, 3.0 ) ] } ]
+        points = get_fitness_over_time( results, minimize = True, number_of_points = 5 )
+        self.assertEqual( [ point[ 'seconds' ] for point in points ], [ 0.0, 1.0, 2.0, 3.0, 4.0 ] )
+        self.assertEqual( [ point[ 'runs' ] for point in points ], [ 1, 2, 2, 2, 2 ] )
+        self.assertEqual( [ point[ '50' ] for point in points ], [ 9.0, 5.0, 4.0, 4.0, 3.0 ] )
+
+
+    def test_mann_whitney_u( self ):
+        u, p_value = get_mann_whitney_u( [ 1.0, 2.0, 3.0 ], [ 4.0, 5.0, 6.0 ] )
+        self.assertEqual( u, 0.0 )
+        self.assertAlmostEqual( p_value, 0.0809, places=4 )
+        # ties count half, runs off target included.
+        u, p_value = get_mann_whitney_u( [ 1.0, math.inf ], [ 1.0, math.inf ] )
+        self.assertEqual( ( u, p_value ), ( 2.0, 1.0 ) )
+        self.assertEqual( get_mann_whitney_u( [ 2.0 ] * 5, [ 2.0 ] * 5 ), ( 12.5, 1.0 ) )
+
+
+    def test_run_trials_and_compare( self ):
+        configurations = { 'fast': { 'step_size': 1.0 }, 'slow': { 'step_size': 0.2 } }
+        results = run_trials( run_random_walk, configurations, 20, seed = 3,
+                              number_of_processes = 2 )
+        # common random numbers: run i has the same seed in both.
+        self.assertEqual( [ r[ 'seed' ] for r in results[ 'fast' ] ],
+                          [ r[ 'seed' ] for r in results[ 'slow' ] ] )
+        self.assertEqual( results, run_trials( run_random_walk, configurations, 20, seed = 3,
+                                               number_of_processes = 1 ) )
+
+        summary = get_summary( results[ 'fast' ], target = 10.0 )
+        self.assertEqual( summary[ 'runs' ], 20 )
+        self.assertEqual( summary[ 'converged' ], 20 )
+        self.assertEqual( len( summary[ 'seconds_to_target_ecdf' ] ), 20 )
+        self.assertEqual( get_summary( results[ 'slow' ], target = 50.0 )[ 'converged' ], 0 )
+
+        comparison = compare( results[ 'fast' ], results[ 'slow' ], target = 10.0 )
+        self.assertLess( comparison[ 'seconds_to_target' ][ 'p_value' ], 0.001 )
+        self.assertGreater( comparison[ 'seconds_to_target' ][ 'a' ], 0.9 )
+        self.assertGreater( comparison[ 'best_fitness' ][ 'a' ], 0.9 )
+        reversed_comparison = compare( results[ 'slow' ], results[ 'fast' ], target = 10.0 )
+        self.assertAlmostEqual( reversed_comparison[ 'seconds_to_target' ][ 'a' ],
+                                1.0 - comparison[ 'seconds_to_target' ][ 'a' ] )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+# Genetic algorithms examples - tests.
+# MIT License.
+
+
+import unittest
+import numpy as np
+from population_index import PopulationIndex
+
+
+class TestPopulationIndex( unittest.TestCase ):
+
+    def test_updates( self ):
+        rng = np.random.default_rng( 1 )
+        # few distinct keys: plenty of ties, broken by the lower id.
+        keys = rng.integers( 0, 5, size=50 ).astype( float )
+        index = PopulationIndex( keys, max_stale_ratio = 2 )
+        for _ in range( 1000 ):
+            self.assertEqual( index.get_best_id(), int( np.flatnonzero( keys == keys.min() )[0] ) )
+            self.assertEqual( index.get_worst_id(), int( np.flatnonzero( keys == keys.max() )[0] ) )
+            i = int( rng.integers( 50 ) ) if rng.random() < 0.5 else index.get_worst_id()
+            keys[ i ] = rng.integers( 0, 5 )
+            index.update( i, keys[ i ] )
+        self.assertEqual( index.keys, keys.tolist() )
+        # the stale entries are bounded.
+        self.assertLessEqual( len( index._best_heap ), 2 * 50 )
+        # a rebuilt index answers the same.
+        rebuilt = PopulationIndex( index.keys )
+        self.assertEqual( ( rebuilt.get_best_id(), rebuilt.get_worst_id() ),
+                          ( index.get_best_id(), index.get_worst_id() ) )
+
+
+if __name__ == '__main__':
+    unittest.main()
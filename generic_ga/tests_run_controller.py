@@ -0,0 +1,103 @@
+# Genetic algorithms examples - tests.
+# MIT License.
+
+
+import time
+import unittest
+import numpy as np
+from run_controller import RunController
+
+
+class TestRunController( unittest.TestCase ):
+
+    def test_best_so_far( self ):
+        controller = RunController()
+        individual = np.array( [ 1, 2, 3 ] )
+        controller.update( 0.5, individual )
+        individual[0] = 9  # the controller keeps a copy.
+        controller.update( 0.4, np.array( [ 4, 5, 6 ] ) )
+        self.assertEqual( controller.best_fitness, 0.5 )
+        self.assertEqual( controller.best_individual.tolist(), [ 1, 2, 3 ] )
+
+        controller = RunController( minimize = True )
+        for length, route in ( ( 10.0, [ 0, 1 ] ), ( 8.0, [ 1, 0 ] ), ( 9.0, [ 0, 1 ] ) ):
+            controller.update( length, route )
+        self.assertEqual( ( controller.best_fitness, controller.best_individual ),
+                          ( 8.0, [ 1, 0 ] ) )
+
+
+    def test_adaptive_mutation( self ):
+        controller = RunController( window = 5, max_mutations = 8 )
+        controller.update( 0.1 )
+        self.assertEqual( controller.number_of_mutations, 1 )
+        numbers_of_mutations = []
+        for _ in range( 25 ):
+            self.assertIsNone( controller.update( 0.1 ) )
+            numbers_of_mutations.append( controller.number_of_mutations )
+        # doubled every window generations of the plateau, up to 8.
+        self.assertEqual( numbers_of_mutations[ 3:25:5 ], [ 1, 2, 4, 8, 8 ] )
+        self.assertTrue( controller.is_stagnating() )
+        for options in ( { 'window': 0 }, { 'restart_after': 0 } ):
+            with self.assertRaises( ValueError ):
+                RunController( **options )
+        # halved at every improvement.
+        controller.update( 0.2 )
+        self.assertEqual( controller.number_of_mutations, 4 )
+        self.assertFalse( controller.is_stagnating() )
+        controller.update( 0.3 )
+        self.assertEqual( controller.number_of_mutations, 2 )
+
+
+    def test_tolerance( self ):
+        # small improvements add up until they exceed the tolerance.
+        controller = RunController( minimize = True, window = 3, tolerance = 1.0 )
+        for length in ( 100.0, 99.5, 99.2, 99.1 ):
+            controller.update( length )
+        self.assertEqual( controller.stagnant_generations, 3 )
+        self.assertTrue( controller.is_stagnating() )
+        controller.update( 98.9 )
+        self.assertEqual( controller.stagnant_generations, 0 )
+        self.assertEqual( controller.best_fitness, 98.9 )
+
+
+    def test_reseed_and_patience( self ):
+        controller = RunController( window = 2, max_mutations = 4, restart_after = 4,
+                                    patience = 10 )
+        controller.update( 0.1 )
+        actions = [ controller.update( 0.1 ) for _ in range( 8 ) ]
+        self.assertEqual( actions, [ None, None, None, 'reseed' ] * 2 )
+        self.assertEqual( controller.number_of_restarts, 2 )
+        self.assertEqual( controller.number_of_mutations, 1 )
+        self.assertFalse( controller.should_stop() )
+        controller.update( 0.1 )
+        controller.update( 0.1 )
+        self.assertTrue( controller.should_stop() )
+
+
+    def test_time_budget( self ):
+        controller = RunController( time_budget = 0.05 )
+        self.assertFalse( controller.should_stop() )
+        self.assertGreater( controller.get_remaining_time(), 0.0 )
+        time.sleep( 0.06 )
+        self.assertTrue( controller.is_out_of_time() and controller.should_stop() )
+        self.assertEqual( controller.get_remaining_time(), 0.0 )
+        # a resumed run's clock goes on.
+        controller.start( elapsed_time = 0.04 )
+        self.assertGreaterEqual( controller.get_elapsed_time(), 0.04 )
+        self.assertIsNone( RunController().get_remaining_time() )
+
+
+    def test_state( self ):
+        controller = RunController( window = 2, max_mutations = 4 )
+        for score in ( 0.1, 0.2, 0.2, 0.2 ):
+            controller.update( score, np.array( [ 3, 1, 2 ] ) )
+        resumed = RunController( window = 2, max_mutations = 4 )
+        resumed.set_state( controller.get_state() )
+        for c in ( controller, resumed ):
+            c.update( 0.2 )
+        self.assertEqual( resumed.get_state(), controller.get_state() )
+        self.assertEqual( resumed.best_individual, [ 3, 1, 2 ] )
+
+
+if __name__ == '__main__':
+    unittest.main()
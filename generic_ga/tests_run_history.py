@@ -0,0 +1,111 @@
+# Genetic algorithms examples - tests.
+# MIT License.
+
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from run_history import RunHistoryRecorder, RunHistory
+
+
+class TestRunHistory( unittest.TestCase ):
+
+    def setUp( self ):
+        handle, self.path = tempfile.mkstemp( suffix='.gahist' )
+        os.close( handle )
+
+        # 25 generations of a 6-city "route" changed by one swap per generation.
+        rng = np.random.default_rng( 1 )
+        route = np.arange( 6 )
+        self.routes = []
+        self.lengths = []
+        for t in range( 25 ):
+            i, j = rng.choice( 6, 2, replace=False )
+            route = route.copy()
+            route[ [ i, j ] ] = route[ [ j, i ] ]
+            self.routes.append( route )
+            self.lengths.append( rng.random( 10 ) + 10.0 - t * 0.1 )
+
+    def tearDown( self ):
+        os.remove( self.path )
+
+    def record( self, chunk_size = 10 ):
+        with RunHistoryRecorder( self.path, 6, chunk_size = chunk_size,
+                                 metadata = { 'problem': 'test' } ) as recorder:
+            for t, ( route, lengths ) in enumerate( zip( self.routes, self.lengths ) ):
+                recorder.record( t, lengths.min(), route, lengths )
+
+
+    def test_records( self ):
+        self.record()
+        history = RunHistory( self.path )
+        self.assertEqual( history.metadata, { 'problem': 'test' } )
+        self.assertEqual( len( history.chunks ), 3 )
+        self.assertEqual( len( history ), 25 )
+
+        records = history.get_records( 8, 13 )
+        self.assertEqual( records[ 'generation' ].tolist(), [ 8, 9, 10, 11, 12 ] )
+        for record in records:
+            lengths = self.lengths[ record[ 'generation' ] ]
+            self.assertEqual( record[ 'best' ], lengths.min() )
+            self.assertAlmostEqual( record[ 'mean' ], lengths.mean() )
+            self.assertAlmostEqual( record[ 'std' ], lengths.std() )
+            self.assertEqual( record[ 'max' ], lengths.max() )
+        self.assertEqual( len( history.get_records( 100 ) ), 0 )
+
+
+    def test_delta_encoding_and_replay( self ):
+        self.record()
+        history = RunHistory( self.path )
+        records = history.get_records()
+        # key frames at the start of each chunk, swaps change 2 positions.
+        self.assertEqual( records[ 'number_of_changes' ][ [ 0, 10, 20 ] ].tolist(), [ 6, 6, 6 ] )
+        self.assertTrue( ( records[ 'number_of_changes' ][ 1:10 ] == 2 ).all() )
+
+        replayed = list( history.replay( 7, 22 ) )
+        self.assertEqual( [ int( r[ 'generation' ] ) for r, _ in replayed ], list( range( 7, 22 ) ) )
+        for record, route in replayed:
+            self.assertEqual( route.tolist(), self.routes[ record[ 'generation' ] ].tolist() )
+        self.assertEqual( history.get_best_individual( 24 ).tolist(), self.routes[ 24 ].tolist() )
+        with self.assertRaises( KeyError ):
+            history.get_best_individual( 25 )
+
+
+    def test_truncated_chunk_is_ignored( self ):
+        self.record()
+        with open( self.path, 'rb+' ) as f:
+            f.truncate( os.path.getsize( self.path ) - 3 )
+        history = RunHistory( self.path )
+        self.assertEqual( len( history ), 20 )
+
+
+    def test_resume( self ):
+        # checkpoint at generation 12, the run goes on to 17 and is killed,
+        # then resumed from the checkpoint up to 24.
+        recorder = RunHistoryRecorder( self.path, 6, chunk_size = 10 )
+        for t in range( 13 ):
+            recorder.record( t, self.lengths[ t ].min(), self.routes[ t ], self.lengths[ t ] )
+        state = recorder.get_state()
+        self.assertEqual( state[ 'generation' ], 12 )
+        self.assertEqual( state[ 'offset' ], os.path.getsize( self.path ) )
+        for t in range( 13, 18 ):
+            recorder.record( t, self.lengths[ t ].min(), self.routes[ t ], self.lengths[ t ] )
+        recorder.close()
+        self.assertEqual( len( RunHistory( self.path ) ), 18 )
+
+        with RunHistoryRecorder( self.path, 6, chunk_size = 10,
+                                 resume_state = state ) as recorder:
+            self.assertEqual( os.path.getsize( self.path ), state[ 'offset' ] )
+            for t in range( 13, 25 ):
+                recorder.record( t, self.lengths[ t ].min(), self.routes[ t ], self.lengths[ t ] )
+        history = RunHistory( self.path )
+        self.assertEqual( history.get_records()[ 'generation' ].tolist(), list( range( 25 ) ) )
+        for record, route in history.replay():
+            self.assertEqual( route.tolist(), self.routes[ record[ 'generation' ] ].tolist() )
+        with self.assertRaises( ValueError ):
+            RunHistoryRecorder( self.path, 6, resume_state = { 'generation': 99, 'offset': 10**9 } )
+
+
+if __name__ == '__main__':
+    unittest.main()
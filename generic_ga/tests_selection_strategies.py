@@ -0,0 +1,82 @@
+# Genetic algorithms examples - tests.
+# MIT License.
+
+
+import unittest
+import numpy as np
+from selection_strategies import get_selection_strategy, TournamentSelection, \
+    RankSelection, RouletteWheelSelection, StochasticUniversalSampling, TruncationSelection, \
+    SELECTION_STRATEGIES
+
+
+class TestSelectionStrategies( unittest.TestCase ):
+
+    def setUp( self ):
+        self.rng = np.random.default_rng( 0 )
+        # individual i has fitness i + 1.
+        self.fitnesses = np.arange( 1.0, 101.0 )
+
+
+    def test_select_pairs( self ):
+        for name in SELECTION_STRATEGIES:
+            ids_1, ids_2 = get_selection_strategy( name ).select_pairs(
+                self.fitnesses, 50, self.rng
+            )
+            self.assertEqual( ( len( ids_1 ), len( ids_2 ) ), ( 50, 50 ), name )
+            self.assertEqual( get_selection_strategy( name ).name, name )
+            self.assertTrue( ( ids_1 >= 0 ).all() and ( ids_1 < 100 ).all(), name )
+            # numpy's global generator by default.
+            ids_1, ids_2 = get_selection_strategy( name ).select_pairs( self.fitnesses, 3 )
+            self.assertEqual( len( ids_2 ), 3 )
+        with self.assertRaises( ValueError ):
+            get_selection_strategy( 'wheel' )
+
+
+    def test_tournament_selection( self ):
+        ids = TournamentSelection( 2 ).select( self.fitnesses, 100000, self.rng )
+        # P( i wins a 2-tournament ) = ( 2i + 1 ) / N^2.
+        counts = np.bincount( ids, minlength=100 ) / 100000.0
+        self.assertTrue( np.allclose( counts, ( 2 * np.arange( 100 ) + 1 ) / 1e4, atol=0.002 ) )
+        # the whole population in every tournament: always the fittest.
+        ids = TournamentSelection( 1000 ).select( self.fitnesses, 10, self.rng )
+        self.assertEqual( ids.tolist(), [ 99 ] * 10 )
+
+
+    def test_rank_selection( self ):
+        # the probabilities only depend on the ranks.
+        fitnesses = self.fitnesses ** 3
+        ids = RankSelection( 2.0 ).select( fitnesses[ ::-1 ], 100000, self.rng )
+        counts = np.bincount( 99 - ids, minlength=100 ) / 100000.0
+        self.assertTrue( np.allclose( counts, 2 * np.arange( 100 ) / 9900.0, atol=0.002 ) )
+        ids = RankSelection( 1.0 ).select( fitnesses, 100000, self.rng )
+        self.assertTrue( np.allclose( np.bincount( ids ) / 100000.0, 0.01, atol=0.002 ) )
+
+
+    def test_roulette_wheel_selection( self ):
+        ids = RouletteWheelSelection().select( self.fitnesses, 100000, self.rng )
+        counts = np.bincount( ids, minlength=100 ) / 100000.0
+        self.assertTrue( np.allclose( counts, self.fitnesses / 5050.0, atol=0.002 ) )
+        ids = RouletteWheelSelection().select( np.array( [ 0.0, 1.0 ] ), 1000, self.rng )
+        self.assertTrue( ( ids == 0 ).sum() < 5 )
+
+
+    def test_stochastic_universal_sampling( self ):
+        ids = StochasticUniversalSampling().select( self.fitnesses, 5050, self.rng )
+        # expected number of copies: fitness * 5050 / 5050.
+        counts = np.bincount( ids, minlength=100 )
+        self.assertTrue( ( np.abs( counts - self.fitnesses ) <= 1 ).all() )
+        # zero fitnesses still get a (tiny) chance.
+        ids = StochasticUniversalSampling().select( np.zeros( 4 ), 400, self.rng )
+        self.assertEqual( np.bincount( ids ).tolist(), [ 100 ] * 4 )
+
+
+    def test_truncation_selection( self ):
+        ids = TruncationSelection( 0.1 ).select( self.fitnesses, 10000, self.rng )
+        self.assertEqual( sorted( set( ids.tolist() ) ), list( range( 90, 100 ) ) )
+        # at least two candidates.
+        ids = TruncationSelection( 0.001 ).select( self.fitnesses, 1000, self.rng )
+        self.assertEqual( sorted( set( ids.tolist() ) ), [ 98, 99 ] )
+
+
+if __name__ == '__main__':
+    unittest.main()
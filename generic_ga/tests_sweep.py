@@ -0,0 +1,109 @@
+# Genetic algorithms examples - tests.
+# MIT License.
+
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from sweep import get_grid_configurations, get_random_configurations, get_options, \
+    get_budgets, successive_halving, TrialCache
+
+
+def run_parabola( options, seed ):
+    # a toy trial: the fitness grows with the budget and peaks at --x 3.
+    arguments = dict( zip( options[ ::2 ], options[ 1::2 ] ) )
+    x, generations = float( arguments[ '--x' ] ), int( arguments[ '--generations' ] )
+    noise = np.random.default_rng( seed ).random() * 0.01
+    return { 'best_fitness': generations - ( x - 3.0 ) ** 2 + noise,
+             'elapsed_time': 0.0, 'generations': generations, 'converged': False,
+             'curve': [] }
+
+
+def run_nothing( options, seed ):
+    raise AssertionError( 'cached trials are never run again' )
+
+
+class TestSweep( unittest.TestCase ):
+
+    def setUp( self ):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown( self ):
+        shutil.rmtree( self.directory )
+
+
+    def test_configurations( self ):
+        configurations = get_grid_configurations( { 'a': [ 1, 2 ], 'b': [ 'x', 'y', 'z' ] } )
+        self.assertEqual( len( configurations ), 6 )
+        self.assertEqual( configurations[ :2 ], [ { 'a': 1, 'b': 'x' }, { 'a': 1, 'b': 'y' } ] )
+        with self.assertRaises( ValueError ):
+            get_grid_configurations( { 'a': { 'min': 0, 'max': 1 } } )
+
+        space = { 'population-size': { 'min': 10, 'max': 1000, 'log': True, 'integer': True },
+                  'crossover-fraction': { 'min': 0.2, 'max': 0.8 },
+                  'selection': [ 'rank', 'tournament' ] }
+        configurations = get_random_configurations( space, 20, rng = 1 )
+        self.assertEqual( configurations, get_random_configurations( space, 20, rng = 1 ) )
+        self.assertEqual( len( configurations ), 20 )
+        for configuration in configurations:
+            self.assertTrue( 10 <= configuration[ 'population-size' ] <= 1000 )
+            self.assertIsInstance( configuration[ 'population-size' ], int )
+            self.assertTrue( 0.2 <= configuration[ 'crossover-fraction' ] <= 0.8 )
+        # a small space, distinct configurations only.
+        self.assertEqual( len( get_random_configurations( { 'a': [ 1, 2 ] }, 5, rng = 1 ) ), 2 )
+
+
+    def test_get_options( self ):
+        self.assertEqual(
+            get_options( { 'mutations': 2, 'greedy-init': True, 'unique-children': None,
+                           'incremental-fitness': False } ),
+            [ '--mutations', '2', '--greedy-init' ]
+        )
+
+
+    def test_get_budgets( self ):
+        self.assertEqual( get_budgets( 30, 810 ), [ 30, 90, 270, 810 ] )
+        self.assertEqual( get_budgets( 10, 100, eta = 4 ), [ 10, 40, 100 ] )
+        self.assertEqual( get_budgets( 5, 5 ), [ 5 ] )
+
+
+    def test_successive_halving( self ):
+        configurations = get_grid_configurations( { 'x': list( range( 9 ) ) } )
+        path = os.path.join( self.directory, 'sweep.jsonl' )
+        with TrialCache( path ) as cache:
+            rungs = successive_halving(
+                run_parabola, configurations, get_budgets( 10, 90 ), runs_per_trial = 2,
+                seed = 1, cache = cache, number_of_processes = 2
+            )
+        self.assertEqual( [ ( rung[ 'budget' ], len( rung[ 'configurations' ] ) )
+                            for rung in rungs ], [ ( 10, 9 ), ( 30, 3 ), ( 90, 1 ) ] )
+        self.assertEqual( rungs[ -1 ][ 'configurations' ][0][ 'configuration' ], { 'x': 3 } )
+        self.assertEqual( [ c[ 'configuration' ][ 'x' ] for c in rungs[1][ 'configurations' ] ],
+                          [ 3, 2, 4 ] )
+        # 2 seeds x ( 9 + 3 + 1 ) trials.
+        with open( path ) as f:
+            self.assertEqual( len( f.readlines() ), 26 )
+
+        # resumed: every trial comes from the cache, even after a torn line.
+        with open( path, 'a' ) as f:
+            f.write( '{"key": "torn' )
+        with TrialCache( path ) as cache:
+            self.assertEqual( len( cache.results ), 26 )
+            resumed_rungs = successive_halving(
+                run_nothing, configurations, get_budgets( 10, 90 ), runs_per_trial = 2,
+                seed = 1, cache = cache, number_of_processes = 2
+            )
+        self.assertEqual( resumed_rungs, rungs )
+
+        # minimized: the worst configurations of the parabola win.
+        rungs = successive_halving( run_parabola, configurations, [ 10, 30 ], minimize = True,
+                                    number_of_processes = 1 )
+        self.assertEqual( [ c[ 'configuration' ][ 'x' ] for c in rungs[1][ 'configurations' ] ],
+                          [ 8, 7, 0 ] )
+        self.assertLess( rungs[1][ 'configurations' ][0][ 'fitness' ], 30.0 - 24.0 )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,216 @@
+# Genetic algorithms examples - operator benchmarks.
+# MIT License.
+
+# Times the symmetric TSP GA operators for city counts from 10 to 50k. See
+# generic_ga/benchmarks.py for the options, e.g.:
+#
+#     python benchmarks_symmetric_travelling_salesman_ga.py --save-baseline baseline.json
+#     python benchmarks_symmetric_travelling_salesman_ga.py --check baseline.json
+
+
+import os, sys
+import numpy as np
+import symmetric_travelling_salesman_ga as ga
+from symmetric_travelling_salesman_local_search import LocalSearch
+from symmetric_travelling_salesman_spatial import GridIndex, get_greedy_route
+from symmetric_travelling_salesman_distances import OnDemandDistances, \
+    CachedDistances
+from symmetric_travelling_salesman_problem import SymmetricTSPProblem
+
+sys.path.append(
+    os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), '..', 'generic_ga' )
+)
+from benchmarks import main, SkipBenchmark
+from engine import Engine, SteadyStateEngine
+
+
+CITY_COUNTS = [ 10, 100, 1000, 10000, 50000 ]
+POPULATION_SIZE = 10  # as in main_symmetric_travelling_salesman_example.py.
+# a full float64 distance matrix needs 8 * n^2 bytes (200MB at 5k cities).
+MAX_DISTANCE_MATRIX_CITIES = 5000
+
+
+def get_city_dict( number_of_cities ):
+    positions = 20 * np.random.random( ( number_of_cities, 2 ) )
+    return dict( zip( range( number_of_cities ), positions ) )
+
+
+def get_population( number_of_cities ):
+    return [
+        np.array( route ) for route in
+        ga.get_initial_population( POPULATION_SIZE, range( number_of_cities ) )
+    ]
+
+
+def get_dist_matrix( number_of_cities ):
+    if number_of_cities > MAX_DISTANCE_MATRIX_CITIES:
+        raise SkipBenchmark()
+    return ga.get_distance_matrix( get_city_dict( number_of_cities ) )
+
+
+def get_initial_population_case( number_of_cities ):
+    city_ids = list( range( number_of_cities ) )
+    return lambda: ga.get_initial_population( POPULATION_SIZE, city_ids )
+
+
+def get_fitness_score_case( number_of_cities ):
+    # cold dist_memo: every edge goes through np.linalg.norm once.
+    city_dict = get_city_dict( number_of_cities )
+    route = get_population( number_of_cities )[0]
+    return lambda: ga.get_fitness_score( route, {}, city_dict )
+
+
+def get_fitness_score_warm_memo_case( number_of_cities ):
+    city_dict = get_city_dict( number_of_cities )
+    route = get_population( number_of_cities )[0]
+    _, dist_memo = ga.get_fitness_score( route, {}, city_dict )
+    return lambda: ga.get_fitness_score( route, dist_memo, city_dict )
+
+
+def crossover_case( number_of_cities ):
+    routes = get_population( number_of_cities )[ :2 ]
+    return lambda: ga.crossover( routes )
+
+
+def crossover_batch_case( number_of_cities ):
+    # a whole generation of children in one call.
+    routes = np.array( get_population( number_of_cities )[ :2 ] )
+    shape = ( POPULATION_SIZE, number_of_cities )
+    parents_1 = np.broadcast_to( routes[0], shape )
+    parents_2 = np.broadcast_to( routes[1], shape )
+    return lambda: ga.crossover_batch( parents_1, parents_2 )
+
+
+def get_mutated_route_case( number_of_cities ):
+    route = get_population( number_of_cities )[0]
+    return lambda: ga.get_mutated_route( route, 1 )
+
+
+def selection_case( number_of_cities ):
+    city_dict = get_city_dict( number_of_cities )
+    population = get_population( number_of_cities )
+    return lambda: ga.selection( population, {}, city_dict )
+
+
+def reproduction_case( number_of_cities ):
+    population = get_population( number_of_cities )
+    mating_pool = ga.MatingPool( population, np.random.random( POPULATION_SIZE ) )
+    return lambda: ga.reproduction( mating_pool, POPULATION_SIZE )
+
+
+def get_distance_matrix_case( number_of_cities ):
+    get_dist_matrix( number_of_cities )  # skip the sizes that do not fit.
+    city_dict = get_city_dict( number_of_cities )
+    return lambda: ga.get_distance_matrix( city_dict )
+
+
+def get_population_lengths_case( number_of_cities ):
+    dist_matrix = get_dist_matrix( number_of_cities )
+    population = get_population( number_of_cities )
+    return lambda: ga.get_population_lengths( population, dist_matrix )
+
+
+def get_mutated_route_with_length_case( number_of_cities ):
+    dist_matrix = get_dist_matrix( number_of_cities )
+    route = get_population( number_of_cities )[0]
+    length = ga.get_route_length( route, dist_matrix )
+    return lambda: ga.get_mutated_route_with_length( route, length, 1, dist_matrix )
+
+
+def reproduction_with_lengths_case( number_of_cities ):
+    dist_matrix = get_dist_matrix( number_of_cities )
+    population = get_population( number_of_cities )
+    mating_pool = ga.MatingPool(
+        population, ga.get_population_lengths( population, dist_matrix )
+    )
+    return lambda: ga.reproduction_with_lengths(
+        mating_pool, POPULATION_SIZE, dist_matrix
+    )
+
+
+def local_search_improve_case( number_of_cities ):
+    # 2-opt / Or-opt from a random route down to a local optimum.
+    dist_matrix = get_dist_matrix( number_of_cities )
+    route = get_population( number_of_cities )[0]
+    local_search = LocalSearch( dist_matrix )
+    return lambda: local_search.improve( route )
+
+
+def grid_index_neighbour_lists_case( number_of_cities ):
+    # no distance matrix needed, runs at every size.
+    index = GridIndex( 20 * np.random.random( ( number_of_cities, 2 ) ) )
+    return lambda: index.get_neighbour_lists( 8 )
+
+
+def get_greedy_route_case( number_of_cities ):
+    index = GridIndex( 20 * np.random.random( ( number_of_cities, 2 ) ) )
+    neighbours = index.get_neighbour_lists( 8 )
+    return lambda: get_greedy_route( index.positions, neighbours )
+
+
+def on_demand_population_lengths_case( number_of_cities ):
+    # no distance matrix needed, runs at every size.
+    distances = OnDemandDistances( 20 * np.random.random( ( number_of_cities, 2 ) ) )
+    population = get_population( number_of_cities )
+    return lambda: ga.get_population_lengths( population, distances )
+
+
+def cached_population_lengths_case( number_of_cities ):
+    # warm cache, capped at 64MB.
+    distances = CachedDistances(
+        OnDemandDistances( 20 * np.random.random( ( number_of_cities, 2 ) ) )
+    )
+    population = get_population( number_of_cities )
+    ga.get_population_lengths( population, distances )
+    return lambda: ga.get_population_lengths( population, distances )
+
+
+def engine_step_case( number_of_cities ):
+    # one generation of the generic engine (see generic_ga/engine.py), on
+    # distances computed on demand so that it runs at every size.
+    distances = OnDemandDistances( 20 * np.random.random( ( number_of_cities, 2 ) ) )
+    engine = Engine(
+        SymmetricTSPProblem( distances ),
+        population_size = POPULATION_SIZE + 1, number_of_elites = 1
+    )
+    engine.initialize()
+    return engine.step
+
+
+
+def steady_state_engine_step_case( number_of_cities ):
+    # two children of the steady-state engine in a population of 1000.
+    distances = OnDemandDistances( 20 * np.random.random( ( number_of_cities, 2 ) ) )
+    engine = SteadyStateEngine(
+        SymmetricTSPProblem( distances ),
+        population_size = 1000, number_of_children = 2
+    )
+    engine.initialize()
+    return engine.step
+
+
+CASES = {
+    'get_initial_population': get_initial_population_case,
+    'get_fitness_score': get_fitness_score_case,
+    'get_fitness_score.warm_memo': get_fitness_score_warm_memo_case,
+    'crossover': crossover_case,
+    'crossover_batch': crossover_batch_case,
+    'get_mutated_route': get_mutated_route_case,
+    'selection': selection_case,
+    'reproduction': reproduction_case,
+    'get_distance_matrix': get_distance_matrix_case,
+    'get_population_lengths': get_population_lengths_case,
+    'get_mutated_route_with_length': get_mutated_route_with_length_case,
+    'reproduction_with_lengths': reproduction_with_lengths_case,
+    'local_search.improve': local_search_improve_case,
+    'grid_index.get_neighbour_lists': grid_index_neighbour_lists_case,
+    'get_greedy_route': get_greedy_route_case,
+    'get_population_lengths.on_demand': on_demand_population_lengths_case,
+    'get_population_lengths.cached': cached_population_lengths_case,
+    'engine.step': engine_step_case,
+    'steady_state_engine.step': steady_state_engine_step_case,
+}
+
+
+if __name__ == '__main__':
+    sys.exit( main( CASES, CITY_COUNTS, 'symmetric TSP GA operator benchmarks.' ) )
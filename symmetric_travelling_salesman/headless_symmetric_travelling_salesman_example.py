@@ -0,0 +1,476 @@
+# Genetic algorithms examples - headless batch runner.
+# MIT License.
+
+# Runs the symmetric TSP GA without any UI or screenshots, as fast as the CPU
+# allows, and writes a compact JSON summary. matplotlib is never imported here.
+#
+#   e.g.:  python -m headless_symmetric_travelling_salesman_example \
+#              --number-of-cities 200 --generations 5000 --seed 1
+#
+# Memetic mode, 2-opt / Or-opt on the children (or on the elites) within a
+# per-generation time budget:
+#   e.g.:  python -m headless_symmetric_travelling_salesman_example \
+#              --number-of-cities 1000 --generations 100 --memetic offspring
+#
+# A cities file is a plain text file with one "x y" pair per line; the city
+# ids are the line numbers starting from 0.
+#
+# TSPLIB instances, with distances computed on demand (or through a bounded
+# LRU cache) instead of a full n x n matrix:
+#   e.g.:  python -m headless_symmetric_travelling_salesman_example \
+#              --tsplib pla85900.tsp --distances cached --distance-cache-mb 256 \
+#              --generations 1000 --neighbour-mutation 8
+#
+# Checkpoints every 1000 generations or 10 minutes, and resume from the last
+# checkpoint if there is one (e.g. on a preemptible node, run the same command
+# again after a restart); the resumed run continues bit-for-bit as the
+# uninterrupted run would have, except in memetic mode whose local search is
+# time-budgeted:
+#   e.g.:  python -m headless_symmetric_travelling_salesman_example \
+#              --generations 1000000 --checkpoint run.npz \
+#              --checkpoint-every 1000 --checkpoint-interval 600 --resume
+#
+# An answer within 60 seconds, with up to 8 swaps per child during plateaus
+# and half of the population reseeded after 2000 generations without progress
+# (see generic_ga/run_controller.py):
+#   e.g.:  python -m headless_symmetric_travelling_salesman_example \
+#              --number-of-cities 500 --time-budget 60 --max-mutations 8 \
+#              --restart-after 2000
+
+
+import argparse
+import json
+import logging
+import os, sys
+import random
+import time
+import numpy as np
+import symmetric_travelling_salesman_ga as ga
+from symmetric_travelling_salesman_problem import SymmetricTSPProblem
+from symmetric_travelling_salesman_local_search import LocalSearch, \
+    get_neighbour_lists
+from symmetric_travelling_salesman_spatial import GridIndex, get_positions, \
+    get_greedy_route
+from symmetric_travelling_salesman_tsplib import load_tsplib, DISTANCE_MODES
+
+sys.path.append(
+    os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), '..', 'generic_ga' )
+)
+from instrumentation import Instrumentation, JsonLinesExporter
+from run_history import RunHistoryRecorder
+from fitness_cache import DuplicateFilter, DUPLICATE_POLICIES
+from selection_strategies import get_selection_strategy, SELECTION_STRATEGIES
+from checkpoint import Checkpointer, load_checkpoint
+from engine import Engine, SteadyStateEngine
+from run_controller import RunController
+from multi_run import CurveRecorder
+
+
+NUMBER_OF_CITIES = 30
+
+
+def get_random_city_dict( number_of_cities, rng = None ):
+    # same layout as CITY_DICT in the main example; rng: a numpy Generator,
+    # or the global generator.
+    positions = 20 * ( np.random if rng is None else rng ).random( ( number_of_cities, 2 ) )
+    return dict( zip( range( number_of_cities ), positions ) )
+
+
+def load_city_dict( path ):
+    positions = np.loadtxt( path, ndmin=2 )[ :, :2 ]
+    return dict( zip( range( len( positions ) ), positions ) )
+
+
+def run( city_dict, population_size = 10, max_generations = None,
+         target_length = None, seed = None, instrumentation = None,
+         recorder = None, local_search = None, memetic = 'offspring',
+         neighbours = None, initial_routes = None, dist_matrix = None,
+         duplicate_filter = None, selection_strategy = None,
+         checkpointer = None, resume_from = None, controller = None,
+         number_of_mutations = 1, gene_fraction = 0.5, number_of_elites = 1,
+         steady_state = False, number_of_children = 2, tournament_size = 2 ):
+
+    # the generation loop is generic_ga/engine.py's, on a delta-scored
+    # SymmetricTSPProblem: the children's lengths are derived from their
+    # parents' edges. The recorder and the checkpointer are engine hooks.
+    # dist_matrix: any distance provider (e.g. a TSPLIB instance's), city_dict
+    # is then unused and may be None.
+    # checkpointer: a generic_ga/checkpoint.py Checkpointer, resume_from: the
+    # ( arrays, metadata ) of one of its checkpoints.
+    # controller: a generic_ga/run_controller.py RunController (minimize =
+    # True), adapting the number of mutations, reseeding and stopping the run.
+    # number_of_mutations: swaps per child without a controller.
+    # gene_fraction: see symmetric_travelling_salesman_ga.crossover().
+    # number_of_elites: the shortest routes kept from one generation to the
+    # next.
+    # steady_state: a generic_ga/engine.py SteadyStateEngine, each step
+    # breeds number_of_children children (parents: tournaments of
+    # tournament_size routes, or selection_strategy), each replacing the
+    # longest route unless it is longer; number_of_elites is then unused.
+    assert( max_generations is not None or target_length is not None or
+            ( controller is not None and
+              ( controller.time_budget is not None or controller.patience is not None ) ) )
+
+    if dist_matrix is None:
+        dist_matrix = ga.get_distance_matrix( city_dict )
+    problem = SymmetricTSPProblem(
+        dist_matrix, neighbours, gene_fraction, delta_scoring = True,
+        local_search = local_search
+    )
+    if steady_state:
+        engine = SteadyStateEngine(
+            problem, population_size, number_of_children, selection_strategy,
+            tournament_size, number_of_mutations, seed, instrumentation, controller,
+            duplicate_filter, memetic if local_search is not None else None
+        )
+    else:
+        engine = Engine(
+            problem, population_size, number_of_elites, selection_strategy,
+            number_of_mutations, seed, instrumentation, controller, duplicate_filter,
+            memetic if local_search is not None else None
+        )
+
+    start_time = time.perf_counter()
+    previous_elapsed_time = 0.0
+    if resume_from is None:
+        population = problem.get_initial_population( population_size, engine.rng )
+        # e.g. a greedy route seeded into the random population.
+        for i, route in enumerate( initial_routes or [] ):
+            population[ i ] = route
+        engine.initialize( population )
+    else:
+        arrays, metadata = resume_from
+        if metadata[ 'number_of_cities' ] != len( dist_matrix ) or \
+                metadata[ 'population_size' ] != population_size or \
+                metadata.get( 'steady_state', False ) != steady_state:
+            raise ValueError( 'checkpoint of another problem: %s' % metadata )
+        engine.set_state( arrays, metadata )
+        previous_elapsed_time = metadata[ 'elapsed_time' ]
+    if controller is not None:
+        controller.start( previous_elapsed_time )
+
+    def get_checkpoint():
+        arrays, metadata = engine.get_state()
+        arrays[ 'positions' ] = get_positions( city_dict ) if city_dict is not None \
+            else np.zeros( ( 0, 2 ) )
+        metadata.update( {
+            'problem': 'symmetric_travelling_salesman',
+            'seed': seed,
+            'population_size': population_size,
+            'number_of_cities': len( dist_matrix ),
+            'steady_state': steady_state,
+            'elapsed_time': previous_elapsed_time + time.perf_counter() - start_time,
+            # where the --history file is cut back to on resume.
+            'history': recorder.get_state() if recorder is not None else None,
+        } )
+        return arrays, metadata
+
+    if recorder is not None:
+        def record( engine ):
+            best_id = engine.get_best_id()
+            recorder.record( engine.generation, engine.fitnesses[ best_id ],
+                             engine.population[ best_id ], engine.fitnesses )
+        engine.add_hook( 'generation', record )
+    if checkpointer is not None:
+        engine.add_hook( 'generation', lambda engine: checkpointer.maybe_save(
+            engine.generation, get_checkpoint ) )
+
+    shortest_length, shortest_route = engine.run( max_generations, target_length )
+
+    if checkpointer is not None:
+        checkpointer.maybe_save( engine.generation, get_checkpoint, force = True )
+    elapsed_time = previous_elapsed_time + time.perf_counter() - start_time
+    t = engine.generation
+
+    return {
+        'problem': 'symmetric_travelling_salesman',
+        'seed': seed,
+        'population_size': population_size,
+        'number_of_cities': len( dist_matrix ),
+        'memetic': memetic if local_search is not None else None,
+        'unique_children': duplicate_filter.policy if duplicate_filter is not None else None,
+        'selection_strategy': selection_strategy.name if selection_strategy else None,
+        'number_of_elites': number_of_elites,
+        'steady_state': steady_state,
+        'number_of_children': engine.number_of_children,
+        'generations': t,
+        'restarts': controller.number_of_restarts if controller is not None else None,
+        'timed_out': controller is not None and controller.is_out_of_time(),
+        'converged': target_length is not None and shortest_length <= target_length,
+        'best_fitness': shortest_length,
+        'best_individual': shortest_route,
+        'elapsed_time': round( elapsed_time, 6 ),
+        'generations_per_second': round( t / elapsed_time, 3 ) if t else None,
+    }
+
+
+def get_argument_parser():
+    parser = argparse.ArgumentParser( description='headless symmetric TSP GA.' )
+    cities = parser.add_mutually_exclusive_group()
+    cities.add_argument( '--number-of-cities', type=int, default=NUMBER_OF_CITIES,
+                         help='number of randomly placed cities.' )
+    cities.add_argument( '--cities-file', help='text file of "x y" lines.' )
+    cities.add_argument( '--tsplib', help='TSPLIB .tsp file.' )
+    parser.add_argument( '--cities-seed', type=int, default=None,
+                         help='place the random cities from this seed rather '
+                         'than --seed (the same cities for every run).' )
+    parser.add_argument( '--distances', choices=DISTANCE_MODES, default='matrix',
+                         help='distance provider of a TSPLIB instance.' )
+    parser.add_argument( '--distance-cache-mb', type=float, default=64,
+                         help='memory cap of --distances cached.' )
+    parser.add_argument( '--population-size', type=int, default=10 )
+    parser.add_argument( '--mutations', type=int, default=1,
+                         help='swaps per child.' )
+    parser.add_argument( '--crossover-fraction', type=float, default=0.5,
+                         help='share of the child\'s cities from the first parent\'s gene.' )
+    parser.add_argument( '--elites', type=int, default=1, metavar='K',
+                         help='keep the K shortest routes (0: no elitism).' )
+    parser.add_argument( '--steady-state', action='store_true',
+                         help='each step breeds --children children, each replacing '
+                         'the longest route (--elites unused).' )
+    parser.add_argument( '--children', type=int, default=2, metavar='N',
+                         help='children per steady-state step.' )
+    parser.add_argument( '--generations', type=int, default=None,
+                         help='max number of generations.' )
+    parser.add_argument( '--target-length', type=float, default=None,
+                         help='stop once a route this short is found.' )
+    parser.add_argument( '--memetic', choices=( 'offspring', 'elites' ),
+                         help='improve these routes with 2-opt / Or-opt.' )
+    parser.add_argument( '--memetic-budget', type=float, default=0.1,
+                         help='local search seconds per generation.' )
+    parser.add_argument( '--neighbours', type=int, default=8,
+                         help='candidate list size of the local search.' )
+    parser.add_argument( '--neighbour-mutation', type=int, default=None, metavar='K',
+                         help='swap cities with one of their K nearest neighbours.' )
+    parser.add_argument( '--greedy-init', action='store_true',
+                         help='seed the population with a greedy edge route.' )
+    parser.add_argument( '--unique-children', choices=DUPLICATE_POLICIES,
+                         help='reject or breed again the duplicate children '
+                         '(rotated or reversed routes included).' )
+    parser.add_argument( '--selection', choices=sorted( SELECTION_STRATEGIES ),
+                         help='parents of every child (default: the two fittest).' )
+    parser.add_argument( '--tournament-size', type=int, default=2 )
+    parser.add_argument( '--rank-pressure', type=float, default=1.5,
+                         help='1 (uniform) to 2 (linear ranking).' )
+    parser.add_argument( '--truncation-proportion', type=float, default=0.2 )
+    parser.add_argument( '--seed', type=int, default=None )
+    parser.add_argument( '--output', help='JSON summary path (default: stdout).' )
+    parser.add_argument( '--metrics', help='per-generation metrics (JSON lines) path.' )
+    parser.add_argument( '--metrics-every', type=int, default=1,
+                         help='only measure every Nth generation.' )
+    parser.add_argument( '--operator-sample-every', type=int, default=1,
+                         help='only time every Nth crossover/mutation call.' )
+    parser.add_argument( '--log-level', default='WARNING',
+                         choices=( 'DEBUG', 'INFO', 'WARNING', 'ERROR' ) )
+    parser.add_argument( '--history', help='binary run history path, see '
+                         'generic_ga/run_history.py.' )
+    parser.add_argument( '--time-budget', type=float, default=None, metavar='SECONDS',
+                         help='stop with the best-so-far route after SECONDS seconds.' )
+    parser.add_argument( '--stagnation-window', type=int, default=50, metavar='N',
+                         help='no progress over N generations is a plateau.' )
+    parser.add_argument( '--max-mutations', type=int, default=1,
+                         help='raise the swaps per child up to this during plateaus.' )
+    parser.add_argument( '--restart-after', type=int, default=None, metavar='N',
+                         help='reseed the population after N generations without progress.' )
+    parser.add_argument( '--reseed-proportion', type=float, default=0.5,
+                         help='proportion of the population reseeded by a restart.' )
+    parser.add_argument( '--patience', type=int, default=None, metavar='N',
+                         help='stop after N generations without progress.' )
+    parser.add_argument( '--checkpoint', help='checkpoint (.npz) path, see '
+                         'generic_ga/checkpoint.py.' )
+    parser.add_argument( '--checkpoint-every', type=int, default=None, metavar='N',
+                         help='checkpoint every N generations.' )
+    parser.add_argument( '--checkpoint-interval', type=float, default=None,
+                         metavar='SECONDS', help='checkpoint every SECONDS seconds.' )
+    parser.add_argument( '--resume', action='store_true',
+                         help='continue from the checkpoint, if it exists.' )
+    return parser
+
+
+def main( argv = None, recorder = None ):
+    # recorder: e.g. a generic_ga/multi_run.py CurveRecorder, instead of the
+    # --history one.
+    parser = get_argument_parser()
+    args = parser.parse_args( argv )
+    if args.generations is None and args.target_length is None and \
+            args.time_budget is None and args.patience is None:
+        # the GA has no natural exit condition, see the main example.
+        parser.error( 'at least one of --generations, --target-length, '
+                      '--time-budget, --patience is required' )
+    if args.resume and not args.checkpoint:
+        parser.error( '--resume needs --checkpoint' )
+    if args.steady_state and not 0 < args.children < args.population_size:
+        parser.error( '--children must be between 1 and --population-size - 1' )
+    if args.steady_state and args.memetic == 'elites':
+        parser.error( '--steady-state has no elites, use --memetic offspring' )
+
+    logging.basicConfig( level = args.log_level )
+    instrumentation = None
+    if args.metrics:
+        instrumentation = Instrumentation(
+            exporters = [ JsonLinesExporter( args.metrics ) ],
+            sample_every = args.metrics_every,
+            operator_sample_every = args.operator_sample_every
+        )
+
+    # seed the global generators the random cities are placed from; the GA
+    # draws from its engine's generator, seeded with --seed as well.
+    if args.seed is not None:
+        np.random.seed( args.seed )
+        random.seed( args.seed )
+
+    resume_from = None
+    if args.resume and os.path.exists( args.checkpoint ):
+        resume_from = load_checkpoint( args.checkpoint )
+
+    city_dict = None
+    if args.tsplib:
+        instance = load_tsplib( args.tsplib )
+        positions = instance.coordinates
+        dist_matrix = instance.get_distances(
+            args.distances, int( args.distance_cache_mb * 2**20 )
+        )
+    else:
+        if args.cities_file:
+            city_dict = load_city_dict( args.cities_file )
+        elif resume_from is not None:
+            # the random cities of the interrupted run.
+            positions = resume_from[0][ 'positions' ]
+            city_dict = dict( zip( range( len( positions ) ), positions ) )
+        else:
+            city_dict = get_random_city_dict(
+                args.number_of_cities,
+                np.random.default_rng( args.cities_seed )
+                if args.cities_seed is not None else None
+            )
+        positions = get_positions( city_dict )
+        dist_matrix = ga.get_distance_matrix( city_dict )
+
+    # the spatial index answers the nearest cities queries; an explicit
+    # TSPLIB instance has no positions but a full matrix to search instead.
+    def get_neighbours( k ):
+        if positions is None:
+            return get_neighbour_lists( dist_matrix, k )
+        return index.get_neighbour_lists( k )
+
+    index = None
+    if positions is not None and \
+            ( args.memetic or args.neighbour_mutation or args.greedy_init ):
+        index = GridIndex( positions )
+    local_search = None
+    if args.memetic:
+        local_search = LocalSearch(
+            dist_matrix,
+            time_budget = args.memetic_budget,
+            neighbours = get_neighbours( args.neighbours )
+        )
+    neighbours = None
+    if args.neighbour_mutation:
+        neighbours = get_neighbours( args.neighbour_mutation )
+    initial_routes = None
+    if args.greedy_init:
+        if positions is None:
+            parser.error( '--greedy-init needs city coordinates' )
+        initial_routes = [
+            get_greedy_route( index.positions, get_neighbours( 10 ) )
+        ]
+    selection_strategy = None
+    if args.selection:
+        selection_strategy = get_selection_strategy( args.selection, **{
+            'tournament': { 'tournament_size': args.tournament_size },
+            'rank': { 'pressure': args.rank_pressure },
+            'truncation': { 'proportion': args.truncation_proportion },
+        }.get( args.selection, {} ) )
+    duplicate_filter = None
+    if args.unique_children:
+        duplicate_filter = DuplicateFilter(
+            args.unique_children, key_function = ga.get_route_key
+        )
+    if recorder is None and args.history:
+        metadata = {
+            'problem': 'symmetric_travelling_salesman',
+            'seed': args.seed,
+            'population_size': args.population_size,
+        }
+        if positions is not None:
+            metadata[ 'city_positions' ] = np.asarray( positions ).tolist()
+        # a resumed run appends to the history of the interrupted one.
+        recorder = RunHistoryRecorder(
+            args.history, len( dist_matrix ), dtype = '<i4', metadata = metadata,
+            resume_state = resume_from[1].get( 'history' ) if resume_from is not None else None
+        )
+    controller = None
+    if args.time_budget is not None or args.max_mutations > args.mutations or \
+            args.restart_after is not None or args.patience is not None:
+        controller = RunController(
+            minimize = True,
+            window = args.stagnation_window,
+            min_mutations = args.mutations,
+            max_mutations = max( args.max_mutations, args.mutations ),
+            restart_after = args.restart_after,
+            reseed_proportion = args.reseed_proportion,
+            patience = args.patience,
+            time_budget = args.time_budget
+        )
+    checkpointer = None
+    if args.checkpoint:
+        checkpointer = Checkpointer(
+            args.checkpoint, args.checkpoint_every, args.checkpoint_interval
+        )
+
+    summary = run(
+        city_dict,
+        population_size = args.population_size,
+        max_generations = args.generations,
+        target_length = args.target_length,
+        seed = args.seed,
+        instrumentation = instrumentation,
+        recorder = recorder,
+        local_search = local_search,
+        memetic = args.memetic,
+        neighbours = neighbours,
+        initial_routes = initial_routes,
+        dist_matrix = dist_matrix,
+        duplicate_filter = duplicate_filter,
+        selection_strategy = selection_strategy,
+        checkpointer = checkpointer,
+        resume_from = resume_from,
+        controller = controller,
+        number_of_mutations = args.mutations,
+        gene_fraction = args.crossover_fraction,
+        number_of_elites = args.elites,
+        steady_state = args.steady_state,
+        number_of_children = args.children,
+        tournament_size = args.tournament_size
+    )
+    if checkpointer is not None:
+        checkpointer.close()
+        summary[ 'resumed_from_generation' ] = \
+            resume_from[1][ 'generation' ] if resume_from is not None else None
+    if instrumentation is not None:
+        instrumentation.close()
+    if recorder is not None:
+        recorder.close()
+
+    if args.output:
+        with open( args.output, 'w' ) as f:
+            json.dump( summary, f )
+    else:
+        json.dump( summary, sys.stdout )
+        sys.stdout.write( '\n' )
+
+    return summary
+
+
+def run_trial( options, seed ):
+    # one run of the generic_ga/multi_run.py harness: options are this
+    # runner's command line options, without --seed.
+    recorder = CurveRecorder()
+    summary = main( list( options ) + [ '--seed', str( seed ), '--output', os.devnull ],
+                    recorder )
+    summary[ 'curve' ] = recorder.curve
+    return summary
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+# Genetic algorithms examples - main, asynchronous rendering.
+# MIT License.
+
+import os, shutil, sys
+import numpy as np
+import matplotlib.pyplot as plt
+import matplotlib.animation as anim
+import symmetric_travelling_salesman_ga as ga
+import symmetric_travelling_salesman_async as ga_async
+
+
+# Symmetric TSP, same problem as main_symmetric_travelling_salesman_example.py
+# but the GA does not wait for the UI: it runs in its own thread (or process,
+# with the 'process' argument) and publishes best-so-far snapshots. The plots
+# are refreshed at most FRAMES_PER_SECOND times per second from the latest
+# snapshot only, and screenshots are written by a background thread.
+#
+#   e.g.:  python main_symmetric_travelling_salesman_async_example.py process
+
+# NB: This example does not have an exit condition.
+
+
+################################################################################
+
+NUMBER_OF_CITIES = 30
+FRAMES_PER_SECOND = 20
+USE_PROCESS = ( len( sys.argv ) > 1 and sys.argv[1] == 'process' )
+
+cities_x_pos = list( 20 * np.random.random(  NUMBER_OF_CITIES) )
+cities_y_pos = list( 20 * np.random.random(  NUMBER_OF_CITIES) )
+
+# init CITY_DICT, see main_symmetric_travelling_salesman_example.py.
+CITY_DICT = dict(
+    zip(
+        list( np.arange( NUMBER_OF_CITIES ) ),                 # city ids.
+        np.array( list( zip( cities_x_pos, cities_y_pos ) ) )  # city positions.
+    )
+)
+# city positions as an ( NUMBER_OF_CITIES, 2 ) array, indexed by city id.
+POSITIONS = np.array( [ CITY_DICT[ i ] for i in range( NUMBER_OF_CITIES ) ] )
+
+# city-to-city distances computed once, see ga.get_distance_matrix().
+DIST_MATRIX = ga.get_distance_matrix( CITY_DICT )
+
+################################################################################
+
+
+def run( frame ):
+    global curr_shortest_distance
+
+    snapshot = snapshots.get_latest()
+    if snapshot is None:
+        # the GA did not publish anything since the last frame.
+        return line
+
+    # update data top plot.
+    xdata.append( snapshot.generation )
+    ydata.append( snapshot.length )
+    xmin, xmax = ax0.get_xlim()
+
+    # extend horizontal axis.
+    if snapshot.generation >= xmax:
+        ax0.set_xlim( xmin, 2 * snapshot.generation )
+    line[0].set_data( xdata, ydata )
+
+    # update bottom plot, a single NaN-separated polyline.
+    line[1].set_data( *ga_async.get_route_polyline( snapshot.route, POSITIONS ) )
+    annotation.set_text( snapshot.length )
+
+    # add red dot on the minimum length and save picture to disk.
+    if snapshot.length < curr_shortest_distance:
+        print( '•••  %s' % snapshot.length )
+        curr_shortest_distance = snapshot.length
+        ax0.plot( snapshot.generation, snapshot.length, 'ro', markersize=1 )
+        screenshot_writer.submit( snapshot )
+
+    return line
+
+
+# NB: the UI and the GA worker are only started when run as a script, since
+# a GA process may re-import this module (e.g. with the 'spawn' start method).
+if __name__ == '__main__':
+
+    #######  init UI  ##########################################################
+
+    xdata, ydata = [], []
+    fig, (ax0, ax1) = plt.subplots( 2, figsize=( 6, 15 ) )
+    line_0, = ax0.plot( [], [], lw=.5 )
+    line_1, = ax1.plot(
+        [], [], '-', linewidth = .5, color = 'olive', marker = 'o', markersize = 3
+    )
+    annotation = ax1.annotate( '', xy = ( 5, -5 ), color='green' )
+    line = [ line_0, line_1 ]
+
+    # top plot.
+    ax0.set_ylabel( 'shortest length' )
+    ax0.set_xlabel( 'time (steps)' )
+    ax0.set_ylim( 0, 500 )
+    ax0.set_xlim( 0, 100 )
+
+    # bottom plot.
+    ax1.set_yticklabels( [] )
+    ax1.set_xticklabels( [] )
+    ax1.xaxis.set_ticks_position( 'none' )
+    ax1.yaxis.set_ticks_position( 'none' )
+    ax1.set_ylim( -10, 30 )
+    ax1.set_xlim( -10, 30 )
+
+    # add images folder.
+    PATH = os.path.expanduser( '~/Desktop/TSP_screenshots' )
+    if os.path.exists( PATH ):
+        shutil.rmtree( PATH )
+    os.makedirs( PATH )
+
+
+    #######  start GA  #########################################################
+
+    snapshots = ga_async.LatestSnapshotQueue( multiprocess = USE_PROCESS )
+    start_ga = ga_async.start_ga_process if USE_PROCESS else ga_async.start_ga_thread
+    ga_worker, stop_event = start_ga(
+        DIST_MATRIX, snapshots, population_size = 10,
+        publish_interval = 1.0 / FRAMES_PER_SECOND
+    )
+    screenshot_writer = ga_async.ScreenshotWriter( PATH, POSITIONS )
+    curr_shortest_distance = np.inf
+
+    animation = anim.FuncAnimation(
+        fig, run, interval = 1000.0 / FRAMES_PER_SECOND, cache_frame_data = False
+    )
+
+    plt.show()
+
+    # NB: drain the queue so that a GA process can flush its last snapshot.
+    stop_event.set()
+    snapshots.get_latest()
+    ga_worker.join()
+    screenshot_writer.close()
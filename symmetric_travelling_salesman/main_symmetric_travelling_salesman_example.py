@@ -1,11 +1,18 @@
 # Genetic algorithms examples - main.
 # MIT License.
 
-import os, shutil
+import argparse
+import os, sys, shutil
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.animation as anim
 import symmetric_travelling_salesman_ga as ga
+from symmetric_travelling_salesman_problem import SymmetricTSPProblem
+
+sys.path.append(
+    os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), '..', 'generic_ga' )
+)
+from engine import Engine, SteadyStateEngine
 
 
 # Symmetric TSP.
@@ -45,16 +52,34 @@ CITY_DICT = dict(
     )
 )
 
-dist_memo = {}  # use memoization to avoid square roots' repeats.
-
-# init symmetric TSP GA.
+# city-to-city distances computed once, see ga.get_distance_matrix().
+DIST_MATRIX = ga.get_distance_matrix( CITY_DICT )
+
+# --steady-state: each step breeds --children children from tournament-
+# selected routes, each replacing the longest route unless it is longer.
+parser = argparse.ArgumentParser( description='symmetric TSP GA example.' )
+parser.add_argument( '--steady-state', action='store_true',
+                     help='replace the longest routes in place instead of whole generations.' )
+parser.add_argument( '--children', type=int, default=2, metavar='N',
+                     help='children per steady-state step (1 to 10).' )
+ARGS = parser.parse_args()
+if not 0 < ARGS.children < 11:
+    parser.error( '--children must be between 1 and 10' )
+
+# init symmetric TSP GA, on the generic engine (see generic_ga/engine.py): 10
+# children per generation bred from the two fittest routes, plus the fittest
+# route (elitism).
 curr_shortest_distance = 1000
-population = ga.get_initial_population( 10, list(CITY_DICT.keys()) )
-length, dist_memo, mating_pool = ga.selection(
-    population,
-    dist_memo,
-    CITY_DICT
-)
+if ARGS.steady_state:
+    engine = SteadyStateEngine(
+        SymmetricTSPProblem( DIST_MATRIX ), population_size = 11,
+        number_of_children = ARGS.children
+    )
+else:
+    engine = Engine(
+        SymmetricTSPProblem( DIST_MATRIX ), population_size = 11, number_of_elites = 1
+    )
+engine.initialize()
 
 
 #######  init UI  ##############################################################
@@ -111,29 +136,13 @@ def init():
 
 
 def data_gen( t = 0 ):
-    global mating_pool
-    global population
     global curr_shortest_distance
-    global dist_memo
 
     while True:
 
-        # save fittest items. 
-        fittest_items_key = min( mating_pool.keys() )
-        fittest_items_copy = list( mating_pool[ fittest_items_key ] )
-
-        ### GAs step.
-        population = ga.reproduction( mating_pool, 10 );
-        length, dist_memo, mating_pool = ga.selection(
-            population,
-            dist_memo,
-            CITY_DICT
-        )
-
-        ###  GA Elitarism step.
-        if fittest_items_key not in mating_pool:
-            mating_pool[ fittest_items_key ] = []
-        mating_pool[ fittest_items_key ].extend( fittest_items_copy )
+        ### GAs step, elitism included.
+        engine.step()
+        length = round( engine.best_fitness, 6 )
 
         # update curr_shortest_distance.
         if length < curr_shortest_distance:
@@ -142,8 +151,7 @@ def data_gen( t = 0 ):
         t += 1
 
         # generate data for the bottom graph.
-        min_dist_path_id = min( mating_pool.keys() )
-        min_dist_path = list( mating_pool[ min_dist_path_id ][0] )
+        min_dist_path = engine.get_best()[1]
         min_dist_path.append( min_dist_path[0] )  # close the path.
         xpairs = []
         ypairs = []
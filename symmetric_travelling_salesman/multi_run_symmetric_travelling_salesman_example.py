@@ -0,0 +1,25 @@
+# Genetic algorithms examples - multi-run statistics runner.
+# MIT License.
+
+# Independent seeded runs of the headless symmetric TSP GA, their
+# distributions of time to target and their comparison, see
+# generic_ga/multi_run.py. Every run must solve the same instance: a cities
+# file, a TSPLIB instance or --cities-seed.
+#
+#   e.g.:  python multi_run_symmetric_travelling_salesman_example.py --runs 30 \
+#              --seed 1 --target 80 \
+#              --configuration swap "--cities-seed 7 --number-of-cities 50 --generations 20000 --target-length 80" \
+#              --configuration neighbour "--cities-seed 7 --number-of-cities 50 --generations 20000 --target-length 80 --neighbour-mutation 8"
+
+
+import os, sys
+import headless_symmetric_travelling_salesman_example as headless
+
+sys.path.append(
+    os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), '..', 'generic_ga' )
+)
+from multi_run import main
+
+
+if __name__ == '__main__':
+    main( headless.run_trial, 'symmetric TSP GA multi-run statistics.', minimize = True )
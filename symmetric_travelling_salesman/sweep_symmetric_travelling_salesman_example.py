@@ -0,0 +1,24 @@
+# Genetic algorithms examples - hyperparameter sweep runner.
+# MIT License.
+
+# Successive halving over the headless symmetric TSP GA's options, see
+# generic_ga/sweep.py. Every run must solve the same instance: a cities file,
+# a TSPLIB instance or --cities-seed in --options.
+#
+#   e.g.:  python sweep_symmetric_travelling_salesman_example.py --cache sweep.jsonl \
+#              --options "--number-of-cities 100 --cities-seed 7" --seed 1 \
+#              --space '{"population-size": [10, 30, 100], "mutations": [1, 2, 4], "crossover-fraction": [0.3, 0.5, 0.7]}' \
+#              --min-budget 100 --max-budget 2700
+
+
+import os, sys
+import headless_symmetric_travelling_salesman_example as headless
+
+sys.path.append(
+    os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), '..', 'generic_ga' )
+)
+from sweep import main
+
+
+if __name__ == '__main__':
+    main( headless.run_trial, 'symmetric TSP GA hyperparameter sweep.', minimize = True )
@@ -0,0 +1,194 @@
+# Genetic algorithms examples - GA loop decoupled from the rendering.
+# MIT License.
+
+# The GA runs in its own thread (or process) at full speed and publishes
+# best-so-far snapshots to a bounded queue. The renderer only ever takes the
+# latest snapshot, at its own capped frame rate, and screenshots are written
+# by a background thread so that neither drawing nor disk I/O can slow down
+# the optimisation. See main_symmetric_travelling_salesman_async_example.py.
+#
+# NB: matplotlib is only imported by the ScreenshotWriter thread.
+
+
+import os
+import queue
+import threading
+import time
+import multiprocessing
+from collections import namedtuple
+import numpy as np
+import symmetric_travelling_salesman_ga as ga
+
+
+# e.g.: Snapshot( generation=1200, length=94.48, route=array([21, 11, ...]) )
+Snapshot = namedtuple( 'Snapshot', [ 'generation', 'length', 'route' ] )
+
+
+class LatestSnapshotQueue( object ):
+
+    # bounded queue where publishing never blocks the GA: when the queue is
+    # full the oldest snapshot is dropped. Works on top of a queue.Queue (GA
+    # thread) or of a multiprocessing.Queue (GA process).
+
+    def __init__( self, maxsize = 2, multiprocess = False ):
+        if multiprocess:
+            self.queue = multiprocessing.Queue( maxsize )
+        else:
+            self.queue = queue.Queue( maxsize )
+
+    def publish( self, snapshot ):
+        while True:
+            try:
+                self.queue.put_nowait( snapshot )
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get_latest( self ):
+        # drain the queue and return the newest snapshot, or None.
+        latest = None
+        while True:
+            try:
+                latest = self.queue.get_nowait()
+            except queue.Empty:
+                return latest
+
+
+def get_route_polyline( route, positions ):
+
+    # x and y arrays of the closed route as separate segments, each followed
+    # by a NaN so that matplotlib draws them as one artist without joining.
+    #   e.g.: route [0, 2, 1] -> x = [x0, x2, nan, x2, x1, nan, x1, x0, nan]
+    route = np.asarray( route )
+    segments = np.full( ( len( route ), 3, 2 ), np.nan )
+    segments[ :, 0 ] = positions[ route ]
+    segments[ :, 1 ] = positions[ np.roll( route, -1 ) ]
+    segments = segments.reshape( -1, 2 )
+    return segments[ :, 0 ], segments[ :, 1 ]
+
+
+def evolve_and_publish( dist_matrix, snapshots, stop_event,
+                        population_size = 10, max_generations = None,
+                        publish_interval = 0.01, seed = None ):
+
+    # the main example's GA loop (with elitism), publishing a snapshot on
+    # every improvement and at most every publish_interval seconds otherwise
+    # so that the generation counter keeps moving in the UI.
+    if seed is not None:
+        np.random.seed( seed )
+
+    population = ga.get_initial_population( population_size, range( len( dist_matrix ) ) )
+    mating_pool = ga.MatingPool(
+        population, ga.get_population_lengths( population, dist_matrix )
+    )
+    shortest_length = np.inf
+    last_publish_time = 0.0
+
+    t = 0
+    while not stop_event.is_set() and \
+            ( max_generations is None or t < max_generations ):
+
+        # save fittest items.
+        fittest_routes, fittest_lengths = mating_pool.get_elites()
+
+        ### GAs step.
+        population, lengths = ga.reproduction_with_lengths(
+            mating_pool, population_size, dist_matrix
+        )
+        mating_pool = ga.MatingPool( population, lengths )
+
+        ###  GA Elitarism step.
+        mating_pool.extend( fittest_routes, fittest_lengths )
+        t += 1
+
+        length = mating_pool.get_best_fitness()
+        now = time.perf_counter()
+        if length < shortest_length or now - last_publish_time > publish_interval:
+            shortest_length = min( shortest_length, length )
+            route = np.array( mating_pool.get_top_k( 1 )[0][0] )
+            snapshots.publish( Snapshot( t, length, route ) )
+            last_publish_time = now
+
+    return t
+
+
+def start_ga_thread( dist_matrix, snapshots, **kwargs ):
+    stop_event = threading.Event()
+    thread = threading.Thread(
+        target = evolve_and_publish,
+        args = ( dist_matrix, snapshots, stop_event ),
+        kwargs = kwargs,
+        daemon = True
+    )
+    thread.start()
+    return thread, stop_event
+
+
+def start_ga_process( dist_matrix, snapshots, **kwargs ):
+    # the snapshots queue must be a LatestSnapshotQueue( multiprocess=True ).
+    stop_event = multiprocessing.Event()
+    process = multiprocessing.Process(
+        target = evolve_and_publish,
+        args = ( dist_matrix, snapshots, stop_event ),
+        kwargs = kwargs,
+        daemon = True
+    )
+    process.start()
+    return process, stop_event
+
+
+class ScreenshotWriter( object ):
+
+    # writes one PNG per submitted snapshot from a background thread. Each
+    # picture is drawn on its own off-screen Agg figure, never on the UI one.
+    # When the writer falls behind, new snapshots are dropped rather than
+    # queued without bound.
+
+    def __init__( self, path, positions, maxsize = 8, dpi = 150,
+                  limits = ( -10, 30 ) ):
+        self.path = path
+        self.positions = positions
+        self.dpi = dpi
+        self.limits = limits
+        self.number_of_dropped = 0
+        self.queue = queue.Queue( maxsize )
+        self.thread = threading.Thread( target = self._write_loop, daemon = True )
+        self.thread.start()
+
+    def submit( self, snapshot ):
+        try:
+            self.queue.put_nowait( snapshot )
+        except queue.Full:
+            self.number_of_dropped += 1
+
+    def _write_loop( self ):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        while True:
+            snapshot = self.queue.get()
+            if snapshot is None:
+                return
+            figure = Figure( figsize = ( 6, 6 ) )
+            FigureCanvasAgg( figure )
+            ax = figure.add_subplot( 1, 1, 1 )
+            ax.set_xlim( *self.limits )
+            ax.set_ylim( *self.limits )
+            ax.set_xticklabels( [] )
+            ax.set_yticklabels( [] )
+            x, y = get_route_polyline( snapshot.route, self.positions )
+            ax.plot( x, y, '-', linewidth = .5, color = 'olive',
+                     marker = 'o', markersize = 3 )
+            ax.set_title( '%s  (step %s)' % ( snapshot.length, snapshot.generation ) )
+            figure.savefig(
+                os.path.join( self.path, '%s.png' % snapshot.length ),
+                dpi = self.dpi
+            )
+
+    def close( self ):
+        # finish the pending screenshots.
+        self.queue.put( None )
+        self.thread.join()
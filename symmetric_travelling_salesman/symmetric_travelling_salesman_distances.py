@@ -0,0 +1,177 @@
+# Genetic algorithms examples - distance providers.
+# MIT License.
+
+# Bounded-memory replacements for the full distance matrix (n^2 floats) and
+# for the dist_memo dict (which grows towards n^2 / 2 tuple keys). Both
+# providers are indexed like the matrix, so every operator taking a
+# dist_matrix (get_population_lengths(), get_swap_delta(),
+# reproduction_with_lengths(), ...) accepts them unchanged:
+#
+#   distances = OnDemandDistances( coordinates, 'EUC_2D' )
+#   distances[ routes, np.roll( routes, -1, axis=1 ) ]   # computed on demand.
+#   distances = CachedDistances( distances, max_bytes = 256 * 2**20 )
+#
+# OnDemandDistances computes the requested distances, vectorized, from the
+# ( n, 2 ) coordinates array (which can be memory-mapped, see
+# symmetric_travelling_salesman_tsplib.py). CachedDistances keeps the most
+# recently used distances in fixed-size arrays, e.g. for the GEO distances
+# whose trigonometry is worth caching.
+#
+# Edge weight types, as defined by TSPLIB:
+#   'EXACT'    plain euclidean distance, as get_distance_matrix().
+#   'EUC_2D'   euclidean distance rounded to the nearest integer.
+#   'CEIL_2D'  euclidean distance rounded up.
+#   'ATT'      pseudo-euclidean distance (att48, att532).
+#   'GEO'      geographical distance, coordinates given as DDD.MM degrees.
+
+
+import numpy as np
+
+
+def get_exact_distances( a, b ):
+    return np.hypot( a[ ..., 0 ] - b[ ..., 0 ], a[ ..., 1 ] - b[ ..., 1 ] )
+
+
+def get_euc_2d_distances( a, b ):
+    return np.floor( get_exact_distances( a, b ) + 0.5 )
+
+
+def get_ceil_2d_distances( a, b ):
+    return np.ceil( get_exact_distances( a, b ) )
+
+
+def get_att_distances( a, b ):
+    r = np.sqrt( ( ( a - b ) ** 2 ).sum( axis=-1 ) / 10.0 )
+    t = np.floor( r + 0.5 )
+    return np.where( t < r, t + 1.0, t )
+
+
+def get_geo_radians( coordinates ):
+    # DDD.MM (degrees and minutes) to radians, with TSPLIB's value of pi.
+    degrees = np.trunc( coordinates )
+    minutes = coordinates - degrees
+    return 3.141592 * ( degrees + 5.0 * minutes / 3.0 ) / 180.0
+
+
+def get_geo_distances( a, b ):
+    a, b = get_geo_radians( a ), get_geo_radians( b )
+    q1 = np.cos( a[ ..., 1 ] - b[ ..., 1 ] )
+    q2 = np.cos( a[ ..., 0 ] - b[ ..., 0 ] )
+    q3 = np.cos( a[ ..., 0 ] + b[ ..., 0 ] )
+    cosine = np.clip( 0.5 * ( ( 1.0 + q1 ) * q2 - ( 1.0 - q1 ) * q3 ), -1.0, 1.0 )
+    distances = np.trunc( 6378.388 * np.arccos( cosine ) + 1.0 )
+    # a city is at distance 0 from itself.
+    return np.where( ( a == b ).all( axis=-1 ), 0.0, distances )
+
+
+EDGE_WEIGHT_FUNCTIONS = {
+    'EXACT': get_exact_distances,
+    'EUC_2D': get_euc_2d_distances,
+    'CEIL_2D': get_ceil_2d_distances,
+    'ATT': get_att_distances,
+    'GEO': get_geo_distances,
+}
+
+
+class OnDemandDistances( object ):
+
+    def __init__( self, coordinates, edge_weight_type = 'EXACT' ):
+        if edge_weight_type not in EDGE_WEIGHT_FUNCTIONS:
+            raise ValueError( 'unsupported edge weight type: %s' % edge_weight_type )
+        self.coordinates = coordinates
+        self.edge_weight_type = edge_weight_type
+        self.function = EDGE_WEIGHT_FUNCTIONS[ edge_weight_type ]
+
+    def __len__( self ):
+        return len( self.coordinates )
+
+    @property
+    def shape( self ):
+        return ( len( self ), len( self ) )
+
+    def __getitem__( self, key ):
+        # distances[ a, b ] with a and b ints or ( broadcastable ) id arrays.
+        a, b = key
+        return self.function( self.coordinates[ a ], self.coordinates[ b ] )
+
+
+class CachedDistances( object ):
+
+    # fixed-size LRU cache in front of another provider, using
+    # max_bytes of memory whatever the number of cities. The cache is
+    # number_of_ways-way set associative: a city pair (unordered, the problem
+    # is symmetric) can only live in one set, and the least recently used of
+    # the set's entries is evicted on a miss. Lookups and updates are
+    # vectorized over all the requested pairs.
+
+    BYTES_PER_ENTRY = 24  # key, value and last use.
+
+    def __init__( self, provider, max_bytes = 64 * 2**20, number_of_ways = 4 ):
+        self.provider = provider
+        self.number_of_cities = len( provider )
+        self.number_of_ways = number_of_ways
+        self.number_of_sets = max(
+            1, max_bytes // ( self.BYTES_PER_ENTRY * number_of_ways )
+        )
+        shape = ( self.number_of_sets, number_of_ways )
+        self.keys = np.full( shape, -1, dtype=np.int64 )
+        self.values = np.zeros( shape )
+        self.last_uses = np.zeros( shape, dtype=np.int64 )
+        self.tick = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__( self ):
+        return self.number_of_cities
+
+    @property
+    def shape( self ):
+        return ( len( self ), len( self ) )
+
+    @property
+    def nbytes( self ):
+        return self.keys.nbytes + self.values.nbytes + self.last_uses.nbytes
+
+    def _get_sets( self, keys ):
+        # Fibonacci hashing spreads the consecutive pair keys over the sets.
+        hashes = keys.astype( np.uint64 ) * np.uint64( 0x9E3779B97F4A7C15 )
+        return ( hashes >> np.uint64( 16 ) ) % np.uint64( self.number_of_sets )
+
+    def __getitem__( self, key ):
+        a, b = np.broadcast_arrays( *key )
+        a, b = a.ravel().astype( np.int64 ), b.ravel().astype( np.int64 )
+        shape = np.broadcast( *key ).shape
+        self.tick += 1
+
+        keys = np.minimum( a, b ) * self.number_of_cities + np.maximum( a, b )
+        sets = self._get_sets( keys ).astype( np.intp )
+        matches = self.keys[ sets ] == keys[ :, None ]
+        hit = matches.any( axis=1 )
+        ways = matches.argmax( axis=1 )
+
+        distances = np.empty( len( keys ) )
+        distances[ hit ] = self.values[ sets[ hit ], ways[ hit ] ]
+        self.last_uses[ sets[ hit ], ways[ hit ] ] = self.tick
+
+        miss = ~hit
+        number_of_misses = 0
+        if miss.any():
+            # every missed pair is computed once, even if requested many times.
+            missed_keys, firsts, inverse = np.unique(
+                keys[ miss ], return_index=True, return_inverse=True
+            )
+            firsts = np.flatnonzero( miss )[ firsts ]
+            values = self.provider[ a[ firsts ], b[ firsts ] ]
+            distances[ miss ] = values[ inverse.ravel() ]
+            number_of_misses = len( missed_keys )
+
+            # evict the least recently used entry of each missed set.
+            missed_sets = sets[ firsts ]
+            victims = self.last_uses[ missed_sets ].argmin( axis=1 )
+            self.keys[ missed_sets, victims ] = missed_keys
+            self.values[ missed_sets, victims ] = values
+            self.last_uses[ missed_sets, victims ] = self.tick
+
+        self.hits += len( keys ) - number_of_misses
+        self.misses += number_of_misses
+        return distances.reshape( shape ) if shape else distances[0]
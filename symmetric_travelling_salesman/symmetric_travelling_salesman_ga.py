@@ -3,14 +3,27 @@
 
 
 from datetime import datetime
+import hashlib
+import logging
 import numpy as np
+import os, sys
 import random
 import time
 from pprint import pprint as pp
 
+sys.path.append(
+    os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), '..', 'generic_ga' )
+)
+from instrumentation import get_phase
+from mating_pool import get_parent_pairs, MatingPool as BaseMatingPool
+
 
 random.seed( time.time() )
 
+# debug output is off unless logging is set up,
+# e.g.: logging.basicConfig( level=logging.DEBUG ).
+logger = logging.getLogger( __name__ )
+
 
 def get_initial_population( population_size, city_ids ):
     # get population of possible routes.
@@ -48,54 +61,397 @@ def get_fitness_score( route, dist_memo, city_dict ):
     return round(length, 6), dist_memo
 
 
-def crossover( two_fittest_individuals ):
+def get_distance_matrix( city_dict ):
+
+    # full city-to-city distance matrix, built once from city_dict so that the
+    # fitness evaluation becomes a plain array gather instead of a memo lookup.
+    # NB: city ids are expected to be 0, 1, ... n-1 as in CITY_DICT.
+    city_ids = sorted( city_dict.keys() )
+    assert( city_ids == list( range( len( city_ids ) ) ) )
+
+    positions = np.array( [ city_dict[ city_id ] for city_id in city_ids ] )
+    x, y = positions[ :, 0 ], positions[ :, 1 ]
+    return np.hypot( x[ :, None ] - x[ None, : ], y[ :, None ] - y[ None, : ] )
+
+
+def get_population_lengths( routes, dist_matrix ):
+
+    # lengths of all the given routes in one call.
+    # e.g.: routes = [[0, 2, 1], [1, 0, 2]] -> each route's round trip is the
+    #       sum of dist_matrix[ route[i], route[i+1] ] with i+1 wrapping to 0.
+    routes = np.asarray( routes )
+    next_cities = np.roll( routes, -1, axis=1 )
+    lengths = dist_matrix[ routes, next_cities ].sum( axis=1 )
+
+    return np.round( lengths, 6 )
+
+
+def get_route_length( route, dist_matrix ):
+    # unrounded length of a single route, used as the starting point for the
+    # incremental (delta) updates below.
+    route = np.asarray( route )
+    return float( dist_matrix[ route, np.roll( route, -1 ) ].sum() )
+
+
+def get_canonical_route( route ):
+
+    # the same round trip whatever its starting city and direction: rotated so
+    # that it starts from the smallest city id, then reversed if needed so
+    # that its second city id is smaller than its last one.
+    # e.g.: [ 3, 1, 4, 0, 2 ] -> [ 0, 2, 3, 1, 4 ] <- [ 2, 0, 4, 1, 3 ].
+    route = np.asarray( route )
+    route = np.roll( route, -int( route.argmin() ) )
+    if len( route ) > 2 and route[ -1 ] < route[ 1 ]:
+        route = np.concatenate( [ route[ :1 ], route[ :0:-1 ] ] )
+    return route
+
+
+def get_route_key( route ):
+    # fixed-size key of a route, equal for all the routes with the same
+    # canonical route (hence the same length), e.g. for a fitness cache.
+    canonical_route = get_canonical_route( route ).astype( '<i4' )
+    return hashlib.blake2b( canonical_route.tobytes(), digest_size=16 ).digest()
+
+
+def has_index_city_ids( routes ):
+    # True if the routes (one route, or one route per row) are integer arrays
+    # of the city ids 0..n-1, n being the number of cities per route, i.e. the
+    # ids can index a membership mask. O(n).
+    routes = np.asarray( routes )
+    return routes.ndim in ( 1, 2 ) and routes.size > 0 and \
+        np.issubdtype( routes.dtype, np.integer ) and \
+        routes.min() >= 0 and routes.max() < routes.shape[ -1 ]
+
+
+def crossover( two_fittest_individuals, gene_fraction = 0.5 ):
 
     route_1, route_2 = two_fittest_individuals
-    route_1 = list( route_1 )  # copy it since the copy might be altered below.
 
     # This TSP breeding step uses the "ordered crossover" method explained by
     # Lee Jacobson (2012) in: www.theprojectspot.com/tutorial-post/applying-a
     #                 -genetic-algorithm-to-the-travelling-salesman-problem/5
+    # NB: O(n) with the city ids 0..n-1 (as CITY_DICT's, see
+    #     get_distance_matrix()), which index a membership mask. Any other
+    #     hashable ids go through a set instead, still O(n) but per city.
+    # gene_fraction: the share of the child's cities taken from route_1's gene
+    # (half in the tutorial).
 
     len_route_1 = len( route_1 )
 
     ### route_1's gene is a contiguous sublist of route_1.
-    route_1_gene_length = int( len_route_1 / 2 )
+    route_1_gene_length = int( len_route_1 * gene_fraction )
     route_1_gene_start  = np.random.randint( len_route_1 )
     route_1_gene_end    = route_1_gene_start + route_1_gene_length
-    # double up route_1 to avoid the gene being at the two extremes of the list.
-    if route_1_gene_end > len_route_1:
-        route_1.extend( route_1 )
-    # extract route_1's gene.
-    route_1_gene = route_1[ route_1_gene_start : route_1_gene_end ]
-
-    ### route_2's gene is a contiguous sublist of route_2.
-    route_2_gene = list( route_2 )  # initially set it as a copy of route_2 and
-    # then remove cities in route_2_gene that are already in route_1_gene.
-    # The deletion of specific ids will preserve the route_2's items order.
-    for city_id in route_1_gene:
-        del route_2_gene[ route_2_gene.index( city_id ) ]
+    gene_positions      = range( route_1_gene_start, route_1_gene_end )
+
+    if not ( np.ndim( route_1 ) == 1 and has_index_city_ids( route_1 ) and
+             has_index_city_ids( route_2 ) ):
+        # the gene wraps around when it goes past the end of route_1.
+        route_1_gene = [ route_1[ i % len_route_1 ] for i in gene_positions ]
+        in_route_1_gene = set( route_1_gene )
+        route_2_gene = [ city_id for city_id in route_2 if city_id not in in_route_1_gene ]
+        child_route = route_1_gene + route_2_gene
+        assert( len( child_route ) == len( route_2 ) )
+        return np.array( child_route )
+
+    route_1 = np.asarray( route_1 )
+    route_2 = np.asarray( route_2 )
+    # the gene wraps around when it goes past the end of route_1.
+    route_1_gene = route_1.take( gene_positions, mode='wrap' )
+
+    ### route_2's gene is route_2 without the cities already in route_1_gene.
+    # Filtering with a boolean mask preserves route_2's items order.
+    in_route_1_gene = np.zeros( len_route_1, dtype=bool )
+    in_route_1_gene[ route_1_gene ] = True
+    route_2_gene = route_2[ ~in_route_1_gene[ route_2 ] ]
 
     ### child_route.
-    child_route = route_1_gene + route_2_gene
+    child_route = np.concatenate( [ route_1_gene, route_2_gene ] )
     assert( len( child_route ) == len( route_2 ) )
 
-    return np.array( child_route )
-
+    return child_route
+
+
+def get_crossover_children( parents_1, parents_2, gene_starts, gene_length ):
+    # ( children, kept ): crossover_batch()'s children and, in parents_2's
+    # order, which of parents_2's cities follow the gene in the children.
+    number_of_children, len_route = parents_1.shape
+    gene_positions = ( gene_starts[ :, None ] + np.arange( gene_length ) ) % len_route
+    genes = np.take_along_axis( parents_1, gene_positions, axis=1 )
+
+    rows = np.arange( number_of_children )[ :, None ]
+    in_genes = np.zeros( ( number_of_children, len_route ), dtype=bool )
+    in_genes[ rows, genes ] = True
+    kept = ~in_genes[ rows, parents_2 ]
+    # every row keeps exactly len_route - gene_length cities, in order.
+    others = parents_2[ kept ].reshape( number_of_children, len_route - gene_length )
+    return np.concatenate( [ genes, others ], axis=1 ), kept
+
+
+def crossover_batch( parents_1, parents_2, gene_starts = None, gene_fraction = 0.5 ):
+
+    # vectorized crossover(): one child per row of the ( number_of_children,
+    # number_of_cities ) parents arrays, e.g. np.tile( route, ( 10, 1 ) ).
+    # Given the same gene starts the children are the same as crossover()'s.
+    # NB: the city ids must be 0..n-1, they index the membership masks.
+    parents_1 = np.atleast_2d( parents_1 )
+    parents_2 = np.atleast_2d( parents_2 )
+    if not ( has_index_city_ids( parents_1 ) and has_index_city_ids( parents_2 ) ):
+        raise ValueError( 'crossover_batch() needs the city ids 0..n-1' )
+    number_of_children, len_route = parents_1.shape
+    if gene_starts is None:
+        gene_starts = np.random.randint( len_route, size=number_of_children )
+    return get_crossover_children(
+        parents_1, parents_2, gene_starts, int( len_route * gene_fraction )
+    )[0]
+
+
+def get_route_edges( routes, dist_matrix ):
+    # edge lengths of the routes (one route, or one route per row): edge i
+    # goes from route[ i ] to route[ i + 1 ], the last one back to route[ 0 ].
+    # Their sum is the route's exact length, as get_route_length().
+    routes = np.asarray( routes )
+    return dist_matrix[ routes, np.roll( routes, -1, axis=-1 ) ]
+
+
+def crossover_batch_with_edges( parents_1, parents_2, edges_1, edges_2, dist_matrix,
+                                number_of_children = None, gene_starts = None,
+                                gene_fraction = 0.5 ):
+
+    # ( children, children's edges ), the children being crossover_batch()'s.
+    # The parents (and their edges, see get_route_edges()) are either one
+    # route each, shared by all the children, or one route per child.
+    # A child's edges are copied from its parents' rather than looked up in
+    # dist_matrix: the gene's inner edges are edges_1's, and an edge between
+    # two cities that are consecutive in parents_2 is edges_2's. Only the
+    # edges joining the gene and the rest of the child, and the edges
+    # jumping over the gene's cities in parents_2, are looked up: a few per
+    # child once the population has converged, instead of one per city.
+    # The children's lengths are their edges' sums, exactly as a rescore.
+    if not ( has_index_city_ids( parents_1 ) and has_index_city_ids( parents_2 ) ):
+        raise ValueError( 'crossover_batch_with_edges() needs the city ids 0..n-1' )
+    len_route = np.shape( parents_1 )[ -1 ]
+    if number_of_children is None:
+        number_of_children = len( gene_starts ) if gene_starts is not None \
+            else len( parents_1 )
+    shape = ( number_of_children, len_route )
+    parents_1, parents_2, edges_1, edges_2 = [
+        np.broadcast_to( array, shape )
+        for array in ( parents_1, parents_2, edges_1, edges_2 )
+    ]
+    if gene_starts is None:
+        gene_starts = np.random.randint( len_route, size=number_of_children )
+    gene_length = int( len_route * gene_fraction )
+    children, kept = get_crossover_children( parents_1, parents_2, gene_starts, gene_length )
+
+    children_edges = np.empty( shape )
+    if gene_length > 1:
+        gene_positions = ( gene_starts[ :, None ] + np.arange( gene_length - 1 ) ) % len_route
+        children_edges[ :, :gene_length - 1 ] = np.take_along_axis(
+            edges_1, gene_positions, axis=1
+        )
+    if len_route - gene_length > 1:
+        # positions in parents_2 of the cities after the gene.
+        kept_positions = np.nonzero( kept )[1].reshape( number_of_children, -1 )
+        edges = np.take_along_axis( edges_2, kept_positions[ :, :-1 ], axis=1 )
+        jumps = kept_positions[ :, 1: ] != kept_positions[ :, :-1 ] + 1
+        if jumps.any():
+            others = children[ :, gene_length: ]
+            edges[ jumps ] = dist_matrix[ others[ :, :-1 ][ jumps ], others[ :, 1: ][ jumps ] ]
+        children_edges[ :, gene_length:len_route - 1 ] = edges
+    # the gene's last city to the next one, and the way back to the start.
+    for i in sorted( { gene_length - 1, len_route - 1 } - { -1 } ):
+        children_edges[ :, i ] = dist_matrix[ children[ :, i ], children[ :, ( i + 1 ) % len_route ] ]
+    return children, children_edges
+
+
+def get_route_positions( routes ):
+
+    # the inverse permutation(s): routes[ ..., positions[ ..., c ] ] == c, for
+    # one route or a ( number_of_routes, n ) batch.
+    routes = np.asarray( routes )
+    positions = np.empty_like( routes )
+    np.put_along_axis(
+        positions, routes, np.broadcast_to( np.arange( routes.shape[ -1 ] ), routes.shape ),
+        axis=-1
+    )
+    return positions
+
+
+def get_neighbour_swap_positions( route, neighbours, route_positions ):
+
+    # neighbour-restricted swap: a random city's successor is swapped with one
+    # of the city's nearest neighbours (see GridIndex.get_neighbour_lists()),
+    # so the two neighbours end up next to each other in the route. The
+    # neighbour's place is read from route_positions (get_route_positions()).
+    list_id_0 = np.random.randint( len( route ) )
+    neighbour = neighbours[ route[ list_id_0 ], np.random.randint( neighbours.shape[1] ) ]
+    return ( list_id_0 + 1 ) % len( route ), int( route_positions[ neighbour ] )
+
+
+def get_swap_positions( route, neighbours = None, route_positions = None ):
+    if neighbours is None:
+        return np.random.choice( range( len(route) ), 2 )
+    if route_positions is None:
+        route_positions = get_route_positions( route )
+    return get_neighbour_swap_positions( route, neighbours, route_positions )
+
+
+def swap_cities( route, list_id_0, list_id_1, route_positions = None ):
+    # swap the cities at list_id_0 and list_id_1, and their positions.
+    city_0 = route[ list_id_0 ]
+    city_1 = route[ list_id_1 ]
+    route[ list_id_0 ] = city_1
+    route[ list_id_1 ] = city_0
+    if route_positions is not None:
+        route_positions[ city_1 ] = list_id_0
+        route_positions[ city_0 ] = list_id_1
+
+
+def get_mutated_route( route, number_of_mutations, neighbours = None,
+                       route_positions = None ):
+
+    # route_positions: the route's get_route_positions(), kept up to date by
+    # the swaps; computed once here if neighbour lists are given without it.
+    if neighbours is not None and route_positions is None:
+        route_positions = get_route_positions( route )
+    for _ in range( number_of_mutations ):
+        # swap two random cities in the given route (or a city's successor
+        # and one of its neighbours, when neighbour lists are given).
+        list_id_0, list_id_1 = get_swap_positions( route, neighbours, route_positions )
+        swap_cities( route, list_id_0, list_id_1, route_positions )
+    return route
 
-def get_mutated_route( route, number_of_mutations ):
 
+def get_swap_delta( route, list_id_0, list_id_1, dist_matrix ):
+
+    # change in the route's length caused by swapping the cities at list_id_0
+    # and list_id_1. Only the (up to) four edges touching those two positions
+    # change, so this is O(1) whatever the number of cities.
+    # NB: the edges are identified by their starting position and deduplicated
+    #     so that adjacent positions (and the wrap-around edge) are handled.
+    n = len( route )
+    if list_id_0 == list_id_1:
+        return 0.0
+    edge_starts = {
+        ( list_id_0 - 1 ) % n, list_id_0, ( list_id_1 - 1 ) % n, list_id_1
+    }
+
+    def get_city( list_id ):
+        if list_id == list_id_0:
+            return route[ list_id_1 ]
+        if list_id == list_id_1:
+            return route[ list_id_0 ]
+        return route[ list_id ]
+
+    delta = 0.0
+    for i in edge_starts:
+        j = ( i + 1 ) % n
+        delta -= dist_matrix[ route[ i ], route[ j ] ]
+        delta += dist_matrix[ get_city( i ), get_city( j ) ]
+    return delta
+
+
+def get_mutated_route_with_length( route, length, number_of_mutations,
+                                   dist_matrix, neighbours = None,
+                                   route_positions = None ):
+
+    # same as get_mutated_route() but the route's length is kept up to date
+    # with get_swap_delta() instead of being recomputed from scratch.
+    if neighbours is not None and route_positions is None:
+        route_positions = get_route_positions( route )
     for _ in range( number_of_mutations ):
-        # swap two random cities in the given route.
-        list_id_0, list_id_1 = np.random.choice( range( len(route) ), 2 )
-        city_0 = route[ list_id_0 ]
-        city_1 = route[ list_id_1 ]
-        route[ list_id_0 ] = city_1
-        route[ list_id_1 ] = city_0
-    return route
+        list_id_0, list_id_1 = get_swap_positions( route, neighbours, route_positions )
+        length += get_swap_delta( route, list_id_0, list_id_1, dist_matrix )
+        swap_cities( route, list_id_0, list_id_1, route_positions )
+    return route, length
+
+
+def crossover_with_length( two_fittest_individuals, dist_matrix, gene_fraction = 0.5,
+                           parent_edges = None ):
+    # ordered crossover plus the child's exact length, built from the
+    # parents' edges (see crossover_batch_with_edges()). parent_edges: the
+    # two parents' get_route_edges(), which are looked up if not given (as
+    # many lookups as a rescore, only worth it when the parents breed again).
+    route_1, route_2 = two_fittest_individuals
+    if parent_edges is None:
+        parent_edges = ( get_route_edges( route_1, dist_matrix ),
+                         get_route_edges( route_2, dist_matrix ) )
+    children, children_edges = crossover_batch_with_edges(
+        route_1, route_2, parent_edges[0], parent_edges[1], dist_matrix,
+        number_of_children = 1, gene_fraction = gene_fraction
+    )
+    return children[0], float( children_edges[0].sum() )
+
+
+class MatingPool( BaseMatingPool ):
+
+    # generic_ga/mating_pool.py's pool of route lengths: shorter routes are
+    # fitter, and the lengths are keyed at 6 decimals as the dict pool's.
+    #
+    #   e.g.:  individuals     = [ r0, r1, r2 ]
+    #          fitnesses       = [ 74.07, 67.96, 74.07 ]
+
+    minimize = True
+    precision = 6
+
+
+def get_reseeded_mating_pool( mating_pool, proportion, dist_matrix ):
+    # partial restart: the longest routes, proportion of the pool but never
+    # the shortest route, are replaced with random routes.
+    mating_pool = as_mating_pool( mating_pool )
+    number_of_new_routes = min(
+        len( mating_pool ) - 1, int( round( proportion * len( mating_pool ) ) )
+    )
+    kept_ids = mating_pool.get_top_k_ids( len( mating_pool ) - number_of_new_routes )
+    routes = mating_pool.get_individuals( kept_ids )
+    lengths = mating_pool.fitnesses[ kept_ids ]
+    if number_of_new_routes > 0:
+        new_routes = get_initial_population(
+            number_of_new_routes, range( len( dist_matrix ) )
+        )
+        routes.extend( new_routes )
+        lengths = np.concatenate(
+            [ lengths, get_population_lengths( new_routes, dist_matrix ) ]
+        )
+    return MatingPool( routes, lengths )
+
+
+def as_mating_pool( mating_pool ):
+    # accept both the array-backed pool and the historical dict pool.
+    return MatingPool.as_mating_pool( mating_pool )
 
 
-def selection( population, dist_memo, city_dict ):
+def get_mating_pool( population, lengths ):
+
+    # build mating pool with (rounded) lengths as keys from already known
+    # lengths, i.e. without rescoring any route.
+    mating_pool = {}
+    for length, route in zip( lengths, population ):
+        length = round( length, 6 )
+        if length not in mating_pool:
+            mating_pool[ length ] = []
+        mating_pool[ length ].append( route )
+
+    return round( lengths[ -1 ], 6 ), mating_pool
+
+
+def selection( population, dist_memo, city_dict, evaluator = None,
+               instrumentation = None ):
+
+    if instrumentation is not None:
+        instrumentation.count( 'evaluations', len( population ) )
+
+    # the scoring can be delegated to an evaluator (e.g. a process pool one,
+    # see generic_ga/fitness_evaluators.py) that returns the route lengths in
+    # the population's order. dist_memo is then left untouched.
+    if evaluator is not None:
+        length, mating_pool = get_mating_pool(
+            population, evaluator.evaluate( population )
+        )
+        return length, dist_memo, mating_pool
+
+    dist_memo_size = len( dist_memo )
 
     # build mating pool with fitness scores as keys.
     mating_pool = {}
@@ -105,47 +461,158 @@ def selection( population, dist_memo, city_dict ):
             mating_pool[ length ] = []
         mating_pool[ length ].append( route )
 
+    if instrumentation is not None:
+        # every route has len( route ) edges, the memo grew by one per miss.
+        number_of_edges = sum( len( route ) for route in population )
+        dist_memo_misses = len( dist_memo ) - dist_memo_size
+        instrumentation.count( 'dist_memo_misses', dist_memo_misses )
+        instrumentation.count( 'dist_memo_hits', number_of_edges - dist_memo_misses )
+        instrumentation.gauge( 'dist_memo_size', len( dist_memo ) )
+
     return length, dist_memo, mating_pool
 
 
+def selection_with_distance_matrix( population, dist_matrix ):
+
+    # same as selection() but all the routes are scored in one batched call.
+    lengths = get_population_lengths( population, dist_matrix ).tolist()
+    return get_mating_pool( population, lengths )
+
+
 def get_two_fittest_individuals( mating_pool ):
 
     # get the two fittest individuals.
     # Two individuals were chosen here to maximise genetic diversity although
     # more than 2 individuals could be used.
+    # NB: thin wrapper, mating_pool can be a MatingPool or a dict pool.
     #
-    two_fittest_individuals = []
-    list_associated_to_the_min_key = \
-        mating_pool.pop( min( mating_pool.keys() ) )
-    if len( list_associated_to_the_min_key ) > 1:
-        # get the two fittest individuals.
-        two_fittest_individuals = random.sample(
-            list_associated_to_the_min_key,
-            2
-        )
-    else:
-        # keep the single fittest individual.
-        two_fittest_individuals.append( list_associated_to_the_min_key[ 0 ] )
-        # and get the second fittest individual.
-        list_associated_to_the_second_min_key = \
-            mating_pool.pop( min( mating_pool.keys() ) )
-        two_fittest_individuals.append(
-            random.sample( list_associated_to_the_second_min_key, 1 )[0]
+    return as_mating_pool( mating_pool ).get_two_fittest_individuals()
+
+
+def reproduction( mating_pool, length_new_population, instrumentation = None,
+                  neighbours = None, duplicate_filter = None,
+                  selection_strategy = None, number_of_mutations = 1,
+                  gene_fraction = 0.5 ):
+
+    # duplicate_filter (e.g. generic_ga/fitness_cache.py's DuplicateFilter)
+    # rejects or breeds again the children identical to a parent or to an
+    # earlier child, so they are never evaluated.
+    # number_of_mutations: swaps per child, e.g. raised by
+    # generic_ga/run_controller.py during a plateau.
+    # gene_fraction: see crossover().
+    parent_pairs, parents, get_parent_pair = get_parent_pairs(
+        as_mating_pool( mating_pool ), length_new_population, selection_strategy
+    )
+
+    def breed( parent_pair ):
+        with get_phase( instrumentation, 'crossover' ):
+            child_route = crossover( parent_pair, gene_fraction )
+        with get_phase( instrumentation, 'mutation' ):
+            return get_mutated_route( child_route, number_of_mutations, neighbours )
+
+    # mating.
+    #
+    new_population = []
+    for parent_pair in parent_pairs:
+        new_population.append( breed( parent_pair ) )
+
+    if duplicate_filter is not None:
+        new_population = duplicate_filter.get_unique_children(
+            new_population, lambda: breed( get_parent_pair() ), parents,
+            instrumentation
         )
-    return two_fittest_individuals
 
+    return new_population
 
-def reproduction( mating_pool, length_new_population ):
 
-    two_fittest_individuals = get_two_fittest_individuals( mating_pool )
+def reproduction_with_lengths( mating_pool, length_new_population,
+                               dist_matrix, instrumentation = None,
+                               local_search = None, neighbours = None,
+                               duplicate_filter = None, selection_strategy = None,
+                               number_of_mutations = 1, gene_fraction = 0.5 ):
+
+    # same as reproduction() but every child comes with its exact length, so
+    # get_mating_pool() can replace a full selection() rescore. The children
+    # are bred with one crossover_batch_with_edges() call: their lengths are
+    # built from their parents' edges, which are looked up once per distinct
+    # parent (the two fittest routes by default), then the swaps update them
+    # by their O(1) deltas.
+    # Memetic mode: the children are then improved by local_search (e.g. 2-opt,
+    # see symmetric_travelling_salesman_local_search.py) within its time budget.
+    parent_pairs, parents, get_parent_pair = get_parent_pairs(
+        as_mating_pool( mating_pool ), length_new_population, selection_strategy
+    )
+    # the parents' edges, by parent route object.
+    parent_edges = {}
+
+    def get_edges( route ):
+        if id( route ) not in parent_edges:
+            parent_edges[ id( route ) ] = get_route_edges( route, dist_matrix )
+        return parent_edges[ id( route ) ]
 
     # mating.
     #
-    new_population = []
-    for i in range( length_new_population ):
+    with get_phase( instrumentation, 'crossover' ):
+        if selection_strategy is None:
+            route_1, route_2 = parents
+            parents_1, parents_2 = np.asarray( route_1 ), np.asarray( route_2 )
+            edges_1, edges_2 = get_edges( route_1 ), get_edges( route_2 )
+        else:
+            parents_1 = np.array( [ parent_pair[0] for parent_pair in parent_pairs ] )
+            parents_2 = np.array( [ parent_pair[1] for parent_pair in parent_pairs ] )
+            edges_1 = np.array( [ get_edges( parent_pair[0] ) for parent_pair in parent_pairs ] )
+            edges_2 = np.array( [ get_edges( parent_pair[1] ) for parent_pair in parent_pairs ] )
+        children, children_edges = crossover_batch_with_edges(
+            parents_1, parents_2, edges_1, edges_2, dist_matrix,
+            number_of_children = length_new_population, gene_fraction = gene_fraction
+        )
+        # exact (unrounded) lengths, as get_route_length().
+        children_lengths = children_edges.sum( axis=1 )
+    # the neighbour-restricted swaps find the cities' places in one inverse
+    # permutation per child, computed for the whole batch.
+    children_positions = [ None ] * len( children ) if neighbours is None \
+        else get_route_positions( children )
 
-        child_route = crossover( two_fittest_individuals )
-        child_route = get_mutated_route( child_route, 1 )
+    new_population = []
+    new_lengths = []
+    for child_route, child_length, child_positions in zip(
+            children, children_lengths, children_positions ):
+
+        with get_phase( instrumentation, 'mutation' ):
+            child_route, child_length = get_mutated_route_with_length(
+                child_route, child_length, number_of_mutations, dist_matrix,
+                neighbours, child_positions
+            )
         new_population.append( child_route )
+        new_lengths.append( child_length )
+
+    if duplicate_filter is not None:
+        # the kept children are the same objects, their lengths are looked up
+        # by identity; the resampled ones come with their own length.
+        lengths = { id( route ): length for route, length in zip( new_population, new_lengths ) }
+
+        def breed():
+            parent_pair = get_parent_pair()
+            child_route, child_length = crossover_with_length(
+                parent_pair, dist_matrix, gene_fraction,
+                [ get_edges( route ) for route in parent_pair ]
+            )
+            child_route, child_length = get_mutated_route_with_length(
+                child_route, child_length, number_of_mutations, dist_matrix,
+                neighbours
+            )
+            lengths[ id( child_route ) ] = child_length
+            return child_route
 
-    return new_population
+        new_population = duplicate_filter.get_unique_children(
+            new_population, breed, parents, instrumentation
+        )
+        new_lengths = [ lengths[ id( route ) ] for route in new_population ]
+
+    if local_search is not None:
+        with get_phase( instrumentation, 'local_search' ):
+            new_population, new_lengths = local_search.improve_population(
+                new_population, new_lengths
+            )
+
+    return new_population, new_lengths
@@ -0,0 +1,407 @@
+# Genetic algorithms examples - island model.
+# MIT License.
+
+# K independent populations ("islands") evolve in worker processes, each on
+# its own generic_ga/engine.py Engine (the headless runner's delta-scored
+# SymmetricTSPProblem, selection strategy, elites, ...). Every M generations
+# (an epoch) the coordinator collects each island's best routes and migrates
+# them to the neighbouring islands, where they replace the worst routes.
+#
+#   e.g.:  python -m symmetric_travelling_salesman_islands \
+#              --number-of-cities 200 --islands 8 --epochs 50 --seed 1
+#
+# The islands stay resident in their workers for the whole run: the city
+# positions are sent once per worker, which builds its own distance matrix,
+# and an epoch only exchanges the commands, each island's statistics and the
+# migrants, never the populations.
+#
+# Topologies:
+#   'ring'             island i sends its migrants to island i+1.
+#   'fully_connected'  island i sends its migrants to every other island.
+#
+# Checkpoints (--checkpoint run.npz): each island saves its engine's state to
+# run.island<i>.npz at the end of every epoch, and --resume continues from
+# them bit-for-bit; likewise --history run.gahist records island i's
+# generations in run.island<i>.gahist (see generic_ga/run_history.py).
+
+
+import argparse
+import json
+import multiprocessing
+import os, sys
+import time
+import traceback
+import numpy as np
+import symmetric_travelling_salesman_ga as ga
+from symmetric_travelling_salesman_problem import SymmetricTSPProblem
+from symmetric_travelling_salesman_spatial import get_positions
+from headless_symmetric_travelling_salesman_example import \
+    get_random_city_dict, load_city_dict
+
+sys.path.append(
+    os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), '..', 'generic_ga' )
+)
+from engine import Engine
+from selection_strategies import get_selection_strategy, SELECTION_STRATEGIES
+from checkpoint import save_checkpoint, load_checkpoint
+from run_history import RunHistoryRecorder
+
+
+TOPOLOGIES = ( 'ring', 'fully_connected' )
+
+
+def get_migration_targets( island_id, number_of_islands, topology ):
+    if number_of_islands < 2:
+        return []
+    if topology == 'ring':
+        return [ ( island_id + 1 ) % number_of_islands ]
+    if topology == 'fully_connected':
+        return [ i for i in range( number_of_islands ) if i != island_id ]
+    raise ValueError( 'unknown topology: %s' % topology )
+
+
+def get_arrivals( migrants, population_size, topology ):
+
+    # migrants: every island's ( routes, lengths ), best first. Returns every
+    # island's arriving routes, best first, never more than half of the
+    # island. The migrants are all picked before any island is changed, so
+    # that the result does not depend on the islands' order.
+    incoming = [ [] for _ in migrants ]
+    for island_id in range( len( migrants ) ):
+        for target_id in get_migration_targets( island_id, len( migrants ), topology ):
+            incoming[ target_id ].extend( zip( *migrants[ island_id ] ) )
+    return [
+        [ route for route, _ in
+          sorted( arrivals, key=lambda arrival: arrival[1] )[ :population_size // 2 ] ]
+        for arrivals in incoming
+    ]
+
+
+def get_island_path( path, island_id ):
+    # run.npz -> run.island3.npz
+    root, extension = os.path.splitext( path )
+    return '%s.island%d%s' % ( root, island_id, extension )
+
+
+class Island( object ):
+
+    # one island: an Engine, its epoch, its checkpoint and run history files.
+    # positions: the ( n, 2 ) city positions. options: population_size,
+    # number_of_elites, selection (a selection strategy name or None),
+    # tournament_size, number_of_mutations and gene_fraction.
+
+    def __init__( self, island_id, positions, dist_matrix, options, seed,
+                  checkpoint = None, history = None, resume = False ):
+        self.island_id = island_id
+        self.positions = positions
+        self.population_size = options[ 'population_size' ]
+        selection_strategy = None
+        if options[ 'selection' ]:
+            selection_strategy = get_selection_strategy( options[ 'selection' ], **(
+                { 'tournament_size': options[ 'tournament_size' ] }
+                if options[ 'selection' ] == 'tournament' else {}
+            ) )
+        self.engine = Engine(
+            SymmetricTSPProblem( dist_matrix, gene_fraction = options[ 'gene_fraction' ],
+                                 delta_scoring = True ),
+            self.population_size, options[ 'number_of_elites' ], selection_strategy,
+            options[ 'number_of_mutations' ], seed
+        )
+        self.checkpoint = get_island_path( checkpoint, island_id ) if checkpoint else None
+        self.epoch = 0
+        resume_state = None
+        if resume and self.checkpoint and os.path.exists( self.checkpoint ):
+            arrays, metadata = load_checkpoint( self.checkpoint )
+            if metadata[ 'population_size' ] != self.population_size or \
+                    not np.array_equal( arrays[ 'positions' ], positions ):
+                raise ValueError( 'checkpoint of another problem: %s' % metadata )
+            self.engine.set_state( arrays, metadata )
+            self.epoch = metadata[ 'epoch' ]
+            resume_state = metadata[ 'history' ]
+        else:
+            self.engine.initialize()
+
+        self.recorder = None
+        if history:
+            self.recorder = RunHistoryRecorder(
+                get_island_path( history, island_id ), len( dist_matrix ), dtype = '<i4',
+                metadata = { 'problem': 'symmetric_travelling_salesman', 'island': island_id },
+                resume_state = resume_state
+            )
+            self.engine.add_hook( 'generation', self.record )
+
+    def record( self, engine ):
+        best_id = engine.get_best_id()
+        self.recorder.record( engine.generation, engine.fitnesses[ best_id ],
+                              engine.population[ best_id ], engine.fitnesses )
+
+    def evolve( self, arrivals, number_of_generations ):
+        # one epoch: the arriving routes replace the worst ones, then
+        # number_of_generations generations.
+        if arrivals:
+            self.engine.immigrate( arrivals )
+        self.engine.run( max_generations = self.engine.generation + number_of_generations )
+        self.epoch += 1
+        if self.checkpoint:
+            arrays, metadata = self.engine.get_state()
+            arrays[ 'positions' ] = self.positions
+            metadata.update( {
+                'problem': 'symmetric_travelling_salesman',
+                'island': self.island_id,
+                'epoch': self.epoch,
+                'population_size': self.population_size,
+                'number_of_cities': self.engine.population.shape[1],
+                'history': self.recorder.get_state() if self.recorder is not None else None,
+            } )
+            save_checkpoint( self.checkpoint, arrays, metadata )
+
+    def get_report( self, number_of_migrants ):
+        # ( epoch, statistics, ( migrant routes, their lengths ) ), the
+        # migrants being the island's best routes.
+        fitnesses = self.engine.fitnesses
+        fittest_ids = self.engine.get_fittest_ids( max( 1, number_of_migrants ) )
+        statistics = {
+            'best': round( float( fitnesses[ fittest_ids[0] ] ), 6 ),
+            'mean': round( float( fitnesses.mean() ), 6 ),
+            'worst': round( float( fitnesses.max() ), 6 ),
+        }
+        migrant_ids = fittest_ids[ :number_of_migrants ]
+        return self.epoch, statistics, \
+            ( self.engine.population[ migrant_ids ], fitnesses[ migrant_ids ] )
+
+    def close( self ):
+        if self.recorder is not None:
+            self.recorder.close()
+
+
+def island_worker( island_ids, positions, options, seeds, number_of_migrants,
+                   commands, reports, checkpoint = None, history = None, resume = False ):
+
+    # a worker process hosting the islands island_ids until the 'stop'
+    # command. Commands: ( 'evolve', { island_id: arrivals },
+    # number_of_generations ) and ( 'stop', ). Every island reports
+    # ( island_id, epoch, statistics, migrants ) once started and after every
+    # epoch, ( island_id, best length, best route ) when stopped; an error is
+    # reported as ( None, traceback ).
+    islands = []
+    try:
+        dist_matrix = ga.get_distance_matrix( dict( enumerate( positions ) ) )
+        for island_id, seed in zip( island_ids, seeds ):
+            islands.append( Island( island_id, positions, dist_matrix, options, seed,
+                                    checkpoint, history, resume ) )
+        for island in islands:
+            reports.put( ( island.island_id, ) + island.get_report( number_of_migrants ) )
+        while True:
+            command = commands.get()
+            if command[0] == 'stop':
+                for island in islands:
+                    reports.put( ( island.island_id, ) + island.engine.get_best() )
+                return
+            _, arrivals, number_of_generations = command
+            for island in islands:
+                island.evolve( arrivals.get( island.island_id ), number_of_generations )
+                reports.put( ( island.island_id, ) + island.get_report( number_of_migrants ) )
+    except Exception:
+        reports.put( ( None, traceback.format_exc() ) )
+    finally:
+        for island in islands:
+            island.close()
+
+
+def get_reports( reports, number_of_islands ):
+    # one report per island, by island id.
+    by_island = [ None ] * number_of_islands
+    for _ in range( number_of_islands ):
+        report = reports.get()
+        if report[0] is None:
+            raise RuntimeError( 'island worker failed:\n%s' % report[1] )
+        by_island[ report[0] ] = report[ 1: ]
+    return by_island
+
+
+def run_islands( city_dict, number_of_islands = 4, population_size = 10,
+                 number_of_epochs = 10, generations_per_epoch = 50,
+                 number_of_migrants = 1, topology = 'ring',
+                 number_of_processes = None, seed = None, number_of_elites = 1,
+                 selection = None, tournament_size = 2, number_of_mutations = 1,
+                 gene_fraction = 0.5, checkpoint = None, history = None,
+                 resume = False ):
+
+    # number_of_processes: the worker processes, each hosting every
+    # number_of_processes-th island (default: one per island).
+    # selection: a selection strategy name (see
+    # generic_ga/selection_strategies.py), or the two fittest routes.
+    # checkpoint, history: the paths the islands' files are named after,
+    # see get_island_path().
+    if topology not in TOPOLOGIES:
+        raise ValueError( 'unknown topology: %s' % topology )
+    if selection is not None and selection not in SELECTION_STRATEGIES:
+        raise ValueError( 'unknown selection strategy: %s' % selection )
+
+    positions = get_positions( city_dict )
+    # one independent seed per island.
+    seeds = np.random.SeedSequence( seed ).generate_state( number_of_islands ).tolist()
+    options = {
+        'population_size': population_size,
+        'number_of_elites': number_of_elites,
+        'selection': selection,
+        'tournament_size': tournament_size,
+        'number_of_mutations': number_of_mutations,
+        'gene_fraction': gene_fraction,
+    }
+    number_of_processes = min( number_of_processes or number_of_islands, number_of_islands )
+
+    start_time = time.perf_counter()
+    reports = multiprocessing.Queue()
+    workers = []
+    for worker_id in range( number_of_processes ):
+        island_ids = list( range( worker_id, number_of_islands, number_of_processes ) )
+        commands = multiprocessing.Queue()
+        process = multiprocessing.Process(
+            target = island_worker,
+            args = ( island_ids, positions, options, [ seeds[ i ] for i in island_ids ],
+                     number_of_migrants, commands, reports, checkpoint, history, resume ),
+            daemon = True
+        )
+        process.start()
+        workers.append( ( island_ids, commands, process ) )
+
+    island_statistics = []
+    try:
+        island_reports = get_reports( reports, number_of_islands )
+        epochs = set( epoch for epoch, _, _ in island_reports )
+        if len( epochs ) > 1:
+            raise ValueError( 'island checkpoints of different epochs: %s' % sorted( epochs ) )
+        first_epoch = epochs.pop()
+
+        for epoch in range( first_epoch, number_of_epochs ):
+            arrivals = [ None ] * number_of_islands
+            if epoch > 0:
+                arrivals = get_arrivals(
+                    [ migrants for _, _, migrants in island_reports ], population_size, topology
+                )
+            for island_ids, commands, _ in workers:
+                commands.put( ( 'evolve', { i: arrivals[ i ] for i in island_ids },
+                                generations_per_epoch ) )
+            island_reports = get_reports( reports, number_of_islands )
+            island_statistics.append( [ statistics for _, statistics, _ in island_reports ] )
+
+        for _, commands, _ in workers:
+            commands.put( ( 'stop', ) )
+        bests = get_reports( reports, number_of_islands )
+    except BaseException:
+        for _, _, process in workers:
+            process.terminate()
+        raise
+    for _, _, process in workers:
+        process.join()
+
+    # gather the global best.
+    best_island_id = int( np.argmin( [ length for length, _ in bests ] ) )
+    best_length, best_route = bests[ best_island_id ]
+
+    return {
+        'problem': 'symmetric_travelling_salesman',
+        'seed': seed,
+        'number_of_islands': number_of_islands,
+        'population_size': population_size,
+        'number_of_cities': len( city_dict ),
+        'topology': topology,
+        'selection_strategy': selection,
+        'number_of_elites': number_of_elites,
+        'generations': number_of_epochs * generations_per_epoch,
+        'resumed_from_epoch': first_epoch if first_epoch else None,
+        'best_fitness': round( float( best_length ), 6 ),
+        'best_individual': best_route,
+        'best_island': best_island_id,
+        'island_statistics': island_statistics,
+        'elapsed_time': round( time.perf_counter() - start_time, 6 ),
+    }
+
+
+def get_argument_parser():
+    parser = argparse.ArgumentParser( description='island model symmetric TSP GA.' )
+    cities = parser.add_mutually_exclusive_group()
+    cities.add_argument( '--number-of-cities', type=int, default=30 )
+    cities.add_argument( '--cities-file', help='text file of "x y" lines.' )
+    parser.add_argument( '--islands', type=int, default=4 )
+    parser.add_argument( '--population-size', type=int, default=10 )
+    parser.add_argument( '--epochs', type=int, default=10 )
+    parser.add_argument( '--generations-per-epoch', type=int, default=50 )
+    parser.add_argument( '--migrants', type=int, default=1 )
+    parser.add_argument( '--topology', choices=TOPOLOGIES, default='ring' )
+    parser.add_argument( '--processes', type=int, default=None,
+                         help='worker processes (default: one per island).' )
+    parser.add_argument( '--seed', type=int, default=None )
+    parser.add_argument( '--mutations', type=int, default=1,
+                         help='swaps per child.' )
+    parser.add_argument( '--gene-fraction', type=float, default=0.5,
+                         help='share of the child\'s route from the first parent.' )
+    parser.add_argument( '--elites', type=int, default=1, metavar='K',
+                         help='keep each island\'s K shortest routes (0: no elitism).' )
+    parser.add_argument( '--selection', choices=sorted( SELECTION_STRATEGIES ),
+                         help='parent selection strategy (default: the two '
+                         'shortest routes breed every child).' )
+    parser.add_argument( '--tournament-size', type=int, default=2 )
+    parser.add_argument( '--checkpoint',
+                         help='save every island\'s state after each epoch.' )
+    parser.add_argument( '--resume', action='store_true',
+                         help='continue from the --checkpoint files, if any.' )
+    parser.add_argument( '--history',
+                         help='record every island\'s generations (one file per island).' )
+    parser.add_argument( '--output', help='JSON summary path (default: stdout).' )
+    return parser
+
+
+def main( argv = None ):
+    parser = get_argument_parser()
+    args = parser.parse_args( argv )
+    if args.resume and not args.checkpoint:
+        parser.error( '--resume needs --checkpoint' )
+    if not 0 <= args.elites < args.population_size:
+        parser.error( '--elites must be between 0 and --population-size - 1' )
+
+    if args.seed is not None:
+        np.random.seed( args.seed )
+    island_checkpoint = get_island_path( args.checkpoint, 0 ) if args.checkpoint else None
+    if args.cities_file:
+        city_dict = load_city_dict( args.cities_file )
+    elif args.resume and os.path.exists( island_checkpoint ):
+        # the random cities of the interrupted run.
+        positions = load_checkpoint( island_checkpoint )[0][ 'positions' ]
+        city_dict = dict( zip( range( len( positions ) ), positions ) )
+    else:
+        city_dict = get_random_city_dict( args.number_of_cities )
+
+    summary = run_islands(
+        city_dict,
+        number_of_islands = args.islands,
+        population_size = args.population_size,
+        number_of_epochs = args.epochs,
+        generations_per_epoch = args.generations_per_epoch,
+        number_of_migrants = args.migrants,
+        topology = args.topology,
+        number_of_processes = args.processes,
+        seed = args.seed,
+        number_of_elites = args.elites,
+        selection = args.selection,
+        tournament_size = args.tournament_size,
+        number_of_mutations = args.mutations,
+        gene_fraction = args.gene_fraction,
+        checkpoint = args.checkpoint,
+        history = args.history,
+        resume = args.resume
+    )
+
+    if args.output:
+        with open( args.output, 'w' ) as f:
+            json.dump( summary, f )
+    else:
+        json.dump( summary, sys.stdout )
+        sys.stdout.write( '\n' )
+
+    return summary
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+# Genetic algorithms examples - local search for the memetic TSP GA.
+# MIT License.
+
+# 2-opt and Or-opt improvement of routes, restricted to each city's k nearest
+# neighbours and driven by don't-look bits, so that a pass costs about
+# O(n * k) distance lookups instead of the O(n^2) of a full 2-opt sweep.
+#
+#   local_search = LocalSearch( dist_matrix, number_of_neighbours = 8,
+#                               time_budget = 0.05 )
+#   population, lengths = ga.reproduction_with_lengths(
+#       mating_pool, 10, dist_matrix, local_search = local_search
+#   )
+#
+# The time budget is per generation: improve_population() improves the
+# shortest routes first and stops once the budget is spent, leaving the other
+# routes untouched.
+#
+# 2-opt:   a b ... c d  ->  a c ... b d    (the b ... c segment is reversed)
+# Or-opt:  a segment of 1 to 3 cities is moved, possibly reversed, next to one
+#          of its first city's neighbours.
+# Don't-look bits: only the cities in the queue are tried, a city leaves the
+# queue when no improving move starts from it and comes back when one of its
+# edges changes.
+#
+# Both moves update the tour and its city -> position list in place, moving
+# only the cities between the changed edges.
+#
+# Candidate lists: given as neighbours, or queried from a GridIndex over the
+# city positions. Without either, they are searched in the distance matrix,
+# which must then be a dense numpy array (the distance providers of
+# symmetric_travelling_salesman_distances.py are for instances too large for
+# that).
+
+
+import time
+from collections import deque
+import numpy as np
+import symmetric_travelling_salesman_ga as ga
+from symmetric_travelling_salesman_spatial import GridIndex
+
+
+EPSILON = 1e-10
+
+
+def get_neighbour_lists( dist_matrix, number_of_neighbours, batch_size = 1024 ):
+
+    # ( n, k ) array of every city's k nearest other cities, nearest first,
+    # from a dense ( n, n ) matrix, batch_size rows at a time.
+    n = len( dist_matrix )
+    k = min( number_of_neighbours, n - 1 )
+    if k <= 0:
+        return np.zeros( ( n, 0 ), dtype=int )
+    neighbours = np.empty( ( n, k ), dtype=int )
+    for start in range( 0, n, batch_size ):
+        rows = np.arange( start, min( start + batch_size, n ) )
+        distances = np.array( dist_matrix[ rows ], dtype=float )
+        distances[ rows - start, rows ] = np.inf  # skip self.
+        candidates = np.argpartition( distances, k - 1, axis=1 )[ :, :k ]
+        order = np.argsort(
+            np.take_along_axis( distances, candidates, axis=1 ), axis=1, kind='stable'
+        )
+        neighbours[ rows ] = np.take_along_axis( candidates, order, axis=1 )
+    return neighbours
+
+
+class LocalSearch( object ):
+
+    def __init__( self, dist_matrix, number_of_neighbours = 8, time_budget = 0.1,
+                  or_opt = True, max_segment_length = 3, neighbours = None,
+                  positions = None ):
+        self.dist_matrix = dist_matrix
+        if neighbours is None:
+            if positions is not None:
+                neighbours = GridIndex( positions ).get_neighbour_lists( number_of_neighbours )
+            elif isinstance( dist_matrix, np.ndarray ):
+                neighbours = get_neighbour_lists( dist_matrix, number_of_neighbours )
+            else:
+                raise ValueError( 'no neighbours or positions for distances: %s'
+                                  % type( dist_matrix ).__name__ )
+        # plain lists, they are read one item at a time in the loops below.
+        self.neighbours = neighbours.tolist()
+        self.time_budget = time_budget
+        self.or_opt = or_opt
+        self.max_segment_length = max_segment_length
+
+    def improve_population( self, routes, lengths ):
+        # improve the shortest routes first, within this generation's budget.
+        deadline = time.perf_counter() + self.time_budget
+        routes, lengths = list( routes ), list( lengths )
+        for i in np.argsort( lengths, kind='stable' ):
+            if time.perf_counter() >= deadline:
+                break
+            routes[ i ], lengths[ i ] = self.improve( routes[ i ], deadline )
+        return routes, lengths
+
+    def improve( self, route, deadline = None ):
+        # returns the improved route (a new array) and its exact length.
+        tour = [ int( c ) for c in route ]
+        n = len( tour )
+        if n < 5:
+            route = np.array( tour )
+            return route, ga.get_route_length( route, self.dist_matrix )
+        position = [ 0 ] * n
+        for i, c in enumerate( tour ):
+            position[ c ] = i
+
+        queue = deque( tour )
+        in_queue = [ True ] * n
+        while queue:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            a = queue.popleft()
+            in_queue[ a ] = False
+            touched = self._try_2_opt( tour, position, a )
+            if touched is None and self.or_opt:
+                touched = self._try_or_opt( tour, position, a )
+            if touched is None:
+                continue  # a's don't-look bit stays set.
+            for c in touched:
+                if not in_queue[ c ]:
+                    in_queue[ c ] = True
+                    queue.append( c )
+
+        route = np.array( tour )
+        return route, ga.get_route_length( route, self.dist_matrix )
+
+    def _try_2_opt( self, tour, position, a ):
+        dist = self.dist_matrix
+        n = len( tour )
+        i = position[ a ]
+        for direction in ( 1, -1 ):
+            # a's successor (or predecessor) b, and the edge ( a, b ) to break.
+            b = tour[ ( i + direction ) % n ]
+            d_ab = dist[ a, b ]
+            for c in self.neighbours[ a ]:
+                d_ac = dist[ a, c ]
+                if d_ac >= d_ab:
+                    break  # the neighbours are sorted, nothing better follows.
+                d = tour[ ( position[ c ] + direction ) % n ]
+                if c == b or d == a:
+                    continue
+                delta = d_ac + dist[ b, d ] - d_ab - dist[ c, d ]
+                if delta < -EPSILON:
+                    if direction == 1:
+                        # a b ... c d -> a c ... b d
+                        reverse( tour, position, position[ b ], position[ c ] )
+                    else:
+                        # d c ... b a -> d b ... c a
+                        reverse( tour, position, position[ c ], position[ b ] )
+                    return ( a, b, c, d )
+        return None
+
+    def _try_or_opt( self, tour, position, a ):
+        # returns the touched cities or None.
+        dist = self.dist_matrix
+        n = len( tour )
+        i = position[ a ]
+        for segment_length in range( 1, min( self.max_segment_length, n - 3 ) + 1 ):
+            # segment a ... s_end between p and nx.
+            segment = [ tour[ ( i + t ) % n ] for t in range( segment_length ) ]
+            s_end = segment[ -1 ]
+            p = tour[ ( i - 1 ) % n ]
+            nx = tour[ ( i + segment_length ) % n ]
+            removal_gain = dist[ p, a ] + dist[ s_end, nx ] - dist[ p, nx ]
+            if removal_gain <= EPSILON:
+                continue
+            for c in self.neighbours[ a ]:
+                d_ac = dist[ a, c ]
+                if d_ac >= removal_gain:
+                    break
+                if c in segment:
+                    continue
+                c_next = tour[ ( position[ c ] + 1 ) % n ]
+                c_prev = tour[ ( position[ c ] - 1 ) % n ]
+                # c a ... s_end c_next
+                if c != p and \
+                        d_ac + dist[ s_end, c_next ] - dist[ c, c_next ] < removal_gain - EPSILON:
+                    move_segment( tour, position, i, segment_length, c, reverse = False )
+                    return ( a, s_end, p, nx, c, c_next )
+                # c_prev s_end ... a c
+                if c != nx and \
+                        d_ac + dist[ s_end, c_prev ] - dist[ c_prev, c ] < removal_gain - EPSILON:
+                    move_segment( tour, position, i, segment_length, c_prev, reverse = True )
+                    return ( a, s_end, p, nx, c, c_prev )
+        return None
+
+
+def reverse( tour, position, start, end ):
+
+    # reverse the circular segment tour[ start .. end ] (both included) in
+    # place. The complement is reversed instead when it is shorter, which gives
+    # the same cycle with the opposite orientation.
+    n = len( tour )
+    segment_length = ( end - start ) % n + 1
+    if 2 * segment_length > n:
+        start, end = ( end + 1 ) % n, ( start - 1 ) % n
+        segment_length = n - segment_length
+    for t in range( segment_length // 2 ):
+        i, j = ( start + t ) % n, ( end - t ) % n
+        tour[ i ], tour[ j ] = tour[ j ], tour[ i ]
+        position[ tour[ i ] ] = i
+        position[ tour[ j ] ] = j
+
+
+def move_segment( tour, position, start, segment_length, after, reverse = False ):
+
+    # move the circular segment tour[ start .. start + segment_length - 1 ]
+    # in place, reversed if asked, right after the city `after` (not in the
+    # segment). Only the span between the segment and its new place shifts,
+    # on the shorter side of the circle, and only the moved cities' positions
+    # are updated.
+    n = len( tour )
+    segment = [ tour[ ( start + t ) % n ] for t in range( segment_length ) ]
+    if reverse:
+        segment.reverse()
+    forward_span = ( position[ after ] - start - segment_length ) % n + 1
+    backward_span = n - segment_length - forward_span
+    if forward_span <= backward_span:
+        # ... segment span after ...  ->  ... span after segment ...
+        for t in range( forward_span ):
+            i = ( start + t ) % n
+            tour[ i ] = tour[ ( i + segment_length ) % n ]
+            position[ tour[ i ] ] = i
+        start = ( start + forward_span ) % n
+    else:
+        # ... after span segment ...  ->  ... after segment span ...
+        for t in range( 1, backward_span + 1 ):
+            i = ( start + segment_length - t ) % n
+            tour[ i ] = tour[ ( i - segment_length ) % n ]
+            position[ tour[ i ] ] = i
+        start = ( start - backward_span ) % n
+    for t, c in enumerate( segment ):
+        i = ( start + t ) % n
+        tour[ i ] = c
+        position[ c ] = i
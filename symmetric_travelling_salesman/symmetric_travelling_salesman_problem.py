@@ -0,0 +1,148 @@
+# Genetic algorithms examples - symmetric TSP on the generic GA engine.
+# MIT License.
+
+# The symmetric TSP operators (see symmetric_travelling_salesman_ga.py) behind
+# generic_ga/engine.py's Problem interface, batched over the
+# ( population_size, number_of_cities ) routes array:
+#
+#   problem = SymmetricTSPProblem( ga.get_distance_matrix( city_dict ) )
+#   engine = Engine( problem, population_size = 10 )
+#   shortest_length, shortest_route = engine.run( max_generations = 1000 )
+#
+# dist_matrix can be any distance provider (see
+# symmetric_travelling_salesman_distances.py); neighbours, nearest neighbour
+# lists (see symmetric_travelling_salesman_spatial.py), restrict the swap
+# mutation as get_swap_positions() does.
+#
+# delta_scoring: the routes carry their edge lengths (see
+# ga.get_route_edges()), the children's are copied from their parents' by
+# ga.crossover_batch_with_edges() and the swaps look up the four edges they
+# change, so the children are never scored from scratch.
+# local_search: e.g. a symmetric_travelling_salesman_local_search.py
+# LocalSearch, the improve() of memetic engines.
+
+
+import os, sys
+import numpy as np
+import symmetric_travelling_salesman_ga as ga
+
+sys.path.append(
+    os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), '..', 'generic_ga' )
+)
+from engine import Problem
+
+
+class SymmetricTSPProblem( Problem ):
+
+    minimize = True
+
+    def __init__( self, dist_matrix, neighbours = None, gene_fraction = 0.5,
+                  delta_scoring = False, local_search = None ):
+        self.dist_matrix = dist_matrix
+        self.number_of_cities = len( dist_matrix )
+        self.neighbours = neighbours
+        self.gene_fraction = gene_fraction
+        self.delta_scoring = delta_scoring
+        self.local_search = local_search
+
+    def get_initial_population( self, population_size, rng ):
+        # random permutations of the city ids.
+        return np.argsort(
+            rng.random( ( population_size, self.number_of_cities ) ), axis=1
+        )
+
+    def evaluate( self, population ):
+        # exact (unrounded) lengths, as get_route_length().
+        return self.dist_matrix[ population, np.roll( population, -1, axis=1 ) ].sum( axis=1 )
+
+    def crossover( self, parents_1, parents_2, rng, out ):
+        out[ ... ] = ga.crossover_batch(
+            parents_1, parents_2,
+            rng.integers( self.number_of_cities, size=len( parents_1 ) ),
+            self.gene_fraction
+        )
+        return out
+
+    def get_swap_positions( self, population, rng, positions = None ):
+        # the two places of one swap per route; positions: the routes'
+        # ga.get_route_positions(), needed with neighbours.
+        population_size, number_of_cities = population.shape
+        list_ids_0 = rng.integers( number_of_cities, size=population_size )
+        if self.neighbours is None:
+            return list_ids_0, rng.integers( number_of_cities, size=population_size )
+        # a random city's successor and one of the city's neighbours.
+        neighbours = self.neighbours[
+            population[ np.arange( population_size ), list_ids_0 ],
+            rng.integers( self.neighbours.shape[1], size=population_size )
+        ]
+        return ( list_ids_0 + 1 ) % number_of_cities, \
+            positions[ np.arange( population_size ), neighbours ]
+
+    def get_positions( self, population ):
+        # the inverse permutations, only read by the neighbour swaps.
+        if self.neighbours is None:
+            return None
+        return ga.get_route_positions( population )
+
+    def swap( self, population, positions, list_ids_0, list_ids_1 ):
+        # one swap per route, every route at once, positions kept up to date.
+        rows = np.arange( len( population ) )
+        cities_0 = population[ rows, list_ids_0 ]
+        cities_1 = population[ rows, list_ids_1 ]
+        population[ rows, list_ids_0 ] = cities_1
+        population[ rows, list_ids_1 ] = cities_0
+        if positions is not None:
+            positions[ rows, cities_1 ] = list_ids_0
+            positions[ rows, cities_0 ] = list_ids_1
+
+    def mutate( self, population, number_of_mutations, rng ):
+        # number_of_mutations swaps per route, every route at once.
+        positions = self.get_positions( population )
+        for _ in range( number_of_mutations ):
+            list_ids_0, list_ids_1 = self.get_swap_positions( population, rng, positions )
+            self.swap( population, positions, list_ids_0, list_ids_1 )
+        return population
+
+    def get_scoring_state( self, population ):
+        # ( edge lengths, ).
+        return ga.get_route_edges( population, self.dist_matrix ),
+
+    def get_state_fitnesses( self, scoring_state ):
+        return scoring_state[0].sum( axis=1 )
+
+    def crossover_with_state( self, parents_1, parents_2, states_1, states_2, rng, out ):
+        # the same gene starts as crossover().
+        children, edges = ga.crossover_batch_with_edges(
+            parents_1, parents_2, states_1[0], states_2[0], self.dist_matrix,
+            gene_starts = rng.integers( self.number_of_cities, size=len( out ) ),
+            gene_fraction = self.gene_fraction
+        )
+        out[ ... ] = children
+        return edges,
+
+    def mutate_with_state( self, population, scoring_state, number_of_mutations, rng ):
+        # the same swaps as mutate(); a swap changes the edges before and
+        # after both its places, at most four lookups per route.
+        edges, = scoring_state
+        rows = np.arange( len( population ) )
+        number_of_cities = self.number_of_cities
+        positions = self.get_positions( population )
+        for _ in range( number_of_mutations ):
+            list_ids_0, list_ids_1 = self.get_swap_positions( population, rng, positions )
+            self.swap( population, positions, list_ids_0, list_ids_1 )
+            for list_ids in ( list_ids_0 - 1, list_ids_0, list_ids_1 - 1, list_ids_1 ):
+                list_ids = list_ids % number_of_cities
+                edges[ rows, list_ids ] = self.dist_matrix[
+                    population[ rows, list_ids ],
+                    population[ rows, ( list_ids + 1 ) % number_of_cities ]
+                ]
+        return population
+
+    def improve( self, population, fitnesses ):
+        # the local search's improved routes and exact lengths.
+        routes, lengths = self.local_search.improve_population( population, fitnesses )
+        population[ ... ] = np.array( routes )
+        return lengths
+
+    def decode( self, genome ):
+        return [ int( city ) for city in genome ]
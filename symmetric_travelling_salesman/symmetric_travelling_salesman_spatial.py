@@ -0,0 +1,235 @@
+# Genetic algorithms examples - spatial index over the city positions.
+# MIT License.
+
+# Grid bucketing of the cities, built once, answering bulk k-nearest-neighbour
+# and radius queries with plain numpy (no scipy needed):
+#
+#   index = GridIndex( positions )                  # ( n, 2 ) array.
+#   neighbours = index.get_neighbour_lists( 8 )     # ( n, 8 ) int array.
+#   ids, offsets = index.query_radius( points, 1.5 )
+#   # the cities near points[ i ] are ids[ offsets[ i ]:offsets[ i + 1 ] ].
+#
+# The cities are sorted by cell so each cell is a contiguous slice of
+# self.city_ids (a CSR layout): no per-cell Python lists. A query scans the
+# square of cells around its point, growing the square only for the queries
+# whose k-th distance is not yet guaranteed, and all the queries of a batch
+# are processed together.
+#
+# Uses: neighbour-restricted mutation (see ga.get_mutated_route()), greedy
+# tour construction (get_greedy_route() below) and the local search's
+# candidate lists (LocalSearch( ..., neighbours = ... )).
+
+
+import numpy as np
+
+
+def get_positions( city_dict ):
+    # CITY_DICT -> ( n, 2 ) array indexed by city id.
+    return np.array( [ city_dict[ i ] for i in range( len( city_dict ) ) ], dtype=float )
+
+
+class GridIndex( object ):
+
+    def __init__( self, positions, cities_per_cell = 2.0, batch_size = 4096 ):
+        self.positions = np.asarray( positions, dtype=float )
+        self.cities_per_cell = cities_per_cell
+        self.batch_size = batch_size
+        number_of_cities = len( self.positions )
+
+        self.origin = self.positions.min( axis=0 )
+        extent = self.positions.max( axis=0 ) - self.origin
+        # about cities_per_cell cities per cell, also when the cities are on a
+        # line (zero area).
+        self.cell_size = max(
+            np.sqrt( extent[0] * extent[1] * cities_per_cell / number_of_cities ),
+            extent.max() * cities_per_cell / number_of_cities
+        ) or 1.0
+        self.shape = ( extent / self.cell_size ).astype( int ) + 1
+
+        cell_ids = self._get_cell_ids( *self._get_cells( self.positions ) )
+        self.city_ids = np.argsort( cell_ids, kind='stable' )
+        self.cell_starts = np.concatenate( [
+            [ 0 ], np.cumsum( np.bincount( cell_ids, minlength=self.shape.prod() ) )
+        ] )
+
+    def __len__( self ):
+        return len( self.positions )
+
+    def _get_cells( self, points ):
+        cells = ( ( points - self.origin ) / self.cell_size ).astype( int )
+        cells = np.clip( cells, 0, self.shape - 1 )
+        return cells[ :, 0 ], cells[ :, 1 ]
+
+    def _get_cell_ids( self, cx, cy ):
+        return cx * self.shape[1] + cy
+
+    def _get_candidates( self, cx, cy, radius ):
+
+        # ( query ids, city ids ) of all the cities in the square of cells
+        # [ cx - radius, cx + radius ] x [ cy - radius, cy + radius ].
+        steps = np.arange( -radius, radius + 1 )
+        ix = ( cx[ :, None ] + np.repeat( steps, len( steps ) ) )
+        iy = ( cy[ :, None ] + np.tile( steps, len( steps ) ) )
+        valid = ( ix >= 0 ) & ( ix < self.shape[0] ) & ( iy >= 0 ) & ( iy < self.shape[1] )
+        cells = np.where( valid, self._get_cell_ids( ix, iy ), 0 )
+        starts = self.cell_starts[ cells ]
+        counts = np.where( valid, self.cell_starts[ cells + 1 ] - starts, 0 ).ravel()
+
+        # expand every ( start, count ) cell slice into its city ids.
+        total = counts.sum()
+        slice_starts = np.repeat( starts.ravel(), counts )
+        within = np.arange( total ) - np.repeat( np.cumsum( counts ) - counts, counts )
+        query_ids = np.repeat(
+            np.arange( len( cx ) ), counts.reshape( len( cx ), -1 ).sum( axis=1 )
+        )
+        return query_ids, self.city_ids[ slice_starts + within ]
+
+    def _get_guaranteed_distances( self, points, cx, cy, radius ):
+        # every city closer than this to the query point lies in the scanned
+        # square of cells (inf once the square covers the whole grid).
+        low = self.origin + self.cell_size * np.stack( [ cx - radius, cy - radius ], 1 )
+        high = self.origin + self.cell_size * np.stack( [ cx + radius + 1, cy + radius + 1 ], 1 )
+        distances = np.minimum( points - low, high - points ).min( axis=1 )
+        covers_all = ( cx - radius <= 0 ) & ( cy - radius <= 0 ) & \
+            ( cx + radius >= self.shape[0] - 1 ) & ( cy + radius >= self.shape[1] - 1 )
+        return np.where( covers_all, np.inf, distances )
+
+    def query_knn( self, points, k, exclude_ids = None ):
+
+        # ( m, k ) array of the k nearest cities of every point, nearest first.
+        # exclude_ids[ i ] (e.g. the query city itself) is never returned.
+        points = np.atleast_2d( np.asarray( points, dtype=float ) )
+        k = min( k, len( self ) - ( 0 if exclude_ids is None else 1 ) )
+        neighbours = np.zeros( ( len( points ), max( k, 0 ) ), dtype=int )
+        if k <= 0:
+            return neighbours
+        for start in range( 0, len( points ), self.batch_size ):
+            batch = slice( start, start + self.batch_size )
+            excluded = None if exclude_ids is None else np.asarray( exclude_ids )[ batch ]
+            neighbours[ batch ] = self._query_knn_batch( points[ batch ], k, excluded )
+        return neighbours
+
+    def _query_knn_batch( self, points, k, exclude_ids ):
+        neighbours = np.zeros( ( len( points ), k ), dtype=int )
+        pending = np.arange( len( points ) )
+        cx, cy = self._get_cells( points )
+        # a ( 2 * radius + 1 ) wide square holds about k cities.
+        radius = max( 1, int( np.ceil( np.sqrt( k / self.cities_per_cell ) / 2 ) ) )
+        while len( pending ):
+            query_ids, city_ids = self._get_candidates( cx[ pending ], cy[ pending ], radius )
+            if exclude_ids is not None:
+                keep = city_ids != exclude_ids[ pending ][ query_ids ]
+                query_ids, city_ids = query_ids[ keep ], city_ids[ keep ]
+            distances = np.hypot( *( self.positions[ city_ids ] - points[ pending ][ query_ids ] ).T )
+
+            # candidates grouped by query, nearest first.
+            order = np.lexsort( ( distances, query_ids ) )
+            query_ids, city_ids, distances = \
+                query_ids[ order ], city_ids[ order ], distances[ order ]
+            counts = np.bincount( query_ids, minlength=len( pending ) )
+            group_starts = np.cumsum( counts ) - counts
+
+            # done: at least k candidates and the k-th one is guaranteed.
+            done = counts >= k
+            kth = group_starts[ done ] + k - 1
+            done[ done ] = distances[ kth ] <= self._get_guaranteed_distances(
+                points[ pending[ done ] ], cx[ pending[ done ] ], cy[ pending[ done ] ], radius
+            )
+            firsts = group_starts[ done ][ :, None ] + np.arange( k )
+            neighbours[ pending[ done ] ] = city_ids[ firsts ]
+
+            pending = pending[ ~done ]
+            # the square never needs to be larger than the grid.
+            radius = min( 2 * radius, self.shape.max() )
+        return neighbours
+
+    def get_neighbour_lists( self, k ):
+        # every city's k nearest other cities, nearest first.
+        return self.query_knn(
+            self.positions, k, exclude_ids = np.arange( len( self ) )
+        )
+
+    def query_radius( self, points, radius ):
+
+        # cities within radius of every point, nearest first, as the compact
+        # ( city_ids, offsets ) pair: point i's cities are
+        # city_ids[ offsets[ i ]:offsets[ i + 1 ] ].
+        points = np.atleast_2d( np.asarray( points, dtype=float ) )
+        cell_radius = min( int( np.ceil( radius / self.cell_size ) ), self.shape.max() )
+        all_city_ids = []
+        counts = []
+        for start in range( 0, len( points ), self.batch_size ):
+            batch_points = points[ start:start + self.batch_size ]
+            cx, cy = self._get_cells( batch_points )
+            query_ids, city_ids = self._get_candidates( cx, cy, cell_radius )
+            distances = np.hypot( *( self.positions[ city_ids ] - batch_points[ query_ids ] ).T )
+            inside = distances <= radius
+            query_ids, city_ids, distances = \
+                query_ids[ inside ], city_ids[ inside ], distances[ inside ]
+            order = np.lexsort( ( distances, query_ids ) )
+            all_city_ids.append( city_ids[ order ] )
+            counts.append( np.bincount( query_ids, minlength=len( batch_points ) ) )
+        offsets = np.concatenate( [ [ 0 ], np.cumsum( np.concatenate( counts ) ) ] )
+        return np.concatenate( all_city_ids ), offsets
+
+
+def get_greedy_route( positions, neighbours ):
+
+    # greedy edge tour: the candidate edges ( city, one of its neighbours ) are
+    # added shortest first whenever both cities still have less than two
+    # edges and no cycle is closed. The resulting path fragments are then
+    # chained, nearest fragment end first.
+    positions = np.asarray( positions, dtype=float )
+    number_of_cities = len( positions )
+    if number_of_cities < 3:
+        return np.arange( number_of_cities )
+
+    cities = np.repeat( np.arange( number_of_cities ), neighbours.shape[1] )
+    others = neighbours.ravel()
+    lengths = np.hypot( *( positions[ cities ] - positions[ others ] ).T )
+    order = np.argsort( lengths, kind='stable' )
+
+    degree = [ 0 ] * number_of_cities
+    adjacency = [ [] for _ in range( number_of_cities ) ]
+    parent = list( range( number_of_cities ) )  # union-find of the fragments.
+
+    def find( city ):
+        while parent[ city ] != city:
+            parent[ city ] = parent[ parent[ city ] ]
+            city = parent[ city ]
+        return city
+
+    for a, b in zip( cities[ order ].tolist(), others[ order ].tolist() ):
+        if degree[ a ] >= 2 or degree[ b ] >= 2:
+            continue
+        root_a, root_b = find( a ), find( b )
+        if root_a == root_b:
+            continue
+        parent[ root_a ] = root_b
+        degree[ a ] += 1
+        degree[ b ] += 1
+        adjacency[ a ].append( b )
+        adjacency[ b ].append( a )
+
+    # chain the fragments (isolated cities are one-city fragments).
+    is_free_end = np.array( [ d < 2 for d in degree ] )
+    route = []
+    visited = np.zeros( number_of_cities, dtype=bool )
+    city = int( np.flatnonzero( is_free_end )[0] )
+    while True:
+        # walk the fragment from one end to the other.
+        previous = None
+        while True:
+            route.append( city )
+            visited[ city ] = True
+            following = [ c for c in adjacency[ city ] if c != previous and not visited[ c ] ]
+            if not following:
+                break
+            previous, city = city, following[0]
+        is_free_end[ city ] = False
+        candidates = np.flatnonzero( is_free_end & ~visited )
+        if not len( candidates ):
+            break
+        distances = np.hypot( *( positions[ candidates ] - positions[ city ] ).T )
+        city = int( candidates[ distances.argmin() ] )
+    return np.array( route )
@@ -0,0 +1,184 @@
+# Genetic algorithms examples - TSPLIB instances.
+# MIT License.
+
+# Loads symmetric TSPLIB .tsp files (http://comopt.ifi.uni-heidelberg.de/
+# software/TSPLIB95/) and serves their distances through a bounded-memory
+# provider, so that instances like pla85900 fit in memory:
+#
+#   instance = load_tsplib( 'pla85900.tsp' )
+#   distances = instance.get_distances( 'cached', max_bytes = 256 * 2**20 )
+#   lengths = ga.get_population_lengths( population, distances )
+#
+# The coordinates are parsed once and cached next to the .tsp file as a .npy
+# file: while the cache is newer than the .tsp file, later loads only read the
+# header lines and memory-map the cache. The city ids are the TSPLIB node
+# numbers minus one.
+#
+# Supported EDGE_WEIGHT_TYPEs: EUC_2D, CEIL_2D, ATT, GEO (see
+# symmetric_travelling_salesman_distances.py) and EXPLICIT with the FULL_MATRIX,
+# UPPER_ROW, LOWER_ROW, UPPER_DIAG_ROW, LOWER_DIAG_ROW formats and their _COL
+# counterparts. Explicit instances are small (a matrix is given in the file),
+# their distances are served by the matrix itself.
+
+
+import os
+import re
+import numpy as np
+from symmetric_travelling_salesman_distances import OnDemandDistances, \
+    CachedDistances, EDGE_WEIGHT_FUNCTIONS
+
+
+SECTION_RE = re.compile( r'^\s*([A-Z_]+_SECTION|EOF)\s*:?\s*$', re.MULTILINE )
+SPECIFICATION_RE = re.compile( r'^\s*([A-Z_]+)\s*:\s*(.*?)\s*$', re.MULTILINE )
+
+# the weights of a symmetric matrix listed row by row: the ( row, column )
+# order of every format. A _COL format lists the same weights as the _ROW
+# format of the other triangle.
+TRIANGLES = {
+    'UPPER_ROW': lambda n: np.triu_indices( n, 1 ),
+    'LOWER_ROW': lambda n: np.tril_indices( n, -1 ),
+    'UPPER_DIAG_ROW': lambda n: np.triu_indices( n ),
+    'LOWER_DIAG_ROW': lambda n: np.tril_indices( n ),
+}
+TRIANGLES.update( {
+    'UPPER_COL': TRIANGLES[ 'LOWER_ROW' ],
+    'LOWER_COL': TRIANGLES[ 'UPPER_ROW' ],
+    'UPPER_DIAG_COL': TRIANGLES[ 'LOWER_DIAG_ROW' ],
+    'LOWER_DIAG_COL': TRIANGLES[ 'UPPER_DIAG_ROW' ],
+} )
+
+DISTANCE_MODES = ( 'matrix', 'on_demand', 'cached' )
+
+
+class TSPLIBInstance( object ):
+
+    def __init__( self, specification, coordinates = None, matrix = None ):
+        self.specification = specification
+        self.name = specification.get( 'NAME' )
+        self.dimension = int( specification[ 'DIMENSION' ] )
+        self.edge_weight_type = specification[ 'EDGE_WEIGHT_TYPE' ]
+        # ( n, 2 ) float array, possibly memory-mapped, or None.
+        self.coordinates = coordinates
+        # ( n, n ) float array of EXPLICIT instances, or None.
+        self.matrix = matrix
+
+    def __len__( self ):
+        return self.dimension
+
+    def get_city_dict( self ):
+        # CITY_DICT of the examples; only for the instances small enough to be
+        # plotted, it holds n small arrays.
+        if self.coordinates is None:
+            raise ValueError( 'no coordinates in instance: %s' % self.name )
+        return dict( zip( range( len( self ) ), np.array( self.coordinates ) ) )
+
+    def get_distances( self, mode = 'on_demand', max_bytes = 64 * 2**20 ):
+
+        # the distance provider, all indexed as distances[ a, b ]:
+        #   'matrix'     the full n x n matrix, n^2 * 8 bytes.
+        #   'on_demand'  computed on each request from the coordinates.
+        #   'cached'     on demand behind a max_bytes LRU cache.
+        if mode not in DISTANCE_MODES:
+            raise ValueError( 'unknown distance mode: %s' % mode )
+        if self.matrix is not None:
+            return self.matrix
+        distances = OnDemandDistances( self.coordinates, self.edge_weight_type )
+        if mode == 'matrix':
+            ids = np.arange( len( self ) )
+            return distances[ ids[ :, None ], ids[ None, : ] ]
+        if mode == 'cached':
+            return CachedDistances( distances, max_bytes )
+        return distances
+
+
+def read_tsplib_header( f ):
+
+    # the specification lines of an open .tsp file, read up to the first
+    # section line: ( specification dict, that line or '' ).
+    specification = {}
+    for line in f:
+        if SECTION_RE.match( line ):
+            return specification, line
+        match = SPECIFICATION_RE.match( line )
+        if match:
+            specification[ match.group( 1 ) ] = match.group( 2 )
+    return specification, ''
+
+
+def read_tsplib( text ):
+
+    # ( specification dict, { section name: section text } ).
+    specification = {}
+    sections = {}
+    matches = list( SECTION_RE.finditer( text ) )
+    header_end = matches[0].start() if matches else len( text )
+    for match in SPECIFICATION_RE.finditer( text[ :header_end ] ):
+        specification[ match.group( 1 ) ] = match.group( 2 )
+    for match, following in zip( matches, matches[ 1: ] + [ None ] ):
+        end = following.start() if following is not None else len( text )
+        sections[ match.group( 1 ) ] = text[ match.end():end ]
+    return specification, sections
+
+
+def get_coordinates( section, dimension ):
+    # "id x y" lines -> ( n, 2 ) array indexed by id - 1.
+    values = np.array( section.split(), dtype=float ).reshape( -1, 3 )
+    if len( values ) != dimension:
+        raise ValueError( 'expected %d nodes, got %d' % ( dimension, len( values ) ) )
+    coordinates = np.zeros( ( dimension, 2 ) )
+    coordinates[ values[ :, 0 ].astype( int ) - 1 ] = values[ :, 1: ]
+    return coordinates
+
+
+def get_explicit_matrix( section, dimension, edge_weight_format ):
+    weights = np.array( section.split(), dtype=float )
+    if edge_weight_format == 'FULL_MATRIX':
+        return weights[ :dimension * dimension ].reshape( dimension, dimension )
+    if edge_weight_format not in TRIANGLES:
+        raise ValueError( 'unsupported edge weight format: %s' % edge_weight_format )
+    rows, columns = TRIANGLES[ edge_weight_format ]( dimension )
+    matrix = np.zeros( ( dimension, dimension ) )
+    matrix[ rows, columns ] = weights[ :len( rows ) ]
+    matrix[ columns, rows ] = weights[ :len( rows ) ]
+    return matrix
+
+
+def get_cache_path( path ):
+    return path + '.coordinates.npy'
+
+
+def load_tsplib( path, use_cache = True ):
+    with open( path ) as f:
+        specification, section_line = read_tsplib_header( f )
+        if specification.get( 'TYPE', 'TSP' ) != 'TSP':
+            raise ValueError( 'not a symmetric TSP instance: %s' % path )
+        edge_weight_type = specification.get( 'EDGE_WEIGHT_TYPE' )
+        if edge_weight_type != 'EXPLICIT' and edge_weight_type not in EDGE_WEIGHT_FUNCTIONS:
+            raise ValueError( 'unsupported edge weight type: %s' % edge_weight_type )
+        cache_path = get_cache_path( path )
+        if edge_weight_type != 'EXPLICIT' and use_cache and os.path.exists( cache_path ) and \
+                os.path.getmtime( cache_path ) >= os.path.getmtime( path ):
+            # the body is never read.
+            return TSPLIBInstance( specification, np.load( cache_path, mmap_mode='r' ) )
+        _, sections = read_tsplib( section_line + f.read() )
+    dimension = int( specification[ 'DIMENSION' ] )
+
+    if edge_weight_type == 'EXPLICIT':
+        matrix = get_explicit_matrix(
+            sections[ 'EDGE_WEIGHT_SECTION' ], dimension,
+            specification.get( 'EDGE_WEIGHT_FORMAT' )
+        )
+        # optional coordinates, only used for plotting.
+        coordinates = None
+        if 'DISPLAY_DATA_SECTION' in sections:
+            coordinates = get_coordinates( sections[ 'DISPLAY_DATA_SECTION' ], dimension )
+        return TSPLIBInstance( specification, coordinates, matrix )
+
+    coordinates = get_coordinates( sections[ 'NODE_COORD_SECTION' ], dimension )
+    if use_cache:
+        try:
+            np.save( cache_path, coordinates )
+            coordinates = np.load( cache_path, mmap_mode='r' )
+        except OSError:
+            pass  # e.g. read-only directory, keep them in memory.
+    return TSPLIBInstance( specification, coordinates )
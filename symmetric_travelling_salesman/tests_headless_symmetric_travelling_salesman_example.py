@@ -0,0 +1,108 @@
+# Genetic algorithms examples - tests.
+# MIT License.
+
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import headless_symmetric_travelling_salesman_example as headless
+from checkpoint import load_checkpoint
+
+
+class TestHeadlessSymmetricTSPExample( unittest.TestCase ):
+
+    def setUp( self ):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown( self ):
+        shutil.rmtree( self.directory )
+
+    def run_headless( self, name, *options ):
+        return headless.main( [
+            '--number-of-cities', '20', '--population-size', '30',
+            '--neighbour-mutation', '4', '--selection', 'tournament',
+            '--unique-children', 'resample', '--stagnation-window', '3',
+            '--max-mutations', '4', '--restart-after', '10',
+            '--checkpoint', os.path.join( self.directory, name ),
+            '--output', os.path.join( self.directory, 'summary.json' ),
+        ] + list( options ) )
+
+
+    def test_resume( self ):
+        uninterrupted = self.run_headless( 'uninterrupted.npz', '--seed', '3',
+                                           '--generations', '60' )
+        interrupted = self.run_headless( 'run.npz', '--seed', '3',
+                                         '--generations', '25', '--checkpoint-every', '10' )
+        self.assertEqual( interrupted[ 'generations' ], 25 )
+        self.assertIsNone( interrupted[ 'resumed_from_generation' ] )
+        # no seed: the cities, the population and the generators' states all
+        # come from the checkpoint.
+        resumed = self.run_headless( 'run.npz', '--generations', '60', '--resume' )
+        self.assertEqual( resumed[ 'resumed_from_generation' ], 25 )
+
+        for key in ( 'generations', 'best_fitness', 'best_individual' ):
+            self.assertEqual( resumed[ key ], uninterrupted[ key ], key )
+        arrays, metadata = load_checkpoint( os.path.join( self.directory, 'run.npz' ) )
+        expected_arrays, expected_metadata = load_checkpoint(
+            os.path.join( self.directory, 'uninterrupted.npz' )
+        )
+        self.assertEqual( metadata[ 'rng' ], expected_metadata[ 'rng' ] )
+        for name in ( 'population', 'fitnesses', 'best_individual', 'positions' ):
+            self.assertEqual( arrays[ name ].tolist(), expected_arrays[ name ].tolist() )
+
+        # nothing left to do.
+        resumed = self.run_headless( 'run.npz', '--generations', '60', '--resume' )
+        self.assertEqual( resumed[ 'best_individual' ], uninterrupted[ 'best_individual' ] )
+        with self.assertRaises( ValueError ):
+            self.run_headless( 'run.npz', '--generations', '60', '--resume',
+                               '--population-size', '31' )
+
+
+    def test_time_budget( self ):
+        summary = self.run_headless( 'run.npz', '--seed', '1', '--time-budget', '0.2' )
+        self.assertTrue( summary[ 'timed_out' ] )
+        self.assertLess( summary[ 'elapsed_time' ], 1.0 )
+        self.assertGreater( summary[ 'restarts' ], 0 )
+        self.assertEqual( sorted( summary[ 'best_individual' ] ), list( range( 20 ) ) )
+
+
+    def test_run_trial( self ):
+        options = [ '--number-of-cities', '15', '--cities-seed', '7', '--generations', '200' ]
+        trials = [ headless.run_trial( options, seed ) for seed in ( 1, 1, 2 ) ]
+        self.assertEqual( trials[0][ 'best_individual' ], trials[1][ 'best_individual' ] )
+        # the same cities whatever the seed, the lengths are theirs.
+        positions = [ headless.get_random_city_dict( 15, np.random.default_rng( 7 ) )[ i ]
+                      for i in range( 15 ) ]
+        for trial in trials:
+            route = trial[ 'best_individual' ]
+            length = sum( np.linalg.norm( positions[ route[ i ] ] - positions[ route[ i - 1 ] ] )
+                          for i in range( 15 ) )
+            self.assertAlmostEqual( trial[ 'best_fitness' ], length, places=5 )
+            # the curve ends on the last population's best.
+            self.assertAlmostEqual( trial[ 'curve' ][ -1 ][2], trial[ 'best_fitness' ], places=5 )
+
+
+    def test_steady_state( self ):
+        uninterrupted = self.run_headless( 'uninterrupted.npz', '--seed', '3',
+                                           '--generations', '300', '--steady-state',
+                                           '--children', '3' )
+        self.assertTrue( uninterrupted[ 'steady_state' ] )
+        self.assertEqual( uninterrupted[ 'number_of_children' ], 3 )
+        self.run_headless( 'run.npz', '--seed', '3', '--generations', '100',
+                           '--steady-state', '--children', '3' )
+        resumed = self.run_headless( 'run.npz', '--generations', '300', '--resume',
+                                     '--steady-state', '--children', '3' )
+        for key in ( 'generations', 'best_fitness', 'best_individual' ):
+            self.assertEqual( resumed[ key ], uninterrupted[ key ], key )
+        # a generational checkpoint.
+        with self.assertRaises( ValueError ):
+            self.run_headless( 'run.npz', '--generations', '300', '--resume' )
+        for options in ( [ '--children', '30' ], [ '--memetic', 'elites' ] ):
+            with self.assertRaises( SystemExit ):
+                self.run_headless( 'run.npz', '--steady-state', *options )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+# Genetic algorithms examples - tests.
+# MIT License.
+
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import numpy as np
+import symmetric_travelling_salesman_ga as ga
+from symmetric_travelling_salesman_async import Snapshot, \
+    LatestSnapshotQueue, get_route_polyline, evolve_and_publish, \
+    start_ga_thread, ScreenshotWriter
+from tests_symmetric_travelling_salesman_ga import CITY_DICT, POPULATION
+
+
+POSITIONS = np.array( [ CITY_DICT[ i ] for i in range( len( CITY_DICT ) ) ] )
+
+
+class TestSymmetricTSPAsync( unittest.TestCase ):
+
+    def test_latest_snapshot_queue( self ):
+        snapshots = LatestSnapshotQueue( maxsize = 2 )
+        self.assertIsNone( snapshots.get_latest() )
+        # publishing never blocks, the oldest snapshots are dropped.
+        for t in range( 5 ):
+            snapshots.publish( Snapshot( t, 100.0 - t, None ) )
+        self.assertEqual( snapshots.get_latest().generation, 4 )
+        self.assertIsNone( snapshots.get_latest() )
+
+
+    def test_get_route_polyline( self ):
+        route = POPULATION[0]
+        x, y = get_route_polyline( route, POSITIONS )
+        self.assertEqual( len( x ), 3 * len( route ) )
+        self.assertTrue( np.isnan( x[ 2::3 ] ).all() )
+        self.assertTrue( np.isnan( y[ 2::3 ] ).all() )
+        # same segments as the main example's xpairs/ypairs.
+        for i in range( len( route ) ):
+            x0, y0 = CITY_DICT[ route[ i ] ]
+            x1, y1 = CITY_DICT[ route[ ( i + 1 ) % len( route ) ] ]
+            self.assertEqual( [ x[ 3*i ], x[ 3*i + 1 ] ], [ x0, x1 ] )
+            self.assertEqual( [ y[ 3*i ], y[ 3*i + 1 ] ], [ y0, y1 ] )
+
+
+    def test_evolve_and_publish( self ):
+        dist_matrix = ga.get_distance_matrix( CITY_DICT )
+        snapshots = LatestSnapshotQueue()
+        number_of_generations = evolve_and_publish(
+            dist_matrix, snapshots, threading.Event(),
+            max_generations = 50, seed = 1
+        )
+        self.assertEqual( number_of_generations, 50 )
+        snapshot = snapshots.get_latest()
+        self.assertEqual( sorted( snapshot.route ), list( range( len( CITY_DICT ) ) ) )
+        self.assertAlmostEqual(
+            snapshot.length, ga.get_route_length( snapshot.route, dist_matrix ), 6
+        )
+
+
+    def test_start_ga_thread( self ):
+        dist_matrix = ga.get_distance_matrix( CITY_DICT )
+        snapshots = LatestSnapshotQueue()
+        thread, stop_event = start_ga_thread( dist_matrix, snapshots )
+        stop_event.set()
+        thread.join( 10 )
+        self.assertFalse( thread.is_alive() )
+
+
+    def test_screenshot_writer( self ):
+        try:
+            import matplotlib
+        except ImportError:
+            self.skipTest( 'matplotlib is not installed' )
+        path = tempfile.mkdtemp()
+        try:
+            writer = ScreenshotWriter( path, POSITIONS )
+            writer.submit( Snapshot( 3, 42.5, np.array( POPULATION[0] ) ) )
+            writer.close()
+            self.assertEqual( os.listdir( path ), [ '42.5.png' ] )
+        finally:
+            shutil.rmtree( path )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+# Genetic algorithms examples - tests.
+# MIT License.
+
+
+import unittest
+import numpy as np
+import symmetric_travelling_salesman_ga as ga
+from symmetric_travelling_salesman_distances import OnDemandDistances, \
+    CachedDistances, get_att_distances, get_euc_2d_distances, \
+    get_ceil_2d_distances
+from tests_symmetric_travelling_salesman_ga import CITY_DICT, POPULATION
+
+
+class TestSymmetricTSPDistances( unittest.TestCase ):
+
+    def setUp( self ):
+        self.dist_matrix = ga.get_distance_matrix( CITY_DICT )
+        self.positions = np.array( [ CITY_DICT[ i ] for i in range( len( CITY_DICT ) ) ] )
+
+
+    def test_on_demand_distances( self ):
+        distances = OnDemandDistances( self.positions )
+        self.assertEqual( len( distances ), 6 )
+        self.assertEqual( distances.shape, ( 6, 6 ) )
+        self.assertAlmostEqual( distances[ 1, 4 ], self.dist_matrix[ 1, 4 ] )
+        # drop-in replacement of the matrix.
+        self.assertTrue( np.allclose(
+            ga.get_population_lengths( POPULATION, distances ),
+            ga.get_population_lengths( POPULATION, self.dist_matrix )
+        ) )
+        with self.assertRaises( ValueError ):
+            OnDemandDistances( self.positions, 'EUC_3D' )
+
+
+    def test_rounded_distances( self ):
+        a, b = np.array( [ 0.0, 0.0 ] ), np.array( [ 3.0, 4.2 ] )
+        # 5.16...
+        self.assertEqual( get_euc_2d_distances( a, b ), 5.0 )
+        self.assertEqual( get_ceil_2d_distances( a, b ), 6.0 )
+        # sqrt( 27.64 / 10 ) = 1.66... -> 2.
+        self.assertEqual( get_att_distances( a, b ), 2.0 )
+        self.assertEqual( get_att_distances( a, np.array( [ 0.0, 10.0 ] ) ), 4.0 )
+
+
+    def test_cached_distances( self ):
+        distances = CachedDistances( OnDemandDistances( self.positions ) )
+        routes = np.array( POPULATION )
+        next_cities = np.roll( routes, -1, axis=1 )
+        expected = self.dist_matrix[ routes, next_cities ]
+        self.assertTrue( np.allclose( distances[ routes, next_cities ], expected ) )
+        # 15 distinct (unordered) edges, all the other lookups hit.
+        self.assertEqual( ( distances.hits, distances.misses ), ( 45, 15 ) )
+        self.assertTrue( np.allclose( distances[ next_cities, routes ], expected ) )
+        self.assertEqual( distances.misses, 15 )
+        self.assertAlmostEqual( distances[ 2, 5 ], self.dist_matrix[ 2, 5 ] )
+
+
+    def test_cached_distances_memory_cap( self ):
+        rng = np.random.default_rng( 1 )
+        positions = rng.random( ( 1000, 2 ) )
+        distances = CachedDistances( OnDemandDistances( positions ), max_bytes = 4096 )
+        self.assertLessEqual( distances.nbytes, 4096 )
+        a, b = rng.integers( 0, 1000, ( 2, 5000 ) )
+        # evicted entries are computed again, the values stay exact.
+        for _ in range( 2 ):
+            self.assertTrue( np.allclose(
+                distances[ a, b ], np.hypot( *( positions[ a ] - positions[ b ] ).T )
+            ) )
+        self.assertLessEqual( distances.nbytes, 4096 )
+        self.assertGreater( distances.misses, 5000 )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,7 +7,43 @@ import os, sys
 from io import StringIO
 import numpy as np
 from symmetric_travelling_salesman_ga import get_two_fittest_individuals, \
-    selection
+    selection, get_fitness_score, get_distance_matrix, get_population_lengths, \
+    selection_with_distance_matrix, get_route_length, get_swap_delta, \
+    get_mutated_route_with_length, reproduction_with_lengths, MatingPool, \
+    crossover, crossover_batch, get_mutated_route, get_canonical_route, \
+    get_route_key, reproduction, get_reseeded_mating_pool, get_route_edges, \
+    crossover_batch_with_edges, crossover_with_length, get_route_positions
+
+sys.path.append(
+    os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), '..', 'generic_ga' )
+)
+from fitness_evaluators import get_evaluator
+from fitness_cache import CachedEvaluator, DuplicateFilter
+from selection_strategies import get_selection_strategy, SELECTION_STRATEGIES
+from instrumentation import Instrumentation
+
+
+CITY_DICT = {
+    0: np.array([19.19093807,  2.91402521]),
+    1: np.array([14.85198645, 15.44710273]),
+    2: np.array([ 4.493833 , 14.9924073]),
+    3: np.array([11.60715415, 13.73150432]),
+    4: np.array([9.01391852, 0.20177464]),
+    5: np.array([16.76969068, 17.55312157])
+}
+
+POPULATION = [
+    [3, 4, 0, 5, 2, 1],
+    [4, 0, 5, 3, 1, 2],
+    [2, 3, 5, 4, 1, 0],
+    [0, 5, 4, 3, 2, 1],
+    [3, 1, 5, 4, 0, 2],
+    [4, 0, 5, 2, 1, 3],
+    [0, 5, 2, 4, 3, 1],
+    [2, 0, 3, 1, 5, 4],
+    [4, 1, 0, 3, 2, 5],
+    [2, 1, 4, 5, 3, 0]
+]
 
 
 class TestSymmetricTSPGA( unittest.TestCase ):
@@ -113,5 +149,358 @@ class TestSymmetricTSPGA( unittest.TestCase ):
         self.assertTrue( flag_length and flag_dist_memo_1 and flag_mating_pool )
 
 
+    def test_get_distance_matrix( self ):
+        dist_matrix = get_distance_matrix( CITY_DICT )
+        self.assertEqual( dist_matrix.shape, ( 6, 6 ) )
+        self.assertTrue( np.allclose( dist_matrix, dist_matrix.T ) )
+        self.assertAlmostEqual( dist_matrix[ 1, 3 ], 3.670451547087608 )
+
+
+    def test_get_population_lengths( self ):
+        lengths = get_population_lengths(
+            POPULATION, get_distance_matrix( CITY_DICT )
+        )
+        self.assertEqual(
+            list( lengths ),
+            [ get_fitness_score( route, {}, CITY_DICT )[0] for route in POPULATION ]
+        )
+
+
+    def test_selection_with_distance_matrix( self ):
+        length, mating_pool = selection_with_distance_matrix(
+            POPULATION,
+            get_distance_matrix( CITY_DICT )
+        )
+        self.assertEqual( length, 84.356504 )
+        self.assertEqual( mating_pool, selection( POPULATION, {}, CITY_DICT )[2] )
+
+
+    def test_get_swap_delta( self ):
+        # every pair of positions, including adjacent ones and the wrap-around.
+        dist_matrix = get_distance_matrix( CITY_DICT )
+        route = np.array( POPULATION[ 0 ] )
+        length = get_route_length( route, dist_matrix )
+        for i in range( len( route ) ):
+            for j in range( len( route ) ):
+                swapped_route = route.copy()
+                swapped_route[ [ i, j ] ] = swapped_route[ [ j, i ] ]
+                self.assertAlmostEqual(
+                    length + get_swap_delta( route, i, j, dist_matrix ),
+                    get_route_length( swapped_route, dist_matrix )
+                )
+
+
+    def test_get_mutated_route_with_length( self ):
+        dist_matrix = get_distance_matrix( CITY_DICT )
+        route = np.array( POPULATION[ 1 ] )
+        length = get_route_length( route, dist_matrix )
+        for _ in range( 1000 ):
+            route, length = get_mutated_route_with_length(
+                route, length, 3, dist_matrix
+            )
+        self.assertAlmostEqual( length, get_route_length( route, dist_matrix ) )
+        self.assertEqual( sorted( route ), list( range( 6 ) ) )
+
+
+    def test_crossover( self ):
+        route_1, route_2 = np.array( POPULATION[0] ), np.array( POPULATION[1] )
+        for _ in range( 100 ):
+            child = crossover( ( route_1, route_2 ) )
+            self.assertEqual( sorted( child ), list( range( 6 ) ) )
+            # route_1's gene first (possibly wrapping around), then the other
+            # cities in route_2's order.
+            start = list( route_1 ).index( child[0] )
+            self.assertEqual( list( child[ :3 ] ), list( np.roll( route_1, -start )[ :3 ] ) )
+            self.assertEqual(
+                list( child[ 3: ] ), [ c for c in route_2 if c not in child[ :3 ] ]
+            )
+        # the parents are left untouched.
+        self.assertEqual( list( route_1 ), POPULATION[0] )
+
+        # any other hashable city ids, with the same gene for the same seed.
+        names = [ 'a', 'b', 'c', 'd', 'e', 'f' ]
+        for offset in ( 0, 10 ):
+            np.random.seed( 2 )
+            expected = crossover( ( route_1, route_2 ) )
+            np.random.seed( 2 )
+            child = crossover( ( [ names[ c ] for c in POPULATION[0] ],
+                                 [ names[ c ] for c in POPULATION[1] ] ) )
+            self.assertEqual( list( child ), [ names[ c ] for c in expected ] )
+            np.random.seed( 2 )
+            child = crossover( ( route_1 + offset, route_2 + offset ) )
+            self.assertEqual( list( child ), list( expected + offset ) )
+
+
+    def test_crossover_batch( self ):
+        parents_1 = np.array( POPULATION[ :5 ] )
+        parents_2 = np.array( POPULATION[ 5: ] )
+        np.random.seed( 1 )
+        children = [ crossover( pair ) for pair in zip( parents_1, parents_2 ) ]
+        np.random.seed( 1 )
+        self.assertEqual(
+            crossover_batch( parents_1, parents_2 ).tolist(),
+            np.array( children ).tolist()
+        )
+        self.assertEqual(
+            crossover_batch( parents_1[ :1 ], parents_2[ :1 ], np.array( [ 4 ] ) ).tolist(),
+            [ [ 2, 1, 3, 4, 0, 5 ] ]
+        )
+        # a third of the cities from parents_1's gene.
+        np.random.seed( 1 )
+        children = [ crossover( pair, gene_fraction = 0.34 )
+                     for pair in zip( parents_1, parents_2 ) ]
+        np.random.seed( 1 )
+        self.assertEqual(
+            crossover_batch( parents_1, parents_2, gene_fraction = 0.34 ).tolist(),
+            np.array( children ).tolist()
+        )
+        self.assertEqual(
+            crossover_batch( parents_1[ :1 ], parents_2[ :1 ], np.array( [ 4 ] ),
+                             gene_fraction = 0.34 )[0][ :2 ].tolist(),
+            parents_1[0].take( [ 4, 5 ] ).tolist()
+        )
+        with self.assertRaises( ValueError ):
+            crossover_batch( parents_1 + 1, parents_2 + 1 )
+
+
+    def test_crossover_batch_with_edges( self ):
+        dist_matrix = get_distance_matrix( CITY_DICT )
+        parents_1 = np.array( POPULATION[ :5 ] )
+        parents_2 = np.array( POPULATION[ 5: ] )
+        edges = get_route_edges( parents_1, dist_matrix )
+        self.assertTrue( np.allclose(
+            edges.sum( axis=1 ), get_population_lengths( parents_1, dist_matrix )
+        ) )
+        for gene_fraction in ( 0.0, 0.17, 0.34, 0.5, 0.84, 1.0 ):
+            np.random.seed( 1 )
+            expected = crossover_batch( parents_1, parents_2, gene_fraction = gene_fraction )
+            np.random.seed( 1 )
+            children, children_edges = crossover_batch_with_edges(
+                parents_1, parents_2, edges, get_route_edges( parents_2, dist_matrix ),
+                dist_matrix, gene_fraction = gene_fraction
+            )
+            self.assertEqual( children.tolist(), expected.tolist() )
+            self.assertTrue( np.allclose(
+                children_edges, get_route_edges( children, dist_matrix )
+            ) )
+        # two parents shared by all the children.
+        children, children_edges = crossover_batch_with_edges(
+            parents_1[0], parents_2[0], edges[0], get_route_edges( parents_2[0], dist_matrix ),
+            dist_matrix, number_of_children = 20
+        )
+        self.assertEqual( children.shape, ( 20, 6 ) )
+        self.assertTrue( np.allclose(
+            children_edges.sum( axis=1 ), get_population_lengths( children, dist_matrix )
+        ) )
+        child_route, child_length = crossover_with_length( POPULATION[ :2 ], dist_matrix )
+        self.assertAlmostEqual( child_length, get_route_length( child_route, dist_matrix ) )
+        with self.assertRaises( ValueError ):
+            crossover_batch_with_edges( parents_1 + 1, parents_2 + 1, edges, edges, dist_matrix )
+
+
+    def test_get_route_positions( self ):
+        routes = np.array( POPULATION[ :3 ] )
+        positions = get_route_positions( routes )
+        for route, route_positions in zip( routes, positions ):
+            self.assertEqual( route[ route_positions ].tolist(), list( range( len( route ) ) ) )
+        self.assertEqual( get_route_positions( [ 2, 0, 1 ] ).tolist(), [ 1, 2, 0 ] )
+
+
+    def test_get_mutated_route_with_neighbours( self ):
+        # every city's single neighbour is the next id, so a mutation always
+        # puts some city c right before c + 1.
+        neighbours = ( np.arange( 6 )[ :, None ] + 1 ) % 6
+        for _ in range( 100 ):
+            # no city comes right before its neighbour in this route.
+            route = get_mutated_route( np.array( [ 0, 3, 1, 5, 2, 4 ] ), 1, neighbours )
+            self.assertEqual( sorted( route ), list( range( 6 ) ) )
+            self.assertTrue( any(
+                route[ ( i + 1 ) % 6 ] == ( route[ i ] + 1 ) % 6 for i in range( 6 )
+            ) )
+
+
+    def test_reproduction_with_lengths( self ):
+        dist_matrix = get_distance_matrix( CITY_DICT )
+        _, mating_pool = selection_with_distance_matrix( POPULATION, dist_matrix )
+        new_population, new_lengths = reproduction_with_lengths(
+            mating_pool, 10, dist_matrix
+        )
+        self.assertEqual( len( new_population ), 10 )
+        self.assertTrue( np.allclose(
+            new_lengths, get_population_lengths( new_population, dist_matrix )
+        ) )
+        # more swaps per child, the lengths are still exact.
+        new_population, new_lengths = reproduction_with_lengths(
+            mating_pool, 10, dist_matrix, number_of_mutations = 5
+        )
+        self.assertTrue( np.allclose(
+            new_lengths, get_population_lengths( new_population, dist_matrix )
+        ) )
+        for route in reproduction( mating_pool, 10, number_of_mutations = 5 ):
+            self.assertEqual( sorted( route ), list( range( 6 ) ) )
+
+
+    def test_get_reseeded_mating_pool( self ):
+        dist_matrix = get_distance_matrix( CITY_DICT )
+        lengths = get_population_lengths( POPULATION, dist_matrix )
+        mating_pool = get_reseeded_mating_pool(
+            MatingPool( POPULATION, lengths ), 0.5, dist_matrix
+        )
+        self.assertEqual( len( mating_pool ), 10 )
+        # the 5 shortest routes are kept.
+        self.assertEqual( sorted( mating_pool.fitnesses[ :5 ] ), sorted( lengths )[ :5 ] )
+        self.assertTrue( np.allclose(
+            mating_pool.fitnesses, get_population_lengths( mating_pool.individuals, dist_matrix )
+        ) )
+        # a full restart keeps the shortest route.
+        mating_pool = get_reseeded_mating_pool(
+            MatingPool( POPULATION, lengths ), 1.0, dist_matrix
+        )
+        self.assertEqual( mating_pool.fitnesses[0], lengths.min() )
+        self.assertEqual( len( mating_pool ), 10 )
+
+    def test_get_route_key( self ):
+        route = [ 3, 1, 4, 0, 2, 5 ]
+        self.assertEqual( get_canonical_route( route ).tolist(), [ 0, 2, 5, 3, 1, 4 ] )
+        # same round trip: rotated and / or reversed.
+        for other in ( [ 0, 2, 5, 3, 1, 4 ], [ 4, 1, 3, 5, 2, 0 ], [ 5, 3, 1, 4, 0, 2 ] ):
+            self.assertEqual( get_route_key( other ), get_route_key( route ) )
+        self.assertNotEqual( get_route_key( [ 0, 1, 2, 3, 4, 5 ] ), get_route_key( route ) )
+
+
+    def test_cached_evaluator( self ):
+        dist_matrix = get_distance_matrix( CITY_DICT )
+        with CachedEvaluator(
+                get_evaluator( 'serial', get_route_length, { 'dist_matrix': dist_matrix } ),
+                key_function = get_route_key ) as evaluator:
+            population = POPULATION + [ POPULATION[0][ 2: ] + POPULATION[0][ :2 ] ]
+            lengths = evaluator.evaluate( population )
+            self.assertTrue( np.allclose( lengths, get_population_lengths( population, dist_matrix ) ) )
+            # the rotated copy of the first route (and any other round trip
+            # already seen) is not scored again.
+            number_of_round_trips = len( set( get_route_key( route ) for route in POPULATION ) )
+            self.assertEqual( evaluator.cache.misses, number_of_round_trips )
+            self.assertEqual( evaluator.cache.hits, len( population ) - number_of_round_trips )
+
+
+    def test_reproduction_with_duplicate_filter( self ):
+        dist_matrix = get_distance_matrix( CITY_DICT )
+        mating_pool = MatingPool( POPULATION, get_population_lengths( POPULATION, dist_matrix ) )
+        parents = get_two_fittest_individuals( mating_pool )
+        parent_keys = set( get_route_key( route ) for route in parents )
+
+        np.random.seed( 1 )
+        new_population, new_lengths = reproduction_with_lengths(
+            mating_pool, 30, dist_matrix,
+            duplicate_filter = DuplicateFilter( 'reject', key_function = get_route_key )
+        )
+        keys = [ get_route_key( route ) for route in new_population ]
+        # 6 cities, 60 distinct round trips: some of the 30 children were duplicates.
+        self.assertLess( len( new_population ), 30 )
+        self.assertEqual( len( set( keys ) ), len( keys ) )
+        self.assertFalse( parent_keys & set( keys ) )
+        self.assertTrue( np.allclose(
+            new_lengths, get_population_lengths( new_population, dist_matrix )
+        ) )
+
+        duplicate_filter = DuplicateFilter( 'resample', key_function = get_route_key )
+        new_population, new_lengths = reproduction_with_lengths(
+            mating_pool, 10, dist_matrix, duplicate_filter = duplicate_filter
+        )
+        self.assertEqual( len( new_population ), 10 )
+        self.assertTrue( np.allclose(
+            new_lengths, get_population_lengths( new_population, dist_matrix )
+        ) )
+        self.assertEqual(
+            len( reproduction( mating_pool, 10, duplicate_filter = duplicate_filter ) ), 10
+        )
+
+
+    def test_reproduction_with_selection_strategy( self ):
+        dist_matrix = get_distance_matrix( CITY_DICT )
+        mating_pool = MatingPool( POPULATION, get_population_lengths( POPULATION, dist_matrix ) )
+        for name in SELECTION_STRATEGIES:
+            selection_strategy = get_selection_strategy( name )
+            new_population, new_lengths = reproduction_with_lengths(
+                mating_pool, 20, dist_matrix, selection_strategy = selection_strategy
+            )
+            self.assertEqual( len( new_population ), 20, name )
+            for route in new_population:
+                self.assertEqual( sorted( route ), list( range( 6 ) ), name )
+            self.assertTrue( np.allclose(
+                new_lengths, get_population_lengths( new_population, dist_matrix )
+            ), name )
+            self.assertEqual( len( reproduction(
+                mating_pool, 20, selection_strategy = selection_strategy
+            ) ), 20, name )
+
+        # the shortest routes weigh more.
+        parent_pairs = mating_pool.select_parent_pairs(
+            10, get_selection_strategy( 'truncation', proportion = 0.2 )
+        )
+        shortest = [ list( route ) for route in mating_pool.get_top_k( 2 )[0] ]
+        for parent_pair in parent_pairs:
+            self.assertTrue( all( list( route ) in shortest for route in parent_pair ) )
+
+
+    def test_selection_with_evaluator( self ):
+        dist_matrix = get_distance_matrix( CITY_DICT )
+        for backend in ( 'serial', 'thread', 'process' ):
+            with get_evaluator(
+                    backend,
+                    get_route_length,
+                    { 'dist_matrix': dist_matrix } ) as evaluator:
+                length, dist_memo, mating_pool = selection(
+                    POPULATION, {}, CITY_DICT, evaluator
+                )
+            self.assertEqual( length, 84.356504 )
+            self.assertEqual( dist_memo, {} )
+            self.assertEqual(
+                mating_pool, selection( POPULATION, {}, CITY_DICT )[2]
+            )
+
+    def test_mating_pool( self ):
+        lengths = get_population_lengths( POPULATION, get_distance_matrix( CITY_DICT ) )
+        mating_pool = MatingPool( POPULATION, lengths )
+        # same content as the dict pool, colliding lengths included.
+        self.assertEqual(
+            mating_pool.to_dict(), selection( POPULATION, {}, CITY_DICT )[2]
+        )
+        self.assertEqual( mating_pool.get_best_fitness(), 61.297819 )
+        routes, top_lengths = mating_pool.get_top_k( 3 )
+        self.assertEqual( routes[0], [4, 0, 5, 3, 1, 2] )
+        self.assertEqual( list( top_lengths ), sorted( lengths )[ :3 ] )
+        self.assertEqual( mating_pool.get_elites()[0], [ [4, 0, 5, 3, 1, 2] ] )
+
+        mating_pool.extend( [ [4, 0, 5, 3, 1, 2] ], [ 61.297819 ] )
+        self.assertEqual( len( mating_pool.get_elites()[0] ), 2 )
+        parent_pairs = mating_pool.select_parent_pairs(
+            50, get_selection_strategy( 'roulette' )
+        )
+        self.assertEqual( len( parent_pairs ), 50 )
+        self.assertAlmostEqual( mating_pool.get_sampling_weights().sum(), 1.0 )
+
+
+    def test_mating_pool_from_dict( self ):
+        mating_pool = { 1.5: [ [0, 1, 2] ], 0.5: [ [2, 1, 0], [1, 2, 0] ] }
+        self.assertEqual( MatingPool.from_dict( mating_pool ).to_dict(), mating_pool )
+        self.assertEqual(
+            sorted( get_two_fittest_individuals( mating_pool ) ),
+            [ [1, 2, 0], [2, 1, 0] ]
+        )
+
+    def test_selection_with_instrumentation( self ):
+        instrumentation = Instrumentation()
+        length, dist_memo, mating_pool = selection(
+            POPULATION, {}, CITY_DICT, instrumentation = instrumentation
+        )
+        record = instrumentation.end_generation()
+        # 10 routes of 6 edges over 15 distinct city pairs.
+        self.assertEqual( record[ 'counters' ], {
+            'evaluations': 10, 'dist_memo_misses': 15, 'dist_memo_hits': 45
+        } )
+        self.assertEqual( record[ 'gauges' ], { 'dist_memo_size': 15 } )
+
+
 if __name__ == '__main__':
     unittest.main()
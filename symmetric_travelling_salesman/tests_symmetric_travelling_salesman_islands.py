@@ -0,0 +1,115 @@
+# Genetic algorithms examples - tests.
+# MIT License.
+
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import symmetric_travelling_salesman_ga as ga
+from symmetric_travelling_salesman_islands import get_migration_targets, \
+    get_arrivals, Island, run_islands, main
+from symmetric_travelling_salesman_spatial import get_positions
+from run_history import RunHistory
+from tests_symmetric_travelling_salesman_ga import CITY_DICT, POPULATION
+
+
+class TestSymmetricTSPIslands( unittest.TestCase ):
+
+    def test_get_migration_targets( self ):
+        self.assertEqual( get_migration_targets( 3, 4, 'ring' ), [0] )
+        self.assertEqual(
+            get_migration_targets( 1, 4, 'fully_connected' ), [0, 2, 3]
+        )
+        self.assertEqual( get_migration_targets( 0, 1, 'ring' ), [] )
+        with self.assertRaises( ValueError ) as ctx:
+            get_migration_targets( 0, 4, 'star' )
+
+
+    def test_get_arrivals( self ):
+        migrants = [
+            ( [ np.array( POPULATION[0] ) ], [ 10.0 ] ),
+            ( [ np.array( POPULATION[2] ) ], [ 30.0 ] ),
+            ( [ np.array( POPULATION[3] ) ], [ 20.0 ] ),
+        ]
+        arrivals = get_arrivals( migrants, 2, 'ring' )
+        self.assertEqual( [ [ route.tolist() for route in routes ] for routes in arrivals ],
+                          [ [ POPULATION[3] ], [ POPULATION[0] ], [ POPULATION[2] ] ] )
+        # best first, never more than half of the island.
+        arrivals = get_arrivals( migrants, 2, 'fully_connected' )
+        self.assertEqual( [ routes[0].tolist() for routes in arrivals ],
+                          [ POPULATION[3], POPULATION[0], POPULATION[0] ] )
+        self.assertEqual( [ len( routes ) for routes in arrivals ], [ 1, 1, 1 ] )
+        self.assertEqual( get_arrivals( migrants, 1, 'ring' ), [ [], [], [] ] )
+
+
+    def test_island( self ):
+        positions = get_positions( CITY_DICT )
+        dist_matrix = ga.get_distance_matrix( CITY_DICT )
+        options = { 'population_size': 10, 'number_of_elites': 1, 'selection': 'tournament',
+                    'tournament_size': 3, 'number_of_mutations': 1, 'gene_fraction': 0.5 }
+        island = Island( 0, positions, dist_matrix, options, 1 )
+        _, statistics, _ = island.get_report( 2 )
+        island.evolve( [ np.array( POPULATION[0] ) ], 20 )
+        epoch, new_statistics, ( routes, lengths ) = island.get_report( 2 )
+        self.assertEqual( ( epoch, island.engine.generation ), ( 1, 20 ) )
+        self.assertEqual( len( routes ), 2 )
+        self.assertEqual( lengths.tolist(), sorted( lengths.tolist() ) )
+        self.assertAlmostEqual( new_statistics[ 'best' ], lengths[0], places=6 )
+        # elitism: the best route can never get worse.
+        self.assertLessEqual( new_statistics[ 'best' ], statistics[ 'best' ] )
+        self.assertTrue( np.allclose(
+            island.engine.fitnesses, ga.get_population_lengths( island.engine.population, dist_matrix )
+        ) )
+
+
+    def test_run_islands( self ):
+        summary = run_islands(
+            CITY_DICT, number_of_islands = 3, number_of_epochs = 3,
+            generations_per_epoch = 5, topology = 'fully_connected',
+            number_of_processes = 2, seed = 7
+        )
+        self.assertEqual( len( summary['island_statistics'] ), 3 )
+        self.assertEqual( len( summary['island_statistics'][0] ), 3 )
+        self.assertEqual( sorted( summary['best_individual'] ), list( range( 6 ) ) )
+        self.assertEqual(
+            run_islands(
+                CITY_DICT, number_of_islands = 3, number_of_epochs = 3,
+                generations_per_epoch = 5, topology = 'fully_connected',
+                number_of_processes = 2, seed = 7
+            )['best_fitness'],
+            summary['best_fitness']
+        )
+
+
+    def test_resume( self ):
+        directory = tempfile.mkdtemp()
+        try:
+            def run_main( name, *options ):
+                return main( [
+                    '--number-of-cities', '12', '--islands', '3', '--processes', '2',
+                    '--population-size', '8', '--generations-per-epoch', '5',
+                    '--selection', 'rank', '--elites', '2', '--migrants', '2',
+                    '--checkpoint', os.path.join( directory, name + '.npz' ),
+                    '--history', os.path.join( directory, name + '.gahist' ),
+                    '--output', os.path.join( directory, 'summary.json' ),
+                ] + list( options ) )
+
+            uninterrupted = run_main( 'uninterrupted', '--seed', '4', '--epochs', '6' )
+            run_main( 'run', '--seed', '4', '--epochs', '2' )
+            # no seed: the cities come from the checkpoints.
+            resumed = run_main( 'run', '--epochs', '6', '--resume' )
+            self.assertEqual( resumed[ 'resumed_from_epoch' ], 2 )
+            for key in ( 'best_fitness', 'best_individual', 'best_island' ):
+                self.assertEqual( resumed[ key ], uninterrupted[ key ], key )
+            self.assertEqual( resumed[ 'island_statistics' ],
+                              uninterrupted[ 'island_statistics' ][ 2: ] )
+            records = RunHistory( os.path.join( directory, 'run.island1.gahist' ) ).get_records()
+            self.assertEqual( records[ 'generation' ].tolist(), list( range( 1, 31 ) ) )
+        finally:
+            shutil.rmtree( directory )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+# Genetic algorithms examples - tests.
+# MIT License.
+
+
+import unittest
+import numpy as np
+import symmetric_travelling_salesman_ga as ga
+from symmetric_travelling_salesman_local_search import get_neighbour_lists, \
+    LocalSearch, reverse, move_segment
+from symmetric_travelling_salesman_distances import OnDemandDistances
+from tests_symmetric_travelling_salesman_ga import CITY_DICT, POPULATION
+
+
+def get_random_dist_matrix( number_of_cities, seed ):
+    positions = 20 * np.random.default_rng( seed ).random( ( number_of_cities, 2 ) )
+    return ga.get_distance_matrix( dict( enumerate( positions ) ) )
+
+
+class TestSymmetricTSPLocalSearch( unittest.TestCase ):
+
+    def test_get_neighbour_lists( self ):
+        dist_matrix = get_random_dist_matrix( 50, 1 )
+        neighbours = get_neighbour_lists( dist_matrix, 5 )
+        self.assertEqual( neighbours.shape, ( 50, 5 ) )
+        for city in range( 50 ):
+            expected = [ c for c in np.argsort( dist_matrix[ city ] ) if c != city ][ :5 ]
+            self.assertEqual( neighbours[ city ].tolist(), expected )
+        self.assertEqual( get_neighbour_lists( dist_matrix[ :3, :3 ], 5 ).shape, ( 3, 2 ) )
+        self.assertEqual( get_neighbour_lists( dist_matrix, 5, batch_size = 7 ).tolist(),
+                          neighbours.tolist() )
+
+
+    def test_reverse( self ):
+        tour = [ 0, 1, 2, 3, 4, 5 ]
+        position = list( range( 6 ) )
+        reverse( tour, position, 1, 3 )
+        self.assertEqual( tour, [ 0, 3, 2, 1, 4, 5 ] )
+        # wrapping segment: its complement ( 1 .. 2 ) is reversed instead.
+        reverse( tour, position, 3, 0 )
+        self.assertEqual( tour, [ 0, 2, 3, 1, 4, 5 ] )
+        self.assertEqual( [ tour[ p ] for p in position ], list( range( 6 ) ) )
+
+
+    def test_move_segment( self ):
+        tour = [ 0, 1, 2, 3, 4, 5 ]
+        position = list( range( 6 ) )
+        move_segment( tour, position, 1, 2, 4 )
+        self.assertEqual( tour, [ 0, 3, 4, 1, 2, 5 ] )
+        tour, position = [ 0, 1, 2, 3, 4, 5 ], list( range( 6 ) )
+        move_segment( tour, position, 1, 2, 4, reverse = True )
+        self.assertEqual( tour, [ 0, 3, 4, 2, 1, 5 ] )
+
+        # the same cycle as removing the segment and inserting it after the
+        # city, whichever side of the circle is shifted.
+        rng = np.random.default_rng( 5 )
+        for _ in range( 200 ):
+            n = int( rng.integers( 5, 12 ) )
+            tour = rng.permutation( n ).tolist()
+            position = [ 0 ] * n
+            for i, c in enumerate( tour ):
+                position[ c ] = i
+            start, segment_length = int( rng.integers( n ) ), int( rng.integers( 1, 4 ) )
+            segment = [ tour[ ( start + t ) % n ] for t in range( segment_length ) ]
+            after = int( rng.choice( [ c for c in tour if c not in segment ] ) )
+            reverse_segment = bool( rng.integers( 2 ) )
+            rest = [ c for c in tour if c not in segment ]
+            j = rest.index( after ) + 1
+            expected = rest[ :j ] + ( segment[ ::-1 ] if reverse_segment else segment ) + rest[ j: ]
+            move_segment( tour, position, start, segment_length, after, reverse_segment )
+            k = tour.index( expected[0] )
+            self.assertEqual( tour[ k: ] + tour[ :k ], expected )
+            self.assertEqual( [ tour[ p ] for p in position ], list( range( n ) ) )
+
+
+    def test_neighbours( self ):
+        positions = 20 * np.random.default_rng( 1 ).random( ( 50, 2 ) )
+        dist_matrix = ga.get_distance_matrix( dict( enumerate( positions ) ) )
+        self.assertEqual(
+            LocalSearch( dist_matrix, 5, positions = positions ).neighbours,
+            get_neighbour_lists( dist_matrix, 5 ).tolist()
+        )
+        # no dense matrix to search.
+        with self.assertRaises( ValueError ):
+            LocalSearch( OnDemandDistances( positions ) )
+        local_search = LocalSearch( OnDemandDistances( positions ), positions = positions )
+        route, length = local_search.improve( np.arange( 50 ) )
+        self.assertAlmostEqual( length, ga.get_route_length( route, dist_matrix ) )
+
+
+    def test_improve( self ):
+        # a crossing on the unit square is removed.
+        square = { 0: np.array( [ 0., 0. ] ), 1: np.array( [ 1., 1. ] ),
+                   2: np.array( [ 1., 0. ] ), 3: np.array( [ 0., 1. ] ),
+                   4: np.array( [ .5, -1. ] ) }
+        dist_matrix = ga.get_distance_matrix( square )
+        route, length = LocalSearch( dist_matrix, 4 ).improve( [ 0, 1, 2, 3, 4 ] )
+        self.assertAlmostEqual( length, 3 + 2 * np.hypot( .5, 1. ) )
+
+        dist_matrix = get_random_dist_matrix( 300, 2 )
+        route = np.random.default_rng( 3 ).permutation( 300 )
+        for or_opt in ( False, True ):
+            improved, length = LocalSearch( dist_matrix, or_opt = or_opt ).improve( route )
+            self.assertEqual( sorted( improved ), list( range( 300 ) ) )
+            self.assertAlmostEqual( length, ga.get_route_length( improved, dist_matrix ) )
+            self.assertTrue( length < 0.2 * ga.get_route_length( route, dist_matrix ) )
+
+
+    def test_improve_population( self ):
+        dist_matrix = ga.get_distance_matrix( CITY_DICT )
+        lengths = ga.get_population_lengths( POPULATION, dist_matrix ).tolist()
+        routes, new_lengths = LocalSearch( dist_matrix ).improve_population(
+            POPULATION, lengths
+        )
+        self.assertTrue( all( n <= l + 1e-9 for n, l in zip( new_lengths, lengths ) ) )
+        # no time budget, nothing is changed.
+        routes, new_lengths = LocalSearch( dist_matrix, time_budget = 0 ).improve_population(
+            POPULATION, lengths
+        )
+        self.assertEqual( routes, POPULATION )
+        self.assertEqual( new_lengths, lengths )
+
+
+    def test_reproduction_with_lengths( self ):
+        dist_matrix = get_random_dist_matrix( 100, 4 )
+        population = [ np.random.permutation( 100 ) for _ in range( 10 ) ]
+        mating_pool = ga.MatingPool(
+            population, ga.get_population_lengths( population, dist_matrix )
+        )
+        new_population, new_lengths = ga.reproduction_with_lengths(
+            mating_pool, 10, dist_matrix, local_search = LocalSearch( dist_matrix )
+        )
+        self.assertTrue( np.allclose(
+            new_lengths, ga.get_population_lengths( new_population, dist_matrix )
+        ) )
+        self.assertTrue( min( new_lengths ) < mating_pool.get_best_fitness() / 2 )
+
+
+if __name__ == '__main__':
+    unittest.main()
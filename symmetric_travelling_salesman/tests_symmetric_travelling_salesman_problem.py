@@ -0,0 +1,125 @@
+# Genetic algorithms examples - tests.
+# MIT License.
+
+
+import unittest
+import numpy as np
+import symmetric_travelling_salesman_ga as ga
+from symmetric_travelling_salesman_problem import SymmetricTSPProblem
+from symmetric_travelling_salesman_spatial import GridIndex
+from engine import Engine, SteadyStateEngine
+from selection_strategies import get_selection_strategy
+from fitness_cache import DuplicateFilter
+from run_controller import RunController
+
+
+# cities on a circle: the optimal route visits them in angle order.
+NUMBER_OF_CITIES = 12
+ANGLES = 2 * np.pi * np.arange( NUMBER_OF_CITIES ) / NUMBER_OF_CITIES
+POSITIONS = np.column_stack( [ np.cos( ANGLES ), np.sin( ANGLES ) ] ) * 10
+CITY_DICT = dict( zip( range( NUMBER_OF_CITIES ), POSITIONS ) )
+
+
+class TestSymmetricTSPProblem( unittest.TestCase ):
+
+    def setUp( self ):
+        self.dist_matrix = ga.get_distance_matrix( CITY_DICT )
+        self.shortest_length = ga.get_route_length( list( range( NUMBER_OF_CITIES ) ),
+                                                    self.dist_matrix )
+        self.rng = np.random.default_rng( 0 )
+
+
+    def assertRoutes( self, routes ):
+        self.assertTrue( ( np.sort( routes, axis=1 ) == np.arange( NUMBER_OF_CITIES ) ).all() )
+
+
+    def test_operators( self ):
+        neighbours = GridIndex( POSITIONS ).get_neighbour_lists( 2 )
+        for problem in ( SymmetricTSPProblem( self.dist_matrix ),
+                         SymmetricTSPProblem( self.dist_matrix, neighbours ) ):
+            population = problem.get_initial_population( 20, self.rng )
+            self.assertRoutes( population )
+            self.assertTrue( np.allclose(
+                problem.evaluate( population ),
+                [ ga.get_route_length( route, self.dist_matrix ) for route in population ]
+            ) )
+            children = np.empty_like( population[ :10 ] )
+            problem.crossover( population[ :10 ], population[ 10: ], self.rng, children )
+            self.assertRoutes( children )
+            problem.mutate( children, 3, self.rng )
+            self.assertRoutes( children )
+
+        # every city's single neighbour is the next id: one swap always puts
+        # some city c right before c + 1, in a route where none was.
+        problem = SymmetricTSPProblem(
+            self.dist_matrix, ( np.arange( NUMBER_OF_CITIES )[ :, None ] + 1 ) % NUMBER_OF_CITIES
+        )
+        routes = np.tile( np.arange( NUMBER_OF_CITIES ) * 5 % NUMBER_OF_CITIES, ( 50, 1 ) )
+        problem.mutate( routes, 1, self.rng )
+        self.assertRoutes( routes )
+        self.assertTrue( ( ( np.roll( routes, -1, axis=1 ) - routes ) % NUMBER_OF_CITIES == 1 )
+                         .any( axis=1 ).all() )
+
+
+    def test_engine( self ):
+        for selection_strategy in ( None, get_selection_strategy( 'tournament' ) ):
+            engine = Engine( SymmetricTSPProblem( self.dist_matrix ), population_size = 100,
+                             number_of_elites = 2, rng = 1,
+                             selection_strategy = selection_strategy )
+            shortest_length, shortest_route = engine.run(
+                max_generations = 2000, target_fitness = self.shortest_length + 1e-6
+            )
+            self.assertAlmostEqual( shortest_length, self.shortest_length )
+            self.assertEqual( sorted( shortest_route ), list( range( NUMBER_OF_CITIES ) ) )
+
+
+
+    def test_delta_scoring( self ):
+        # the same runs, the children's lengths derived from their parents'
+        # edges instead of scored again.
+        neighbours = GridIndex( POSITIONS ).get_neighbour_lists( 3 )
+        for selection_strategy in ( None, get_selection_strategy( 'rank' ) ):
+            engines = [
+                Engine( SymmetricTSPProblem( self.dist_matrix, neighbours, 0.3, delta_scoring ),
+                        population_size = 30, number_of_elites = 2, number_of_mutations = 2,
+                        rng = 4, selection_strategy = selection_strategy,
+                        duplicate_filter = DuplicateFilter( 'reject', ga.get_route_key ),
+                        controller = RunController( minimize = True, window = 2,
+                                                    max_mutations = 3, restart_after = 5 ) )
+                for delta_scoring in ( False, True )
+            ]
+            for engine in engines:
+                engine.run( max_generations = 40 )
+            full, delta = engines
+            self.assertEqual( delta.population.tolist(), full.population.tolist() )
+            self.assertEqual( delta.fitnesses.tolist(), full.fitnesses.tolist() )
+            self.assertTrue( np.allclose(
+                delta.fitnesses, full.problem.evaluate( delta.population ), rtol=0, atol=1e-9
+            ) )
+            self.assertEqual( delta.scoring_state[0].tolist(),
+                              ga.get_route_edges( delta.population, self.dist_matrix ).tolist() )
+
+        engine = SteadyStateEngine( SymmetricTSPProblem( self.dist_matrix, delta_scoring = True ),
+                                    population_size = 20, number_of_children = 4, rng = 2 )
+        engine.run( max_generations = 50 )
+        self.assertEqual( engine.fitnesses.tolist(),
+                          engine.problem.evaluate( engine.population ).tolist() )
+
+
+    def test_memetic( self ):
+        from symmetric_travelling_salesman_local_search import LocalSearch
+        for memetic in ( 'offspring', 'elites' ):
+            for delta_scoring in ( False, True ):
+                problem = SymmetricTSPProblem(
+                    self.dist_matrix, delta_scoring = delta_scoring,
+                    local_search = LocalSearch( self.dist_matrix, time_budget = 1.0 )
+                )
+                engine = Engine( problem, population_size = 10, rng = 1, memetic = memetic )
+                shortest_length, _ = engine.run( max_generations = 20 )
+                self.assertAlmostEqual( shortest_length, self.shortest_length )
+                self.assertRoutes( engine.population )
+                self.assertTrue( np.allclose( engine.fitnesses, problem.evaluate( engine.population ) ) )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+# Genetic algorithms examples - tests.
+# MIT License.
+
+
+import unittest
+import numpy as np
+import symmetric_travelling_salesman_ga as ga
+from symmetric_travelling_salesman_spatial import GridIndex, get_positions, \
+    get_greedy_route
+from tests_symmetric_travelling_salesman_ga import CITY_DICT
+
+
+def get_distances( points, positions ):
+    return np.hypot( *( points[ :, None ] - positions[ None ] ).transpose( 2, 0, 1 ) )
+
+
+class TestSymmetricTSPSpatial( unittest.TestCase ):
+
+    def setUp( self ):
+        rng = np.random.default_rng( 1 )
+        # uniform cities plus a far away cluster.
+        self.positions = np.concatenate( [
+            20 * rng.random( ( 300, 2 ) ), 500 + rng.random( ( 20, 2 ) )
+        ] )
+        self.points = 40 * rng.random( ( 30, 2 ) ) - 10
+        self.index = GridIndex( self.positions, batch_size = 64 )
+
+
+    def test_get_positions( self ):
+        positions = get_positions( CITY_DICT )
+        self.assertEqual( positions.shape, ( 6, 2 ) )
+        self.assertEqual( positions[ 3 ].tolist(), CITY_DICT[ 3 ].tolist() )
+
+
+    def test_get_neighbour_lists( self ):
+        neighbours = self.index.get_neighbour_lists( 6 )
+        distances = get_distances( self.positions, self.positions )
+        np.fill_diagonal( distances, np.inf )
+        self.assertEqual( neighbours.shape, ( 320, 6 ) )
+        self.assertTrue( np.allclose(
+            np.take_along_axis( distances, neighbours, axis=1 ),
+            np.sort( distances, axis=1 )[ :, :6 ]
+        ) )
+        # no more neighbours than cities.
+        self.assertEqual( GridIndex( self.positions[ :3 ] ).get_neighbour_lists( 6 ).shape, ( 3, 2 ) )
+
+
+    def test_query_knn( self ):
+        neighbours = self.index.query_knn( self.points, 4 )
+        distances = get_distances( self.points, self.positions )
+        self.assertTrue( np.allclose(
+            np.take_along_axis( distances, neighbours, axis=1 ),
+            np.sort( distances, axis=1 )[ :, :4 ]
+        ) )
+
+
+    def test_query_radius( self ):
+        city_ids, offsets = self.index.query_radius( self.points, 2.5 )
+        self.assertEqual( len( offsets ), len( self.points ) + 1 )
+        distances = get_distances( self.points, self.positions )
+        for i in range( len( self.points ) ):
+            found = city_ids[ offsets[ i ]:offsets[ i + 1 ] ]
+            self.assertEqual( sorted( found ), np.flatnonzero( distances[ i ] <= 2.5 ).tolist() )
+            # nearest first.
+            self.assertTrue( ( np.diff( distances[ i, found ] ) >= 0 ).all() )
+
+
+    def test_get_greedy_route( self ):
+        positions = self.positions[ :300 ]
+        route = get_greedy_route( positions, GridIndex( positions ).get_neighbour_lists( 8 ) )
+        self.assertEqual( sorted( route ), list( range( 300 ) ) )
+        dist_matrix = ga.get_distance_matrix( dict( enumerate( positions ) ) )
+        random_route = np.random.default_rng( 2 ).permutation( 300 )
+        self.assertTrue(
+            ga.get_route_length( route, dist_matrix ) <
+            0.2 * ga.get_route_length( random_route, dist_matrix )
+        )
+        self.assertEqual( get_greedy_route( positions[ :2 ], np.zeros( ( 2, 1 ), int ) ).tolist(), [ 0, 1 ] )
+
+
+if __name__ == '__main__':
+    unittest.main()
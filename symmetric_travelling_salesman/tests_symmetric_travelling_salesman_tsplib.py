@@ -0,0 +1,177 @@
+# Genetic algorithms examples - tests.
+# MIT License.
+
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import symmetric_travelling_salesman_ga as ga
+from symmetric_travelling_salesman_distances import CachedDistances
+from symmetric_travelling_salesman_tsplib import load_tsplib, get_cache_path
+import headless_symmetric_travelling_salesman_example as headless
+
+
+BURMA14 = '''NAME: burma14
+TYPE: TSP
+COMMENT: 14-Staedte in Burma (Zaw Win)
+DIMENSION: 14
+EDGE_WEIGHT_TYPE: GEO
+EDGE_WEIGHT_FORMAT: FUNCTION
+DISPLAY_DATA_TYPE: COORD_DISPLAY
+NODE_COORD_SECTION
+   1  16.47       96.10
+   2  16.47       94.44
+   3  20.09       92.54
+   4  22.39       93.37
+   5  25.23       97.24
+   6  22.00       96.05
+   7  20.47       97.02
+   8  17.20       96.29
+   9  16.30       97.38
+  10  14.05       98.12
+  11  16.53       97.38
+  12  21.52       95.59
+  13  19.41       97.13
+  14  20.09       94.55
+EOF
+'''
+# optimal tour, length 3323.
+BURMA14_TOUR = [ 1, 2, 14, 3, 4, 5, 6, 12, 7, 13, 8, 11, 9, 10 ]
+
+SQUARE = '''NAME : square
+TYPE : TSP
+DIMENSION : 4
+EDGE_WEIGHT_TYPE : EUC_2D
+NODE_COORD_SECTION
+2 10.0 0.0
+1 0.0 0.0
+3 10.0 10.4
+4 0.0 10.4
+EOF
+'''
+
+# the same 4 x 4 matrix in several formats.
+MATRIX = np.array( [
+    [ 0, 1, 2, 3 ],
+    [ 1, 0, 4, 5 ],
+    [ 2, 4, 0, 6 ],
+    [ 3, 5, 6, 0 ],
+] )
+EXPLICIT_WEIGHTS = {
+    'FULL_MATRIX': MATRIX.ravel(),
+    'UPPER_ROW': [ 1, 2, 3, 4, 5, 6 ],
+    'LOWER_ROW': [ 1, 2, 4, 3, 5, 6 ],
+    'UPPER_DIAG_ROW': [ 0, 1, 2, 3, 0, 4, 5, 0, 6, 0 ],
+    'LOWER_DIAG_ROW': [ 0, 1, 0, 2, 4, 0, 3, 5, 6, 0 ],
+    'UPPER_COL': [ 1, 2, 4, 3, 5, 6 ],
+    'LOWER_DIAG_COL': [ 0, 1, 2, 3, 0, 4, 5, 0, 6, 0 ],
+}
+
+
+def get_explicit_instance( edge_weight_format, weights ):
+    return '''NAME: explicit
+TYPE: TSP
+DIMENSION: 4
+EDGE_WEIGHT_TYPE: EXPLICIT
+EDGE_WEIGHT_FORMAT: %s
+EDGE_WEIGHT_SECTION
+%s
+EOF
+''' % ( edge_weight_format, ' '.join( str( w ) for w in weights ) )
+
+
+class TestSymmetricTSPTSPLIB( unittest.TestCase ):
+
+    def setUp( self ):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown( self ):
+        shutil.rmtree( self.directory )
+
+    def write( self, name, text ):
+        path = os.path.join( self.directory, name )
+        with open( path, 'w' ) as f:
+            f.write( text )
+        return path
+
+
+    def test_load_euc_2d( self ):
+        path = self.write( 'square.tsp', SQUARE )
+        instance = load_tsplib( path )
+        self.assertEqual( ( instance.name, len( instance ) ), ( 'square', 4 ) )
+        # nodes in id order, whatever the file order.
+        self.assertEqual( instance.coordinates.tolist(),
+                          [ [ 0, 0 ], [ 10, 0 ], [ 10, 10.4 ], [ 0, 10.4 ] ] )
+        distances = instance.get_distances()
+        self.assertEqual( ga.get_route_length( [ 0, 1, 2, 3 ], distances ), 40.0 )
+        self.assertEqual( distances[ 0, 2 ], 14.0 )  # 14.4...
+        self.assertEqual( instance.get_city_dict()[ 2 ].tolist(), [ 10, 10.4 ] )
+
+        # the coordinates are memory-mapped from the cache on the next load.
+        self.assertTrue( os.path.exists( get_cache_path( path ) ) )
+        instance = load_tsplib( path )
+        self.assertIsInstance( instance.coordinates, np.memmap )
+        self.assertEqual( instance.coordinates[ 2 ].tolist(), [ 10, 10.4 ] )
+        # only the header is read then: a body that no longer parses, but
+        # older than the cache, is never reached.
+        modification_time = os.path.getmtime( path )
+        with open( path, 'w' ) as f:
+            f.write( SQUARE.split( 'NODE_COORD_SECTION' )[0] + 'NODE_COORD_SECTION\n1 x\n' )
+        os.utime( path, ( modification_time, modification_time ) )
+        instance = load_tsplib( path )
+        self.assertEqual( ( instance.name, len( instance ) ), ( 'square', 4 ) )
+        self.assertEqual( instance.coordinates[ 2 ].tolist(), [ 10, 10.4 ] )
+        with self.assertRaises( ValueError ):
+            load_tsplib( path, use_cache = False )
+
+
+    def test_load_geo( self ):
+        instance = load_tsplib( self.write( 'burma14.tsp', BURMA14 ) )
+        route = np.array( BURMA14_TOUR ) - 1
+        for mode in ( 'matrix', 'on_demand', 'cached' ):
+            distances = instance.get_distances( mode )
+            self.assertEqual( ga.get_route_length( route, distances ), 3323.0 )
+        self.assertIsInstance( instance.get_distances( 'cached' ), CachedDistances )
+        self.assertEqual( instance.get_distances( 'matrix' ).shape, ( 14, 14 ) )
+        with self.assertRaises( ValueError ):
+            instance.get_distances( 'dict' )
+
+
+    def test_load_explicit( self ):
+        for edge_weight_format, weights in EXPLICIT_WEIGHTS.items():
+            instance = load_tsplib( self.write(
+                'explicit.tsp', get_explicit_instance( edge_weight_format, weights )
+            ) )
+            self.assertEqual(
+                instance.get_distances().tolist(), MATRIX.tolist(), edge_weight_format
+            )
+            self.assertIsNone( instance.coordinates )
+        with self.assertRaises( ValueError ):
+            load_tsplib( self.write(
+                'explicit.tsp', get_explicit_instance( 'UPPER_TRIANGLE', [] )
+            ) )
+
+
+    def test_unsupported( self ):
+        with self.assertRaises( ValueError ):
+            load_tsplib( self.write( 'atsp.tsp', SQUARE.replace( 'TYPE : TSP', 'TYPE : ATSP' ) ) )
+        with self.assertRaises( ValueError ):
+            load_tsplib( self.write( 'man.tsp', SQUARE.replace( 'EUC_2D', 'MAN_2D' ) ) )
+
+
+    def test_headless_run( self ):
+        path = self.write( 'burma14.tsp', BURMA14 )
+        summary = headless.main( [
+            '--tsplib', path, '--distances', 'cached', '--generations', '50',
+            '--neighbour-mutation', '4', '--seed', '1',
+            '--output', os.path.join( self.directory, 'summary.json' )
+        ] )
+        self.assertEqual( summary[ 'number_of_cities' ], 14 )
+        self.assertEqual( sorted( summary[ 'best_individual' ] ), list( range( 14 ) ) )
+        self.assertGreaterEqual( summary[ 'best_fitness' ], 3323.0 )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+# Genetic algorithms examples - operator benchmarks.
+# MIT License.
+
+# Times the word search GA operators (both engines) for word lengths from 10 to
+# 100k characters. See generic_ga/benchmarks.py for the options, e.g.:
+#
+#     python benchmarks_word_search_ga.py --save-baseline baseline.json
+#     python benchmarks_word_search_ga.py --check baseline.json
+
+
+import os, sys
+import numpy as np
+import word_search_ga as ga
+import word_search_batched_ga as batched_ga
+from word_search_problem import WordSearchProblem
+
+sys.path.append(
+    os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), '..', 'generic_ga' )
+)
+from benchmarks import main
+from selection_strategies import get_selection_strategy, SELECTION_STRATEGIES
+from engine import Engine, SteadyStateEngine
+
+
+WORD_LENGTHS = [ 10, 100, 1000, 10000, 100000 ]
+POPULATION_SIZE = 10  # as in main_word_search_example.py.
+
+
+def get_random_word( word_length ):
+    return ga.get_initial_population( 1, word_length )[0]
+
+
+def get_initial_population_case( word_length ):
+    return lambda: ga.get_initial_population( POPULATION_SIZE, word_length )
+
+
+def get_fitness_score_case( word_length ):
+    word, ref = get_random_word( word_length ), get_random_word( word_length )
+    return lambda: ga.get_fitness_score( word, ref )
+
+
+def get_crossover_case( crossover_operator ):
+    def crossover_case( word_length ):
+        words = ( get_random_word( word_length ), get_random_word( word_length ) )
+        return lambda: ga.crossover( words, crossover_operator )
+    return crossover_case
+
+
+def get_mutated_word_case( word_length ):
+    word = get_random_word( word_length )
+    return lambda: ga.get_mutated_word( word, 1 )
+
+
+def selection_case( word_length ):
+    population = ga.get_initial_population( POPULATION_SIZE, word_length )
+    ref = get_random_word( word_length )
+    return lambda: ga.selection( population, ref )
+
+
+def reproduction_case( word_length ):
+    population = ga.get_initial_population( POPULATION_SIZE, word_length )
+    mating_pool = ga.get_mating_pool( population, get_random_word( word_length ) )
+    return lambda: ga.reproduction( mating_pool, POPULATION_SIZE )
+
+
+def batched_get_initial_population_case( word_length ):
+    return lambda: batched_ga.get_initial_population( POPULATION_SIZE, word_length )
+
+
+def batched_get_fitness_scores_case( word_length ):
+    population = batched_ga.get_initial_population( POPULATION_SIZE, word_length )
+    ref = batched_ga.get_initial_population( 1, word_length )[0]
+    return lambda: batched_ga.get_fitness_scores( population, ref )
+
+
+def get_batched_crossover_case( crossover_operator ):
+    def batched_crossover_case( word_length ):
+        words = batched_ga.get_initial_population( 2, word_length )
+        return lambda: batched_ga.crossover(
+            words, POPULATION_SIZE, crossover_operator = crossover_operator
+        )
+    return batched_crossover_case
+
+
+def batched_get_mutated_population_case( word_length ):
+    population = batched_ga.get_initial_population( POPULATION_SIZE, word_length )
+    return lambda: batched_ga.get_mutated_population( population, 1 )
+
+
+def batched_reproduction_case( word_length ):
+    population = batched_ga.get_initial_population( POPULATION_SIZE, word_length )
+    ref = batched_ga.get_initial_population( 1, word_length )[0]
+    scores = batched_ga.selection( population, ref )
+    return lambda: batched_ga.reproduction( population, scores, POPULATION_SIZE )
+
+
+def get_batched_reproduction_with_bitmaps_case( mutation_mode ):
+    # incremental fitness: the same generation as batched_reproduction_case,
+    # scores included.
+    def batched_reproduction_with_bitmaps_case( word_length ):
+        population = batched_ga.get_initial_population( POPULATION_SIZE, word_length )
+        ref = batched_ga.get_initial_population( 1, word_length )[0]
+        bitmaps, counts = batched_ga.get_match_bitmaps( population, ref )
+        return lambda: batched_ga.reproduction_with_bitmaps(
+            population, bitmaps, counts, POPULATION_SIZE, ref,
+            mutation_mode = mutation_mode
+        )
+    return batched_reproduction_with_bitmaps_case
+
+
+def get_batched_reproduction_case( selection_strategy ):
+    # here the size is the population size, words of 32 letters.
+    def batched_reproduction_case( population_size ):
+        population = batched_ga.get_initial_population( population_size, 32 )
+        ref = batched_ga.get_initial_population( 1, 32 )[0]
+        scores = batched_ga.selection( population, ref )
+        strategy = get_selection_strategy( selection_strategy )
+        return lambda: batched_ga.reproduction(
+            population, scores, population_size, selection_strategy = strategy
+        )
+    return batched_reproduction_case
+
+
+def engine_step_case( word_length ):
+    # one generation of the generic engine, see generic_ga/engine.py.
+    engine = Engine(
+        WordSearchProblem( get_random_word( word_length ) ),
+        population_size = POPULATION_SIZE, number_of_elites = 0
+    )
+    engine.initialize()
+    return engine.step
+
+
+
+def steady_state_engine_step_case( word_length ):
+    # two children of the steady-state engine in a population of 1000.
+    engine = SteadyStateEngine(
+        WordSearchProblem( get_random_word( word_length ) ),
+        population_size = 1000, number_of_children = 2
+    )
+    engine.initialize()
+    return engine.step
+
+
+CASES = {
+    'get_initial_population': get_initial_population_case,
+    'get_fitness_score': get_fitness_score_case,
+    'crossover': get_crossover_case( 'random_positions' ),
+    'get_mutated_word': get_mutated_word_case,
+    'selection': selection_case,
+    'reproduction': reproduction_case,
+    'batched.get_initial_population': batched_get_initial_population_case,
+    'batched.get_fitness_scores': batched_get_fitness_scores_case,
+    'batched.crossover': get_batched_crossover_case( 'random_positions' ),
+    'batched.get_mutated_population': batched_get_mutated_population_case,
+    'batched.reproduction': batched_reproduction_case,
+    'batched.reproduction_with_bitmaps':
+        get_batched_reproduction_with_bitmaps_case( 'uniform' ),
+    'batched.reproduction_with_bitmaps.mismatch':
+        get_batched_reproduction_with_bitmaps_case( 'mismatch' ),
+    'engine.step': engine_step_case,
+    'steady_state_engine.step': steady_state_engine_step_case,
+}
+# the other crossover operators.
+for crossover_operator in ( 'single_point', 'even_uniform', 'odd_uniform' ):
+    CASES[ 'crossover.' + crossover_operator ] = \
+        get_crossover_case( crossover_operator )
+    CASES[ 'batched.crossover.' + crossover_operator ] = \
+        get_batched_crossover_case( crossover_operator )
+# every child from its own parents, see generic_ga/selection_strategies.py.
+for selection_strategy in SELECTION_STRATEGIES:
+    CASES[ 'batched.reproduction.' + selection_strategy ] = \
+        get_batched_reproduction_case( selection_strategy )
+
+
+if __name__ == '__main__':
+    sys.exit( main( CASES, WORD_LENGTHS, 'word search GA operator benchmarks.' ) )
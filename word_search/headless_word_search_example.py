@@ -0,0 +1,384 @@
+# Genetic algorithms examples - headless batch runner.
+# MIT License.
+
+# Runs the word search GA without any UI, as fast as the CPU allows, and writes
+# a compact JSON summary. matplotlib is never imported here.
+#
+#   e.g.:  python -m headless_word_search_example --population-size 10000 \
+#              --word supercalifragilisticexpialidocious --seed 1
+#
+# Each distinct word scored once (LRU cache of 100000 scores) and no duplicate
+# children:
+#   e.g.:  python -m headless_word_search_example --fitness-cache 100000 \
+#              --unique-children resample
+#
+# Large populations, every child from its own tournament-selected parents:
+#   e.g.:  python -m headless_word_search_example --population-size 10000 \
+#              --selection tournament --tournament-size 3
+#
+# Checkpoints every 1000 generations, and resume from the last checkpoint if
+# there is one; the resumed run continues bit-for-bit:
+#   e.g.:  python -m headless_word_search_example --population-size 100000 \
+#              --checkpoint run.npz --checkpoint-every 1000 --resume
+#
+# The best-so-far word within 10 seconds, with up to 4 mutated letters per
+# child during plateaus (see generic_ga/run_controller.py):
+#   e.g.:  python -m headless_word_search_example --population-size 1000 \
+#              --time-budget 10 --max-mutations 4 --restart-after 500
+#
+# Very long target words: the children's scores are updated from their
+# parents' match bitmaps instead of being recomputed, and the mutations only
+# hit mismatching letters:
+#   e.g.:  python -m headless_word_search_example --word-file long_word.txt \
+#              --incremental-fitness --mutation mismatch
+
+
+import argparse
+import json
+import logging
+import os, sys
+import time
+import word_search_batched_ga as ga
+from word_search_ga import CROSSOVERS
+from word_search_problem import WordSearchProblem
+
+sys.path.append(
+    os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), '..', 'generic_ga' )
+)
+from instrumentation import Instrumentation, JsonLinesExporter
+from fitness_evaluators import VectorizedEvaluator
+from fitness_cache import CachedEvaluator, DuplicateFilter, DUPLICATE_POLICIES
+from selection_strategies import get_selection_strategy, SELECTION_STRATEGIES
+from run_history import RunHistoryRecorder
+from checkpoint import Checkpointer, load_checkpoint
+from engine import Engine, SteadyStateEngine
+from run_controller import RunController
+from multi_run import CurveRecorder
+
+
+REF_WORD = 'supercalifragilisticexpialidocious'
+
+
+def run( ref_word, population_size = 10, max_generations = None,
+         target_fitness = 1.0, seed = None, instrumentation = None,
+         recorder = None, crossover_operator = 'random_positions',
+         evaluator = None, duplicate_filter = None, selection_strategy = None,
+         checkpointer = None, resume_from = None, controller = None,
+         incremental_fitness = False, mutation_mode = 'uniform',
+         number_of_mutations = 1, crossover_fraction = 0.5, number_of_elites = 1,
+         steady_state = False, number_of_children = 2, tournament_size = 2 ):
+
+    # the generation loop is generic_ga/engine.py's, on a WordSearchProblem;
+    # the recorder and the checkpointer are engine hooks.
+    # checkpointer: a generic_ga/checkpoint.py Checkpointer, resume_from: the
+    # ( arrays, metadata ) of one of its checkpoints.
+    # controller: a generic_ga/run_controller.py RunController, adapting the
+    # number of mutations, reseeding and stopping the run; the best-so-far
+    # word is returned, even if the last population lost it.
+    # incremental_fitness: the engine's delta scoring, the words carry their
+    # match bitmaps (see word_search_problem.py), the evaluator is then not
+    # used. mutation_mode 'mismatch' needs it.
+    # number_of_mutations: mutated letters per child without a controller.
+    # crossover_fraction: see word_search_batched_ga.get_crossover_mask().
+    # number_of_elites: the fittest words kept from one generation to the
+    # next.
+    # steady_state: a generic_ga/engine.py SteadyStateEngine, each step
+    # breeds number_of_children children (parents: tournaments of
+    # tournament_size words, or selection_strategy), each replacing the
+    # worst word unless it is worse; number_of_elites is then unused.
+    problem = WordSearchProblem(
+        ref_word, crossover_operator, crossover_fraction, incremental_fitness,
+        mutation_mode, None if incremental_fitness else evaluator
+    )
+    if steady_state:
+        engine = SteadyStateEngine(
+            problem, population_size, number_of_children, selection_strategy,
+            tournament_size, number_of_mutations, seed, instrumentation, controller,
+            duplicate_filter
+        )
+    else:
+        engine = Engine(
+            problem, population_size, number_of_elites, selection_strategy,
+            number_of_mutations, seed, instrumentation, controller, duplicate_filter
+        )
+
+    start_time = time.perf_counter()
+    previous_elapsed_time = 0.0
+    if resume_from is None:
+        engine.initialize()
+    else:
+        arrays, metadata = resume_from
+        if metadata[ 'ref_word' ] != ref_word or \
+                metadata[ 'population_size' ] != population_size or \
+                metadata.get( 'steady_state', False ) != steady_state:
+            raise ValueError( 'checkpoint of another problem: %s' % metadata )
+        engine.set_state( arrays, metadata )
+        previous_elapsed_time = metadata[ 'elapsed_time' ]
+    if controller is not None:
+        controller.start( previous_elapsed_time )
+
+    def get_checkpoint():
+        arrays, metadata = engine.get_state()
+        metadata.update( {
+            'problem': 'word_search',
+            'seed': seed,
+            'population_size': population_size,
+            'ref_word': ref_word,
+            'steady_state': steady_state,
+            'elapsed_time': previous_elapsed_time + time.perf_counter() - start_time,
+            # where the --history file is cut back to on resume.
+            'history': recorder.get_state() if recorder is not None else None,
+        } )
+        return arrays, metadata
+
+    if recorder is not None:
+        def record( engine ):
+            best_id = engine.get_best_id()
+            recorder.record( engine.generation, engine.fitnesses[ best_id ],
+                             engine.population[ best_id ], engine.fitnesses )
+        engine.add_hook( 'generation', record )
+    if checkpointer is not None:
+        engine.add_hook( 'generation', lambda engine: checkpointer.maybe_save(
+            engine.generation, get_checkpoint ) )
+
+    best_fitness, best_word = engine.run( max_generations, target_fitness )
+
+    if checkpointer is not None:
+        checkpointer.maybe_save( engine.generation, get_checkpoint, force = True )
+    elapsed_time = previous_elapsed_time + time.perf_counter() - start_time
+    t = engine.generation
+
+    return {
+        'problem': 'word_search',
+        'seed': seed,
+        'population_size': population_size,
+        'word_length': len( ref_word ),
+        'crossover_operator': crossover_operator,
+        'unique_children': duplicate_filter.policy if duplicate_filter is not None else None,
+        'selection_strategy': selection_strategy.name if selection_strategy else None,
+        'incremental_fitness': incremental_fitness,
+        'mutation_mode': mutation_mode,
+        'number_of_elites': number_of_elites,
+        'steady_state': steady_state,
+        'number_of_children': engine.number_of_children,
+        'generations': t,
+        'restarts': controller.number_of_restarts if controller is not None else None,
+        'timed_out': controller is not None and controller.is_out_of_time(),
+        'converged': bool( best_fitness >= target_fitness ),
+        'best_fitness': float( best_fitness ),
+        'best_individual': best_word,
+        'elapsed_time': round( elapsed_time, 6 ),
+        'generations_per_second': round( t / elapsed_time, 3 ) if t else None,
+    }
+
+
+def get_argument_parser():
+    parser = argparse.ArgumentParser( description='headless word search GA.' )
+    words = parser.add_mutually_exclusive_group()
+    words.add_argument( '--word', default=REF_WORD, help='target word.' )
+    words.add_argument( '--word-file', help='read the target word from a file.' )
+    parser.add_argument( '--population-size', type=int, default=10 )
+    parser.add_argument( '--mutations', type=int, default=1,
+                         help='mutated letters per child.' )
+    parser.add_argument( '--crossover-fraction', type=float, default=0.5,
+                         help='share of the child\'s letters from the first parent.' )
+    parser.add_argument( '--elites', type=int, default=1, metavar='K',
+                         help='keep the K fittest words (0: no elitism).' )
+    parser.add_argument( '--steady-state', action='store_true',
+                         help='each step breeds --children children, each replacing '
+                         'the worst word (--elites unused).' )
+    parser.add_argument( '--children', type=int, default=2, metavar='N',
+                         help='children per steady-state step.' )
+    parser.add_argument( '--generations', type=int, default=None,
+                         help='max number of generations (default: no limit).' )
+    parser.add_argument( '--target-fitness', type=float, default=1.0 )
+    parser.add_argument( '--crossover', default='random_positions',
+                         choices=sorted( CROSSOVERS ) )
+    parser.add_argument( '--fitness-cache', type=int, default=0, metavar='N',
+                         help='cache the scores of the N most recent words.' )
+    parser.add_argument( '--unique-children', choices=DUPLICATE_POLICIES,
+                         help='reject or breed again the duplicate children.' )
+    parser.add_argument( '--incremental-fitness', action='store_true',
+                         help='update the scores from the parents\' match bitmaps '
+                         '(very long words).' )
+    parser.add_argument( '--mutation', default='uniform', choices=ga.MUTATION_MODES,
+                         help='mutated letters: anywhere, or only mismatching ones '
+                         '(implies --incremental-fitness).' )
+    parser.add_argument( '--selection', choices=sorted( SELECTION_STRATEGIES ),
+                         help='parents of every child (default: the two fittest).' )
+    parser.add_argument( '--tournament-size', type=int, default=2 )
+    parser.add_argument( '--rank-pressure', type=float, default=1.5,
+                         help='1 (uniform) to 2 (linear ranking).' )
+    parser.add_argument( '--truncation-proportion', type=float, default=0.2 )
+    parser.add_argument( '--seed', type=int, default=None )
+    parser.add_argument( '--output', help='JSON summary path (default: stdout).' )
+    parser.add_argument( '--metrics', help='per-generation metrics (JSON lines) path.' )
+    parser.add_argument( '--metrics-every', type=int, default=1,
+                         help='only measure every Nth generation.' )
+    parser.add_argument( '--operator-sample-every', type=int, default=1,
+                         help='only time every Nth crossover/mutation call.' )
+    parser.add_argument( '--log-level', default='WARNING',
+                         choices=( 'DEBUG', 'INFO', 'WARNING', 'ERROR' ) )
+    parser.add_argument( '--history', help='binary run history path, see '
+                         'generic_ga/run_history.py.' )
+    parser.add_argument( '--time-budget', type=float, default=None, metavar='SECONDS',
+                         help='stop with the best-so-far word after SECONDS seconds.' )
+    parser.add_argument( '--stagnation-window', type=int, default=50, metavar='N',
+                         help='no progress over N generations is a plateau.' )
+    parser.add_argument( '--max-mutations', type=int, default=1,
+                         help='raise the mutated letters per child up to this during plateaus.' )
+    parser.add_argument( '--restart-after', type=int, default=None, metavar='N',
+                         help='reseed the population after N generations without progress.' )
+    parser.add_argument( '--reseed-proportion', type=float, default=0.5,
+                         help='proportion of the population reseeded by a restart.' )
+    parser.add_argument( '--patience', type=int, default=None, metavar='N',
+                         help='stop after N generations without progress.' )
+    parser.add_argument( '--checkpoint', help='checkpoint (.npz) path, see '
+                         'generic_ga/checkpoint.py.' )
+    parser.add_argument( '--checkpoint-every', type=int, default=None, metavar='N',
+                         help='checkpoint every N generations.' )
+    parser.add_argument( '--checkpoint-interval', type=float, default=None,
+                         metavar='SECONDS', help='checkpoint every SECONDS seconds.' )
+    parser.add_argument( '--resume', action='store_true',
+                         help='continue from the checkpoint, if it exists.' )
+    return parser
+
+
+def main( argv = None, recorder = None ):
+    # recorder: e.g. a generic_ga/multi_run.py CurveRecorder, instead of the
+    # --history one.
+    parser = get_argument_parser()
+    args = parser.parse_args( argv )
+    if args.resume and not args.checkpoint:
+        parser.error( '--resume needs --checkpoint' )
+    if args.steady_state and not 0 < args.children < args.population_size:
+        parser.error( '--children must be between 1 and --population-size - 1' )
+    incremental_fitness = args.incremental_fitness or args.mutation != 'uniform'
+    if incremental_fitness and args.fitness_cache:
+        parser.error( '--incremental-fitness does not score the children again, '
+                      'no --fitness-cache' )
+    logging.basicConfig( level = args.log_level )
+    instrumentation = None
+    if args.metrics:
+        instrumentation = Instrumentation(
+            exporters = [ JsonLinesExporter( args.metrics ) ],
+            sample_every = args.metrics_every,
+            operator_sample_every = args.operator_sample_every
+        )
+
+    ref_word = args.word
+    if args.word_file:
+        with open( args.word_file ) as f:
+            ref_word = f.read().strip()
+    resume_from = None
+    if args.resume and os.path.exists( args.checkpoint ):
+        resume_from = load_checkpoint( args.checkpoint )
+    if recorder is None and args.history:
+        # the best words are recorded as their uint8 letter codes; a resumed
+        # run appends to the history of the interrupted one.
+        recorder = RunHistoryRecorder(
+            args.history, len( ref_word ), dtype = 'u1', metadata = {
+                'problem': 'word_search',
+                'seed': args.seed,
+                'population_size': args.population_size,
+            },
+            resume_state = resume_from[1].get( 'history' ) if resume_from is not None else None
+        )
+
+    evaluator = None
+    if args.fitness_cache:
+        evaluator = CachedEvaluator(
+            VectorizedEvaluator(
+                ga.get_fitness_scores, { 'encoded_ref': ga.encode_word( ref_word ) }
+            ),
+            max_entries = args.fitness_cache
+        )
+    selection_strategy = None
+    if args.selection:
+        selection_strategy = get_selection_strategy( args.selection, **{
+            'tournament': { 'tournament_size': args.tournament_size },
+            'rank': { 'pressure': args.rank_pressure },
+            'truncation': { 'proportion': args.truncation_proportion },
+        }.get( args.selection, {} ) )
+    duplicate_filter = None
+    if args.unique_children:
+        duplicate_filter = DuplicateFilter( args.unique_children )
+    controller = None
+    if args.time_budget is not None or args.max_mutations > args.mutations or \
+            args.restart_after is not None or args.patience is not None:
+        controller = RunController(
+            window = args.stagnation_window,
+            min_mutations = args.mutations,
+            max_mutations = max( args.max_mutations, args.mutations ),
+            restart_after = args.restart_after,
+            reseed_proportion = args.reseed_proportion,
+            patience = args.patience,
+            time_budget = args.time_budget
+        )
+    checkpointer = None
+    if args.checkpoint:
+        checkpointer = Checkpointer(
+            args.checkpoint, args.checkpoint_every, args.checkpoint_interval
+        )
+
+    summary = run(
+        ref_word,
+        population_size = args.population_size,
+        max_generations = args.generations,
+        target_fitness = args.target_fitness,
+        seed = args.seed,
+        instrumentation = instrumentation,
+        recorder = recorder,
+        crossover_operator = args.crossover,
+        evaluator = evaluator,
+        duplicate_filter = duplicate_filter,
+        selection_strategy = selection_strategy,
+        checkpointer = checkpointer,
+        resume_from = resume_from,
+        controller = controller,
+        incremental_fitness = incremental_fitness,
+        mutation_mode = args.mutation,
+        number_of_mutations = args.mutations,
+        crossover_fraction = args.crossover_fraction,
+        number_of_elites = args.elites,
+        steady_state = args.steady_state,
+        number_of_children = args.children,
+        tournament_size = args.tournament_size
+    )
+    if checkpointer is not None:
+        checkpointer.close()
+        summary[ 'resumed_from_generation' ] = \
+            resume_from[1][ 'generation' ] if resume_from is not None else None
+    if evaluator is not None:
+        summary[ 'fitness_cache_hits' ] = evaluator.cache.hits
+        summary[ 'fitness_cache_misses' ] = evaluator.cache.misses
+        evaluator.close()
+    if instrumentation is not None:
+        instrumentation.close()
+    if recorder is not None:
+        recorder.close()
+    # keep the summary compact for very long target words.
+    summary[ 'best_individual' ] = summary[ 'best_individual' ][ :1000 ]
+
+    if args.output:
+        with open( args.output, 'w' ) as f:
+            json.dump( summary, f )
+    else:
+        json.dump( summary, sys.stdout )
+        sys.stdout.write( '\n' )
+
+    return summary
+
+
+def run_trial( options, seed ):
+    # one run of the generic_ga/multi_run.py harness: options are this
+    # runner's command line options, without --seed.
+    recorder = CurveRecorder()
+    summary = main( list( options ) + [ '--seed', str( seed ), '--output', os.devnull ],
+                    recorder )
+    summary[ 'curve' ] = recorder.curve
+    return summary
+
+
+if __name__ == '__main__':
+    main()
@@ -2,28 +2,57 @@
 # MIT License.
 
 
+import argparse
+import os, sys
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.animation as anim
-import word_search_ga as ga
+from word_search_problem import WordSearchProblem
 
-
-REF_WORD = 'supercalifragilisticexpialidocious'
+sys.path.append(
+    os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), '..', 'generic_ga' )
+)
+from engine import Engine, SteadyStateEngine
 
 
-population  = ga.get_initial_population( 10, len( REF_WORD ) )
-mating_pool = ga.selection( population, REF_WORD )
+REF_WORD = 'supercalifragilisticexpialidocious'
+# one of CROSSOVERS: random_positions, single_point, even_uniform, odd_uniform.
+CROSSOVER_OPERATOR = 'random_positions'
+
+
+# --steady-state: each step breeds --children children from tournament-
+# selected words, each replacing the worst word unless it is worse.
+parser = argparse.ArgumentParser( description='word search GA example.' )
+parser.add_argument( '--steady-state', action='store_true',
+                     help='replace the worst words in place instead of whole generations.' )
+parser.add_argument( '--children', type=int, default=2, metavar='N',
+                     help='children per steady-state step (1 to 9).' )
+ARGS = parser.parse_args()
+if not 0 < ARGS.children < 10:
+    parser.error( '--children must be between 1 and 9' )
+
+# the generation loop is the generic engine's (see generic_ga/engine.py): 10
+# children per generation, all bred from the two fittest words, no elitism.
+if ARGS.steady_state:
+    engine = SteadyStateEngine(
+        WordSearchProblem( REF_WORD, CROSSOVER_OPERATOR ),
+        population_size = 10, number_of_children = ARGS.children
+    )
+else:
+    engine = Engine(
+        WordSearchProblem( REF_WORD, CROSSOVER_OPERATOR ),
+        population_size = 10, number_of_elites = 0
+    )
+engine.initialize()
 
 
 def data_gen( t = 0 ):
-    global mating_pool
-    while max( mating_pool.keys() ) < 1.0:
-        population = ga.reproduction( mating_pool, 10 );
-        mating_pool = ga.selection( population, REF_WORD );
-        #print max(mating_pool.keys())
+    while engine.fitnesses.max() < 1.0:
+        engine.step()
+        #print engine.fitnesses.max()
 
         t += 1
-        yield t, max( mating_pool.keys() )
+        yield t, engine.fitnesses.max()
 
 
 def init():
@@ -0,0 +1,22 @@
+# Genetic algorithms examples - multi-run statistics runner.
+# MIT License.
+
+# Independent seeded runs of the headless word search GA, their distributions
+# of time to target and their comparison, see generic_ga/multi_run.py.
+#
+#   e.g.:  python multi_run_word_search_example.py --runs 30 --seed 1 \
+#              --configuration two_fittest "--population-size 100" \
+#              --configuration tournament "--population-size 100 --selection tournament"
+
+
+import os, sys
+import headless_word_search_example as headless
+
+sys.path.append(
+    os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), '..', 'generic_ga' )
+)
+from multi_run import main
+
+
+if __name__ == '__main__':
+    main( headless.run_trial, 'word search GA multi-run statistics.' )
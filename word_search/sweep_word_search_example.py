@@ -0,0 +1,22 @@
+# Genetic algorithms examples - hyperparameter sweep runner.
+# MIT License.
+
+# Successive halving over the headless word search GA's options, see
+# generic_ga/sweep.py.
+#
+#   e.g.:  python sweep_word_search_example.py --cache sweep.jsonl --seed 1 \
+#              --space '{"population-size": [10, 100, 1000], "mutations": [1, 2], "elites": [0, 2]}' \
+#              --min-budget 30 --max-budget 810
+
+
+import os, sys
+import headless_word_search_example as headless
+
+sys.path.append(
+    os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), '..', 'generic_ga' )
+)
+from sweep import main
+
+
+if __name__ == '__main__':
+    main( headless.run_trial, 'word search GA hyperparameter sweep.' )
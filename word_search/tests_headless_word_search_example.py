@@ -0,0 +1,143 @@
+# Genetic algorithms examples - tests.
+# MIT License.
+
+
+import os
+import shutil
+import tempfile
+import unittest
+import headless_word_search_example as headless
+from checkpoint import load_checkpoint
+from run_history import RunHistory
+
+
+class TestHeadlessWordSearchExample( unittest.TestCase ):
+
+    def setUp( self ):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown( self ):
+        shutil.rmtree( self.directory )
+
+    def run_headless( self, name, *options ):
+        return headless.main( [
+            '--word', 'resumable', '--population-size', '50',
+            '--selection', 'rank', '--unique-children', 'resample',
+            '--stagnation-window', '2', '--max-mutations', '3', '--restart-after', '4',
+            '--checkpoint', os.path.join( self.directory, name ),
+            '--output', os.path.join( self.directory, 'summary.json' ),
+        ] + list( options ) )
+
+
+    def test_resume( self ):
+        uninterrupted = self.run_headless( 'uninterrupted.npz', '--seed', '5',
+                                           '--generations', '40' )
+        self.run_headless( 'run.npz', '--seed', '5', '--generations', '15',
+                           '--checkpoint-every', '5' )
+        resumed = self.run_headless( 'run.npz', '--seed', '5', '--generations', '40',
+                                     '--resume' )
+        self.assertEqual( resumed[ 'resumed_from_generation' ], 15 )
+
+        for key in ( 'generations', 'best_fitness', 'best_individual' ):
+            self.assertEqual( resumed[ key ], uninterrupted[ key ], key )
+        arrays, metadata = load_checkpoint( os.path.join( self.directory, 'run.npz' ) )
+        expected_arrays, expected_metadata = load_checkpoint(
+            os.path.join( self.directory, 'uninterrupted.npz' )
+        )
+        self.assertEqual( metadata[ 'rng' ], expected_metadata[ 'rng' ] )
+        for name in ( 'population', 'fitnesses', 'best_individual' ):
+            self.assertEqual( arrays[ name ].tolist(), expected_arrays[ name ].tolist() )
+
+        with self.assertRaises( ValueError ):
+            self.run_headless( 'run.npz', '--word', 'another', '--generations', '40',
+                               '--resume' )
+
+
+    def test_resume_history( self ):
+        def get_path( name ):
+            return os.path.join( self.directory, name )
+
+        self.run_headless( 'uninterrupted.npz', '--seed', '5', '--generations', '40',
+                           '--history', get_path( 'uninterrupted.gahist' ) )
+        self.run_headless( 'run.npz', '--seed', '5', '--generations', '15',
+                           '--history', get_path( 'run.gahist' ) )
+        shutil.copy( get_path( 'run.npz' ), get_path( 'generation_15.npz' ) )
+        # killed after recording generations 16 to 18, but before their
+        # checkpoint: they are recorded again by the resumed run.
+        self.run_headless( 'run.npz', '--seed', '5', '--generations', '18',
+                           '--history', get_path( 'run.gahist' ), '--resume' )
+        shutil.copy( get_path( 'generation_15.npz' ), get_path( 'run.npz' ) )
+        self.run_headless( 'run.npz', '--seed', '5', '--generations', '40',
+                           '--history', get_path( 'run.gahist' ), '--resume' )
+
+        records = RunHistory( get_path( 'run.gahist' ) ).get_records()
+        expected_records = RunHistory( get_path( 'uninterrupted.gahist' ) ).get_records()
+        self.assertEqual( records[ 'generation' ].tolist(), list( range( 1, 41 ) ) )
+        self.assertEqual( records[ 'best' ].tolist(), expected_records[ 'best' ].tolist() )
+
+
+    def test_time_budget( self ):
+        summary = self.run_headless( 'run.npz', '--word', 'x' * 500, '--seed', '1',
+                                     '--time-budget', '0.2' )
+        self.assertTrue( summary[ 'timed_out' ] )
+        self.assertFalse( summary[ 'converged' ] )
+        self.assertLess( summary[ 'elapsed_time' ], 1.0 )
+        # the best-so-far word.
+        self.assertEqual( summary[ 'best_fitness' ],
+                          summary[ 'best_individual' ].count( 'x' ) / 500.0 )
+
+
+    def test_incremental_fitness( self ):
+        options = [ '--word', 'incremental' * 10, '--population-size', '20',
+                    '--seed', '3', '--generations', '300',
+                    '--output', os.path.join( self.directory, 'summary.json' ) ]
+        full = headless.main( options )
+        incremental = headless.main( options + [ '--incremental-fitness' ] )
+        # the same run, without scoring the children again.
+        for key in ( 'generations', 'best_fitness', 'best_individual' ):
+            self.assertEqual( incremental[ key ], full[ key ], key )
+        mismatch = headless.main( options + [ '--mutation', 'mismatch' ] )
+        self.assertTrue( mismatch[ 'incremental_fitness' ] )
+        self.assertGreater( mismatch[ 'best_fitness' ], full[ 'best_fitness' ] )
+        with self.assertRaises( SystemExit ):
+            headless.main( options + [ '--incremental-fitness', '--fitness-cache', '10' ] )
+
+
+    def test_run_trial( self ):
+        options = [ '--word', 'trial', '--population-size', '20' ]
+        trials = [ headless.run_trial( options, seed ) for seed in ( 1, 1, 2 ) ]
+        self.assertEqual( trials[0][ 'generations' ], trials[1][ 'generations' ] )
+        self.assertEqual( [ trial[ 'seed' ] for trial in trials ], [ 1, 1, 2 ] )
+        for trial in trials:
+            self.assertTrue( trial[ 'converged' ] )
+            self.assertEqual( trial[ 'curve' ][ -1 ][1:], ( trial[ 'generations' ], 1.0 ) )
+
+
+    def test_elites( self ):
+        for options in ( [], [ '--incremental-fitness' ] ):
+            trial = headless.run_trial( [
+                '--word', 'elitism' * 5, '--population-size', '20', '--elites', '2',
+                '--mutations', '2', '--crossover-fraction', '0.3', '--generations', '100'
+            ] + options, 1 )
+            # the best word is never lost.
+            fitnesses = [ point[2] for point in trial[ 'curve' ] ]
+            self.assertEqual( fitnesses, sorted( fitnesses ) )
+
+
+    def test_steady_state( self ):
+        for options in ( [], [ '--incremental-fitness' ] ):
+            trial = headless.run_trial( [
+                '--word', 'steady', '--population-size', '20', '--steady-state',
+                '--children', '4', '--tournament-size', '3'
+            ] + options, 1 )
+            self.assertTrue( trial[ 'converged' ] )
+            self.assertTrue( trial[ 'steady_state' ] )
+            # the best word is never replaced.
+            fitnesses = [ point[2] for point in trial[ 'curve' ] ]
+            self.assertEqual( fitnesses, sorted( fitnesses ) )
+        with self.assertRaises( SystemExit ):
+            headless.main( [ '--population-size', '20', '--steady-state', '--children', '20' ] )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,225 @@
+# Genetic algorithms examples - tests.
+# MIT License.
+
+
+import unittest
+import os, sys
+import numpy as np
+import word_search_ga
+from word_search_batched_ga import encode_word, decode_population, \
+    get_initial_population, get_fitness_scores, crossover, \
+    get_mutated_population, get_two_fittest_individuals, reproduction, \
+    selection, select_parents, get_reseeded_population, get_match_bitmaps, \
+    get_mismatch_positions, reproduction_with_bitmaps
+
+sys.path.append(
+    os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), '..', 'generic_ga' )
+)
+from fitness_evaluators import get_evaluator
+from fitness_cache import CachedEvaluator, DuplicateFilter
+from selection_strategies import get_selection_strategy, SELECTION_STRATEGIES
+
+
+
+class TestWordSearchBatchedGA( unittest.TestCase ):
+
+
+    def test_encode_decode( self ):
+        population = np.array( [ encode_word( 'qwerty' ), encode_word( 'abc' * 2 ) ] )
+        self.assertEqual( decode_population( population ), [ 'qwerty', 'abcabc' ] )
+
+
+    def test_get_initial_population( self ):
+        population = get_initial_population( 50, 12, np.random.default_rng( 0 ) )
+        self.assertEqual( population.shape, ( 50, 12 ) )
+        self.assertEqual( population.dtype, np.uint8 )
+        self.assertTrue( ( population >= 97 ).all() and ( population <= 122 ).all() )
+
+
+    def test_get_fitness_scores( self ):
+        population = np.array( [ encode_word( 'qwerty' ), encode_word( 'queens' ) ] )
+        self.assertEqual(
+            list( get_fitness_scores( population, encode_word( 'queens' ) ) ),
+            [ 1/3.0, 1.0 ]
+        )
+
+
+    def test_get_fitness_scores_different_lengths( self ):
+        with self.assertRaises( AssertionError ) as ctx:
+            get_fitness_scores(
+                np.array( [ encode_word( 'evolution' ) ] ), encode_word( 'queens' )
+            )
+
+
+    def test_crossover( self ):
+        # every child takes exactly half of its cells from word_1.
+        word_1 = encode_word( 'aaaaaaaaa' )
+        word_2 = encode_word( 'zzzzzzzzz' )
+        children = crossover(
+            ( word_1, word_2 ), 10000, np.random.default_rng( 1 )
+        )
+        self.assertEqual( children.shape, ( 10000, 9 ) )
+        self.assertTrue( ( ( children == ord( 'a' ) ).sum( axis=1 ) == 4 ).all() )
+        self.assertTrue( ( ( children == ord( 'z' ) ).sum( axis=1 ) == 5 ).all() )
+
+
+    def test_crossover_operators( self ):
+        # same children as the scalar operators.
+        two_words = ( 'abcdefg', 'rstuvwx' )
+        for crossover_operator in ( 'single_point', 'even_uniform', 'odd_uniform' ):
+            children = crossover(
+                [ encode_word( word ) for word in two_words ], 3,
+                crossover_operator = crossover_operator
+            )
+            self.assertEqual(
+                decode_population( children ),
+                [ word_search_ga.crossover( two_words, crossover_operator ) ] * 3
+            )
+        with self.assertRaises( ValueError ):
+            crossover( [ encode_word( word ) for word in two_words ], 3,
+                       crossover_operator = 'two_points' )
+
+        # a quarter of the letters from the first word.
+        two_words = [ np.zeros( 100, dtype=np.uint8 ), np.ones( 100, dtype=np.uint8 ) ]
+        for crossover_operator in ( 'random_positions', 'single_point' ):
+            children = crossover( two_words, 5, np.random.default_rng( 1 ),
+                                  crossover_operator, crossover_fraction = 0.25 )
+            self.assertEqual( ( children == 0 ).sum( axis=1 ).tolist(), [ 25 ] * 5 )
+
+
+    def test_get_mutated_population( self ):
+        rng = np.random.default_rng( 2 )
+        for number_of_mutations in ( 1, 3 ):
+            population = np.tile( encode_word( 'abcdefgzy' ), ( 10000, 1 ) )
+            mutated = get_mutated_population(
+                population.copy(), number_of_mutations, rng
+            )
+            changed_cells = ( mutated != population ).sum( axis=1 )
+            self.assertTrue( ( changed_cells <= number_of_mutations ).all() )
+
+
+    def test_get_two_fittest_individuals( self ):
+        population = np.array( [
+            encode_word( w ) for w in [ 'vfwpcyze', 'svvdlsof', 'ebjvywaz' ]
+        ] )
+        scores = np.array( [ 0.0, 0.125, 0.125 ] )
+        self.assertEqual(
+            sorted( decode_population( get_two_fittest_individuals( population, scores ) ) ),
+            sorted( [ 'svvdlsof', 'ebjvywaz' ] )
+        )
+
+
+    def test_reproduction( self ):
+        rng = np.random.default_rng( 3 )
+        population = get_initial_population( 20, 16, rng )
+        scores = get_fitness_scores( population, encode_word( 'abcdefghijklmnop' ) )
+        new_population = reproduction( population, scores, 30, rng )
+        self.assertEqual( new_population.shape, ( 30, 16 ) )
+        # up to every letter mutated.
+        for number_of_mutations in ( 4, 100 ):
+            new_population = reproduction(
+                population, scores, 30, rng, number_of_mutations = number_of_mutations
+            )
+            self.assertEqual( new_population.shape, ( 30, 16 ) )
+
+
+    def test_get_reseeded_population( self ):
+        rng = np.random.default_rng( 3 )
+        population = get_initial_population( 20, 16, rng )
+        scores = get_fitness_scores( population, encode_word( 'abcdefghijklmnop' ) )
+        new_population = get_reseeded_population( population, scores, 1.0, rng )
+        self.assertEqual( new_population.shape, ( 20, 16 ) )
+        # one of the fittest words is kept, the population itself is left
+        # untouched.
+        kept = ( new_population == population ).all( axis=1 )
+        self.assertEqual( kept.sum(), 1 )
+        self.assertEqual( scores[ kept ][0], scores.max() )
+
+
+
+    def test_reproduction_with_duplicate_filter( self ):
+        rng = np.random.default_rng( 3 )
+        population = get_initial_population( 20, 2, rng )
+        scores = get_fitness_scores( population, encode_word( 'ab' ) )
+        new_population = reproduction(
+            population, scores, 100, rng, duplicate_filter = DuplicateFilter( 'reject' )
+        )
+        self.assertEqual( new_population.shape[1], 2 )
+        self.assertLess( len( new_population ), 100 )
+        self.assertEqual( len( np.unique( new_population, axis=0 ) ), len( new_population ) )
+
+        new_population = reproduction(
+            population, scores, 10, rng, duplicate_filter = DuplicateFilter( 'resample' )
+        )
+        self.assertEqual( new_population.shape, ( 10, 2 ) )
+
+
+    def test_selection_with_cached_evaluator( self ):
+        encoded_ref = encode_word( 'queens' )
+        population = np.array( [ encode_word( w ) for w in ( 'qwerty', 'queens', 'qwerty' ) ] )
+        with CachedEvaluator( get_evaluator(
+                'vectorized', get_fitness_scores, { 'encoded_ref': encoded_ref } ) ) as evaluator:
+            scores = selection( population, encoded_ref, evaluator = evaluator )
+            self.assertTrue( np.allclose( scores, get_fitness_scores( population, encoded_ref ) ) )
+            selection( population, encoded_ref, evaluator = evaluator )
+            self.assertEqual( ( evaluator.cache.hits, evaluator.cache.misses ), ( 4, 2 ) )
+
+
+
+    def test_reproduction_with_selection_strategy( self ):
+        rng = np.random.default_rng( 3 )
+        population = get_initial_population( 20, 16, rng )
+        scores = get_fitness_scores( population, encode_word( 'abcdefghijklmnop' ) )
+        for name in SELECTION_STRATEGIES:
+            new_population = reproduction(
+                population, scores, 30, rng,
+                selection_strategy = get_selection_strategy( name )
+            )
+            self.assertEqual( new_population.shape, ( 30, 16 ), name )
+
+        parents_1, parents_2 = select_parents(
+            population, scores, 40, get_selection_strategy( 'truncation', proportion = 0.1 ), rng
+        )
+        self.assertEqual( parents_1.shape, ( 40, 16 ) )
+        fittest = set( population[ i ].tobytes() for i in np.argsort( -scores )[ :2 ] )
+        self.assertTrue( set( row.tobytes() for row in np.vstack( [ parents_1, parents_2 ] ) ) <= fittest )
+
+
+    def test_reproduction_with_bitmaps( self ):
+        rng = np.random.default_rng( 4 )
+        encoded_ref = encode_word( 'incremental' * 20 )
+        population = get_initial_population( 30, len( encoded_ref ), rng )
+        bitmaps, counts = get_match_bitmaps( population, encoded_ref )
+        for name, number_of_mutations, mutation_mode in (
+                ( None, 1, 'uniform' ), ( None, 5, 'mismatch' ),
+                ( 'tournament', 3, 'uniform' ), ( 'rank', 2, 'mismatch' ) ):
+            selection_strategy = get_selection_strategy( name ) if name else None
+            for _ in range( 20 ):
+                population, bitmaps, counts = reproduction_with_bitmaps(
+                    population, bitmaps, counts, 30, encoded_ref, rng,
+                    selection_strategy = selection_strategy,
+                    number_of_mutations = number_of_mutations,
+                    mutation_mode = mutation_mode
+                )
+                # the same as a full rescoring.
+                self.assertEqual( bitmaps.tolist(), ( population == encoded_ref ).tolist() )
+                self.assertEqual( ( counts / float( len( encoded_ref ) ) ).tolist(),
+                                  get_fitness_scores( population, encoded_ref ).tolist() )
+        with self.assertRaises( ValueError ):
+            reproduction_with_bitmaps( population, bitmaps, counts, 30, encoded_ref, rng,
+                                       mutation_mode = 'everywhere' )
+
+
+    def test_get_mismatch_positions( self ):
+        rng = np.random.default_rng( 5 )
+        bitmaps = np.ones( ( 50, 10000 ), dtype=bool )
+        bitmaps[ :, [ 17, 4242 ] ] = False
+        bitmaps[ 0 ] = True  # a perfect word.
+        positions = get_mismatch_positions( bitmaps, 3, rng )
+        self.assertEqual( positions.shape, ( 50, 3 ) )
+        self.assertEqual( set( positions[ 1: ].ravel().tolist() ), { 17, 4242 } )
+        self.assertTrue( ( ( 0 <= positions[0] ) & ( positions[0] < 10000 ) ).all() )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,7 +6,17 @@ import unittest
 import os, sys
 from io import StringIO
 from word_search_ga import get_fitness_score, crossover, get_mutated_word, \
-    get_normalised_fitness_score_mating_pool, get_two_fittest_individuals
+    get_normalised_fitness_score_mating_pool, get_two_fittest_individuals, \
+    selection, MatingPool, get_mating_pool, reproduction
+from word_search_batched_ga import encode_word, encode_population
+
+sys.path.append(
+    os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), '..', 'generic_ga' )
+)
+from fitness_evaluators import get_evaluator
+from fitness_cache import CachedEvaluator, DuplicateFilter
+from selection_strategies import get_selection_strategy, SELECTION_STRATEGIES
+from instrumentation import Instrumentation
 
 
 
@@ -56,6 +66,19 @@ class TestWordSearchGA( unittest.TestCase ):
         self.assertTrue( all( battery_test_list ) )
 
 
+    def test_crossover_operators( self ):
+        two_words = ( 'abcdefg', 'rstuvwx' )
+        self.assertEqual( crossover( two_words, 'single_point' ), 'abcuvwx' )
+        self.assertEqual( crossover( two_words, 'even_uniform' ), 'rbtdvfx' )
+        self.assertEqual( crossover( two_words, 'odd_uniform' ), 'ascuewg' )
+        child = crossover( two_words, 'random_positions' )
+        self.assertEqual(
+            sum( [ c == w for c, w in zip( child, two_words[0] ) ] ), 3
+        )
+        with self.assertRaises( ValueError ):
+            crossover( two_words, 'two_points' )
+
+
     def test_get_mutated_word( self ):
         # NB: This is just a probabilistic test and would need a better test or
         #     a new get_mutated_word function.
@@ -136,6 +159,119 @@ class TestWordSearchGA( unittest.TestCase ):
         )
 
 
+    def test_selection_with_evaluator( self ):
+        population = [ 'qwerty', 'queens', 'qwerts', 'abcdef', 'quiets' ]
+        for backend in ( 'serial', 'thread', 'process' ):
+            with get_evaluator(
+                    backend,
+                    get_fitness_score,
+                    { 'ref': encode_word( 'queens' ) },
+                    to_array = encode_population ) as evaluator:
+                mating_pool = selection( population, 'queens', evaluator )
+            self.assertEqual(
+                sorted( mating_pool.keys() ),
+                sorted( selection( population, 'queens' ).keys() )
+            )
+            self.assertEqual( mating_pool[ 1.0 ], [ 'queens' ] )
+
+
+    def test_mating_pool( self ):
+        words = [ 'vfwpcyze', 'svvdlsof', 'ebjvywaz', 'cqehqacd' ]
+        mating_pool = MatingPool( words, [ 0.0, 0.125, 0.125, 0.25 ] )
+        self.assertEqual( mating_pool.get_best_fitness(), 0.25 )
+        self.assertEqual( mating_pool.get_top_k( 1 )[0], [ 'cqehqacd' ] )
+        self.assertEqual(
+            sorted( mating_pool.get_top_k( 3 )[0][1:] ), [ 'ebjvywaz', 'svvdlsof' ]
+        )
+        self.assertEqual( mating_pool.get_elites()[0], [ 'cqehqacd' ] )
+        self.assertEqual(
+            MatingPool.from_dict( mating_pool.to_dict() ).to_dict(),
+            mating_pool.to_dict()
+        )
+        self.assertAlmostEqual( mating_pool.get_sampling_weights().sum(), 1.0 )
+        # the zero-score word is (almost) never drawn by the roulette wheel.
+        parent_pairs = mating_pool.select_parent_pairs(
+            500, get_selection_strategy( 'roulette' )
+        )
+        self.assertTrue( sum( pair.count( 'vfwpcyze' ) for pair in parent_pairs ) < 5 )
+
+
+    def test_mating_pool_keeps_colliding_scores( self ):
+        population = [ 'qwerty', 'qwerty', 'queens' ]
+        mating_pool = get_mating_pool( population, 'queens' )
+        mating_pool.extend( [ 'quiets' ], [ 0.5 ] )
+        self.assertEqual( len( mating_pool ), 4 )
+        self.assertEqual( mating_pool.to_dict()[ 1/3.0 ], [ 'qwerty', 'qwerty' ] )
+
+
+    def test_reproduction_with_instrumentation( self ):
+        instrumentation = Instrumentation()
+        mating_pool = get_mating_pool(
+            [ 'qwerty', 'queens', 'quiets' ], 'queens', None, instrumentation
+        )
+        new_population = reproduction( mating_pool, 10, instrumentation )
+        record = instrumentation.end_generation()
+        self.assertEqual( len( new_population ), 10 )
+        self.assertEqual( record[ 'counters' ], { 'evaluations': 3 } )
+        self.assertEqual( record[ 'calls' ], { 'crossover': 10, 'mutation': 10 } )
+
+
+
+    def test_reproduction_with_duplicate_filter( self ):
+        # 2-letter words: most of the 100 children are duplicates.
+        # distinct scores: the two fittest words are 'ad' and 'ab'.
+        mating_pool = get_mating_pool( [ 'ab', 'xy', 'ad' ], 'ad' )
+        parents = mating_pool.get_top_k( 2 )[0]
+        instrumentation = Instrumentation()
+        new_population = reproduction(
+            mating_pool, 100, instrumentation,
+            duplicate_filter = DuplicateFilter( 'reject' )
+        )
+        record = instrumentation.end_generation()
+        self.assertLess( len( new_population ), 100 )
+        self.assertEqual( len( set( new_population ) ), len( new_population ) )
+        self.assertFalse( set( parents ) & set( new_population ) )
+        self.assertEqual(
+            record[ 'counters' ][ 'duplicate_children' ], 100 - len( new_population )
+        )
+
+        new_population = reproduction(
+            mating_pool, 10, duplicate_filter = DuplicateFilter( 'resample' )
+        )
+        self.assertEqual( len( new_population ), 10 )
+
+
+    def test_mating_pool_with_cached_evaluator( self ):
+        population = [ 'qwerty', 'queens', 'qwerty', 'quiets' ]
+        with CachedEvaluator( get_evaluator(
+                'serial', get_fitness_score, { 'ref': 'queens' } ) ) as evaluator:
+            mating_pool = get_mating_pool( population, 'queens', evaluator )
+            get_mating_pool( population, 'queens', evaluator )
+            self.assertEqual( mating_pool.get_best_fitness(), 1.0 )
+            # 3 distinct words scored once, all the other lookups hit.
+            self.assertEqual( ( evaluator.cache.hits, evaluator.cache.misses ), ( 5, 3 ) )
+
+
+    def test_reproduction_with_selection_strategy( self ):
+        population = [ 'qwerty', 'queens', 'quiets', 'abcdef', 'ghijkl', 'mnopqr' ]
+        mating_pool = get_mating_pool( population, 'queens' )
+        for name in SELECTION_STRATEGIES:
+            new_population = reproduction(
+                mating_pool, 20, selection_strategy = get_selection_strategy( name )
+            )
+            self.assertEqual( len( new_population ), 20, name )
+            self.assertTrue( all( len( word ) == 6 for word in new_population ), name )
+
+        # only the 2 fittest words are parents.
+        parent_pairs = mating_pool.select_parent_pairs(
+            50, get_selection_strategy( 'truncation', proportion = 0.1 )
+        )
+        self.assertEqual( len( parent_pairs ), 50 )
+        self.assertEqual(
+            set( word for parent_pair in parent_pairs for word in parent_pair ),
+            { 'queens', 'quiets' }
+        )
+
 
 if __name__ == '__main__':
     unittest.main()
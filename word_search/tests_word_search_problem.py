@@ -0,0 +1,76 @@
+# Genetic algorithms examples - tests.
+# MIT License.
+
+
+import unittest
+import numpy as np
+from word_search_problem import WordSearchProblem
+from engine import Engine, SteadyStateEngine
+from selection_strategies import get_selection_strategy
+from fitness_cache import DuplicateFilter
+from run_controller import RunController
+
+
+class TestWordSearchProblem( unittest.TestCase ):
+
+    def test_operators( self ):
+        rng = np.random.default_rng( 0 )
+        problem = WordSearchProblem( 'queens', 'single_point' )
+        population = problem.get_initial_population( 4, rng )
+        self.assertEqual( population.shape, ( 4, 6 ) )
+        parents_1 = np.array( [ problem.encode( 'qwerty' ) ] * 2 )
+        parents_2 = np.array( [ problem.encode( 'abcdef' ) ] * 2 )
+        children = np.empty_like( parents_1 )
+        problem.crossover( parents_1, parents_2, rng, children )
+        self.assertEqual( [ problem.decode( child ) for child in children ], [ 'qwedef' ] * 2 )
+        self.assertEqual( problem.evaluate( children ).tolist(), [ 2 / 6.0 ] * 2 )
+        problem.mutate( children, 6, rng )
+        self.assertFalse( ( children == parents_1 ).all() )
+
+
+    def test_engine( self ):
+        engine = Engine( WordSearchProblem( 'generic' ), population_size = 50, rng = 1 )
+        self.assertEqual( engine.run( target_fitness = 1.0 ), ( 1.0, 'generic' ) )
+
+        engine = Engine(
+            WordSearchProblem( 'supercalifragilisticexpialidocious' ),
+            population_size = 200, number_of_elites = 2, rng = 1,
+            selection_strategy = get_selection_strategy( 'tournament', tournament_size = 3 )
+        )
+        best_fitness, best_word = engine.run( max_generations = 400, target_fitness = 1.0 )
+        self.assertEqual( best_word, 'supercalifragilisticexpialidocious' )
+
+
+
+    def test_delta_scoring( self ):
+        # the same runs, the children's scores updated from their parents'
+        # match bitmaps.
+        for selection_strategy in ( None, get_selection_strategy( 'tournament' ) ):
+            engines = [
+                Engine( WordSearchProblem( 'incremental' * 3, crossover_fraction = 0.3,
+                                           delta_scoring = delta_scoring ),
+                        population_size = 30, number_of_elites = 2, number_of_mutations = 2,
+                        rng = 4, selection_strategy = selection_strategy,
+                        duplicate_filter = DuplicateFilter( 'resample' ),
+                        controller = RunController( window = 2, max_mutations = 3,
+                                                    restart_after = 5 ) )
+                for delta_scoring in ( False, True )
+            ]
+            for engine in engines:
+                engine.run( max_generations = 60 )
+            full, delta = engines
+            self.assertEqual( delta.population.tolist(), full.population.tolist() )
+            self.assertEqual( delta.fitnesses.tolist(), full.fitnesses.tolist() )
+            bitmaps, counts = delta.scoring_state
+            self.assertEqual( bitmaps.tolist(), ( delta.population == delta.problem.encoded_ref ).tolist() )
+            self.assertEqual( counts.tolist(), bitmaps.sum( axis=1 ).tolist() )
+
+        problem = WordSearchProblem( 'mismatch' * 4, delta_scoring = True, mutation_mode = 'mismatch' )
+        engine = SteadyStateEngine( problem, population_size = 20, number_of_children = 4, rng = 2 )
+        self.assertEqual( engine.run( max_generations = 2000, target_fitness = 1.0 )[0], 1.0 )
+        with self.assertRaises( ValueError ):
+            WordSearchProblem( 'mismatch', mutation_mode = 'mismatch' )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,404 @@
+# Genetic algorithms examples - batched GA algorithm.
+# MIT License.
+
+
+import os, sys
+import numpy as np
+
+sys.path.append(
+    os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), '..', 'generic_ga' )
+)
+from instrumentation import get_phase
+
+
+# Alternate engine for the word search GA.
+# The whole population is stored in a single ( population_size, word_length )
+# uint8 matrix of ascii codes, so fitness, crossover and mutation each work on
+# all the individuals at once instead of looping over one word at a time.
+#
+#   e.g.:  [ 'qwe',        ->    array([[113, 119, 101],
+#            'rty' ]                    [114, 116, 121]], dtype=uint8)
+
+FIRST_LETTER = 97   # 'a'
+LAST_LETTER  = 122  # 'z'
+
+
+_rng = np.random.default_rng()
+
+
+def get_rng( rng = None ):
+    # use the given numpy Generator or fall back on the module-wide one.
+    return _rng if rng is None else rng
+
+
+def encode_word( word ):
+    return np.frombuffer( word.encode( 'ascii' ), dtype=np.uint8 ).copy()
+
+
+def encode_population( population ):
+    # e.g.: list of str words -> ( population_size, word_length ) matrix.
+    return np.array( [ encode_word( word ) for word in population ] )
+
+
+def decode_word( encoded_word ):
+    return encoded_word.tobytes().decode( 'ascii' )
+
+
+def decode_population( population ):
+    return [ decode_word( row ) for row in population ]
+
+
+def get_random_letters( shape, rng = None ):
+    return get_rng( rng ).integers(
+        FIRST_LETTER, LAST_LETTER + 1, size=shape, dtype=np.uint8
+    )
+
+
+def get_initial_population( population_size, word_length, rng = None ):
+    return get_random_letters( ( population_size, word_length ), rng )
+
+
+def get_fitness_scores( population, encoded_ref ):
+
+    assert( population.shape[1] == len( encoded_ref ) )
+
+    # fraction of matching characters of every word, in one comparison.
+    return np.count_nonzero( population == encoded_ref, axis=1 ) / \
+        float( len( encoded_ref ) )
+
+
+def get_random_positions_mask( number_of_rows, word_length, number_of_positions,
+                               rng = None ):
+    # boolean ( number_of_rows, word_length ) mask with exactly
+    # number_of_positions True cells per row, chosen uniformly at random.
+    if number_of_positions <= 0:
+        return np.zeros( ( number_of_rows, word_length ), dtype=bool )
+    random_keys = get_rng( rng ).random( ( number_of_rows, word_length ) )
+    # the number_of_positions smallest keys of every row, compared with their
+    # row's largest rather than scattered from argpartition's positions.
+    thresholds = np.partition(
+        random_keys, number_of_positions - 1, axis=1
+    )[ :, number_of_positions - 1:number_of_positions ]
+    return random_keys <= thresholds
+
+
+def get_crossover_mask( crossover_operator, number_of_children, word_length,
+                        rng = None, crossover_fraction = 0.5 ):
+    # True where a child takes word_1's letter, with the same semantics as
+    # word_search_ga.CROSSOVERS. crossover_fraction: the share of word_1's
+    # letters of 'random_positions' and 'single_point' (half in
+    # word_search_ga).
+    if crossover_operator == 'random_positions':
+        return get_random_positions_mask(
+            number_of_children, word_length, int( word_length * crossover_fraction ), rng
+        )
+    positions = np.arange( word_length )
+    if crossover_operator == 'single_point':
+        mask = positions < int( word_length * crossover_fraction )
+    elif crossover_operator == 'even_uniform':
+        mask = positions % 2 == 1
+    elif crossover_operator == 'odd_uniform':
+        mask = positions % 2 == 0
+    else:
+        raise ValueError( 'unknown crossover operator: %s' % crossover_operator )
+    return np.broadcast_to( mask, ( number_of_children, word_length ) )
+
+
+def get_mixed( mask, values_1, values_2 ):
+    # np.where( mask, values_1, values_2 ) for uint8 or bool values, as
+    # values_2 ^ ( mask * ( values_1 ^ values_2 ) ): np.where branches on
+    # every cell, which is an order of magnitude slower for random masks.
+    dtype = np.asarray( values_1 ).dtype
+    values_1 = np.asarray( values_1 ).view( np.uint8 )
+    values_2 = np.asarray( values_2 ).view( np.uint8 )
+    mixed = np.multiply( np.asarray( mask, dtype=bool ).view( np.uint8 ),
+                         values_1 ^ values_2 )
+    mixed ^= values_2
+    return mixed.view( dtype )
+
+
+def crossover( two_fittest_individuals, number_of_children, rng = None,
+               crossover_operator = 'random_positions', crossover_fraction = 0.5 ):
+
+    # word_1 and word_2 are two words, or two ( number_of_children,
+    # word_length ) arrays of parents (one pair per child).
+    word_1, word_2 = two_fittest_individuals
+    assert( np.shape( word_1 ) == np.shape( word_2 ) )
+
+    # batched over all the children, e.g. with 'random_positions' every child
+    # takes half random cells from word_1 and the remaining cells from word_2.
+    mask = get_crossover_mask(
+        crossover_operator, number_of_children, np.shape( word_1 )[ -1 ], rng,
+        crossover_fraction
+    )
+    return get_mixed( mask, word_1, word_2 )
+
+
+def get_mutation_positions( population_size, word_length, number_of_mutations,
+                            rng = None ):
+    # ( population_size, number_of_mutations ) random places.
+    rng = get_rng( rng )
+    number_of_mutations = min( number_of_mutations, word_length )
+    if number_of_mutations == 1:
+        # cheap path for the common case: one random place per word.
+        return rng.integers( 0, word_length, size=( population_size, 1 ) )
+    # non-overlapping random places in every word.
+    return np.argpartition(
+        rng.random( ( population_size, word_length ) ),
+        number_of_mutations - 1,
+        axis=1
+    )[ :, :number_of_mutations ]
+
+
+def get_mutated_population( population, number_of_mutations, rng = None ):
+    # NB: the population is mutated in place and also returned.
+    rng = get_rng( rng )
+    population_size, word_length = population.shape
+    rows = np.arange( population_size )[ :, None ]
+    positions = get_mutation_positions(
+        population_size, word_length, number_of_mutations, rng
+    )
+    population[ rows, positions ] = get_random_letters( positions.shape, rng )
+    return population
+
+
+def get_reseeded_population( population, scores, proportion, rng = None ):
+    # partial restart: the worst words, proportion of the population but
+    # never the fittest word, are replaced with random words (in a copy).
+    population_size, word_length = population.shape
+    number_of_new_words = min(
+        population_size - 1, int( round( proportion * population_size ) )
+    )
+    new_population = population.copy()
+    worst_ids = np.argsort( scores, kind='stable' )[ :number_of_new_words ]
+    new_population[ worst_ids ] = get_initial_population(
+        number_of_new_words, word_length, rng
+    )
+    return new_population
+
+
+def selection( population, encoded_ref, instrumentation = None, evaluator = None ):
+    # the mating pool is the population itself plus its parallel scores array.
+    # The scoring can be delegated to an evaluator, e.g. a CachedEvaluator
+    # (see generic_ga/fitness_cache.py) in front of get_fitness_scores().
+    if instrumentation is not None:
+        instrumentation.count( 'evaluations', len( population ) )
+    if evaluator is not None:
+        return np.array( evaluator.evaluate( population ), dtype=float )
+    return get_fitness_scores( population, encoded_ref )
+
+
+def get_two_fittest_individuals( population, scores, rng = None ):
+    # get the two fittest individuals.
+    # Ties are broken at random by shuffling the candidates' order before the
+    # O(N) partial sort.
+    order = get_rng( rng ).permutation( len( scores ) )
+    two_fittest_ids = order[ np.argpartition( -scores[ order ], 1 )[ :2 ] ]
+    return population[ two_fittest_ids[0] ], population[ two_fittest_ids[1] ]
+
+
+def select_parents( population, scores, number_of_pairs, selection_strategy,
+                    rng = None ):
+    # ( parents_1, parents_2 ) arrays, one row per child, drawn by
+    # selection_strategy (see generic_ga/selection_strategies.py) with the
+    # same zero score replacement as word_search_ga's sampling weights.
+    weights = np.where( scores == 0.0, 0.00001, scores )
+    ids_1, ids_2 = selection_strategy.select_pairs(
+        weights, number_of_pairs, get_rng( rng )
+    )
+    return population[ ids_1 ], population[ ids_2 ]
+
+
+def reproduction( population, scores, length_new_population, rng = None,
+                  instrumentation = None, crossover_operator = 'random_positions',
+                  duplicate_filter = None, selection_strategy = None,
+                  number_of_mutations = 1, crossover_fraction = 0.5 ):
+
+    # all the children are bred from the two fittest individuals, or each
+    # from its own parents drawn by selection_strategy.
+    # number_of_mutations: mutated letters per child, e.g. raised by
+    # generic_ga/run_controller.py during a plateau.
+    # crossover_fraction: see get_crossover_mask().
+    rng = get_rng( rng )
+    if selection_strategy is None:
+        parents = get_two_fittest_individuals( population, scores, rng )
+        get_parent_pair = lambda: parents
+    else:
+        parents = select_parents(
+            population, scores, length_new_population, selection_strategy, rng
+        )
+        get_parent_pair = lambda: select_parents(
+            population, scores, 1, selection_strategy, rng
+        )
+
+    # mating, all the children at once.
+    #
+    with get_phase( instrumentation, 'crossover' ):
+        new_population = crossover(
+            parents, length_new_population, rng, crossover_operator, crossover_fraction
+        )
+    with get_phase( instrumentation, 'mutation' ):
+        new_population = get_mutated_population(
+            new_population, number_of_mutations, rng
+        )
+
+    if duplicate_filter is not None:
+        # rows identical to a parent or to an earlier row are rejected or
+        # bred again one at a time, see generic_ga/fitness_cache.py.
+        def breed():
+            child = crossover( get_parent_pair(), 1, rng, crossover_operator,
+                               crossover_fraction )
+            return get_mutated_population( child, number_of_mutations, rng )[0]
+
+        new_population = np.array( duplicate_filter.get_unique_children(
+            list( new_population ), breed, np.vstack( parents ), instrumentation
+        ) )
+    return new_population
+
+
+# Incremental fitness, for very long target words.
+# Every word carries its match bitmap ( word == encoded_ref, one bool per
+# letter ) and its number of matching letters, from which its score is
+# count / word_length:
+#   - crossover combines the parents' bitmaps with the children's mask; with
+#     the two fittest parents, the children's counts only look at the
+#     positions where the parents' bitmaps differ (few once the population
+#     has converged).
+#   - mutation updates one bit and the count per mutated letter, O(1).
+# No word is ever compared with the target again after the first generation.
+#
+# Mutation modes:
+#   'uniform'   random places, as get_mutated_population().
+#   'mismatch'  random places among the word's mismatching letters (the
+#               matching letters of a perfect word).
+
+MUTATION_MODES = ( 'uniform', 'mismatch' )
+
+
+def get_match_bitmaps( population, encoded_ref ):
+    # ( bitmaps, counts ) of the whole population, O(L) per word.
+    bitmaps = population == encoded_ref
+    return bitmaps, np.count_nonzero( bitmaps, axis=1 )
+
+
+def get_mismatch_positions( bitmaps, number_of_mutations, rng = None,
+                            number_of_attempts = 4 ):
+    # ( population_size, number_of_mutations ) places among every word's
+    # mismatching letters, drawn with replacement. Uniform places are drawn
+    # again while they hit a matching letter, then the last rows are drawn
+    # exactly among their (by then few) mismatches.
+    rng = get_rng( rng )
+    population_size, word_length = bitmaps.shape
+    positions = rng.integers( 0, word_length, size=( population_size, number_of_mutations ) )
+    rows = np.arange( population_size )[ :, None ]
+    matching = bitmaps[ rows, positions ]
+    for _ in range( number_of_attempts ):
+        if not matching.any():
+            return positions
+        redrawn = rng.integers( 0, word_length, size=np.count_nonzero( matching ) )
+        positions[ matching ] = redrawn
+        matching[ matching ] = bitmaps[ np.nonzero( matching )[0], redrawn ]
+
+    # exact draw: the k-th mismatch of a row, from the mismatches of the rows
+    # left, in row order.
+    rows_left = np.flatnonzero( matching.any( axis=1 ) )
+    mismatch_rows, mismatch_positions = np.nonzero( ~bitmaps[ rows_left ] )
+    numbers_of_mismatches = np.bincount( mismatch_rows, minlength=len( rows_left ) )
+    starts = np.cumsum( numbers_of_mismatches ) - numbers_of_mismatches
+    for i, row in enumerate( rows_left ):
+        if numbers_of_mismatches[ i ] == 0:
+            continue  # a perfect word, keep its uniform places.
+        redrawn = starts[ i ] + rng.integers(
+            numbers_of_mismatches[ i ], size=np.count_nonzero( matching[ row ] )
+        )
+        positions[ row, matching[ row ] ] = mismatch_positions[ redrawn ]
+    return positions
+
+
+def get_mutated_population_with_bitmaps( population, bitmaps, counts, encoded_ref,
+                                         number_of_mutations, rng = None,
+                                         mutation_mode = 'uniform' ):
+    # NB: the population, bitmaps and counts are updated in place.
+    rng = get_rng( rng )
+    population_size, word_length = population.shape
+    if mutation_mode == 'uniform':
+        positions = get_mutation_positions(
+            population_size, word_length, number_of_mutations, rng
+        )
+    elif mutation_mode == 'mismatch':
+        positions = get_mismatch_positions( bitmaps, number_of_mutations, rng )
+    else:
+        raise ValueError( 'unknown mutation mode: %s' % mutation_mode )
+    letters = get_random_letters( positions.shape, rng )
+
+    # one column at a time, the places of a word may repeat.
+    rows = np.arange( population_size )
+    for column in range( positions.shape[1] ):
+        places = positions[ :, column ]
+        new_bits = letters[ :, column ] == encoded_ref[ places ]
+        counts += new_bits.astype( int ) - bitmaps[ rows, places ]
+        bitmaps[ rows, places ] = new_bits
+        population[ rows, places ] = letters[ :, column ]
+    return population, bitmaps, counts
+
+
+def crossover_with_bitmaps( parents, parent_bitmaps, parent_counts,
+                            number_of_children, rng = None,
+                            crossover_operator = 'random_positions',
+                            crossover_fraction = 0.5 ):
+    # ( children, bitmaps, counts ), the children as crossover()'s.
+    word_1, word_2 = parents
+    bitmap_1, bitmap_2 = parent_bitmaps
+    mask = get_crossover_mask(
+        crossover_operator, number_of_children, np.shape( word_1 )[ -1 ], rng,
+        crossover_fraction
+    )
+    children = get_mixed( mask, word_1, word_2 )
+    bitmaps = get_mixed( mask, bitmap_1, bitmap_2 )
+    if np.ndim( word_1 ) == 1:
+        # a child differs from word_2's count where it takes word_1's letter
+        # and the parents' bits differ.
+        differences = np.flatnonzero( bitmap_1 != bitmap_2 )
+        taken = mask[ :, differences ]
+        counts = parent_counts[1] + \
+            np.count_nonzero( taken & bitmap_1[ differences ], axis=1 ) - \
+            np.count_nonzero( taken & bitmap_2[ differences ], axis=1 )
+    else:
+        counts = np.count_nonzero( bitmaps, axis=1 )
+    return children, bitmaps, counts
+
+
+def reproduction_with_bitmaps( population, bitmaps, counts, length_new_population,
+                               encoded_ref, rng = None, instrumentation = None,
+                               crossover_operator = 'random_positions',
+                               selection_strategy = None, number_of_mutations = 1,
+                               mutation_mode = 'uniform', crossover_fraction = 0.5 ):
+
+    # same as reproduction() but the children come with their bitmaps and
+    # counts (see above), their scores are counts / word_length.
+    rng = get_rng( rng )
+    scores = counts / float( population.shape[1] )
+    if selection_strategy is None:
+        order = rng.permutation( len( scores ) )
+        parent_ids = order[ np.argpartition( -scores[ order ], 1 )[ :2 ] ]
+    else:
+        ids_1, ids_2 = selection_strategy.select_pairs(
+            np.where( scores == 0.0, 0.00001, scores ), length_new_population, rng
+        )
+        parent_ids = ( ids_1, ids_2 )
+
+    with get_phase( instrumentation, 'crossover' ):
+        new_population, new_bitmaps, new_counts = crossover_with_bitmaps(
+            ( population[ parent_ids[0] ], population[ parent_ids[1] ] ),
+            ( bitmaps[ parent_ids[0] ], bitmaps[ parent_ids[1] ] ),
+            ( counts[ parent_ids[0] ], counts[ parent_ids[1] ] ),
+            length_new_population, rng, crossover_operator, crossover_fraction
+        )
+    with get_phase( instrumentation, 'mutation' ):
+        get_mutated_population_with_bitmaps(
+            new_population, new_bitmaps, new_counts, encoded_ref,
+            number_of_mutations, rng, mutation_mode
+        )
+    if instrumentation is not None:
+        instrumentation.count( 'delta_evaluations', length_new_population )
+    return new_population, new_bitmaps, new_counts
@@ -3,13 +3,25 @@
 
 
 from datetime import datetime
+import logging
 import numpy as np
+import os, sys
 import random
 import time
 
+sys.path.append(
+    os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), '..', 'generic_ga' )
+)
+from instrumentation import get_phase
+from mating_pool import get_parent_pairs, MatingPool
+
 
 random.seed( time.time() )
 
+# debug output (e.g. every new population) is off unless logging is set up,
+# e.g.: logging.basicConfig( level=logging.DEBUG ).
+logger = logging.getLogger( __name__ )
+
 
 def get_initial_population( population_size, word_length ):
 
@@ -31,11 +43,7 @@ def get_fitness_score( word, ref ):
     return sum( charwise_comparisons ) / float( len( ref ) )
 
 
-def crossover( two_fittest_individuals ):
-
-    word_1, word_2 = two_fittest_individuals
-    assert( len( word_1 ) == len( word_2 ) )
-
+def random_positions_crossover( word_1, word_2 ):
     # random-points crossover. This seems to be comparatively the fastest.
     # choose half random cells from word_1 and replace them with word_2's cells.
     number_letter_substitutions = int( len(word_1) / 2.0 )
@@ -43,39 +51,58 @@ def crossover( two_fittest_individuals ):
         range( len( word_1 ) ),        # e.g.: [ 0, 1, 2, 3, 4, 5, 6, 7 ]
         number_letter_substitutions    # e.g.: 4
     )
-    tuples = zip( word_1, word_2 )
+    # O(1) membership tests through a mask instead of searching the list.
+    from_word_1 = [ False ] * len( word_1 )
+    for i in random_positions:
+        from_word_1[ i ] = True
 
     return ''.join(
-        [ t[0] if i in random_positions else t[1] for i, t in enumerate(tuples) ]
+        [ t[0] if f else t[1] for f, t in zip( from_word_1, zip( word_1, word_2 ) ) ]
     )
 
-    """
-    # mixed crossover.
-    crossing_mode = random.random()
-    if crossing_mode > 0.666:
 
-        # single-point crossover.
-        half = int( len( word_1 ) / 2.0 )
-        return word_1[:half] + word_2[half:]
+def single_point_crossover( word_1, word_2 ):
+    half = int( len( word_1 ) / 2.0 )
+    return word_1[:half] + word_2[half:]
 
-    elif crossing_mode > 0.5:
-        # uniform crossover (even numbers).
-        return ''.join(
-            [ t[0] if i%2 else t[1] for i, t in enumerate(zip(word_1, word_2)) ]
-        )
 
-    else:
-        # uniform crossover (odd numbers).
-        return ''.join(
-            [ t[1] if i%2 else t[0] for i, t in enumerate(zip(word_1, word_2)) ]
-        )
-    """
+def even_uniform_crossover( word_1, word_2 ):
+    # uniform crossover (even numbers): the even cells come from word_2.
+    letters = list( word_2 )
+    letters[ 1::2 ] = word_1[ 1::2 ]
+    return ''.join( letters )
+
+
+def odd_uniform_crossover( word_1, word_2 ):
+    # uniform crossover (odd numbers): the odd cells come from word_2.
+    letters = list( word_1 )
+    letters[ 1::2 ] = word_2[ 1::2 ]
+    return ''.join( letters )
+
+
+CROSSOVERS = {
+    'random_positions': random_positions_crossover,
+    'single_point': single_point_crossover,
+    'even_uniform': even_uniform_crossover,
+    'odd_uniform': odd_uniform_crossover,
+}
+
+
+def crossover( two_fittest_individuals, crossover_operator = 'random_positions' ):
+
+    word_1, word_2 = two_fittest_individuals
+    assert( len( word_1 ) == len( word_2 ) )
+
+    # every operator is linear in the word length, see CROSSOVERS.
+    if crossover_operator not in CROSSOVERS:
+        raise ValueError( 'unknown crossover operator: %s' % crossover_operator )
+    return CROSSOVERS[ crossover_operator ]( word_1, word_2 )
 
 
 def get_mutated_word( word, number_of_mutations ):
 
     non_overlapping_random_places_in_the_word = \
-        random.sample( range(0, len(word)), number_of_mutations )
+        random.sample( range(0, len(word)), min( number_of_mutations, len(word) ) )
 
     # inject mutations in those places.
     word_as_list = list( word )
@@ -85,17 +112,31 @@ def get_mutated_word( word, number_of_mutations ):
     return ''.join( word_as_list )
 
 
-def selection( population, ref ):
+def as_mating_pool( mating_pool ):
+    # accept both the array-backed pool and the historical dict pool.
+    return MatingPool.as_mating_pool( mating_pool )
+
+
+def get_mating_pool( population, ref, evaluator = None, instrumentation = None ):
+
+    # the scoring can be delegated to an evaluator (e.g. a process pool one,
+    # see generic_ga/fitness_evaluators.py) that returns the scores in the
+    # population's order.
+    if evaluator is None:
+        scores = [ get_fitness_score( word, ref ) for word in population ]
+    else:
+        scores = evaluator.evaluate( population )
+    if instrumentation is not None:
+        instrumentation.count( 'evaluations', len( population ) )
+
+    return MatingPool( population, scores )
 
-    # build mating pool with fitness scores as keys.
-    mating_pool = {}
-    for word in population:
-        score = get_fitness_score( word, ref )
-        if score not in mating_pool.keys():
-            mating_pool[ score ] = []
-        mating_pool[ score ].append( word )
 
-    return mating_pool
+def selection( population, ref, evaluator = None, instrumentation = None ):
+
+    # build mating pool with fitness scores as keys.
+    # NB: thin wrapper around get_mating_pool() kept for the dict pool users.
+    return get_mating_pool( population, ref, evaluator, instrumentation ).to_dict()
 
 
 def get_normalised_fitness_score_mating_pool( mating_pool ):
@@ -124,48 +165,43 @@ def get_two_fittest_individuals( nfs_mating_pool ):
     # get the two fittest individuals.
     # Two individuals were chosen here to maximise genetic diversity although
     # more than 2 individuals could be used.
+    # NB: thin wrapper, the pool can be a MatingPool or a dict pool. Scaling
+    #     the scores does not change their order so no normalisation is needed.
     #
-    two_fittest_individuals = []
-    list_associated_to_the_max_key = \
-        nfs_mating_pool.pop( max( nfs_mating_pool.keys() ) )
-    if len( list_associated_to_the_max_key ) > 1:
-        # get two fittest individuals.
-        two_fittest_individuals = random.sample(
-            list_associated_to_the_max_key,
-            2
-        )
-    else:
-        # keep the single fittest individual.
-        two_fittest_individuals.append(
-            ''.join( list_associated_to_the_max_key[ 0 ] )
-        )
-        # get the second fittest individual.
-        list_associated_to_the_new_max_key = \
-            nfs_mating_pool.pop( max( nfs_mating_pool.keys() ) )
-        two_fittest_individuals.append(
-            ''.join( random.sample( list_associated_to_the_new_max_key, 1 ) )
-        )
+    return as_mating_pool( nfs_mating_pool ).get_two_fittest_individuals()
 
-    return two_fittest_individuals
 
+def reproduction( mating_pool, length_new_population, instrumentation = None,
+                  crossover_operator = 'random_positions', duplicate_filter = None,
+                  selection_strategy = None, number_of_mutations = 1 ):
 
-def reproduction( mating_pool, length_new_population ):
-
-    two_fittest_individuals = get_two_fittest_individuals(
-        get_normalised_fitness_score_mating_pool( mating_pool )
+    # duplicate_filter (e.g. generic_ga/fitness_cache.py's DuplicateFilter)
+    # rejects or breeds again the children identical to a parent or to an
+    # earlier child, so they are never evaluated.
+    # number_of_mutations: mutated letters per child, e.g. raised by
+    # generic_ga/run_controller.py during a plateau.
+    parent_pairs, parents, get_parent_pair = get_parent_pairs(
+        as_mating_pool( mating_pool ), length_new_population, selection_strategy
     )
 
-    print( two_fittest_individuals )
+    def breed( parent_pair ):
+        with get_phase( instrumentation, 'crossover' ):
+            child_word = crossover( parent_pair, crossover_operator )
+        with get_phase( instrumentation, 'mutation' ):
+            return get_mutated_word( child_word, number_of_mutations )
 
     # mating.
     #
     new_population = []
-    for i in range( length_new_population ):
+    for parent_pair in parent_pairs:
+        new_population.append( breed( parent_pair ) )
 
-        child_word = crossover( two_fittest_individuals )
-        child_word = get_mutated_word( child_word, 1 )
-        new_population.append( child_word )
+    if duplicate_filter is not None:
+        new_population = duplicate_filter.get_unique_children(
+            new_population, lambda: breed( get_parent_pair() ), parents,
+            instrumentation
+        )
 
-    print( new_population )
+    logger.debug( 'new population: %s', new_population )
 
     return new_population
@@ -0,0 +1,94 @@
+# Genetic algorithms examples - word search on the generic GA engine.
+# MIT License.
+
+# The batched word search operators (see word_search_batched_ga.py) behind
+# generic_ga/engine.py's Problem interface:
+#
+#   engine = Engine( WordSearchProblem( 'supercalifragilisticexpialidocious' ),
+#                    population_size = 10 )
+#   best_fitness, best_word = engine.run( target_fitness = 1.0 )
+#
+# delta_scoring: the words carry their match bitmaps and counts (see
+# word_search_batched_ga.reproduction_with_bitmaps()), the children are
+# never compared with the target word. mutation_mode 'mismatch' needs it.
+# evaluator: e.g. a generic_ga/fitness_cache.py CachedEvaluator, scoring the
+# words without delta scoring.
+
+
+import os, sys
+import numpy as np
+import word_search_batched_ga as ga
+
+sys.path.append(
+    os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), '..', 'generic_ga' )
+)
+from engine import Problem
+
+
+class WordSearchProblem( Problem ):
+
+    def __init__( self, ref_word, crossover_operator = 'random_positions',
+                  crossover_fraction = 0.5, delta_scoring = False,
+                  mutation_mode = 'uniform', evaluator = None ):
+        if mutation_mode not in ga.MUTATION_MODES:
+            raise ValueError( 'unknown mutation mode: %s' % mutation_mode )
+        if mutation_mode != 'uniform' and not delta_scoring:
+            raise ValueError( 'the %s mutation needs delta scoring' % mutation_mode )
+        self.ref_word = ref_word
+        self.encoded_ref = ga.encode_word( ref_word )
+        self.crossover_operator = crossover_operator
+        self.crossover_fraction = crossover_fraction
+        self.delta_scoring = delta_scoring
+        self.mutation_mode = mutation_mode
+        self.evaluator = evaluator
+
+    def get_initial_population( self, population_size, rng ):
+        return ga.get_initial_population( population_size, len( self.ref_word ), rng )
+
+    def evaluate( self, population ):
+        return ga.selection( population, self.encoded_ref, evaluator = self.evaluator )
+
+    def crossover( self, parents_1, parents_2, rng, out ):
+        # same masks as ga.crossover(), written in place.
+        mask = ga.get_crossover_mask(
+            self.crossover_operator, len( out ), len( self.ref_word ), rng,
+            self.crossover_fraction
+        )
+        np.copyto( out, parents_2 )
+        np.copyto( out, parents_1, where=mask )
+        return out
+
+    def mutate( self, population, number_of_mutations, rng ):
+        return ga.get_mutated_population( population, number_of_mutations, rng )
+
+    def get_scoring_state( self, population ):
+        # ( match bitmaps, counts ).
+        return ga.get_match_bitmaps( population, self.encoded_ref )
+
+    def get_state_fitnesses( self, scoring_state ):
+        return scoring_state[1] / float( len( self.ref_word ) )
+
+    def crossover_with_state( self, parents_1, parents_2, states_1, states_2, rng, out ):
+        # the same masks as crossover(); shared parents only count the
+        # positions where their bitmaps differ.
+        children, bitmaps, counts = ga.crossover_with_bitmaps(
+            ( parents_1, parents_2 ), ( states_1[0], states_2[0] ),
+            ( states_1[1], states_2[1] ), len( out ), rng,
+            self.crossover_operator, self.crossover_fraction
+        )
+        out[ ... ] = children
+        return bitmaps, counts
+
+    def mutate_with_state( self, population, scoring_state, number_of_mutations, rng ):
+        bitmaps, counts = scoring_state
+        ga.get_mutated_population_with_bitmaps(
+            population, bitmaps, counts, self.encoded_ref, number_of_mutations, rng,
+            self.mutation_mode
+        )
+        return population
+
+    def encode( self, individual ):
+        return ga.encode_word( individual )
+
+    def decode( self, genome ):
+        return ga.decode_word( genome )